@@ -0,0 +1,240 @@
+# benchmarks/bench_agent_loop.py
+"""
+Benchmark: framework overhead of the agent loop, offline.
+Drives ToolUsingAgent with a deterministic scripted model (no API key, no
+network), so every microsecond measured is the loop's own cost:
+- per-turn overhead, with and without a tool call, with tracing on and with token accounting
+- tool dispatch throughput, with the tool memo off and on
+- scaling with the number of tool calls per turn
+- memory per session as the history grows, with and without the token budget
+
+Results are printed and written to JSON so runs can be compared over time.
+
+Run with: uv run python -m benchmarks.bench_agent_loop [--quick] [--output PATH]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+from src.agent.accounting import TokenAccountant
+from src.agent.history import HistoryManager
+from src.agent.loop import ToolUsingAgent
+from src.agent.scripted import ScriptedChatModel, tool_turn_responder
+from src.agent.tracing import disable_tracing, enable_local_tracing
+from src.tools.memo import TOOL_MEMO
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+TURNS = 300
+SCALING_CALLS = [1, 2, 4, 8, 16, 32]
+MEMORY_TURNS = [0, 10, 50, 100, 200]
+
+# Quick mode, for a smoke run
+QUICK_TURNS = 30
+QUICK_SCALING_CALLS = [1, 4, 16]
+QUICK_MEMORY_TURNS = [0, 10, 50]
+
+
+def calc_calls(count: int, unique: bool = True) -> Callable[[int], List[Dict[str, Any]]]:
+    """Tool calls for each turn: `count` calc calls, distinct per turn unless unique is False."""
+    def calls(turn: int) -> List[Dict[str, Any]]:
+        base = turn if unique else 0
+        return [{"name": "calc", "args": {"expression": f"{base} + {i}"}} for i in range(count)]
+    return calls
+
+
+def make_agent(calls: Callable[[int], List[Dict[str, Any]]], **kwargs) -> ToolUsingAgent:
+    """An agent driven by a scripted model that does not keep its requests."""
+    model = ScriptedChatModel(responder=tool_turn_responder(calls), record=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = ToolUsingAgent(llm=model, **kwargs)
+        agent.llm_with_tools
+    return agent
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Mean, median and p95 of per-turn times, in microseconds."""
+    ordered = sorted(samples)
+    return {
+        "mean_us": statistics.fmean(ordered) * 1e6,
+        "p50_us": ordered[len(ordered) // 2] * 1e6,
+        "p95_us": ordered[int(len(ordered) * 0.95) - 1] * 1e6,
+    }
+
+
+def time_turns(agent: ToolUsingAgent, turns: int, use_async: bool = False) -> List[float]:
+    """Per-turn wall time of `turns` turns through run() or arun()."""
+    samples = []
+    if use_async:
+        async def drive():
+            for turn in range(turns):
+                start = time.perf_counter()
+                await agent.arun(f"Question {turn}", verbose=False)
+                samples.append(time.perf_counter() - start)
+        asyncio.run(drive())
+        return samples
+    for turn in range(turns):
+        start = time.perf_counter()
+        agent.run(f"Question {turn}", verbose=False)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_turn_overhead(turns: int) -> Dict[str, Any]:
+    results = {}
+    scenarios = {
+        "no_tools_run": (calc_calls(0), False, False, {}),
+        "one_tool_run": (calc_calls(1), False, False, {}),
+        "one_tool_arun": (calc_calls(1), True, False, {}),
+        "one_tool_traced": (calc_calls(1), False, True, {}),
+        "one_tool_accounted": (calc_calls(1), False, False, {"accountant": TokenAccountant()}),
+    }
+    for name, (calls, use_async, traced, kwargs) in scenarios.items():
+        TOOL_MEMO.invalidate()
+        agent = make_agent(calls, **kwargs)
+        if traced:
+            enable_local_tracing()
+        try:
+            time_turns(agent, 5, use_async)  # warm up
+            results[name] = summarize(time_turns(agent, turns, use_async))
+        finally:
+            disable_tracing()
+    return results
+
+
+def bench_dispatch(turns: int, calls_per_turn: int = 8) -> Dict[str, Any]:
+    results = {}
+    for name, memo, unique in [("memo_off", None, True), ("memo_on_repeated", TOOL_MEMO, False)]:
+        TOOL_MEMO.invalidate()
+        agent = make_agent(calc_calls(calls_per_turn, unique), tool_memo=memo)
+        time_turns(agent, 5)
+        start = time.perf_counter()
+        time_turns(agent, turns)
+        elapsed = time.perf_counter() - start
+        results[name] = {
+            "calls_per_turn": calls_per_turn,
+            "calls_per_sec": turns * calls_per_turn / elapsed,
+        }
+    return results
+
+
+def bench_scaling(turns: int, call_counts: List[int]) -> List[Dict[str, Any]]:
+    rows = []
+    for count in call_counts:
+        TOOL_MEMO.invalidate()
+        agent = make_agent(calc_calls(count), tool_memo=None)
+        time_turns(agent, 3)
+        stats = summarize(time_turns(agent, max(turns // 4, 10)))
+        rows.append({"calls": count, **stats, "per_call_us": stats["mean_us"] / count})
+    return rows
+
+
+def session_bytes(turns: int, history: Optional[HistoryManager]) -> int:
+    """Memory held by one agent session after `turns` one-tool turns."""
+    TOOL_MEMO.invalidate()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        agent = make_agent(calc_calls(1), tool_memo=None, history=history)
+        for turn in range(turns):
+            agent.run(f"Question {turn}: what is {turn} + 0?", verbose=False)
+        gc.collect()
+        held, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del agent
+    return held
+
+
+def bench_memory(turn_counts: List[int]) -> Dict[str, Any]:
+    results = {}
+    for name, history in [("token_budget", HistoryManager), ("unbounded", lambda: HistoryManager(max_tokens=10**9))]:
+        rows = [{"turns": turns, "bytes": session_bytes(turns, history())} for turns in turn_counts]
+        for row in rows[1:]:
+            row["bytes_per_turn"] = (row["bytes"] - rows[0]["bytes"]) / row["turns"]
+        results[name] = rows
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quick", action="store_true", help="fewer turns, for a smoke run")
+    parser.add_argument("--output", help="JSON file to write (default: benchmarks/results/agent_loop_<time>.json)")
+    args = parser.parse_args(argv)
+    
+    turns = QUICK_TURNS if args.quick else TURNS
+    call_counts = QUICK_SCALING_CALLS if args.quick else SCALING_CALLS
+    memory_turns = QUICK_MEMORY_TURNS if args.quick else MEMORY_TURNS
+    
+    print("=" * 60)
+    print("BENCHMARK: agent loop overhead (scripted model)")
+    print("=" * 60)
+    
+    overhead = bench_turn_overhead(turns)
+    print(f"\nPer-turn overhead ({turns} turns):")
+    print(f"  {'scenario':<18} {'mean µs':>10} {'p50 µs':>10} {'p95 µs':>10}")
+    for name, stats in overhead.items():
+        print(f"  {name:<18} {stats['mean_us']:>10.0f} {stats['p50_us']:>10.0f} {stats['p95_us']:>10.0f}")
+    
+    dispatch = bench_dispatch(turns)
+    print(f"\nTool dispatch throughput:")
+    for name, stats in dispatch.items():
+        print(f"  {name:<16} {stats['calls_per_sec']:>10,.0f} calls/s")
+    
+    scaling = bench_scaling(turns, call_counts)
+    print(f"\nScaling with tool calls per turn:")
+    print(f"  {'calls':>5} {'mean µs':>10} {'µs/call':>10}")
+    for row in scaling:
+        print(f"  {row['calls']:>5} {row['mean_us']:>10.0f} {row['per_call_us']:>10.0f}")
+    
+    memory = bench_memory(memory_turns)
+    print(f"\nMemory per session:")
+    print(f"  {'turns':>5} " + " ".join(f"{name + ' KiB':>16}" for name in memory))
+    for i, turns_done in enumerate(memory_turns):
+        print(f"  {turns_done:>5} " + " ".join(f"{rows[i]['bytes'] / 1024:>16.1f}" for rows in memory.values()))
+    
+    report = {
+        "benchmark": "agent_loop",
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": args.quick,
+        "turn_overhead": overhead,
+        "tool_dispatch": dispatch,
+        "scaling": scaling,
+        "memory": memory,
+    }
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"agent_loop_{stamp}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+# benchmarks/bench_batch.py
+"""
+Benchmark: batch throughput of run_many vs a serial loop over run(), offline.
+The scripted model sleeps for a fixed time per call to stand in for the
+network latency of a real model, so the gain from overlapping prompts shows.
+
+Run with: uv run python -m benchmarks.bench_batch [--prompts N] [--latency-ms MS]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import sys
+import time
+from src.agent.loop import ToolUsingAgent
+from src.agent.scripted import ScriptedChatModel, tool_turn_responder
+from src.tools.memo import TOOL_MEMO
+
+PROMPTS = 200
+LATENCY_MS = 20.0
+CONCURRENCY_LEVELS = [1, 4, 16, 64]
+
+
+class LatentChatModel(ScriptedChatModel):
+    """Scripted model whose async calls wait `latency` seconds, like a remote model."""
+    
+    def __init__(self, latency: float, **kwargs):
+        super().__init__(**kwargs)
+        self.latency = latency
+    
+    async def ainvoke(self, messages, **kwargs):
+        await asyncio.sleep(self.latency)
+        return self.invoke(messages)
+
+
+def make_agent(latency: float) -> ToolUsingAgent:
+    """One-tool turns: two model calls per prompt."""
+    model = LatentChatModel(
+        latency,
+        responder=tool_turn_responder(lambda turn: [{"name": "calc", "args": {"expression": f"{turn} * 2"}}]),
+        record=False,
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = ToolUsingAgent(llm=model, tool_memo=None)
+        agent.llm_with_tools
+    return agent
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--prompts", type=int, default=PROMPTS, help="prompts per batch")
+    parser.add_argument("--latency-ms", type=float, default=LATENCY_MS, help="simulated latency per model call")
+    args = parser.parse_args(argv)
+    latency = args.latency_ms / 1000
+    prompts = [f"Question {i}: what is {i} * 2?" for i in range(args.prompts)]
+    
+    print("=" * 60)
+    print(f"BENCHMARK: batch execution ({args.prompts} prompts, {args.latency_ms:.0f} ms per model call)")
+    print("=" * 60)
+    
+    TOOL_MEMO.invalidate()
+    agent = make_agent(latency)
+    start = time.perf_counter()
+    for prompt in prompts:
+        agent.spawn().run(prompt, verbose=False)
+    serial = args.prompts / (time.perf_counter() - start)
+    
+    print(f"\n  {'mode':<16} {'prompts/s':>10} {'speedup':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    print(f"  {'serial run()':<16} {serial:>10.1f} {1.0:>7.1f}x")
+    for concurrency in CONCURRENCY_LEVELS:
+        batch = make_agent(latency).run_many(prompts, concurrency=concurrency)
+        batch.collect()
+        stats = batch.stats
+        print(
+            f"  {f'run_many({concurrency})':<16} {stats.throughput:>10.1f} {stats.throughput / serial:>7.1f}x "
+            f"{stats.p50_ms:>8.1f} {stats.p95_ms:>8.1f} {stats.p99_ms:>8.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+# benchmarks/bench_calc.py
+"""
+Micro-benchmark: compiled, cached calc evaluator vs the original eval-based one.
+Runs a hot set of repeated expressions through both implementations.
+
+Run with: uv run python -m benchmarks.bench_calc
+"""
+
+import re
+import timeit
+from src.tools.calculator import compile_expression
+from src.tools.execution import execute_calc
+
+# A small set of expressions that repeats, like a busy support flow
+HOT_EXPRESSIONS = [
+    "18% of 24500",
+    "2 + 2 * 3",
+    "(5 + 3) * 2",
+    "100 / 4",
+    "25 * 48",
+    "1250.50 - 399.99 + 12.75",
+    "7.5% of 1999",
+    "((1 + 2) * (3 + 4)) / 5",
+]
+
+ROUNDS = 20_000
+
+
+def legacy_execute_calc(expression: str) -> str:
+    """The original execute_calc: regex + character checks + eval on every call."""
+    try:
+        if not expression or expression.strip() == "":
+            return "Error: Empty expression provided."
+        percentage_pattern = r'(\d+(?:\.\d+)?)\s*%\s*of\s*(\d+(?:\.\d+)?)'
+        match = re.search(percentage_pattern, expression.lower())
+        if match:
+            percentage = float(match.group(1))
+            number = float(match.group(2))
+            result = (percentage / 100) * number
+            return f"Calculation: {percentage}% of {number} = {result:,.2f}\n\nSteps:\n1. Convert {percentage}% to decimal: {percentage}/100 = {percentage/100}\n2. Multiply: {percentage/100} × {number} = {result:,.2f}"
+        allowed_chars = set('0123456789+-*/()%. ')
+        if not all(c in allowed_chars for c in expression):
+            return "Error: Invalid characters in expression."
+        if expression.count('(') != expression.count(')'):
+            return "Error: Unmatched parentheses in expression."
+        result = eval(expression, {"__builtins__": {}}, {})
+        return f"Calculation: {expression} = {result}"
+    except ZeroDivisionError:
+        return "Error: Division by zero is not allowed."
+
+
+def run_hot_set(calc):
+    for expression in HOT_EXPRESSIONS:
+        calc(expression)
+
+
+def main():
+    """Time both implementations and print throughput and speedup."""
+    for expression in HOT_EXPRESSIONS:
+        assert legacy_execute_calc(expression) == execute_calc(expression), expression
+    
+    compile_expression.cache_clear()
+    calls = ROUNDS * len(HOT_EXPRESSIONS)
+    legacy = timeit.timeit(lambda: run_hot_set(legacy_execute_calc), number=ROUNDS)
+    compiled = timeit.timeit(lambda: run_hot_set(execute_calc), number=ROUNDS)
+    
+    print("=" * 60)
+    print("BENCHMARK: calc evaluator on a hot set of repeated expressions")
+    print("=" * 60)
+    print(f"Expressions: {len(HOT_EXPRESSIONS)} distinct, {calls:,} calls each")
+    print(f"eval-based:     {calls / legacy:>12,.0f} calls/s  ({legacy / calls * 1e6:.2f} µs/call)")
+    print(f"compiled+LRU:   {calls / compiled:>12,.0f} calls/s  ({compiled / calls * 1e6:.2f} µs/call)")
+    print(f"Speedup:        {legacy / compiled:.1f}x")
+    print(f"Cache: {compile_expression.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
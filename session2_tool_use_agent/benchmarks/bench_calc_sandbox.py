@@ -0,0 +1,87 @@
+# benchmarks/bench_calc_sandbox.py
+"""
+Benchmark: calc in the process-pool sandbox vs inline evaluation.
+- throughput of cheap expressions inline and through the sandbox, from one
+  and from several calling threads (the agent's tool threads)
+- how long a pathological expression holds up a caller, and how long the
+  pool takes to be back at full strength
+
+Run with: uv run python -m benchmarks.bench_calc_sandbox [--workers N] [--threads N]
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.tools.execution import evaluate_calc
+from src.tools.sandbox import CALC_SANDBOX_WORKERS, CalcSandbox
+
+CHEAP_EXPRESSIONS = [
+    "18% of 24500",
+    "2 + 2 * 3",
+    "(5 + 3) * 2",
+    "2 ** 10",
+    "1250.50 - 399.99 + 12.75",
+    "((1 + 2) * (3 + 4)) / 5",
+]
+
+PATHOLOGICAL = "9**9**9"
+CALLS = 4000
+THREADS = 4
+
+
+def throughput(evaluate, calls: int, threads: int) -> float:
+    """Calls per second of `evaluate` over the cheap expressions."""
+    expressions = [CHEAP_EXPRESSIONS[i % len(CHEAP_EXPRESSIONS)] for i in range(calls)]
+    start = time.perf_counter()
+    if threads == 1:
+        for expression in expressions:
+            evaluate(expression)
+    else:
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(evaluate, expressions))
+    return calls / (time.perf_counter() - start)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--workers", type=int, default=CALC_SANDBOX_WORKERS)
+    parser.add_argument("--threads", type=int, default=THREADS)
+    parser.add_argument("--calls", type=int, default=CALLS)
+    parser.add_argument("--timeout", type=float, default=1.0)
+    args = parser.parse_args()
+    
+    with CalcSandbox(workers=args.workers, timeout=args.timeout) as sandbox:
+        start = time.perf_counter()
+        sandbox.start()
+        startup = time.perf_counter() - start
+        for expression in CHEAP_EXPRESSIONS:
+            assert sandbox.evaluate(expression) == evaluate_calc(expression), expression
+        
+        print("=" * 60)
+        print("BENCHMARK: calc sandbox (process pool) vs inline evaluation")
+        print("=" * 60)
+        print(f"Workers: {args.workers}, pool startup {startup * 1000:.0f} ms")
+        print(f"{'':<28}{'calls/s':>12}{'µs/call':>10}")
+        for threads in (1, args.threads):
+            inline = throughput(evaluate_calc, args.calls, threads)
+            pooled = throughput(sandbox.evaluate, args.calls, threads)
+            print(f"{f'inline, {threads} thread(s)':<28}{inline:>12,.0f}{1e6 / inline:>10.1f}")
+            print(f"{f'sandbox, {threads} thread(s)':<28}{pooled:>12,.0f}{1e6 / pooled:>10.1f}")
+        
+        start = time.perf_counter()
+        result = sandbox.evaluate(PATHOLOGICAL)
+        stalled = time.perf_counter() - start
+        start = time.perf_counter()
+        recovered = sandbox.evaluate("1 + 1")
+        recovery = time.perf_counter() - start
+        print(f"\n{PATHOLOGICAL!r}: {result.splitlines()[0]}")
+        print(f"Caller held up {stalled:.2f}s (timeout {args.timeout:g}s); "
+              f"next call after the worker was replaced: {recovery * 1000:.0f} ms")
+        print(f"Stats: {sandbox.stats.to_dict()}")
+    
+    return 0 if recovered == "Calculation: 1 + 1 = 2" and result.startswith("Error") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
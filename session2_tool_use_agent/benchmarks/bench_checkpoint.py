@@ -0,0 +1,117 @@
+# benchmarks/bench_checkpoint.py
+"""
+Benchmark: cost of durable checkpoints, offline.
+Runs a scripted one-tool conversation and saves it to a CheckpointStore
+after every turn, timing only the save:
+- per-turn save time, committing every turn vs in batches
+- whether the save time grows with the conversation (it should not: writes are append-only)
+- lazy resume (load) time of a long conversation
+- compaction time
+
+Exits with status 1 if the p95 batched save time exceeds the budget.
+
+Run with: uv run python -m benchmarks.bench_checkpoint [--turns N]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List
+from src.agent.checkpoint import CHECKPOINT_BATCH_SIZE, CheckpointStore
+from src.agent.history import HistoryManager
+from src.agent.loop import ToolUsingAgent
+from src.agent.scripted import ScriptedChatModel, tool_turn_responder
+from src.tools.memo import TOOL_MEMO
+
+TURNS = 500
+
+# Budget for the p95 save time of one turn with batched commits, in milliseconds
+SAVE_BUDGET_MS = 5.0
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Mean and p95 of save times, in microseconds."""
+    ordered = sorted(samples)
+    return {
+        "mean_us": statistics.fmean(ordered) * 1e6,
+        "p95_us": ordered[max(int(len(ordered) * 0.95) - 1, 0)] * 1e6,
+    }
+
+
+def time_saves(store: CheckpointStore, turns: int) -> List[float]:
+    """Save time of each turn of a one-tool conversation (history kept whole)."""
+    TOOL_MEMO.invalidate()
+    model = ScriptedChatModel(
+        responder=tool_turn_responder(lambda turn: [{"name": "calc", "args": {"expression": f"{turn} + 1"}}]),
+        record=False,
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = ToolUsingAgent(llm=model, history=HistoryManager(max_tokens=10**9), tool_memo=None)
+    samples = []
+    for turn in range(turns):
+        agent.run(f"Question {turn}: what is {turn} + 1?", verbose=False)
+        start = time.perf_counter()
+        store.save("bench", agent.messages, agent.state, agent.history)
+        samples.append(time.perf_counter() - start)
+    store.flush()
+    return samples
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=TURNS, help="turns per conversation")
+    args = parser.parse_args(argv)
+    
+    print("=" * 60)
+    print("BENCHMARK: conversation checkpoints (SQLite, WAL)")
+    print("=" * 60)
+    
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, batch_size in [("commit_every_turn", 1), (f"batch_{CHECKPOINT_BATCH_SIZE}", CHECKPOINT_BATCH_SIZE)]:
+            path = os.path.join(tmp, f"{name}.db")
+            store = CheckpointStore(path, batch_size=batch_size)
+            samples = time_saves(store, args.turns)
+            tenth = max(args.turns // 10, 1)
+            results[name] = {
+                **summarize(samples),
+                "first_tenth_mean_us": statistics.fmean(samples[:tenth]) * 1e6,
+                "last_tenth_mean_us": statistics.fmean(samples[-tenth:]) * 1e6,
+            }
+            store.close()
+        
+        print(f"\nPer-turn save time ({args.turns} turns):")
+        print(f"  {'mode':<18} {'mean µs':>9} {'p95 µs':>9} {'first 10% µs':>13} {'last 10% µs':>12}")
+        for name, row in results.items():
+            print(
+                f"  {name:<18} {row['mean_us']:>9.0f} {row['p95_us']:>9.0f} "
+                f"{row['first_tenth_mean_us']:>13.0f} {row['last_tenth_mean_us']:>12.0f}"
+            )
+        
+        path = os.path.join(tmp, f"batch_{CHECKPOINT_BATCH_SIZE}.db")
+        store = CheckpointStore(path)
+        start = time.perf_counter()
+        checkpoint = store.load("bench")
+        load_ms = (time.perf_counter() - start) * 1000
+        size_kib = os.path.getsize(path) / 1024
+        start = time.perf_counter()
+        deleted = store.compact()
+        compact_ms = (time.perf_counter() - start) * 1000
+        store.close()
+        
+        print(f"\nResume: {len(checkpoint.messages)} messages loaded in {load_ms:.1f} ms")
+        print(f"Compact: {deleted} rows deleted in {compact_ms:.1f} ms (database was {size_kib:.0f} KiB)")
+    
+    p95_ms = results[f"batch_{CHECKPOINT_BATCH_SIZE}"]["p95_us"] / 1000
+    ok = p95_ms <= SAVE_BUDGET_MS
+    print(f"\nBatched p95 save: {p95_ms:.2f} ms (budget {SAVE_BUDGET_MS:.1f} ms) -> {'OK' if ok else 'OVER BUDGET'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+# benchmarks/bench_faq_search.py
+"""
+Benchmark: FAQ retrieval recall and latency.
+Compares the original substring lookup with BM25 keyword search and the
+offline semantic search on held-out paraphrased questions, then measures
+latency on a large synthetic knowledge base.
+
+Run with: uv run python -m benchmarks.bench_faq_search
+"""
+
+import random
+import time
+from src.tools.execution import FAQ_DATABASE, FAQ_PHRASINGS
+from src.tools.faq_store import InMemoryFaqStore
+from src.tools.semantic_faq import SemanticFaqStore
+
+# Held-out questions (not in FAQ_PHRASINGS) and the topic they should find.
+# None means the FAQ has no answer and the lookup should fall back.
+LABELED_QUERIES = {
+    "I'd like my money back please": "refund policy",
+    "how do I return something I bought": "refund policy",
+    "returning a purchase": "refund policy",
+    "how many days until my package arrives": "shipping",
+    "is delivery free": "shipping",
+    "shipping costs": "shipping",
+    "what hours is support open": "business hours",
+    "when can I call you": "business hours",
+    "contact hours": "business hours",
+    "can I use apple pay": "payment methods",
+    "do you accept visa": "payment methods",
+    "paying by card": "payment methods",
+    "my item arrived defective": "warranty",
+    "is there a guarantee on products": "warranty",
+    "product warranty coverage": "warranty",
+    "cryptocurrency policy": None,
+    "what's the weather in Paris": None,
+    "tell me a joke": None,
+    "how tall is mount everest": None,
+}
+
+LARGE_CORPUS_SIZE = 20_000
+QUERY_BATCH = 256
+
+
+def substring_lookup(faqs, query):
+    """The original execute_lookup_faq matching: first key contained in the query."""
+    query_lower = query.lower().strip()
+    for key in faqs:
+        if key in query_lower or query_lower in key:
+            return key
+    return None
+
+
+def evaluate(name, lookup):
+    """Print recall@1 on answerable questions and false positives on the rest."""
+    answerable = [q for q, topic in LABELED_QUERIES.items() if topic]
+    unanswerable = [q for q, topic in LABELED_QUERIES.items() if not topic]
+    start = time.perf_counter()
+    found = {q: lookup(q) for q in LABELED_QUERIES}
+    elapsed = time.perf_counter() - start
+    
+    recall = sum(found[q] == LABELED_QUERIES[q] for q in answerable) / len(answerable)
+    false_positives = sum(found[q] is not None for q in unanswerable)
+    print(f"{name:<12} recall@1 {recall:6.1%}   false positives {false_positives}/{len(unanswerable)}"
+          f"   {elapsed / len(LABELED_QUERIES) * 1e6:8.1f} µs/query")
+
+
+def first_topic(store):
+    def lookup(query):
+        hits = store.search(query, k=1)
+        return hits[0].topic if hits else None
+    return lookup
+
+
+def synthetic_faqs(size):
+    """A large FAQ built from the real entries with extra filler topics."""
+    random.seed(0)
+    words = [w for entry in FAQ_DATABASE.values() for w in entry["answer"].lower().split()]
+    faqs = dict(FAQ_DATABASE)
+    for i in range(size - len(faqs)):
+        faqs[f"topic {i} {' '.join(random.sample(words, 2))}"] = {
+            "answer": " ".join(random.sample(words, 12)),
+            "source_title": f"Article {i}",
+        }
+    return faqs
+
+
+def main():
+    print("=" * 70)
+    print("BENCHMARK: FAQ retrieval on held-out paraphrased questions")
+    print("=" * 70)
+    evaluate("substring", lambda q: substring_lookup(FAQ_DATABASE, q))
+    evaluate("bm25", first_topic(InMemoryFaqStore(FAQ_DATABASE)))
+    evaluate("semantic", first_topic(SemanticFaqStore.from_faqs(FAQ_DATABASE, FAQ_PHRASINGS)))
+    
+    print("\n" + "=" * 70)
+    print(f"BENCHMARK: latency on {LARGE_CORPUS_SIZE:,} FAQ entries")
+    print("=" * 70)
+    faqs = synthetic_faqs(LARGE_CORPUS_SIZE)
+    queries = [random.choice(list(LABELED_QUERIES)) for _ in range(QUERY_BATCH)]
+    
+    start = time.perf_counter()
+    for query in queries:
+        substring_lookup(faqs, query)
+    print(f"substring scan:       {(time.perf_counter() - start) / len(queries) * 1e3:8.3f} ms/query")
+    
+    store = SemanticFaqStore.from_faqs(faqs, FAQ_PHRASINGS)
+    start = time.perf_counter()
+    for query in queries[:32]:
+        store.search(query, k=5)
+    print(f"semantic, one by one: {(time.perf_counter() - start) / 32 * 1e3:8.3f} ms/query")
+    
+    start = time.perf_counter()
+    store.search_batch(queries, k=5)
+    print(f"semantic, batched:    {(time.perf_counter() - start) / len(queries) * 1e3:8.3f} ms/query"
+          f"  (batch of {len(queries)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# benchmarks/bench_gazetteer.py
+"""
+Benchmark: location resolution for get_time.
+Measures gazetteer build time and per-lookup latency for exact, prefix and
+fuzzy queries, cold (first lookup) and cached (repeat lookup).
+
+Run with: uv run python -m benchmarks.bench_gazetteer
+"""
+
+import time
+from src.tools.gazetteer import Gazetteer, get_zone
+
+QUERIES = {
+    "exact": ["NYC", "Tokyo", "Europe/Paris", "Japan", "Sao Paulo"],
+    "prefix": ["Johannes", "Kathman", "Reykjav"],
+    "fuzzy": ["Johannesburgh", "Londn", "Bankok", "Kolkatta", "Sidney"],
+    "no match": ["Mars", "Narnia", "Atlantis Prime"],
+}
+
+ROUNDS = 2_000
+
+
+def time_per_call(fn, rounds=ROUNDS):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main():
+    print("=" * 60)
+    print("BENCHMARK: gazetteer location resolution")
+    print("=" * 60)
+    start = time.perf_counter()
+    gazetteer = Gazetteer.from_sources()
+    print(f"Build: {(time.perf_counter() - start) * 1e3:.1f} ms for {len(gazetteer):,} names\n")
+    
+    print(f"{'kind':<10} {'cold µs':>10} {'cached µs':>10}")
+    for kind, queries in QUERIES.items():
+        cold = sum(time_per_call(lambda: gazetteer._resolve(q), 200) for q in queries) / len(queries)
+        cached = sum(time_per_call(lambda: gazetteer.resolve(q)) for q in queries) / len(queries)
+        print(f"{kind:<10} {cold:>10.1f} {cached:>10.2f}")
+    
+    from zoneinfo import ZoneInfo
+    print(f"\nZoneInfo(key):  {time_per_call(lambda: ZoneInfo('Asia/Tokyo')):.2f} µs")
+    print(f"get_zone(key):  {time_per_call(lambda: get_zone('Asia/Tokyo')):.2f} µs")
+
+
+if __name__ == "__main__":
+    main()
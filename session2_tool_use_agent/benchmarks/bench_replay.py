@@ -0,0 +1,88 @@
+# benchmarks/bench_replay.py
+"""
+Benchmark: replaying recorded model traffic, offline.
+Records one-tool conversations from a scripted model with simulated network
+latency to a cassette, then replays the recorded prompts through run_many:
+- at the recorded pace, which approximates the live run
+- as fast as possible, which leaves only the loop, tool and state code
+  (the setting for load tests and regression hunting)
+
+Pass --cassette to replay a cassette recorded from real traffic instead.
+
+Run with: uv run python -m benchmarks.bench_replay [--prompts N] [--cassette PATH]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from benchmarks.bench_batch import LatentChatModel
+from src.agent.cassette import Cassette, record, replay
+from src.agent.loop import ToolUsingAgent
+from src.agent.scripted import ScriptedChatModel, tool_turn_responder
+
+PROMPTS = 200
+LATENCY_MS = 20.0
+CONCURRENCY = 16
+
+
+def quiet_agent(model) -> ToolUsingAgent:
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = ToolUsingAgent(llm=model, tool_memo=None)
+    return agent
+
+
+def record_traffic(path: str, prompts: int, latency: float):
+    """Record `prompts` one-tool conversations, each in its own session."""
+    model = LatentChatModel(
+        latency,
+        responder=tool_turn_responder(lambda turn: [{"name": "calc", "args": {"expression": f"{turn} * 3"}}]),
+        record=False,
+    )
+    agent = quiet_agent(model)
+    cassette = record(agent, path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent.run_many([f"Question {i}: what is {i} * 3?" for i in range(prompts)], concurrency=CONCURRENCY).collect()
+    cassette.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--prompts", type=int, default=PROMPTS, help="conversations to record")
+    parser.add_argument("--cassette", help="replay this cassette instead of recording one")
+    args = parser.parse_args(argv)
+    
+    print("=" * 60)
+    print("BENCHMARK: record and replay of model traffic")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.cassette
+        if path is None:
+            path = os.path.join(tmp, "traffic.jsonl.zst")
+            start = time.perf_counter()
+            record_traffic(path, args.prompts, LATENCY_MS / 1000)
+            print(f"\nRecorded {args.prompts} conversations in {time.perf_counter() - start:.2f}s "
+                  f"({os.path.getsize(path) / 1024:.1f} KiB compressed)")
+        prompts = Cassette(path).prompts()
+        
+        print(f"\n  {'replay':<16} {'prompts/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'exact':>6} {'turn':>6} {'misses':>6}")
+        for name, scale in [("recorded pace", 1.0), ("full speed", None)]:
+            agent = quiet_agent(ScriptedChatModel())
+            model = replay(agent, path, latency_scale=scale)
+            with contextlib.redirect_stdout(io.StringIO()):
+                batch = agent.run_many(prompts, concurrency=CONCURRENCY, max_attempts=1)
+                batch.collect()
+            stats = batch.stats
+            print(
+                f"  {name:<16} {stats.throughput:>10.1f} {stats.p50_ms:>8.2f} {stats.p95_ms:>8.2f} "
+                f"{model.stats.exact:>6} {model.stats.turn:>6} {model.stats.misses:>6}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
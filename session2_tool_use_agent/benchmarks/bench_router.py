@@ -0,0 +1,94 @@
+# benchmarks/bench_router.py
+"""
+Benchmark: the fast-path router, offline.
+- cost of matching a query (paid by every turn when the router is on)
+- share of a mixed query set answered without the model
+- turn latency with and without the router, with a scripted model that
+  waits a fixed time per call to stand in for Gemini
+
+Run with: uv run python -m benchmarks.bench_router [--latency-ms MS]
+"""
+
+import argparse
+import contextlib
+import io
+import statistics
+import sys
+import time
+from benchmarks.bench_batch import LatentChatModel
+from src.agent.loop import ToolUsingAgent
+from src.agent.router import FastPathRouter
+from src.agent.scripted import tool_turn_responder
+from src.tools.memo import TOOL_MEMO
+
+LATENCY_MS = 300.0
+MATCH_ROUNDS = 2000
+
+QUERIES = [
+    "What is 18% of 24500?",
+    "calculate 1250 * 12",
+    "time in Tokyo",
+    "What time is it in London?",
+    "What's your refund policy?",
+    "What payment methods do you accept?",
+    "How long does shipping take to Canada?",
+    "Compare the time in Bangkok with New York and tell me if I can call now",
+    "What is 15% tip on a $86 dinner split between 3 people?",
+    "Can I return a gift without a receipt?",
+]
+
+
+def turn_latency(router, latency: float) -> float:
+    """Mean turn time over QUERIES, in ms; the model always makes one calc call."""
+    TOOL_MEMO.invalidate()
+    model = LatentChatModel(
+        latency,
+        responder=tool_turn_responder(lambda turn: [{"name": "calc", "args": {"expression": "2 + 2"}}]),
+        record=False,
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = ToolUsingAgent(llm=model, router=router)
+        samples = []
+        for query in QUERIES:
+            start = time.perf_counter()
+            agent.spawn().run(query, verbose=False)
+            samples.append(time.perf_counter() - start)
+    return statistics.fmean(samples) * 1000
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency-ms", type=float, default=LATENCY_MS, help="simulated latency per model call")
+    args = parser.parse_args(argv)
+    
+    print("=" * 60)
+    print("BENCHMARK: fast-path router")
+    print("=" * 60)
+    
+    start = time.perf_counter()
+    router = FastPathRouter()
+    print(f"\nBuilt in {(time.perf_counter() - start) * 1000:.1f} ms (first build imports the tool stack)")
+    
+    start = time.perf_counter()
+    for _ in range(MATCH_ROUNDS):
+        for query in QUERIES:
+            router.match(query)
+    per_query = (time.perf_counter() - start) / (MATCH_ROUNDS * len(QUERIES)) * 1e6
+    print(f"match(): {per_query:.1f} µs per query")
+    
+    routed = [q for q in QUERIES if FastPathRouter().match(q) is not None]
+    print(f"Routed {len(routed)}/{len(QUERIES)} queries:")
+    for query in QUERIES:
+        print(f"  {'→ tool ' if query in routed else '→ model'}  {query}")
+    
+    router = FastPathRouter()
+    without = turn_latency(None, args.latency_ms / 1000)
+    with_router = turn_latency(router, args.latency_ms / 1000)
+    print(f"\nMean turn latency at {args.latency_ms:.0f} ms per model call:")
+    print(f"  without router: {without:>8.1f} ms")
+    print(f"  with router:    {with_router:>8.1f} ms ({router.stats.short_circuit_rate:.0%} short-circuited)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+# benchmarks/bench_startup.py
+"""
+Benchmark: cold start of the agent package.
+Each sample runs in a fresh interpreter and measures importing src.agent.loop
+and constructing a ToolUsingAgent, the cost every CLI call and worker fork
+pays. Prints the slowest imports (as `python -X importtime` would) and exits
+with status 1 if the median cold start is over budget or a heavy module is
+loaded before first use.
+
+Run with: uv run python -m benchmarks.bench_startup [--budget-ms 1500]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SAMPLES = 5
+
+# Median import + construction time allowed, in milliseconds
+STARTUP_BUDGET_MS = 1500.0
+
+# Modules that must only be imported when an agent first calls the model or a tool
+DEFERRED_MODULES = [
+    "langchain_google_genai",
+    "langchain_core.tools",
+    "src.tools.schemas",
+    "src.tools.execution",
+    "src.agent.llm_cache",
+    "opentelemetry",
+]
+
+PROBE = f"""
+import contextlib, io, json, sys, time
+start = time.perf_counter()
+from src.agent.loop import ToolUsingAgent
+imported = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    ToolUsingAgent()
+built = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - start) * 1e3,
+    "construct_ms": (built - imported) * 1e3,
+    "loaded": [m for m in {DEFERRED_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def sample() -> dict:
+    """Run the probe in a fresh interpreter."""
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        capture_output=True, text=True, check=True,
+        # No disk cache, so only the agent's own startup is measured
+        env=dict(os.environ, LLM_CACHE_PATH=""),
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int = 10) -> list:
+    """The modules with the largest cumulative import time, from -X importtime."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.agent.loop"],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    parser.add_argument("--samples", type=int, default=SAMPLES)
+    args = parser.parse_args(argv)
+    
+    print("=" * 60)
+    print("BENCHMARK: agent cold start")
+    print("=" * 60)
+    samples = [sample() for _ in range(args.samples)]
+    import_ms = statistics.median(s["import_ms"] for s in samples)
+    construct_ms = statistics.median(s["construct_ms"] for s in samples)
+    total_ms = import_ms + construct_ms
+    print(f"import src.agent.loop: {import_ms:8.1f} ms (median of {args.samples})")
+    print(f"ToolUsingAgent():      {construct_ms:8.1f} ms")
+    print(f"cold start:            {total_ms:8.1f} ms (budget {args.budget_ms:.0f} ms)")
+    
+    print("\nSlowest imports (cumulative):")
+    for micros, name in slowest_imports():
+        print(f"  {micros / 1e3:8.1f} ms {name}")
+    
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"cold start {total_ms:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+    loaded = sorted({m for s in samples for m in s["loaded"]})
+    if loaded:
+        failures.append(f"loaded before first use: {', '.join(loaded)}")
+    for failure in failures:
+        print(f"\nFAIL: {failure}")
+    if not failures:
+        print("\nOK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+# benchmarks/bench_travel_search.py
+"""
+Benchmark: indexed NumPy inventory vs the notebook's list-comprehension searches.
+Both sides answer the same queries over the same rows (the list version
+scans a list of dicts, sorts the matches by price and keeps the first page).
+The indexed version is also run memory-mapped from disk at a larger size,
+to show its query time does not grow with the inventory.
+
+Run with: uv run python -m benchmarks.bench_travel_search [--rows N] [--large-rows N]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from src.travel.inventory import TravelInventory
+
+ROWS = 200_000
+LARGE_ROWS = 2_000_000
+QUERIES = 300
+PAGE = 10
+
+
+def to_dicts(inventory: TravelInventory):
+    """The inventory as the notebook's lists of dicts."""
+    cities, n_cities, n_categories = inventory.cities, len(inventory.cities), len(inventory.categories)
+    flights = [
+        {"origin": cities[r["route"] // n_cities], "destination": cities[r["route"] % n_cities],
+         "airline": inventory.airlines[r["airline"]], "price": float(r["price"]),
+         "duration": float(r["duration"]), "stops": int(r["stops"])}
+        for r in inventory.flights
+    ]
+    hotels = [
+        {"city": cities[r["city"]], "name": inventory.hotel_names[r["name"]],
+         "price": float(r["price"]), "rating": float(r["rating"])}
+        for r in inventory.hotels
+    ]
+    activities = [
+        {"city": cities[r["key"] // n_categories], "category": inventory.categories[r["key"] % n_categories],
+         "name": inventory.activity_names[r["name"]], "price": float(r["price"])}
+        for r in inventory.activities
+    ]
+    return flights, hotels, activities
+
+
+def make_queries(inventory: TravelInventory, count: int, seed: int = 1):
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        origin, destination = rng.sample(inventory.cities, 2)
+        interests = rng.sample(inventory.categories, 2)
+        queries.append((origin, destination, rng.choice([300, 600, 10000]), rng.choice([80, 150, 500]), interests))
+    return queries
+
+
+def run_lists(data, queries):
+    flights, hotels, activities = data
+    for origin, destination, max_fare, max_night, interests in queries:
+        found = [f for f in flights if f["origin"] == origin and f["destination"] == destination and f["price"] <= max_fare]
+        sorted(found, key=lambda f: f["price"])[:PAGE]
+        found = [h for h in hotels if h["city"] == destination and h["price"] <= max_night]
+        sorted(found, key=lambda h: h["price"])[:PAGE]
+        found = [a for a in activities if a["city"] == destination and a["category"] in interests and a["price"] <= 50]
+        sorted(found, key=lambda a: a["price"])[:PAGE]
+
+
+def run_indexed(inventory: TravelInventory, queries):
+    for origin, destination, max_fare, max_night, interests in queries:
+        inventory.search_flights(origin, destination, max_fare, PAGE)
+        inventory.search_hotels(destination, max_night, None, PAGE)
+        inventory.search_activities(destination, interests, 50, PAGE)
+
+
+def per_query_us(run, *args) -> float:
+    start = time.perf_counter()
+    run(*args)
+    return (time.perf_counter() - start) / len(args[-1]) * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--rows", type=int, default=ROWS, help="Rows per table for the comparison")
+    parser.add_argument("--large-rows", type=int, default=LARGE_ROWS, help="Rows per table for the memory-mapped run")
+    parser.add_argument("--queries", type=int, default=QUERIES)
+    args = parser.parse_args()
+    
+    inventory = TravelInventory.generate(args.rows, args.rows, args.rows)
+    queries = make_queries(inventory, args.queries)
+    data = to_dicts(inventory)
+    lists_us = per_query_us(run_lists, data, queries[: max(1, args.queries // 30)])
+    indexed_us = per_query_us(run_indexed, inventory, queries)
+    
+    with tempfile.TemporaryDirectory() as path:
+        TravelInventory.generate(args.large_rows, args.large_rows, args.large_rows).save(path)
+        start = time.perf_counter()
+        large = TravelInventory.load(path)
+        open_ms = (time.perf_counter() - start) * 1000
+        cold_us = per_query_us(run_indexed, large, queries)
+        warm_us = per_query_us(run_indexed, large, queries)
+        del large
+    
+    print("=" * 60)
+    print("BENCHMARK: travel search, indexed inventory vs list comprehensions")
+    print("=" * 60)
+    print("One query = flights + hotels + activities, first page of each")
+    print(f"{args.rows:,} rows per table:")
+    print(f"  list comprehensions:  {lists_us:>10,.0f} µs/query")
+    print(f"  indexed (in memory):  {indexed_us:>10,.1f} µs/query  ({lists_us / indexed_us:,.0f}x faster)")
+    print(f"{args.large_rows:,} rows per table, memory-mapped (opened in {open_ms:.1f} ms):")
+    print(f"  first pass (cold):    {cold_us:>10,.1f} µs/query")
+    print(f"  second pass (warm):   {warm_us:>10,.1f} µs/query")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+# benchmarks/bench_trip_pipeline.py
+"""
+Benchmark: planning a trip with the search stage vs letting the model search.
+- the trip's searches one after another, as the notebook's agent calls
+  them one per step, vs concurrently (asearch_trip)
+- a whole plan where the model asks for the searches and then answers
+  (two model calls), vs plan_trip(), which searches first and calls the
+  model once
+Searches and model calls are given a simulated latency, as for remote
+services; memo and per-thread caches are off so every plan searches.
+
+Run with: uv run python -m benchmarks.bench_trip_pipeline [--search-ms N] [--model-ms N]
+"""
+
+import argparse
+import sys
+import time
+from langchain_core.messages import AIMessage
+from langchain_core.tools import StructuredTool
+from src.agent.loop import ToolUsingAgent
+from src.agent.scripted import ScriptedChatModel, tool_call
+from src.tools.registry import ToolRegistry
+from src.travel.inventory import TravelInventory, set_inventory
+from src.travel.pipeline import TRIP_SEARCHES, plan_trip, search_trip, trip_search_calls
+from src.travel.preferences import TripPreferences
+from src.travel.schemas import TRAVEL_REGISTRY
+
+SEARCH_MS = 100
+MODEL_MS = 500
+PLANS = 5
+
+TRIP = TripPreferences("San Francisco", "Tokyo", "2025-04-10", "2025-04-13", 180, ["food", "culture"])
+
+
+def delayed_registry(seconds: float) -> ToolRegistry:
+    """The travel tools, each taking `seconds` longer."""
+    def delayed(tool):
+        def run(**kwargs) -> str:
+            time.sleep(seconds)
+            return tool.invoke(kwargs)
+        return StructuredTool.from_function(run, name=tool.name, description=tool.description, args_schema=tool.args_schema)
+    return ToolRegistry([delayed(tool) for tool in TRAVEL_REGISTRY])
+
+
+def delayed_model(seconds: float, searches: bool) -> ScriptedChatModel:
+    """A model that asks for the trip's searches first, or answers at once; `seconds` per call."""
+    calls = trip_search_calls(TRIP)
+    
+    def respond(messages):
+        time.sleep(seconds)
+        if searches and messages[-1].type != "tool":
+            return AIMessage(content="", tool_calls=[
+                tool_call(name, calls[name], f"call-{i}") for i, name in enumerate(TRIP_SEARCHES)
+            ])
+        return AIMessage(content="Day 1: ...")
+    return ScriptedChatModel(responder=respond, record=False)
+
+
+def per_plan_ms(run, plans: int) -> float:
+    start = time.perf_counter()
+    for _ in range(plans):
+        run()
+    return (time.perf_counter() - start) / plans * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--search-ms", type=float, default=SEARCH_MS, help="Simulated latency of one search")
+    parser.add_argument("--model-ms", type=float, default=MODEL_MS, help="Simulated latency of one model call")
+    parser.add_argument("--plans", type=int, default=PLANS)
+    args = parser.parse_args()
+    
+    set_inventory(TravelInventory.generate())
+    registry = delayed_registry(args.search_ms / 1000)
+    calls = trip_search_calls(TRIP)
+    
+    sequential_ms = per_plan_ms(lambda: [registry.get(name).invoke(calls[name]) for name in TRIP_SEARCHES], args.plans)
+    concurrent_ms = per_plan_ms(lambda: search_trip(TRIP, registry=registry, memo=None, cache=None), args.plans)
+    
+    def model_searches():
+        agent = ToolUsingAgent(llm=delayed_model(args.model_ms / 1000, True), registry=registry, tool_memo=None)
+        agent.run(f"Plan a trip: {TRIP.as_text()}. Search for options and create an itinerary.", verbose=False)
+    
+    def pipeline():
+        agent = ToolUsingAgent(llm=delayed_model(args.model_ms / 1000, False), registry=registry, tool_memo=None)
+        plan_trip(agent, TRIP, registry=registry, memo=None, cache=None)
+    
+    model_ms = per_plan_ms(model_searches, args.plans)
+    pipeline_ms = per_plan_ms(pipeline, args.plans)
+    
+    print("=" * 60)
+    print("BENCHMARK: trip planning, search stage vs model-driven searches")
+    print("=" * 60)
+    print(f"{len(TRIP_SEARCHES)} searches at {args.search_ms:g} ms, model calls at {args.model_ms:g} ms")
+    print("Searches only:")
+    print(f"  one after another:        {sequential_ms:>8,.0f} ms/plan")
+    print(f"  concurrent:               {concurrent_ms:>8,.0f} ms/plan  ({sequential_ms / concurrent_ms:.1f}x faster)")
+    print("Whole plan:")
+    print(f"  model searches (2 calls): {model_ms:>8,.0f} ms/plan")
+    print(f"  plan_trip (1 call):       {pipeline_ms:>8,.0f} ms/plan  ({model_ms / pipeline_ms:.1f}x faster)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
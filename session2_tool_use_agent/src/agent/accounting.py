@@ -0,0 +1,292 @@
+# src/agent/accounting.py
+"""
+Per-turn token accounting and prompt budgets.
+Counts prompt, completion and tool-schema tokens for every model call of a
+turn. Counts come from the response's usage_metadata when the provider
+returns it (Gemini does) and from tiktoken estimates otherwise. Each prompt
+is also broken down by system context, conversation history, tool results
+and the bound tool schemas, which providers do not report.
+
+Budgets are checked before a call is sent, from the estimated prompt size:
+a call that would take the turn or the session over its budget raises
+TokenBudgetExceeded instead of spending the tokens.
+"""
+
+import json
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from src.agent.tokens import DEFAULT_COUNTER, PrefixCounts, TokenCounter
+
+# Kinds of prompt tokens, in report order
+PROMPT_PARTS = ("system", "history", "tool_results", "schemas")
+
+
+class TokenBudgetExceeded(RuntimeError):
+    """A model call would take a turn, a session or a single prompt over its token budget."""
+    
+    def __init__(self, scope: str, limit: int, used: int, needed: int):
+        """
+        Args:
+            scope: "prompt", "turn" or "session"
+            limit: The budget
+            used: Tokens already spent in the scope
+            needed: Estimated prompt tokens of the call that was refused
+        """
+        super().__init__(
+            f"{scope} token budget exceeded: {used} used + {needed} needed > {limit} allowed"
+        )
+        self.scope = scope
+        self.limit = limit
+        self.used = used
+        self.needed = needed
+
+
+@dataclass
+class PromptBreakdown:
+    """Estimated prompt tokens of one model call, by part."""
+    system: int = 0
+    history: int = 0
+    tool_results: int = 0
+    schemas: int = 0
+    
+    @property
+    def total(self) -> int:
+        return self.system + self.history + self.tool_results + self.schemas
+
+
+@dataclass
+class CallUsage:
+    """Tokens of one model call."""
+    prompt_tokens: int
+    completion_tokens: int
+    breakdown: PromptBreakdown
+    source: str  # "provider" (usage_metadata) or "estimate" (tiktoken)
+    
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+@dataclass
+class TurnUsage:
+    """Tokens of one agent turn: every model call it made."""
+    turn: int
+    calls: List[CallUsage] = field(default_factory=list)
+    
+    @property
+    def prompt_tokens(self) -> int:
+        return sum(c.prompt_tokens for c in self.calls)
+    
+    @property
+    def completion_tokens(self) -> int:
+        return sum(c.completion_tokens for c in self.calls)
+    
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+    
+    def breakdown(self) -> PromptBreakdown:
+        """Estimated prompt tokens of all the turn's calls, by part."""
+        total = PromptBreakdown()
+        for call in self.calls:
+            for part in PROMPT_PARTS:
+                setattr(total, part, getattr(total, part) + getattr(call.breakdown, part))
+        return total
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "turn": self.turn,
+            "calls": len(self.calls),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "estimated": any(c.source == "estimate" for c in self.calls),
+            "prompt_breakdown": {part: getattr(self.breakdown(), part) for part in PROMPT_PARTS},
+        }
+
+
+@dataclass
+class UsageTotals:
+    """Tokens summed over sessions; shared by an accountant and its forks."""
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+class TokenAccountant:
+    """
+    Token accounting for one conversation.
+    
+    The agent calls begin_turn()/end_turn() around each turn, and check()
+    before / record() after each model call. `turns` holds the usage of
+    every finished turn; fork() gives a new session the same counter and
+    budgets, adding to the same all-sessions totals.
+    """
+    
+    def __init__(
+        self,
+        max_turn_tokens: Optional[int] = None,
+        max_session_tokens: Optional[int] = None,
+        max_prompt_tokens: Optional[int] = None,
+        counter: Optional[TokenCounter] = None,
+    ):
+        """
+        Args:
+            max_turn_tokens: Budget of one turn, prompt plus completion tokens of all its calls
+            max_session_tokens: Budget of the whole conversation
+            max_prompt_tokens: Largest prompt of a single call
+            counter: Token counter for estimates (default: the shared tiktoken counter)
+        """
+        self.max_turn_tokens = max_turn_tokens
+        self.max_session_tokens = max_session_tokens
+        self.max_prompt_tokens = max_prompt_tokens
+        self.counter = counter or DEFAULT_COUNTER
+        self.turns: List[TurnUsage] = []
+        self.all_sessions = UsageTotals()
+        self._current: Optional[TurnUsage] = None
+        self._session_tokens = 0
+        # (part, tokens) of the messages last seen
+        self._counted = PrefixCounts(lambda message: (_part(message), self.counter.count_message(message)))
+        self._schema_tokens: Dict[Tuple[int, Tuple[str, ...]], int] = {}
+    
+    def fork(self) -> "TokenAccountant":
+        """A fresh accountant for another session, with the same budgets and all-sessions totals."""
+        forked = TokenAccountant(
+            self.max_turn_tokens, self.max_session_tokens, self.max_prompt_tokens, self.counter
+        )
+        forked.all_sessions = self.all_sessions
+        forked._schema_tokens = self._schema_tokens
+        return forked
+    
+    @property
+    def session_tokens(self) -> int:
+        """Tokens spent by this conversation so far, the current turn included."""
+        return self._session_tokens
+    
+    @property
+    def current_turn(self) -> Optional[TurnUsage]:
+        return self._current
+    
+    def begin_turn(self):
+        """Start accounting a turn (finishing one left open by an error)."""
+        self.end_turn()
+        self._current = TurnUsage(turn=len(self.turns))
+    
+    def end_turn(self) -> Optional[TurnUsage]:
+        """Finish the current turn and return its usage."""
+        turn, self._current = self._current, None
+        if turn is not None:
+            self.turns.append(turn)
+        return turn
+    
+    def forget_messages(self):
+        """Drop the cached message counts (e.g. when the history is cleared)."""
+        self._counted.reset()
+    
+    def schema_tokens(self, registry: Any) -> int:
+        """Tokens of the bound tool schemas (name, description and parameters of each tool)."""
+        key = (id(registry), tuple(registry.names()))
+        tokens = self._schema_tokens.get(key)
+        if tokens is None:
+            tokens = sum(
+                self.counter.count_text(json.dumps({
+                    "name": tool.name,
+                    "description": tool.description,
+                    "parameters": registry.json_schema(tool.name),
+                }))
+                for tool in registry
+            )
+            self._schema_tokens[key] = tokens
+        return tokens
+    
+    def breakdown(self, messages: Sequence[Any], schema_tokens: int = 0) -> PromptBreakdown:
+        """Estimated prompt tokens of a request, by part; counts only messages not seen before."""
+        breakdown = PromptBreakdown(schemas=schema_tokens)
+        for part, tokens in self._counted.update(messages):
+            setattr(breakdown, part, getattr(breakdown, part) + tokens)
+        return breakdown
+    
+    def check(self, messages: Sequence[Any], schema_tokens: int = 0) -> PromptBreakdown:
+        """
+        Estimate a request and refuse it if it would break a budget.
+        
+        Returns:
+            The request's prompt breakdown, to pass to record()
+        
+        Raises:
+            TokenBudgetExceeded: If the prompt, the turn or the session would go over budget
+        """
+        breakdown = self.breakdown(messages, schema_tokens)
+        needed = breakdown.total
+        turn_used = self._current.total_tokens if self._current is not None else 0
+        if self.max_prompt_tokens is not None and needed > self.max_prompt_tokens:
+            raise TokenBudgetExceeded("prompt", self.max_prompt_tokens, 0, needed)
+        if self.max_turn_tokens is not None and turn_used + needed > self.max_turn_tokens:
+            raise TokenBudgetExceeded("turn", self.max_turn_tokens, turn_used, needed)
+        if self.max_session_tokens is not None and self._session_tokens + needed > self.max_session_tokens:
+            raise TokenBudgetExceeded("session", self.max_session_tokens, self._session_tokens, needed)
+        return breakdown
+    
+    def record(self, breakdown: PromptBreakdown, response: Any) -> CallUsage:
+        """Account a finished call, from the provider's usage_metadata if present."""
+        usage = getattr(response, "usage_metadata", None) or {}
+        if "input_tokens" in usage and "output_tokens" in usage:
+            call = CallUsage(usage["input_tokens"], usage["output_tokens"], breakdown, "provider")
+        else:
+            call = CallUsage(breakdown.total, self.counter.count_message(response), breakdown, "estimate")
+        
+        if self._current is None:
+            self.begin_turn()
+        self._current.calls.append(call)
+        self._session_tokens += call.total_tokens
+        totals = self.all_sessions
+        with totals.lock:
+            totals.calls += 1
+            totals.prompt_tokens += call.prompt_tokens
+            totals.completion_tokens += call.completion_tokens
+        return call
+    
+    def report(self) -> Dict[str, Any]:
+        """Session totals and per-turn usage, e.g. for logging."""
+        return {
+            "turns": [turn.to_dict() for turn in self.turns],
+            "session_tokens": self.session_tokens,
+            "prompt_tokens": sum(t.prompt_tokens for t in self.turns),
+            "completion_tokens": sum(t.completion_tokens for t in self.turns),
+            "budgets": {
+                "turn": self.max_turn_tokens,
+                "session": self.max_session_tokens,
+                "prompt": self.max_prompt_tokens,
+            },
+        }
+    
+    def print_report(self):
+        """Print per-turn usage as a table; * marks turns with estimated counts."""
+        print(
+            f"{'turn':>4} {'calls':>5} {'prompt':>8} {'compl.':>7} {'total':>7}   "
+            + " ".join(f"{part:>12}" for part in PROMPT_PARTS)
+        )
+        for turn in self.turns:
+            row = turn.to_dict()
+            mark = "*" if row["estimated"] else " "
+            print(
+                f"{row['turn']:>4} {row['calls']:>5} {row['prompt_tokens']:>8} {row['completion_tokens']:>7} "
+                f"{row['total_tokens']:>7}{mark}  "
+                + " ".join(f"{row['prompt_breakdown'][part]:>12}" for part in PROMPT_PARTS)
+            )
+        print(f"Session: {self.session_tokens} tokens")
+
+
+def _part(message: Any) -> str:
+    """Which part of the prompt a message belongs to."""
+    if message.type == "system":
+        return "system"
+    if message.type == "tool":
+        return "tool_results"
+    return "history"
@@ -0,0 +1,222 @@
+# src/agent/batch.py
+"""
+Batch execution of many independent prompts through one agent.
+Each prompt runs in its own session (ToolUsingAgent.spawn()), so prompts
+never see each other's history or state, while sharing the agent's model
+client, tool binding, caches and tool thread pool.
+
+A fixed pool of workers pulls prompts as it goes, so at most `concurrency`
+prompts are in flight and a long prompt list is never materialized.
+Failed prompts are retried with exponential backoff (tenacity); a prompt
+that still fails is reported as a failed result instead of stopping the batch.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Iterable, Iterator, List, Optional, Tuple, Type
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception_type,
+    retry_if_not_exception_type,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
+from src.agent.accounting import TokenBudgetExceeded
+
+# Default number of prompts in flight at once
+BATCH_CONCURRENCY = 8
+
+# Default attempts per prompt, the first one included
+BATCH_MAX_ATTEMPTS = 3
+
+# Default first and longest backoff between attempts, in seconds
+BATCH_BACKOFF_INITIAL = 0.5
+BATCH_BACKOFF_MAX = 10.0
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one prompt of a batch."""
+    index: int
+    prompt: str
+    answer: Optional[str]
+    error: Optional[str]
+    latency: float
+    attempts: int
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchStats:
+    """Throughput and latency of a batch, over the results so far."""
+    total: int
+    succeeded: int
+    failed: int
+    retried: int
+    elapsed_s: float
+    throughput: float
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    
+    def __str__(self) -> str:
+        return (
+            f"{self.total} prompts ({self.failed} failed, {self.retried} retried) in {self.elapsed_s:.2f}s: "
+            f"{self.throughput:.1f} prompts/s, latency mean {self.mean_ms:.0f} ms, "
+            f"p50 {self.p50_ms:.0f} ms, p95 {self.p95_ms:.0f} ms, p99 {self.p99_ms:.0f} ms"
+        )
+
+
+def batch_stats(results: List[BatchResult], elapsed: float) -> BatchStats:
+    """Summarize batch results; latencies are per prompt, retries and backoff included."""
+    latencies = sorted(r.latency * 1000 for r in results)
+    
+    def percentile(p: float) -> float:
+        if not latencies:
+            return 0.0
+        return latencies[min(int(len(latencies) * p), len(latencies) - 1)]
+    
+    succeeded = sum(1 for r in results if r.ok)
+    return BatchStats(
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        retried=sum(1 for r in results if r.attempts > 1),
+        elapsed_s=elapsed,
+        throughput=len(results) / elapsed if elapsed > 0 else 0.0,
+        mean_ms=sum(latencies) / len(latencies) if latencies else 0.0,
+        p50_ms=percentile(0.50),
+        p95_ms=percentile(0.95),
+        p99_ms=percentile(0.99),
+    )
+
+
+class BatchRun:
+    """
+    A batch of prompts, run when iterated.
+    
+    Iterate with `for` (blocking) or `async for` to get BatchResults as they
+    complete, in completion order; collect() returns them all in input order.
+    `stats` covers the results so far, and the whole batch once it is done.
+    A batch can be iterated only once.
+    """
+    
+    def __init__(
+        self,
+        agent: Any,
+        prompts: Iterable[str],
+        concurrency: int = BATCH_CONCURRENCY,
+        max_attempts: int = BATCH_MAX_ATTEMPTS,
+        retry_on: Tuple[Type[BaseException], ...] = (Exception,),
+        backoff_initial: float = BATCH_BACKOFF_INITIAL,
+        backoff_max: float = BATCH_BACKOFF_MAX,
+    ):
+        """
+        Args:
+            agent: ToolUsingAgent whose sessions run the prompts
+            prompts: The prompts, consumed lazily
+            concurrency: Most prompts in flight at once
+            max_attempts: Attempts per prompt, the first one included
+            retry_on: Exceptions that are retried (never TokenBudgetExceeded); others fail
+                      the prompt at once
+            backoff_initial: First backoff between attempts, in seconds
+            backoff_max: Longest backoff between attempts, in seconds
+        """
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+        self.agent = agent
+        self.prompts = prompts
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_on = retry_on
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.results: List[BatchResult] = []
+        self._started: Optional[float] = None
+        self._elapsed: Optional[float] = None
+    
+    @property
+    def stats(self) -> BatchStats:
+        if self._elapsed is not None:
+            elapsed = self._elapsed
+        elif self._started is not None:
+            elapsed = time.perf_counter() - self._started
+        else:
+            elapsed = 0.0
+        return batch_stats(self.results, elapsed)
+    
+    def __iter__(self) -> Iterator[BatchResult]:
+        from src.agent.loop import _iterate_async_sync
+        return _iterate_async_sync(self.__aiter__())
+    
+    def collect(self) -> List[BatchResult]:
+        """Run the whole batch; results in input order."""
+        return sorted(self, key=lambda r: r.index)
+    
+    async def acollect(self) -> List[BatchResult]:
+        """Async collect()."""
+        return sorted([r async for r in self], key=lambda r: r.index)
+    
+    async def __aiter__(self) -> AsyncIterator[BatchResult]:
+        if self._started is not None:
+            raise RuntimeError("A BatchRun can be iterated only once")
+        self._started = time.perf_counter()
+        
+        # Bounded, so finished results wait for a slow consumer instead of piling up
+        finished: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+        done = object()
+        pending = enumerate(self.prompts)
+        
+        async def worker():
+            try:
+                for index, prompt in pending:
+                    await finished.put(await self._run_one(index, prompt))
+            except Exception as e:
+                await finished.put(e)
+            await finished.put(done)
+        
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        running = len(workers)
+        try:
+            while running:
+                item = await finished.get()
+                if item is done:
+                    running -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    self.results.append(item)
+                    yield item
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._elapsed = time.perf_counter() - self._started
+    
+    async def _run_one(self, index: int, prompt: str) -> BatchResult:
+        """Run one prompt in a fresh session per attempt, with backoff between attempts."""
+        start = time.perf_counter()
+        attempts = 0
+        answer, error = None, None
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(self.max_attempts),
+            wait=wait_exponential_jitter(
+                initial=self.backoff_initial, max=self.backoff_max, jitter=self.backoff_initial
+            ),
+            # A budget refusal would only happen again
+            retry=retry_if_exception_type(self.retry_on) & retry_if_not_exception_type(TokenBudgetExceeded),
+            reraise=True,
+        )
+        try:
+            async for attempt in retrying:
+                with attempt:
+                    attempts += 1
+                    answer = await self.agent.spawn().arun(prompt, verbose=False)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        return BatchResult(index, prompt, answer, error, time.perf_counter() - start, attempts)
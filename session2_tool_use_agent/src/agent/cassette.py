@@ -0,0 +1,337 @@
+# src/agent/cassette.py
+"""
+Record and replay of model interactions.
+RecordingChatModel wraps the agent's chat model and appends every
+request/response pair, with its latency, to a cassette: zstd-compressed
+JSONL (orjson). ReplayChatModel serves the recorded responses back without
+calling the model, so real conversation shapes can drive load tests and
+profiling of the loop, tools and state code, as fast as the code allows or
+at the recorded pace.
+
+Requests are matched by hash. The exact key covers the bound tools and the
+whole conversation (as in the response cache, minus the model settings,
+which the replay model does not have). When it misses, e.g. because a tool
+like get_time returned something else this time, the turn key is tried:
+the current turn only (from the last user message on), without tool result
+contents.
+
+    record(agent, "traffic.jsonl.zst")      # talk to Gemini, keep the pairs
+    replay(agent, "traffic.jsonl.zst")      # same answers, no API calls
+"""
+
+import asyncio
+import atexit
+import copy
+import hashlib
+import os
+import threading
+import time
+import weakref
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
+import orjson
+import zstandard
+from langchain_core.messages import AIMessageChunk, BaseMessage
+from langchain_core.messages.base import message_to_dict
+from src.agent.llm_cache import _canonical_message, message_to_chunk, request_key
+
+# Bump when the record format or the key changes
+CASSETTE_VERSION = 1
+
+
+def _turn_start(messages: Sequence[BaseMessage]) -> int:
+    """Index of the last user message (0 if there is none)."""
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i].type == "human":
+            return i
+    return 0
+
+
+def turn_key(tool_schemas: Sequence[Dict[str, Any]], messages: Sequence[BaseMessage]) -> str:
+    """
+    Hash of the current turn of a request: the messages from the last user
+    message on, with tool result contents left out.
+    """
+    turn = []
+    for message in messages[_turn_start(messages):]:
+        data = _canonical_message(message)
+        if message.type == "tool":
+            data.pop("content")
+        turn.append(data)
+    payload = {"version": CASSETTE_VERSION, "tools": list(tool_schemas), "turn": turn}
+    encoded = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS, default=str)
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _tool_schemas(tools: Sequence[Any]) -> List[Dict[str, Any]]:
+    from langchain_core.utils.function_calling import convert_to_openai_tool
+    return [convert_to_openai_tool(t) for t in tools]
+
+
+class Cassette:
+    """
+    A zstd-compressed JSONL file of model interactions.
+    Records are appended through one compressor, and written out on close()
+    (also run at interpreter exit); each recording session adds a zstd frame.
+    """
+    
+    def __init__(self, path: str, level: int = 3):
+        """
+        Args:
+            path: Cassette file (conventionally *.jsonl.zst)
+            level: zstd compression level for new records
+        """
+        self.path = path
+        self.level = level
+        self._writer: Any = None
+        self._lock = threading.Lock()
+        atexit.register(_close_at_exit, weakref.ref(self))
+    
+    def append(self, record: Dict[str, Any]):
+        """Append one record."""
+        line = orjson.dumps(record, default=str) + b"\n"
+        with self._lock:
+            if self._writer is None:
+                self._writer = zstandard.ZstdCompressor(level=self.level).stream_writer(open(self.path, "ab"))
+            self._writer.write(line)
+    
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """Every record, in recording order. Records still being written are not included."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            reader = zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True)
+            buffer = b""
+            while True:
+                block = reader.read(1 << 16)
+                if not block:
+                    break
+                buffer += block
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    if line:
+                        yield orjson.loads(line)
+            if buffer.strip():
+                yield orjson.loads(buffer)
+    
+    def prompts(self) -> List[str]:
+        """The user inputs of the recorded turns, in order, e.g. to drive a replay."""
+        return [r["prompt"] for r in self.records() if r.get("round") == 0]
+    
+    def close(self):
+        """Finish the current frame and close the file."""
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+
+def _close_at_exit(cassette_ref: "weakref.ref[Cassette]"):
+    cassette = cassette_ref()
+    if cassette is not None:
+        cassette.close()
+
+
+class RecordingChatModel:
+    """
+    Wraps a chat model and records each invoke/ainvoke (and stream/astream,
+    as the assembled response) to a cassette, with its wall-clock latency.
+    Other attributes are passed through to the wrapped model.
+    """
+    
+    def __init__(self, llm: Any, cassette: Cassette, tool_schemas: Sequence[Dict[str, Any]] = ()):
+        self.llm = llm
+        self.cassette = cassette
+        self.tool_schemas = list(tool_schemas)
+    
+    def bind_tools(self, tools: Sequence[Any], **kwargs) -> "RecordingChatModel":
+        return RecordingChatModel(self.llm.bind_tools(tools, **kwargs), self.cassette, _tool_schemas(tools))
+    
+    def _record(self, messages: Sequence[BaseMessage], response: BaseMessage, latency: float):
+        start = _turn_start(messages)
+        self.cassette.append({
+            "version": CASSETTE_VERSION,
+            "key": request_key(None, None, self.tool_schemas, messages),
+            "turn_key": turn_key(self.tool_schemas, messages),
+            "prompt": messages[start].content if messages else None,
+            "round": len(messages) - start - 1,
+            "model": getattr(self.llm, "model", None) or getattr(self.llm, "model_name", None),
+            "latency": latency,
+            "recorded_at": time.time(),
+            "response": message_to_dict(response),
+        })
+    
+    def invoke(self, messages: Sequence[BaseMessage], **kwargs) -> BaseMessage:
+        start = time.perf_counter()
+        response = self.llm.invoke(messages, **kwargs)
+        self._record(messages, response, time.perf_counter() - start)
+        return response
+    
+    async def ainvoke(self, messages: Sequence[BaseMessage], **kwargs) -> BaseMessage:
+        start = time.perf_counter()
+        response = await self.llm.ainvoke(messages, **kwargs)
+        self._record(messages, response, time.perf_counter() - start)
+        return response
+    
+    def stream(self, messages: Sequence[BaseMessage], **kwargs) -> Iterator[AIMessageChunk]:
+        from langchain_core.messages import message_chunk_to_message
+        start = time.perf_counter()
+        gathered = None
+        for chunk in self.llm.stream(messages, **kwargs):
+            gathered = chunk if gathered is None else gathered + chunk
+            yield chunk
+        if gathered is not None:
+            self._record(messages, message_chunk_to_message(gathered), time.perf_counter() - start)
+    
+    async def astream(self, messages: Sequence[BaseMessage], **kwargs) -> AsyncIterator[AIMessageChunk]:
+        from langchain_core.messages import message_chunk_to_message
+        start = time.perf_counter()
+        gathered = None
+        async for chunk in self.llm.astream(messages, **kwargs):
+            gathered = chunk if gathered is None else gathered + chunk
+            yield chunk
+        if gathered is not None:
+            self._record(messages, message_chunk_to_message(gathered), time.perf_counter() - start)
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
+
+
+class CassetteMiss(KeyError):
+    """A replayed request matches no recorded one."""
+
+
+@dataclass
+class ReplayStats:
+    """Counters of a ReplayChatModel."""
+    exact: int = 0
+    turn: int = 0
+    misses: int = 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class _Tape:
+    """Recorded interactions indexed by exact and turn key, with a playback position per key."""
+    
+    def __init__(self, records: Iterator[Dict[str, Any]]):
+        self.by_key: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.by_turn: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for record in records:
+            self.by_key[record["key"]].append(record)
+            self.by_turn[record["turn_key"]].append(record)
+        self._positions: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+    
+    def next(self, index: Dict[str, List[Dict[str, Any]]], key: str) -> Optional[Dict[str, Any]]:
+        """The next record for a key, starting over when they run out."""
+        records = index.get(key)
+        if not records:
+            return None
+        with self._lock:
+            position = self._positions[key]
+            self._positions[key] = position + 1
+        return records[position % len(records)]
+
+
+class ReplayChatModel:
+    """
+    Chat model that answers from a cassette instead of calling a model.
+    
+    A request gets the response recorded for its exact key, else for its
+    turn key; requests recorded several times get their responses in
+    recording order, starting over when they run out.
+    """
+    
+    def __init__(self, cassette: Any, latency_scale: Optional[float] = None):
+        """
+        Args:
+            cassette: Cassette, or path of one, to replay
+            latency_scale: None to answer at once; otherwise wait the recorded
+                           latency times this factor (1.0: recorded pace,
+                           0.1: ten times faster)
+        """
+        self.cassette = cassette if isinstance(cassette, Cassette) else Cassette(cassette)
+        self.latency_scale = latency_scale
+        self.tool_schemas: List[Dict[str, Any]] = []
+        self.stats = ReplayStats()
+        self._tape = _Tape(self.cassette.records())
+    
+    def bind_tools(self, tools: Sequence[Any], **kwargs) -> "ReplayChatModel":
+        """A copy hashing the bound tools' schemas; shares the tape and stats."""
+        bound = copy.copy(self)
+        bound.tool_schemas = _tool_schemas(tools)
+        return bound
+    
+    def __len__(self) -> int:
+        """Number of recorded interactions."""
+        return sum(len(records) for records in self._tape.by_key.values())
+    
+    def _lookup(self, messages: Sequence[BaseMessage]) -> Dict[str, Any]:
+        """The next recorded interaction matching a request."""
+        key = request_key(None, None, self.tool_schemas, messages)
+        record = self._tape.next(self._tape.by_key, key)
+        if record is not None:
+            self.stats.exact += 1
+            return record
+        record = self._tape.next(self._tape.by_turn, turn_key(self.tool_schemas, messages))
+        if record is not None:
+            self.stats.turn += 1
+            return record
+        self.stats.misses += 1
+        raise CassetteMiss(f"No recorded response for request {key[:12]} in {self.cassette.path}")
+    
+    def _delay(self, record: Dict[str, Any]) -> float:
+        return 0.0 if self.latency_scale is None else record["latency"] * self.latency_scale
+    
+    @staticmethod
+    def _response(record: Dict[str, Any]) -> BaseMessage:
+        from langchain_core.messages import messages_from_dict
+        return messages_from_dict([record["response"]])[0]
+    
+    def invoke(self, messages: Sequence[BaseMessage], **kwargs) -> BaseMessage:
+        record = self._lookup(messages)
+        delay = self._delay(record)
+        if delay:
+            time.sleep(delay)
+        return self._response(record)
+    
+    async def ainvoke(self, messages: Sequence[BaseMessage], **kwargs) -> BaseMessage:
+        record = self._lookup(messages)
+        delay = self._delay(record)
+        if delay:
+            await asyncio.sleep(delay)
+        return self._response(record)
+    
+    def stream(self, messages: Sequence[BaseMessage], **kwargs) -> Iterator[AIMessageChunk]:
+        yield message_to_chunk(self.invoke(messages))
+    
+    async def astream(self, messages: Sequence[BaseMessage], **kwargs) -> AsyncIterator[AIMessageChunk]:
+        yield message_to_chunk(await self.ainvoke(messages))
+
+
+def record(agent: Any, path: str) -> Cassette:
+    """
+    Record the agent's model calls from now on.
+    With a response cache, cache hits are recorded too (with their short latency).
+    
+    Returns:
+        The cassette; close() it to finish the file (also done at exit)
+    """
+    cassette = Cassette(path)
+    agent.llm = RecordingChatModel(agent.llm, cassette)
+    return cassette
+
+
+def replay(agent: Any, path: str, latency_scale: Optional[float] = None) -> ReplayChatModel:
+    """
+    Answer the agent's model calls from a cassette from now on.
+    
+    Returns:
+        The replay model, whose `stats` count exact and turn matches and misses
+    """
+    model = ReplayChatModel(path, latency_scale=latency_scale)
+    agent.llm = model
+    return model
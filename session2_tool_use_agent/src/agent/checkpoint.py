@@ -0,0 +1,291 @@
+# src/agent/checkpoint.py
+"""
+Durable checkpoints of agent conversations in SQLite.
+Each turn appends only what is new: the messages added since the last save
+and a small state record (AgentState snapshot plus the history summary).
+Nothing is rewritten, so the write cost of a turn does not grow with the
+conversation. Commits are batched, and the database runs in WAL mode.
+
+When the history manager folds old turns into a summary, the message list
+no longer extends the saved one; the store then starts a new epoch holding
+the shorter list. compact() deletes superseded epochs and state records.
+"""
+
+import atexit
+import sqlite3
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import ormsgpack
+from langchain_core.messages.base import message_to_dict
+from src.agent.state import AgentState
+
+# Default number of saved turns per commit
+CHECKPOINT_BATCH_SIZE = 16
+
+# Default longest time a saved turn waits for its commit, in seconds
+CHECKPOINT_MAX_DELAY = 0.5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL,
+    epoch INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    payload BLOB NOT NULL,
+    PRIMARY KEY (session_id, epoch, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS states (
+    session_id TEXT NOT NULL,
+    turn INTEGER NOT NULL,
+    epoch INTEGER NOT NULL,
+    message_count INTEGER NOT NULL,
+    created REAL NOT NULL,
+    payload BLOB NOT NULL,
+    PRIMARY KEY (session_id, turn)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass
+class Checkpoint:
+    """A conversation as saved: history, state and rolling summary."""
+    session_id: str
+    messages: List[Any]
+    state: AgentState
+    summary_lines: List[str]
+    folded_turns: int
+    turn: int
+
+
+@dataclass
+class _Tracked:
+    """
+    What the store last saved for a session in this process: the message
+    count and the first and last message objects, enough to tell in O(1)
+    whether the current history extends the saved one (None if unknown).
+    """
+    epoch: int
+    turn: int
+    count: Optional[int] = None
+    first: Any = None
+    last: Any = None
+    
+    def extended_by(self, messages: Sequence[Any]) -> bool:
+        if self.count is None or len(messages) < self.count:
+            return False
+        if self.count == 0:
+            return True
+        return messages[0] is self.first and messages[self.count - 1] is self.last
+    
+    @classmethod
+    def of(cls, epoch: int, turn: int, messages: Sequence[Any]) -> "_Tracked":
+        if not messages:
+            return cls(epoch, turn, 0)
+        return cls(epoch, turn, len(messages), messages[0], messages[-1])
+
+
+class CheckpointStore:
+    """
+    Append-only conversation store.
+    
+    Writes go through one connection; saves are committed every batch_size
+    turns or max_delay seconds after the first uncommitted save, whichever
+    comes first, and on flush() or close() (also run at interpreter exit).
+    Reads see uncommitted saves.
+    """
+    
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = CHECKPOINT_BATCH_SIZE,
+        max_delay: float = CHECKPOINT_MAX_DELAY,
+    ):
+        """
+        Args:
+            path: SQLite database file
+            batch_size: Saved turns per commit (1 commits every turn)
+            max_delay: Longest time a saved turn waits for its commit, in seconds
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._tracked: Dict[str, _Tracked] = {}
+        self._pending = 0
+        self._timer: Optional[threading.Timer] = None
+        self._closed = False
+        atexit.register(_close_at_exit, weakref.ref(self))
+    
+    def save(self, session_id: str, messages: Sequence[Any], state: AgentState, history: Any = None):
+        """
+        Append a turn: the messages added since the last save and the current state.
+        
+        Args:
+            session_id: The conversation's id
+            messages: The agent's full current history
+            state: The agent's state
+            history: The agent's HistoryManager, whose rolling summary is saved too
+        """
+        summary_lines = list(history.summary_lines) if history is not None else []
+        folded_turns = history.folded_turns if history is not None else 0
+        state_payload = ormsgpack.packb([state.to_bytes(), summary_lines, folded_turns])
+        
+        with self._lock:
+            tracked = self._tracked.get(session_id)
+            if tracked is None:
+                tracked = self._tracked_from_db(session_id)
+            
+            if tracked is not None and tracked.extended_by(messages):
+                epoch, start = tracked.epoch, tracked.count
+            else:
+                # History was rewritten (folded, reset or unknown): start a new epoch
+                epoch, start = (tracked.epoch + 1 if tracked is not None else 0), 0
+            turn = tracked.turn + 1 if tracked is not None else 0
+            
+            self._begin()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?)",
+                [
+                    (session_id, epoch, seq, ormsgpack.packb(message_to_dict(message)))
+                    for seq, message in enumerate(messages[start:], start)
+                ],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO states VALUES (?, ?, ?, ?, ?, ?)",
+                (session_id, turn, epoch, len(messages), time.time(), state_payload),
+            )
+            self._tracked[session_id] = _Tracked.of(epoch, turn, messages)
+            self._pending += 1
+            if self._pending >= self.batch_size:
+                self._commit()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.max_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+    
+    def load(self, session_id: str) -> Optional[Checkpoint]:
+        """The latest checkpoint of a session, or None if it was never saved."""
+        from langchain_core.messages import messages_from_dict
+        with self._lock:
+            row = self._latest_state(session_id)
+            if row is None:
+                return None
+            turn, epoch, message_count, payload = row
+            rows = self._conn.execute(
+                "SELECT payload FROM messages WHERE session_id = ? AND epoch = ? AND seq < ? ORDER BY seq",
+                (session_id, epoch, message_count),
+            ).fetchall()
+            messages = messages_from_dict([ormsgpack.unpackb(r[0]) for r in rows])
+            self._tracked[session_id] = _Tracked.of(epoch, turn, messages)
+        
+        state_bytes, summary_lines, folded_turns = ormsgpack.unpackb(payload)
+        return Checkpoint(
+            session_id=session_id,
+            messages=messages,
+            state=AgentState.from_bytes(state_bytes),
+            summary_lines=summary_lines,
+            folded_turns=folded_turns,
+            turn=turn,
+        )
+    
+    def compact(self, session_id: Optional[str] = None, keep_states: int = 1) -> int:
+        """
+        Delete superseded epochs and all but the newest state records.
+        
+        Args:
+            session_id: Session to compact (default: every session)
+            keep_states: Newest state records kept per session
+        
+        Returns:
+            Number of rows deleted
+        """
+        with self._lock:
+            self._begin()
+            where, params = ("WHERE session_id = ?", (session_id,)) if session_id is not None else ("", ())
+            sessions = [r[0] for r in self._conn.execute(
+                f"SELECT DISTINCT session_id FROM states {where}", params
+            ).fetchall()]
+            deleted = 0
+            for sid in sessions:
+                turn, epoch, message_count, _ = self._latest_state(sid)
+                deleted += self._conn.execute(
+                    "DELETE FROM messages WHERE session_id = ? AND (epoch < ? OR (epoch = ? AND seq >= ?))",
+                    (sid, epoch, epoch, message_count),
+                ).rowcount
+                deleted += self._conn.execute(
+                    "DELETE FROM states WHERE session_id = ? AND turn <= ?",
+                    (sid, turn - keep_states),
+                ).rowcount
+            self._commit()
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return deleted
+    
+    def delete(self, session_id: str):
+        """Forget a session entirely."""
+        with self._lock:
+            self._begin()
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM states WHERE session_id = ?", (session_id,))
+            self._tracked.pop(session_id, None)
+            self._commit()
+    
+    def sessions(self) -> List[str]:
+        """Ids of all saved sessions."""
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT DISTINCT session_id FROM states ORDER BY session_id")]
+    
+    def flush(self):
+        """Commit pending saves now."""
+        with self._lock:
+            if not self._closed:
+                self._commit()
+    
+    def close(self):
+        """Commit pending saves and close the database."""
+        with self._lock:
+            if self._closed:
+                return
+            self._commit()
+            self._conn.close()
+            self._closed = True
+    
+    def _begin(self):
+        """Open a transaction if none is open. Caller holds the lock."""
+        if not self._conn.in_transaction:
+            self._conn.execute("BEGIN")
+    
+    def _commit(self):
+        """Caller holds the lock."""
+        if self._conn.in_transaction:
+            self._conn.execute("COMMIT")
+        self._pending = 0
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+    
+    def _latest_state(self, session_id: str) -> Optional[Tuple[int, int, int, bytes]]:
+        return self._conn.execute(
+            "SELECT turn, epoch, message_count, payload FROM states "
+            "WHERE session_id = ? ORDER BY turn DESC LIMIT 1",
+            (session_id,),
+        ).fetchone()
+    
+    def _tracked_from_db(self, session_id: str) -> Optional[_Tracked]:
+        """Where an unloaded session left off, so a new save does not overwrite it."""
+        row = self._latest_state(session_id)
+        if row is None:
+            return None
+        turn, epoch, _, _ = row
+        return _Tracked(epoch, turn)
+
+
+def _close_at_exit(store_ref: "weakref.ref[CheckpointStore]"):
+    store = store_ref()
+    if store is not None:
+        store.close()
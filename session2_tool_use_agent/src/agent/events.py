@@ -0,0 +1,46 @@
+# src/agent/events.py
+"""
+Events yielded by ToolUsingAgent.run_stream() and arun_stream().
+A turn yields token deltas as the model writes, a started/finished pair
+for every tool call, and finally the answer.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Union
+
+
+@dataclass(frozen=True)
+class TokenDelta:
+    """A piece of text streamed by the model."""
+    text: str
+    type: str = field(default="token", init=False)
+
+
+@dataclass(frozen=True)
+class ToolCallStarted:
+    """The model asked for a tool call, which is about to run."""
+    name: str
+    args: Dict[str, Any]
+    call_id: str
+    type: str = field(default="tool_started", init=False)
+
+
+@dataclass(frozen=True)
+class ToolCallFinished:
+    """A tool call finished; duration is in seconds."""
+    name: str
+    args: Dict[str, Any]
+    call_id: str
+    result: str
+    duration: float
+    type: str = field(default="tool_finished", init=False)
+
+
+@dataclass(frozen=True)
+class FinalAnswer:
+    """The agent's answer for the turn, the same string run() returns."""
+    content: str
+    type: str = field(default="final_answer", init=False)
+
+
+AgentEvent = Union[TokenDelta, ToolCallStarted, ToolCallFinished, FinalAnswer]
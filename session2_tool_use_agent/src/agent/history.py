@@ -0,0 +1,187 @@
+# src/agent/history.py
+"""
+Token-budgeted message history.
+Keeps the conversation sent to the model under a token budget by folding
+the oldest turns into a rolling summary SystemMessage. Turns are folded
+whole, so an AIMessage with tool calls always stays with its ToolMessages.
+"""
+
+import json
+from typing import Any, Callable, List, Optional, Tuple
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from src.agent.tokens import DEFAULT_COUNTER, PrefixCounts, TokenCounter
+
+# Default token budget of the history sent to the model
+HISTORY_TOKEN_BUDGET = 8000
+
+# Folded turns kept as lines in the rolling summary
+MAX_SUMMARY_TURNS = 10
+
+# Largest share of the token budget the summary may take; older lines are dropped first
+SUMMARY_BUDGET_SHARE = 0.5
+
+# Characters kept from each message in a summary line
+SUMMARY_SNIPPET_CHARS = 120
+
+# Prefix of the context/summary SystemMessage at the start of the history
+CONTEXT_PREFIX = "Context from previous conversation: "
+
+# Builds the new summary text from the previous one and the turns being folded
+Summarizer = Callable[[Optional[str], List[List[Any]]], str]
+
+
+def _snippet(text: Any) -> str:
+    text = text if isinstance(text, str) else json.dumps(text, default=str)
+    text = " ".join(text.split())
+    return text if len(text) <= SUMMARY_SNIPPET_CHARS else text[:SUMMARY_SNIPPET_CHARS - 3] + "..."
+
+
+def summarize_turn(turn: List[Any]) -> str:
+    """One summary line for a turn: the question, the tools used and the answer."""
+    parts = []
+    for message in turn:
+        if isinstance(message, HumanMessage):
+            parts.append(f"User: {_snippet(message.content)}")
+        elif isinstance(message, AIMessage) and message.tool_calls:
+            calls = ", ".join(f"{c['name']}({json.dumps(c['args'], default=str)})" for c in message.tool_calls)
+            parts.append(f"Tools: {calls}")
+        elif isinstance(message, ToolMessage):
+            parts.append(f"Result: {_snippet(message.content)}")
+        elif isinstance(message, AIMessage) and message.content:
+            parts.append(f"Answer: {_snippet(message.content)}")
+    return " | ".join(parts)
+
+
+class HistoryManager:
+    """
+    Enforces a token budget on an agent's message history.
+    
+    Token counts are computed once per message and reused across turns.
+    When the history is over budget, the oldest whole turns are folded into
+    a rolling summary until it fits again; the current turn is never folded.
+    
+    The summary starts with the agent state's context summary and keeps the
+    last MAX_SUMMARY_TURNS folded turns, one line each, within
+    SUMMARY_BUDGET_SHARE of the budget. Pass a summarizer to use something
+    else (e.g. a model call).
+    """
+    
+    def __init__(
+        self,
+        max_tokens: int = HISTORY_TOKEN_BUDGET,
+        counter: Optional[TokenCounter] = None,
+        summarizer: Optional[Summarizer] = None,
+    ):
+        self.max_tokens = max_tokens
+        self.counter = counter or DEFAULT_COUNTER
+        self.summarizer = summarizer
+        self.summary_lines: List[str] = []
+        self.folded_turns = 0
+        # Token counts of the messages last seen
+        self._counted = PrefixCounts(lambda message: self.counter.count_message(message))
+    
+    def count(self, messages: List[Any]) -> int:
+        """Total tokens of messages, counting only messages not seen before."""
+        return sum(self._counted.update(messages))
+    
+    def fit(self, messages: List[Any], state: Any = None) -> List[Any]:
+        """
+        Fold old turns until the history fits the budget.
+        Leading system messages (earlier context or summary) are replaced by
+        the new summary.
+        
+        Args:
+            messages: The full history; the last turn is the current one
+            state: AgentState whose context summary seeds the rolling summary
+        
+        Returns:
+            The same list if it fits, otherwise a new, shorter list that starts
+            with the summary SystemMessage
+        """
+        if self.count(messages) <= self.max_tokens:
+            return messages
+        
+        _, turns = split_turns(messages)
+        counts = {id(m): tokens for m, tokens in zip(self._counted.messages, self._counted.values)}
+        turn_tokens = [sum(counts[id(m)] for m in turn) for turn in turns]
+        folded = self._turns_to_fold(turns, turn_tokens, state)
+        if folded == 0:
+            return messages
+        
+        self._fold(turns[:folded], state)
+        fitted = [SystemMessage(content=self.summary_text(state))]
+        for turn in turns[folded:]:
+            fitted.extend(turn)
+        self.count(fitted)
+        return fitted
+    
+    def _turns_to_fold(self, turns: List[List[Any]], turn_tokens: List[int], state: Any) -> int:
+        """The fewest oldest turns to fold so the summary and the rest fit."""
+        remaining = sum(turn_tokens)
+        lines = list(self.summary_lines)
+        for folded in range(1, len(turns)):
+            remaining -= turn_tokens[folded - 1]
+            if self.summarizer is None:
+                lines = self._trim(lines + [summarize_turn(turns[folded - 1])], state)
+            # With a custom summarizer, the previous summary's size is the estimate
+            summary = SystemMessage(content=self.summary_text(state, lines, self.folded_turns + folded))
+            if remaining + self.counter.count_message(summary) <= self.max_tokens:
+                return folded
+        # Even with everything folded the current turn is over budget; it is kept whole
+        return len(turns) - 1
+    
+    def _fold(self, turns: List[List[Any]], state: Any):
+        """Add folded turns to the rolling summary."""
+        self.folded_turns += len(turns)
+        if self.summarizer is not None:
+            previous = "\n".join(self.summary_lines) or None
+            self.summary_lines = [self.summarizer(previous, turns)]
+            return
+        self.summary_lines = self._trim(self.summary_lines + [summarize_turn(turn) for turn in turns], state)
+    
+    def _trim(self, lines: List[str], state: Any) -> List[str]:
+        """Keep the most recent summary lines that fit MAX_SUMMARY_TURNS and the summary's budget share."""
+        lines = lines[-MAX_SUMMARY_TURNS:]
+        budget = self.max_tokens * SUMMARY_BUDGET_SHARE
+        while lines and self.counter.count_text(self.summary_text(state, lines)) > budget:
+            lines = lines[1:]
+        return lines
+    
+    def summary_text(
+        self,
+        state: Any = None,
+        lines: Optional[List[str]] = None,
+        folded_turns: Optional[int] = None,
+    ) -> str:
+        """The rolling summary, starting with the state's context summary."""
+        lines = self.summary_lines if lines is None else lines
+        folded_turns = self.folded_turns if folded_turns is None else folded_turns
+        context = state.get_context_summary() if state is not None else "No context yet"
+        text = [f"{CONTEXT_PREFIX}{context}"]
+        if lines:
+            text.append(f"Earlier turns ({folded_turns} folded, most recent last):")
+            text.extend(f"- {line}" for line in lines)
+        return "\n".join(text)
+    
+    def reset(self):
+        """Forget the summary and the cached counts."""
+        self.summary_lines = []
+        self.folded_turns = 0
+        self._counted.reset()
+
+
+def split_turns(messages: List[Any]) -> Tuple[List[Any], List[List[Any]]]:
+    """
+    Split a history into its leading system messages and its turns.
+    Each turn starts with a HumanMessage and holds everything up to the next one.
+    """
+    preamble: List[Any] = []
+    turns: List[List[Any]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            turns.append([message])
+        elif turns:
+            turns[-1].append(message)
+        else:
+            preamble.append(message)
+    return preamble, turns
@@ -0,0 +1,534 @@
+# src/agent/llm_cache.py
+"""
+Response cache for the agent's chat model.
+Identical requests (same model, temperature, bound tools and messages) are
+answered from an in-memory LRU tier or a SQLite disk tier instead of calling
+the model again, and concurrent identical requests share one model call.
+"""
+
+import asyncio
+import contextvars
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, asdict
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Sequence, Tuple
+from langchain_core.messages import (
+    AIMessageChunk,
+    BaseMessage,
+    message_chunk_to_message,
+    messages_from_dict,
+    messages_to_dict,
+)
+
+# Default number of responses kept in memory
+CACHE_MAX_ENTRIES = 1024
+
+# Default time-to-live of a cached response, in seconds
+CACHE_TTL = 3600.0
+
+# Bump when the key format changes, so old disk entries are not reused
+KEY_VERSION = 1
+
+# Whether the last lookup in this thread/task was answered without calling the model
+_last_hit: contextvars.ContextVar = contextvars.ContextVar("llm_cache_last_hit", default=None)
+
+
+def last_lookup_hit() -> Optional[bool]:
+    """
+    Whether the most recent cached model call in the current thread or task
+    was served from the cache (or shared another caller's call).
+    None if that call bypassed the cache.
+    """
+    return _last_hit.get()
+
+
+def _canonical_message(message: BaseMessage) -> Dict[str, Any]:
+    """The parts of a message that affect the model's answer."""
+    data: Dict[str, Any] = {"type": message.type, "content": message.content}
+    if getattr(message, "tool_calls", None):
+        data["tool_calls"] = [
+            {"name": call["name"], "args": call["args"], "id": call.get("id")}
+            for call in message.tool_calls
+        ]
+    if getattr(message, "tool_call_id", None):
+        data["tool_call_id"] = message.tool_call_id
+    if message.name:
+        data["name"] = message.name
+    return data
+
+
+def request_key(
+    model_name: Optional[str],
+    temperature: Optional[float],
+    tool_schemas: Sequence[Dict[str, Any]],
+    messages: Sequence[BaseMessage],
+) -> str:
+    """
+    Canonical hash of a chat request.
+    
+    Args:
+        model_name: Name of the model
+        temperature: Sampling temperature
+        tool_schemas: JSON schemas of the bound tools, in binding order
+        messages: The conversation sent to the model
+    
+    Returns:
+        A hex SHA-256 digest that is equal for equal requests
+    """
+    payload = {
+        "version": KEY_VERSION,
+        "model": model_name,
+        "temperature": temperature,
+        "tools": list(tool_schemas),
+        "messages": [_canonical_message(m) for m in messages],
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _dump_message(message: BaseMessage) -> str:
+    return json.dumps(messages_to_dict([message]), default=str)
+
+
+def _load_message(payload: str) -> BaseMessage:
+    return messages_from_dict(json.loads(payload))[0]
+
+
+@dataclass
+class CacheStats:
+    """Counters of a ResponseCache."""
+    hits: int = 0
+    misses: int = 0
+    memory_hits: int = 0
+    disk_hits: int = 0
+    coalesced: int = 0
+    stores: int = 0
+    
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "hit_rate": self.hit_rate}
+
+
+class ResponseCache:
+    """
+    Two-tier cache of model responses.
+    
+    - Memory tier: LRU of at most max_entries responses, each living ttl seconds
+    - Disk tier (optional): SQLite file at path, entries living disk_ttl seconds
+    
+    Responses are stored as JSON and rebuilt on every hit, so callers may
+    modify the returned message (the agent resolves references in place).
+    """
+    
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl: float = CACHE_TTL,
+        disk_ttl: Optional[float] = None,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_ttl = ttl if disk_ttl is None else disk_ttl
+        self.stats = CacheStats()
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self._local = threading.local()
+    
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread, created lazily."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, created REAL NOT NULL, payload TEXT NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+    
+    def get(self, key: str) -> Optional[BaseMessage]:
+        """Look up a response, counting a hit or a miss."""
+        payload = self._memory_lookup(key)
+        if payload is None:
+            payload = self._disk_lookup(key)
+        self._count_lookup(payload)
+        return _load_message(payload) if payload is not None else None
+    
+    def _count_lookup(self, payload: Optional[str]):
+        with self._lock:
+            if payload is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+    
+    def _memory_lookup(self, key: str) -> Optional[str]:
+        """Find a serialized response in the memory tier."""
+        with self._lock:
+            return self._memory_entry(key, time.time())
+    
+    def _memory_entry(self, key: str, now: float) -> Optional[str]:
+        """Fresh payload of key in the memory tier. Caller holds the lock."""
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        self.stats.memory_hits += 1
+        return entry[1]
+    
+    def _disk_lookup(self, key: str) -> Optional[str]:
+        """Find a serialized response on disk, keeping it in memory. Blocking."""
+        if self.path is None:
+            return None
+        now = time.time()
+        conn = self._connection()
+        row = conn.execute("SELECT created, payload FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if row[0] + self.disk_ttl <= now:
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            conn.commit()
+            return None
+        
+        payload = row[1]
+        with self._lock:
+            self.stats.disk_hits += 1
+            self._remember(key, payload, now)
+        return payload
+    
+    def _remember(self, key: str, payload: str, now: float):
+        """Put a response in the memory tier, evicting the least recently used. Caller holds the lock."""
+        self._memory[key] = (now + self.ttl, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+    
+    def put(self, key: str, message: BaseMessage):
+        """Store a response in both tiers."""
+        payload, now = self._store_memory(key, message)
+        self._store_disk(key, payload, now)
+    
+    def _store_memory(self, key: str, message: BaseMessage) -> Tuple[str, float]:
+        payload = _dump_message(message)
+        now = time.time()
+        with self._lock:
+            self._remember(key, payload, now)
+            self.stats.stores += 1
+        return payload, now
+    
+    def _store_disk(self, key: str, payload: str, now: float):
+        """Write a response to the disk tier. Blocking."""
+        if self.path is not None:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                (key, now, payload),
+            )
+            conn.commit()
+    
+    def _claim(self, key: str) -> Tuple[Optional[Future], bool, Optional[str]]:
+        """
+        Get the in-flight future for a key, and whether the caller must compute it.
+        The memory tier is checked again before taking the lead, in case a
+        leader finished since the caller's lookup.
+        
+        Returns:
+            (future, leader, payload); payload is set (and future None) if the
+            response was stored in the meantime
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.stats.coalesced += 1
+                return future, False, None
+            payload = self._memory_entry(key, time.time())
+            if payload is not None:
+                self.stats.coalesced += 1
+                return None, False, payload
+            future = Future()
+            self._in_flight[key] = future
+            return future, True, None
+    
+    def _release(self, key: str, future: Future, result: Optional[BaseMessage], error: Optional[BaseException]):
+        """Publish the outcome of an in-flight request to everyone waiting on it."""
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(_dump_message(result))
+    
+    def get_or_call(self, key: str, call: Callable[[], BaseMessage]) -> BaseMessage:
+        """
+        Return the cached response for key, or call the model once for it.
+        Concurrent callers with the same key wait for the first caller's result.
+        """
+        cached = self.get(key)
+        _last_hit.set(cached is not None)
+        if cached is not None:
+            return cached
+        
+        future, leader, payload = self._claim(key)
+        if not leader:
+            _last_hit.set(True)
+            return _load_message(payload if payload is not None else future.result())
+        try:
+            result = call()
+        except BaseException as e:
+            self._release(key, future, None, e)
+            raise
+        self.put(key, result)
+        self._release(key, future, result, None)
+        return result
+    
+    async def aget_or_call(self, key: str, call: Callable[[], Any]) -> BaseMessage:
+        """
+        Async version of get_or_call; call returns an awaitable response.
+        Only the memory tier is read and written on the event loop; the
+        disk tier (SQLite) runs on a worker thread.
+        """
+        payload = await self._alookup(key)
+        if payload is not None:
+            return _load_message(payload)
+        
+        future, leader, payload = self._claim(key)
+        if not leader:
+            _last_hit.set(True)
+            return _load_message(payload if payload is not None else await asyncio.wrap_future(future))
+        try:
+            result = await call()
+        except BaseException as e:
+            self._release(key, future, None, e)
+            raise
+        await self._astore(key, future, result)
+        return result
+    
+    async def _alookup(self, key: str) -> Optional[str]:
+        """Look up a serialized response without blocking the event loop, counting a hit or a miss."""
+        payload = self._memory_lookup(key)
+        if payload is None and self.path is not None:
+            payload = await asyncio.to_thread(self._disk_lookup, key)
+        self._count_lookup(payload)
+        _last_hit.set(payload is not None)
+        return payload
+    
+    async def _astore(self, key: str, future: Future, result: BaseMessage):
+        """Store the leader's response, publish it, then write it to disk on a worker thread."""
+        payload, now = self._store_memory(key, result)
+        self._release(key, future, result, None)
+        if self.path is not None:
+            await asyncio.to_thread(self._store_disk, key, payload, now)
+    
+    def stream_or_call(self, key: str, stream: Callable[[], Iterator[AIMessageChunk]]) -> Iterator[AIMessageChunk]:
+        """
+        Streaming version of get_or_call: a cached response is replayed as
+        one chunk, otherwise the model's chunks are passed through and the
+        assembled response is cached. Concurrent callers with the same key
+        get the first caller's response as one chunk once it is complete.
+        """
+        cached = self.get(key)
+        _last_hit.set(cached is not None)
+        if cached is not None:
+            yield message_to_chunk(cached)
+            return
+        
+        future, leader, payload = self._claim(key)
+        if not leader:
+            _last_hit.set(True)
+            yield message_to_chunk(_load_message(payload if payload is not None else future.result()))
+            return
+        gathered = None
+        try:
+            for chunk in stream():
+                gathered = chunk if gathered is None else gathered + chunk
+                yield chunk
+        except BaseException as e:
+            self._release(key, future, None, _stream_error(e))
+            raise
+        if gathered is None:
+            self._release(key, future, None, ValueError("The model streamed no chunks"))
+            return
+        result = message_chunk_to_message(gathered)
+        self.put(key, result)
+        self._release(key, future, result, None)
+    
+    async def astream_or_call(self, key: str, stream: Callable[[], AsyncIterator[AIMessageChunk]]) -> AsyncIterator[AIMessageChunk]:
+        """
+        Async version of stream_or_call, with the disk tier on a worker
+        thread as in aget_or_call.
+        """
+        payload = await self._alookup(key)
+        if payload is not None:
+            yield message_to_chunk(_load_message(payload))
+            return
+        
+        future, leader, payload = self._claim(key)
+        if not leader:
+            _last_hit.set(True)
+            if payload is None:
+                payload = await asyncio.wrap_future(future)
+            yield message_to_chunk(_load_message(payload))
+            return
+        gathered = None
+        try:
+            async for chunk in stream():
+                gathered = chunk if gathered is None else gathered + chunk
+                yield chunk
+        except BaseException as e:
+            self._release(key, future, None, _stream_error(e))
+            raise
+        if gathered is None:
+            self._release(key, future, None, ValueError("The model streamed no chunks"))
+            return
+        await self._astore(key, future, message_chunk_to_message(gathered))
+    
+    def purge_expired(self) -> int:
+        """
+        Drop expired entries from both tiers.
+        
+        Returns:
+            Number of disk entries removed
+        """
+        now = time.time()
+        with self._lock:
+            for key in [k for k, (expires, _) in self._memory.items() if expires <= now]:
+                del self._memory[key]
+        if self.path is None:
+            return 0
+        conn = self._connection()
+        removed = conn.execute("DELETE FROM responses WHERE created + ? <= ?", (self.disk_ttl, now)).rowcount
+        conn.commit()
+        return removed
+    
+    def clear(self):
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        if self.path is not None:
+            conn = self._connection()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+    
+    def __len__(self) -> int:
+        return len(self._memory)
+    
+    def close(self):
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def _stream_error(error: BaseException) -> BaseException:
+    """
+    The error passed to callers waiting on a leader's stream. A stream closed
+    or cancelled by its consumer must not close or cancel the waiters.
+    """
+    if isinstance(error, Exception):
+        return error
+    return RuntimeError("The shared response stream was stopped before it finished")
+
+
+def message_to_chunk(message: BaseMessage) -> AIMessageChunk:
+    """A complete AI message as a single stream chunk, tool calls included."""
+    return AIMessageChunk(
+        content=message.content,
+        id=message.id,
+        tool_call_chunks=[
+            {"name": call["name"], "args": json.dumps(call["args"]), "id": call.get("id"), "index": i}
+            for i, call in enumerate(getattr(message, "tool_calls", None) or [])
+        ],
+    )
+
+
+class CachedChatModel:
+    """
+    Wraps a chat model so invoke/ainvoke and stream/astream go through a
+    ResponseCache. Streams replay a cached response as one chunk, and
+    otherwise stream from the model and cache the assembled response.
+    
+    bind_tools() returns a wrapper around the tool-bound model that also
+    hashes the bound tool schemas. Other attributes are passed through to
+    the wrapped model.
+    """
+    
+    def __init__(
+        self,
+        llm: Any,
+        cache: ResponseCache,
+        model_name: Optional[str] = None,
+        temperature: Optional[float] = None,
+        tool_schemas: Sequence[Dict[str, Any]] = (),
+    ):
+        self.llm = llm
+        self.cache = cache
+        self.model_name = (
+            model_name
+            or getattr(llm, "model", None)
+            or getattr(llm, "model_name", None)
+            or type(llm).__name__
+        )
+        self.temperature = temperature if temperature is not None else getattr(llm, "temperature", None)
+        self.tool_schemas = list(tool_schemas)
+    
+    def bind_tools(self, tools: Sequence[Any], **kwargs) -> "CachedChatModel":
+        from langchain_core.utils.function_calling import convert_to_openai_tool
+        return CachedChatModel(
+            self.llm.bind_tools(tools, **kwargs),
+            self.cache,
+            model_name=self.model_name,
+            temperature=self.temperature,
+            tool_schemas=[convert_to_openai_tool(t) for t in tools],
+        )
+    
+    def cache_key(self, messages: Sequence[BaseMessage]) -> str:
+        """The cache key of a request with these messages."""
+        return request_key(self.model_name, self.temperature, self.tool_schemas, messages)
+    
+    def invoke(self, messages: Sequence[BaseMessage], **kwargs) -> BaseMessage:
+        if kwargs:
+            # Per-call options are not part of the key; do not cache
+            _last_hit.set(None)
+            return self.llm.invoke(messages, **kwargs)
+        return self.cache.get_or_call(self.cache_key(messages), lambda: self.llm.invoke(messages))
+    
+    async def ainvoke(self, messages: Sequence[BaseMessage], **kwargs) -> BaseMessage:
+        if kwargs:
+            _last_hit.set(None)
+            return await self.llm.ainvoke(messages, **kwargs)
+        return await self.cache.aget_or_call(self.cache_key(messages), lambda: self.llm.ainvoke(messages))
+    
+    def stream(self, messages: Sequence[BaseMessage], **kwargs) -> Iterator[AIMessageChunk]:
+        if kwargs:
+            _last_hit.set(None)
+            yield from self.llm.stream(messages, **kwargs)
+            return
+        yield from self.cache.stream_or_call(self.cache_key(messages), lambda: self.llm.stream(messages))
+    
+    async def astream(self, messages: Sequence[BaseMessage], **kwargs) -> AsyncIterator[AIMessageChunk]:
+        if kwargs:
+            _last_hit.set(None)
+            async for chunk in self.llm.astream(messages, **kwargs):
+                yield chunk
+            return
+        async for chunk in self.cache.astream_or_call(self.cache_key(messages), lambda: self.llm.astream(messages)):
+            yield chunk
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
@@ -2,18 +2,144 @@
 """
 Message-handling loop for the tool-using agent WITH STATE MANAGEMENT.
 Implements the core loop: user prompt → model → tool selection → tool execution → final answer
+
+Startup is kept cheap: the Gemini client, the .env file, the response cache
+and the tool stack are only loaded when an agent first needs them.
 """
 
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage, SystemMessage
-from src.tools.schemas import TOOLS
+from src.tools.memo import TOOL_MEMO, ToolMemo
 from src.agent.state import AgentState, display_state
-from typing import List, Dict, Any
+from src.agent.history import CONTEXT_PREFIX, HistoryManager
+from src.agent.accounting import TokenBudgetExceeded
+from src.agent.events import AgentEvent, FinalAnswer, TokenDelta, ToolCallFinished, ToolCallStarted
+from src.agent.tracing import span
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Coroutine, AsyncIterator, Iterable, Iterator, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import copy
+import json
+import queue
+import threading
+import time
 import os
-from dotenv import load_dotenv
+import uuid
+
+if TYPE_CHECKING:
+    from src.tools.registry import ToolRegistry
+    from src.agent.llm_cache import ResponseCache
+    from src.agent.checkpoint import CheckpointStore
+    from src.agent.batch import BatchRun
+    from src.agent.router import FastPathRouter
+    from src.agent.accounting import TokenAccountant
+
+# Name of the environment variable with the SQLite file for the model
+# response cache, used when no cache is passed in
+LLM_CACHE_PATH_ENV = "LLM_CACHE_PATH"
+
+# Words in a get_time location that refer back to the last location
+REFERENCE_WORDS = ["that", "it", "there"]
+
+_env_loaded = False
+_env_lock = threading.Lock()
+
+
+def _load_env():
+    """Load the .env file once, the first time an agent needs its settings."""
+    global _env_loaded
+    with _env_lock:
+        if not _env_loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _env_loaded = True
+
+
+# Shared background event loop used by the blocking wrappers around async methods
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+_background_loop_lock = threading.Lock()
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    """Get the shared background event loop, starting it on first use."""
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None:
+            _background_loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_background_loop.run_forever,
+                name="agent-event-loop",
+                daemon=True,
+            ).start()
+    return _background_loop
+
+
+# Thread pools for sync tools, shared by every agent with the same pool size
+_tool_executors: Dict[int, ThreadPoolExecutor] = {}
+_tool_executors_lock = threading.Lock()
+
+
+def _get_tool_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Get the shared tool thread pool of this size, creating it on first use."""
+    with _tool_executors_lock:
+        executor = _tool_executors.get(max_workers)
+        if executor is None:
+            executor = _tool_executors[max_workers] = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix="agent-tool",
+            )
+    return executor
+
+
+def _run_coroutine_sync(coro: Coroutine) -> Any:
+    """
+    Run a coroutine to completion from synchronous code.
+    
+    Uses one long-lived event loop on a daemon thread, so async clients that
+    bind to a loop keep working across calls, and so the blocking API also
+    works when the caller is already inside a running loop (e.g. Jupyter).
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_background_loop()).result()
+
+
+def _iterate_async_sync(agen: AsyncIterator[Any]) -> Iterator[Any]:
+    """
+    Iterate an async generator from synchronous code.
+    Items are produced on the background loop and handed over through a queue
+    as soon as they are ready. Closing the iterator early cancels the producer.
+    """
+    items: "queue.Queue" = queue.Queue()
+    done = object()
+    
+    async def produce():
+        try:
+            async for item in agen:
+                items.put((item, None))
+        except BaseException as e:
+            items.put((done, e))
+            raise
+        items.put((done, None))
+    
+    future = asyncio.run_coroutine_threadsafe(produce(), _get_background_loop())
+    try:
+        while True:
+            item, error = items.get()
+            if item is done:
+                if error is not None and not isinstance(error, asyncio.CancelledError):
+                    raise error
+                return
+            yield item
+    finally:
+        future.cancel()
+
 
-# Load environment variables
-load_dotenv()
+def _annotate_tool_span(tool_span: Any, tool_args: Dict[str, Any], result: Any, memo_hit: bool):
+    """Add argument/result size, memo and error attributes to a tool's span."""
+    if not tool_span.is_recording():
+        return
+    tool_span.set_attribute("tool.args_bytes", len(json.dumps(tool_args, default=str)))
+    tool_span.set_attribute("tool.result_bytes", len(str(result)))
+    tool_span.set_attribute("tool.memo_hit", memo_hit)
+    tool_span.set_attribute("tool.error", isinstance(result, str) and result.startswith("Error"))
 
 
 class ToolUsingAgent:
@@ -23,178 +149,718 @@ class ToolUsingAgent:
     Now includes state/memory for Part B.4.
     """
     
-    def __init__(self, model_name: str = "gemini-2.5-flash"):
+    def __init__(
+        self,
+        model_name: str = "gemini-2.5-flash",
+        llm: Optional[Any] = None,
+        registry: Optional["ToolRegistry"] = None,
+        max_tool_workers: int = 4,
+        response_cache: Optional["ResponseCache"] = None,
+        tool_memo: Optional[ToolMemo] = TOOL_MEMO,
+        history: Optional[HistoryManager] = None,
+        checkpoint: Optional["CheckpointStore"] = None,
+        session_id: Optional[str] = None,
+        router: Optional["FastPathRouter"] = None,
+        accountant: Optional["TokenAccountant"] = None,
+    ):
         """
         Initialize the agent with Gemini model and tools.
+        Construction is cheap: the Gemini client is created and the tools are
+        bound on first use of `llm` / `llm_with_tools`.
         
         Args:
             model_name: The Gemini model to use (default: gemini-2.5-flash)
+            llm: Optional pre-built chat model to use instead of Gemini
+            registry: Tools available to the agent (default: the built-in REGISTRY)
+            max_tool_workers: Size of the thread pool that runs sync tools concurrently
+                              (one pool per size, shared by every agent)
+            response_cache: Cache for model responses (default: a cache stored at
+                            $LLM_CACHE_PATH if that is set, otherwise no caching)
+            tool_memo: Cache for the results of tools with a memo policy
+                       (default: the process-wide TOOL_MEMO; None disables it)
+            history: Keeps the history under a token budget (default: HistoryManager())
+            checkpoint: Store that saves the conversation after every turn
+            session_id: Id of the conversation in the checkpoint store; a saved
+                        conversation is resumed on the first turn (or resume())
+            router: Answers trivial queries with a direct tool call, skipping the model
+            accountant: Counts the tokens of every model call and enforces token
+                        budgets before a call is sent
         """
-        # Initialize the LLM
-        self.llm = ChatGoogleGenerativeAI(
-            model=model_name,
-            temperature=0,
-            google_api_key=os.getenv("GOOGLE_API_KEY")
-        )
+        self.model_name = model_name
         
-        # Bind tools to the model
-        self.llm_with_tools = self.llm.bind_tools(TOOLS)
+        # The LLM and the tool-bound LLM are built on first use (see the properties below)
+        self._llm_with_tools = None
+        self._registry = registry
+        self._client_lock = threading.Lock()
         
-        # Message history
+        # Answer repeated requests from the response cache
+        if response_cache is None:
+            _load_env()
+            cache_path = os.getenv(LLM_CACHE_PATH_ENV)
+            if cache_path:
+                from src.agent.llm_cache import ResponseCache
+                response_cache = ResponseCache(cache_path)
+        self.response_cache = response_cache
+        self._llm = self._with_cache(llm) if llm is not None else None
+        
+        # Message history, folded into a summary when over the token budget
         self.messages: List[Any] = []
+        self.history = history or HistoryManager()
         
         # State management (Part B.4)
         self.state = AgentState()
         
+        # Reuse results of pure and time-stable tools
+        self.tool_memo = tool_memo
+        
+        # Optional fast path that skips the model for trivial queries
+        self.router = router
+        
+        # Token usage per turn, and budgets
+        self.accountant = accountant
+        # Where the current turn's messages start in the history
+        self._turn_start = 0
+        
+        # Durable conversation, resumed lazily
+        self.checkpoint = checkpoint
+        self.session_id = session_id
+        self._resumed = False
+        
+        # Bounded pool for sync tools so one turn's tool calls can overlap;
+        # shared with other agents, so creating many agents adds no threads
+        self.tool_executor = _get_tool_executor(max_tool_workers)
+        
         print(f"Agent initialized with model: {model_name}")
-        print(f"Tools bound: {[tool.name for tool in TOOLS]}")
         print(f"State management enabled")
     
+    @property
+    def registry(self) -> "ToolRegistry":
+        """Tools available to the agent; the built-in tools are imported on first use."""
+        if self._registry is None:
+            from src.tools.schemas import REGISTRY
+            self._registry = REGISTRY
+        return self._registry
+    
+    @registry.setter
+    def registry(self, registry: "ToolRegistry"):
+        self._registry = registry
+        self._llm_with_tools = None
+    
+    @property
+    def llm(self) -> Any:
+        """The chat model, created on first use and wrapped by the response cache if any."""
+        if self._llm is None:
+            with self._client_lock:
+                if self._llm is None:
+                    _load_env()
+                    from langchain_google_genai import ChatGoogleGenerativeAI
+                    self._llm = self._with_cache(ChatGoogleGenerativeAI(
+                        model=self.model_name,
+                        temperature=0,
+                        google_api_key=os.getenv("GOOGLE_API_KEY")
+                    ))
+        return self._llm
+    
+    @llm.setter
+    def llm(self, llm: Any):
+        self._llm = llm
+        self._llm_with_tools = None
+    
+    def _with_cache(self, llm: Any) -> Any:
+        """Wrap a chat model so its responses go through the response cache, if any."""
+        if self.response_cache is None:
+            return llm
+        from src.agent.llm_cache import CachedChatModel
+        return CachedChatModel(llm, self.response_cache)
+    
+    @property
+    def llm_with_tools(self) -> Any:
+        """The chat model with the registry's tools bound, bound on first use."""
+        if self._llm_with_tools is None:
+            llm = self.llm
+            registry = self.registry
+            with self._client_lock:
+                if self._llm_with_tools is None:
+                    self._llm_with_tools = llm.bind_tools(registry.tools())
+                    print(f"Tools bound: {registry.names()}")
+        return self._llm_with_tools
+    
+    @llm_with_tools.setter
+    def llm_with_tools(self, llm_with_tools: Any):
+        self._llm_with_tools = llm_with_tools
+    
     def run(self, user_input: str, verbose: bool = True) -> str:
         """
         Run the agent with a user query.
+        Blocking wrapper around arun(); see arun() for the loop itself.
+        
+        Args:
+            user_input: The user's question/request
+            verbose: Whether to print intermediate steps
+        
+        Returns:
+            The final answer from the agent
+        """
+        return _run_coroutine_sync(self.arun(user_input, verbose=verbose))
+    
+    def run_stream(self, user_input: str, verbose: bool = False) -> Iterator[AgentEvent]:
+        """
+        Run the agent with a user query, yielding events as they happen.
+        Blocking wrapper around arun_stream().
+        
+        Args:
+            user_input: The user's question/request
+            verbose: Whether to print intermediate steps
+        
+        Yields:
+            TokenDelta, ToolCallStarted, ToolCallFinished and FinalAnswer events
+        """
+        return _iterate_async_sync(self.arun_stream(user_input, verbose=verbose))
+    
+    async def arun_stream(self, user_input: str, verbose: bool = False) -> AsyncIterator[AgentEvent]:
+        """
+        Run the agent with a user query, streaming the model's output.
+        Same loop as arun(), with the same state and message history at the end,
+        but the model calls use astream() and progress is yielded as events:
+        - TokenDelta for each piece of text the model writes
+        - ToolCallStarted / ToolCallFinished (with timing) for each tool call,
+          finished events in completion order
+        - FinalAnswer with the string arun() would return
+        
+        Args:
+            user_input: The user's question/request
+            verbose: Whether to print intermediate steps
+        """
+        with span("agent.turn", {"agent.model": self.model_name, "agent.streaming": True}) as turn_span:
+            self._begin_turn(user_input, verbose)
+            
+            routed = await self._afast_path(user_input, verbose)
+            if routed is not None:
+                ai_message, result, duration, final_answer = routed
+                tool_call = ai_message.tool_calls[0]
+                yield ToolCallStarted(tool_call["name"], dict(tool_call["args"]), tool_call["id"])
+                yield ToolCallFinished(tool_call["name"], dict(tool_call["args"]), tool_call["id"], result, duration)
+                yield TokenDelta(final_answer)
+            else:
+                ai_message = None
+                async for event in self._astream_model():
+                    if isinstance(event, TokenDelta):
+                        yield event
+                    else:
+                        ai_message = event
+                self.messages.append(ai_message)
+                
+                if ai_message.tool_calls:
+                    if verbose:
+                        print(f"\n[STEP 2] Model selected {len(ai_message.tool_calls)} tool(s):")
+                    
+                    tool_calls = ai_message.tool_calls
+                    self._prepare_tool_calls(tool_calls, verbose)
+                    for tool_call in tool_calls:
+                        yield ToolCallStarted(tool_call["name"], dict(tool_call["args"]), tool_call["id"])
+                    
+                    async def timed(index: int, tool_call: Dict[str, Any]):
+                        start = time.perf_counter()
+                        result = await self._aexecute_tool(tool_call["name"], tool_call["args"])
+                        return index, result, time.perf_counter() - start
+                    
+                    results: List[Any] = [None] * len(tool_calls)
+                    for next_done in asyncio.as_completed([timed(i, c) for i, c in enumerate(tool_calls)]):
+                        index, result, duration = await next_done
+                        results[index] = result
+                        tool_call = tool_calls[index]
+                        yield ToolCallFinished(tool_call["name"], dict(tool_call["args"]), tool_call["id"], result, duration)
+                    self._record_tool_results(tool_calls, results, verbose)
+                    
+                    if verbose:
+                        print(f"\n[STEP 3] Sending tool results back to model...")
+                    
+                    final_response = None
+                    async for event in self._astream_model():
+                        if isinstance(event, TokenDelta):
+                            yield event
+                        else:
+                            final_response = event
+                    self.messages.append(final_response)
+                    final_answer = final_response.content
+                else:
+                    final_answer = ai_message.content
+            
+            answer = self._finish_turn(final_answer, verbose)
+            self._annotate_turn_span(turn_span, ai_message, answer)
+            yield FinalAnswer(answer)
+    
+    async def _astream_model(self) -> AsyncIterator[Any]:
+        """
+        Stream one model call over the current history.
+        Yields a TokenDelta per text chunk, then the complete AIMessage.
+        """
+        # langchain_core.messages.utils is slow to import; only streaming needs it
+        from langchain_core.messages import message_chunk_to_message
+        
+        breakdown = self._check_budget()
+        with span("agent.llm", {"gen_ai.request.model": self.model_name, "llm.streaming": True}) as llm_span:
+            gathered = None
+            async for chunk in self.llm_with_tools.astream(self.messages):
+                gathered = chunk if gathered is None else gathered + chunk
+                text = chunk.text
+                if text:
+                    yield TokenDelta(text)
+            ai_message = message_chunk_to_message(gathered)
+            self._annotate_llm_span(llm_span, ai_message)
+        self._record_usage(breakdown, ai_message)
+        yield ai_message
+    
+    async def _ainvoke_model(self) -> Any:
+        """One model call over the current history."""
+        breakdown = self._check_budget()
+        with span("agent.llm", {"gen_ai.request.model": self.model_name, "llm.streaming": False}) as llm_span:
+            ai_message = await self.llm_with_tools.ainvoke(self.messages)
+            self._annotate_llm_span(llm_span, ai_message)
+        self._record_usage(breakdown, ai_message)
+        return ai_message
+    
+    def _check_budget(self) -> Any:
+        """
+        Estimate the next model call's prompt and enforce the token budgets.
+        
+        Returns:
+            The prompt breakdown for _record_usage(), or None without an accountant
+        
+        Raises:
+            TokenBudgetExceeded: If the call would go over a budget; nothing is
+                sent and the turn's messages are removed from the history
+        """
+        if self.accountant is None:
+            return None
+        try:
+            return self.accountant.check(self.messages, self.accountant.schema_tokens(self.registry))
+        except TokenBudgetExceeded:
+            self._rollback_turn()
+            raise
+    
+    def _rollback_turn(self):
+        """Drop the current turn's messages, so a refused turn does not stay in the history."""
+        self.messages = self.messages[:self._turn_start]
+        self.accountant.forget_messages()
+    
+    def _record_usage(self, breakdown: Any, ai_message: Any):
+        """Account a finished model call."""
+        if breakdown is not None:
+            self.accountant.record(breakdown, ai_message)
+    
+    def _annotate_llm_span(self, llm_span: Any, ai_message: Any):
+        """Add history size, cache and token usage attributes to a model call's span."""
+        if not llm_span.is_recording():
+            return
+        llm_span.set_attribute("llm.messages", len(self.messages))
+        llm_span.set_attribute("llm.tool_calls", len(ai_message.tool_calls))
+        if self.response_cache is not None:
+            from src.agent.llm_cache import last_lookup_hit
+            hit = last_lookup_hit()
+            if hit is not None:
+                llm_span.set_attribute("llm.cache_hit", hit)
+        usage = getattr(ai_message, "usage_metadata", None) or {}
+        for key in ("input_tokens", "output_tokens", "total_tokens"):
+            if key in usage:
+                llm_span.set_attribute(f"gen_ai.usage.{key}", usage[key])
+    
+    def _annotate_turn_span(self, turn_span: Any, ai_message: Any, answer: str):
+        """Add tool call count, answer size and history size attributes to a turn's span."""
+        if turn_span.is_recording():
+            turn_span.set_attribute("turn.tool_calls", len(ai_message.tool_calls))
+            turn_span.set_attribute("turn.answer_chars", len(answer))
+            turn_span.set_attribute("turn.history_messages", len(self.messages))
+    
+    def run_many(self, prompts: Iterable[str], concurrency: int = 8, **kwargs) -> "BatchRun":
+        """
+        Run many independent prompts, each in its own session, with at most
+        `concurrency` in flight and failed prompts retried with backoff.
+        
+        Iterate the returned BatchRun for results as they complete (or call
+        collect() for all of them in input order); its `stats` report
+        throughput and latency percentiles.
+        
+        Args:
+            prompts: The prompts, consumed lazily
+            concurrency: Most prompts in flight at once
+            **kwargs: Retry settings, see BatchRun
+        
+        Returns:
+            The BatchRun, started when iterated
+        """
+        from src.agent.batch import BatchRun
+        return BatchRun(self, prompts, concurrency=concurrency, **kwargs)
+    
+    def arun_many(self, prompts: Iterable[str], concurrency: int = 8, **kwargs) -> "BatchRun":
+        """
+        Async variant of run_many(): iterate the BatchRun with `async for`,
+        or await its acollect().
+        """
+        return self.run_many(prompts, concurrency=concurrency, **kwargs)
+    
+    async def arun(self, user_input: str, verbose: bool = True) -> str:
+        """
+        Run the agent with a user query using the async model API.
         Implements the message-handling loop with state management:
         1. Store user intent in state
         2. Add context from state to help with reference resolution
         3. User prompt → model
         4. Model selects tool + arguments
-        5. Run tool and store result in state
-        6. Send tool result back to model
+        5. Run the turn's tools concurrently and store results in state
+        6. Send tool results back to model
         7. Print final answer
         
         Args:
             user_input: The user's question/request
             verbose: Whether to print intermediate steps
-            
+        
         Returns:
             The final answer from the agent
         """
+        with span("agent.turn", {"agent.model": self.model_name, "agent.streaming": False}) as turn_span:
+            self._begin_turn(user_input, verbose)
+            
+            # Trivial queries are answered by a direct tool call
+            routed = await self._afast_path(user_input, verbose)
+            if routed is not None:
+                ai_message, _, _, final_answer = routed
+            else:
+                # Step 2: Model responds (may include tool calls)
+                ai_message = await self._ainvoke_model()
+                self.messages.append(ai_message)
+                
+                # Step 3: Check if model wants to use tools
+                if ai_message.tool_calls:
+                    if verbose:
+                        print(f"\n[STEP 2] Model selected {len(ai_message.tool_calls)} tool(s):")
+                    
+                    # Step 4: Execute the tool calls concurrently
+                    await self._aexecute_tool_calls(ai_message.tool_calls, verbose)
+                    
+                    # Step 5: Send tool results back to model for final answer
+                    if verbose:
+                        print(f"\n[STEP 3] Sending tool results back to model...")
+                    
+                    final_response = await self._ainvoke_model()
+                    self.messages.append(final_response)
+                    
+                    final_answer = final_response.content
+                else:
+                    # No tools needed, use direct response
+                    final_answer = ai_message.content
+            
+            answer = self._finish_turn(final_answer, verbose)
+            self._annotate_turn_span(turn_span, ai_message, answer)
+            return answer
+    
+    async def _afast_path(self, user_input: str, verbose: bool) -> Optional[Tuple[AIMessage, str, float, str]]:
+        """
+        Answer the turn with a direct tool call if the router is confident.
+        On success the tool call, its result and the answer are added to the
+        history and state exactly as a model-driven turn would add them.
+        
+        Returns:
+            (tool-calling AIMessage, tool result, tool seconds, answer), or
+            None to ask the model
+        """
+        if self.router is None:
+            return None
+        route = self.router.match(user_input)
+        if route is None:
+            return None
+        
+        with span("agent.fast_path", {"route.tool": route.tool_name, "route.rule": route.rule}) as route_span:
+            tool_call = {
+                "name": route.tool_name,
+                "args": dict(route.args),
+                "id": f"fastpath_{uuid.uuid4().hex[:12]}",
+                "type": "tool_call",
+            }
+            start = time.perf_counter()
+            result = await self._aexecute_tool(tool_call["name"], tool_call["args"])
+            duration = time.perf_counter() - start
+            answer = self.router.format(route, result, user_input)
+            route_span.set_attribute("route.answered", answer is not None)
+        if answer is None:
+            return None
+        
+        if verbose:
+            print(f"\n[FAST PATH] {route.tool_name}({route.args}) answered without the model")
+        ai_message = AIMessage(content="", tool_calls=[tool_call])
+        self.messages.append(ai_message)
+        self._record_tool_results([tool_call], [result], verbose)
+        self.messages.append(AIMessage(content=answer))
+        return ai_message, result, duration, answer
+    
+    def _begin_turn(self, user_input: str, verbose: bool):
+        """Record the user intent and add the user message to the history."""
+        self.resume()
+        
         if verbose:
             print("\n" + "=" * 60)
             print(f"USER: {user_input}")
             print("=" * 60)
         
+        if self.accountant is not None:
+            self.accountant.begin_turn()
+        
         # Part B.4: Store user intent
         self.state.add_user_intent(user_input)
         
+        self._turn_start = len(self.messages)
+        
         # Add system message with context if we have state
         if len(self.messages) == 0 and self.state.last_location:
             context_msg = SystemMessage(
-                content=f"Context from previous conversation: {self.state.get_context_summary()}"
+                content=f"{CONTEXT_PREFIX}{self.state.get_context_summary()}"
             )
             self.messages.append(context_msg)
         
-        # Step 1: Add user message and invoke model
+        # Step 1: Add user message
         self.messages.append(HumanMessage(content=user_input))
         
+        # Keep the history under the token budget
+        folded_before = self.history.folded_turns
+        self.messages = self.history.fit(self.messages, self.state)
+        if self.history.folded_turns > folded_before:
+            # The current turn is kept whole after the summary; it starts at the user message
+            self._turn_start = len(self.messages) - 1
+            if verbose:
+                print(f"[HISTORY] Folded {self.history.folded_turns - folded_before} earlier turn(s) into the summary")
+        
         if verbose:
             print("\n[STEP 1] Sending prompt to model...")
             if self.state.last_tool_name:
                 print(f"[STATE] Context available: {self.state.get_context_summary()}")
+    
+    def _finish_turn(self, final_answer: Any, verbose: bool) -> str:
+        """Save the turn, print the final answer and state, and return the answer as a string."""
+        self._save_checkpoint()
+        if self.accountant is not None:
+            self.accountant.end_turn()
         
-        # Step 2: Model responds (may include tool calls)
-        ai_message = self.llm_with_tools.invoke(self.messages)
-        self.messages.append(ai_message)
-        
-        # Step 3: Check if model wants to use tools
-        if ai_message.tool_calls:
-            if verbose:
-                print(f"\n[STEP 2] Model selected {len(ai_message.tool_calls)} tool(s):")
+        if verbose:
+            print(f"\n[FINAL ANSWER]")
+            print(f"AGENT: {final_answer}")
+            print("=" * 60)
             
-            # Execute each tool call
-            for tool_call in ai_message.tool_calls:
+            # Display state after response
+            display_state(self.state)
+        
+        return str(final_answer)
+    
+    async def _aexecute_tool_calls(self, tool_calls: List[Dict[str, Any]], verbose: bool):
+        """
+        Execute one turn's tool calls concurrently.
+        
+        References are resolved up front in call order, as if the calls had run
+        one after another. Results are written to state and history in the
+        original call order once every call has finished.
+        
+        Args:
+            tool_calls: The tool calls from the model's AIMessage
+            verbose: Whether to print intermediate steps
+        """
+        self._prepare_tool_calls(tool_calls, verbose)
+        results = await asyncio.gather(*[
+            self._aexecute_tool(tool_call["name"], tool_call["args"])
+            for tool_call in tool_calls
+        ])
+        self._record_tool_results(tool_calls, results, verbose)
+    
+    def _prepare_tool_calls(self, tool_calls: List[Dict[str, Any]], verbose: bool):
+        """Print the tool calls and resolve their references, in call order."""
+        with span("agent.resolve_references", {"tool.calls": len(tool_calls)}) as resolve_span:
+            last_location = self.state.last_location
+            resolved = 0
+            for tool_call in tool_calls:
                 tool_name = tool_call["name"]
                 tool_args = tool_call["args"]
-                tool_id = tool_call["id"]
                 
                 if verbose:
                     print(f"\n  → Tool: {tool_name}")
                     print(f"    Arguments: {tool_args}")
                 
-                # Step 4: Execute the tool
-                tool_result = self._execute_tool(tool_name, tool_args)
-                
-                # Part B.4: Store tool result in state
-                self.state.update_tool_result(tool_name, tool_args, tool_result)
-                
-                if verbose:
-                    print(f"    Result: {tool_result[:100]}..." if len(tool_result) > 100 else f"    Result: {tool_result}")
-                
-                # Create tool message with result
-                tool_message = ToolMessage(
-                    content=tool_result,
-                    tool_call_id=tool_id
-                )
-                self.messages.append(tool_message)
+                original = tool_args.get("location")
+                last_location = self._resolve_references(tool_name, tool_args, last_location)
+                resolved += tool_args.get("location") != original
+            resolve_span.set_attribute("references.resolved", resolved)
+    
+    def _record_tool_results(self, tool_calls: List[Dict[str, Any]], results: List[str], verbose: bool):
+        """Store tool results in state and history, in the original call order."""
+        for tool_call, tool_result in zip(tool_calls, results):
+            # Part B.4: Store tool result in state
+            self.state.update_tool_result(tool_call["name"], tool_call["args"], tool_result)
             
-            # Step 5: Send tool results back to model for final answer
             if verbose:
-                print(f"\n[STEP 3] Sending tool results back to model...")
-            
-            final_response = self.llm_with_tools.invoke(self.messages)
-            self.messages.append(final_response)
+                print(f"\n  ← Tool: {tool_call['name']}")
+                print(f"    Result: {tool_result[:100]}..." if len(tool_result) > 100 else f"    Result: {tool_result}")
             
-            final_answer = final_response.content
-        else:
-            # No tools needed, use direct response
-            final_answer = ai_message.content
+            # Create tool message with result
+            self.messages.append(ToolMessage(
+                content=tool_result,
+                tool_call_id=tool_call["id"]
+            ))
+    
+    def _resolve_references(
+        self,
+        tool_name: str,
+        tool_args: Dict[str, Any],
+        last_location: Optional[str],
+    ) -> Optional[str]:
+        """
+        Resolve references like "that" in tool arguments using state.
         
-        if verbose:
-            print(f"\n[FINAL ANSWER]")
-            print(f"AGENT: {final_answer}")
-            print("=" * 60)
-            
-            # Display state after response
-            display_state(self.state)
+        Args:
+            tool_name: Name of the tool being called
+            tool_args: Arguments for the tool (updated in place)
+            last_location: The most recent location known at this point
         
-        return str(final_answer)
+        Returns:
+            The most recent location after this call
+        """
+        # Part B.4: Reference resolution for "that" in location queries
+        if tool_name == "get_time" and "location" in tool_args:
+            location = tool_args["location"].lower()
+            # If user says "convert that to UTC", use last location
+            if location in REFERENCE_WORDS and last_location:
+                print(f"    [STATE] Resolving '{location}' to last location: {last_location}")
+                tool_args["location"] = last_location
+            return tool_args["location"]
+        return last_location
     
     def _execute_tool(self, tool_name: str, tool_args: Dict[str, Any]) -> str:
         """
-        Execute a tool by name with given arguments.
-        Handles reference resolution using state.
+        Execute a tool by name with given arguments, from synchronous code.
+        Resolves references using state, then runs _aexecute_tool().
         
         Args:
             tool_name: Name of the tool to execute
             tool_args: Arguments to pass to the tool
-            
+        
         Returns:
             Tool execution result as string
         """
-        # Part B.4: Reference resolution for "that" in location queries
-        if tool_name == "get_time" and "location" in tool_args:
-            location = tool_args["location"].lower()
-            # If user says "convert that to UTC", use last location
-            if location in ["that", "it", "there"] and self.state.last_location:
-                print(f"    [STATE] Resolving '{location}' to last location: {self.state.last_location}")
-                tool_args["location"] = self.state.last_location
-        
-        # Find the tool
-        tool = None
-        for t in TOOLS:
-            if t.name == tool_name:
-                tool = t
-                break
+        with span("agent.resolve_references", {"tool.calls": 1}):
+            self._resolve_references(tool_name, tool_args, self.state.last_location)
+        return _run_coroutine_sync(self._aexecute_tool(tool_name, tool_args))
+    
+    async def _aexecute_tool(self, tool_name: str, tool_args: Dict[str, Any]) -> str:
+        """
+        Execute a tool by name without blocking the event loop.
+        Async tools are awaited directly; sync tools run on the tool thread pool.
+        Tools with a memo policy reuse earlier results, and identical calls
+        in the same turn run once. References must already be resolved.
         
-        if tool is None:
-            return f"Error: Tool '{tool_name}' not found"
+        Args:
+            tool_name: Name of the tool to execute
+            tool_args: Arguments to pass to the tool
         
-        try:
-            # Execute the tool with arguments
-            result = tool.invoke(tool_args)
+        Returns:
+            Tool execution result as string
+        """
+        with span("agent.tool", {"tool.name": tool_name}) as tool_span:
+            ran = []
+            
+            def run():
+                ran.append(True)
+                return self._ainvoke_tool(tool, tool_args)
+            
+            tool = self.registry.get(tool_name)
+            if tool is None:
+                result = f"Error: Tool '{tool_name}' not found"
+            else:
+                try:
+                    tool_args = self.registry.validate(tool_name, tool_args)
+                    policy = self.registry.memo_policy(tool_name)
+                    if policy is None or self.tool_memo is None:
+                        result = await run()
+                    else:
+                        result = await self.tool_memo.acall(tool_name, tool_args, policy, run)
+                except Exception as e:
+                    result = f"Error executing {tool_name}: {str(e)}"
+            _annotate_tool_span(tool_span, tool_args, result, memo_hit=tool is not None and not ran)
             return result
-        except Exception as e:
-            return f"Error executing {tool_name}: {str(e)}"
+    
+    async def _ainvoke_tool(self, tool: Any, tool_args: Dict[str, Any]) -> str:
+        """Invoke a tool with validated arguments on the event loop or the tool pool."""
+        if getattr(tool, "coroutine", None) is not None:
+            return await tool.ainvoke(tool_args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.tool_executor, tool.invoke, tool_args)
+    
+    def resume(self) -> bool:
+        """
+        Load the saved conversation of session_id from the checkpoint store,
+        once; later calls do nothing.
+        
+        Returns:
+            True if a saved conversation was loaded
+        """
+        if self._resumed or self.checkpoint is None or self.session_id is None:
+            return False
+        self._resumed = True
+        with span("agent.checkpoint.load", {"session.id": self.session_id}):
+            saved = self.checkpoint.load(self.session_id)
+        if saved is None:
+            return False
+        self.messages = saved.messages
+        self.state = saved.state
+        self.history.reset()
+        self.history.summary_lines = saved.summary_lines
+        self.history.folded_turns = saved.folded_turns
+        return True
+    
+    def _save_checkpoint(self):
+        """Append the turn to the checkpoint store, if the agent has one."""
+        if self.checkpoint is None or self.session_id is None:
+            return
+        with span("agent.checkpoint.save", {"session.id": self.session_id}):
+            self.checkpoint.save(self.session_id, self.messages, self.state, self.history)
+    
+    def spawn(self, session_id: Optional[str] = None) -> "ToolUsingAgent":
+        """
+        A new conversation that shares this agent's model, tool binding,
+        caches and tool thread pool, with its own history and state.
+        Much cheaper than constructing another agent; used by SessionManager.
+        
+        Args:
+            session_id: Id of the new conversation in the checkpoint store
+        """
+        self.llm_with_tools  # bind once, before the binding is shared
+        agent = copy.copy(self)
+        agent.messages = []
+        agent.state = AgentState()
+        agent.history = HistoryManager(
+            max_tokens=self.history.max_tokens,
+            counter=self.history.counter,
+            summarizer=self.history.summarizer,
+        )
+        agent.session_id = session_id
+        agent._resumed = False
+        agent.accountant = self.accountant.fork() if self.accountant is not None else None
+        return agent
     
     def reset(self):
         """Clear message history but keep state for follow-up."""
+        self.resume()
         self.messages = []
+        self.history.reset()
+        if self.accountant is not None:
+            self.accountant.forget_messages()
+        self._save_checkpoint()
         print("Message history cleared (state retained)")
     
     def reset_all(self):
         """Clear both message history and state."""
+        self.resume()
         self.messages = []
+        self.history.reset()
+        if self.accountant is not None:
+            self.accountant.forget_messages()
         self.state.reset()
+        self._save_checkpoint()
         print("Message history and state cleared")
 
 
@@ -224,4 +890,4 @@ def demo_with_state():
 
 
 if __name__ == "__main__":
-    demo_with_state()
\ No newline at end of file
+    demo_with_state()
@@ -0,0 +1,256 @@
+# src/agent/router.py
+"""
+Deterministic fast path for trivial queries.
+Some questions name their tool and its argument outright: "what is 18% of
+24500", "time in Tokyo", "what's your refund policy". For those, the router
+picks the tool call itself, so the turn costs one tool call instead of two
+model round trips, and the answer is formatted from a template.
+
+Routes come from precompiled patterns and a keyword index built once from:
+- the registry's tool schemas (a route only targets a registered tool, and
+  fills the argument the schema requires)
+- the LOCATION_TIMEZONES keys, for get_time
+- the FAQ_DATABASE keys, for lookup_faq
+
+Anything less than a confident match, and any tool result that is an error
+or a miss, falls through to the model.
+"""
+
+import json
+import re
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional, Set
+
+# Lowest confidence at which a route skips the model
+ROUTER_MIN_CONFIDENCE = 0.75
+
+# Answer templates by tool. Fields: {query}, {result}, {first_line} of the
+# result, and the keys of a JSON object result (e.g. {answer}, {source_title})
+ANSWER_TEMPLATES = {
+    "calc": "{first_line}",
+    "get_time": "{result}.",
+    "lookup_faq": "{answer}\n\nSource: {source_title}",
+}
+
+# "what is", "calculate", ... before an arithmetic expression
+CALC_PATTERN = re.compile(
+    r"(?:please\s+)?(?:(?:what\s+is|what's|whats|how\s+much\s+is|calculate|compute|evaluate)\s+)?"
+    r"(?P<expression>.+?)\s*=?"
+)
+
+# The whole expression: arithmetic with at least one operator, or "X% of Y"
+EXPRESSION_PATTERN = re.compile(
+    r"\(*\s*-?\d[\d.\s]*\)*(?:\s*[-+*/%]\s*\(*\s*-?\d[\d.\s]*\)*)+"
+    r"|\d+(?:\.\d+)?\s*%\s*of\s*\d+(?:\.\d+)?"
+)
+
+# Digit grouping commas, as in "24,500"
+THOUSANDS_PATTERN = re.compile(r"(?<=\d),(?=\d{3}\b)")
+
+# "time in X", "what time is it in X", "what's the current time in X (now)"
+TIME_PATTERN = re.compile(
+    r"(?:what\s+time\s+is\s+it|(?:what(?:'s|\s+is)\s+the\s+)?(?:current\s+|local\s+)?time(?:\s+is\s+it)?)"
+    r"\s+in\s+(?P<location>[a-z][a-z .'-]*?)(?:\s+(?:right\s+)?now)?"
+)
+
+# Words that do not change which FAQ topic a question is about, beyond the
+# FAQ search's own stop words
+FAQ_FILLER_WORDS = frozenset("accept explain info information details offer take".split())
+
+# source_title of lookup_faq results that are not answers
+FAQ_MISS_TITLES = ("No Match Found", "Error")
+
+# Punctuation and whitespace trimmed from the end of a query
+TRAILING = "?!. \t\n"
+
+
+@dataclass(frozen=True)
+class Route:
+    """A tool call chosen without the model."""
+    tool_name: str
+    args: Dict[str, Any]
+    confidence: float
+    rule: str
+
+
+@dataclass
+class RouterStats:
+    """How often the router answered without the model."""
+    queries: int = 0
+    routed: int = 0
+    no_match: int = 0
+    rejected: int = 0
+    by_tool: Counter = field(default_factory=Counter)
+    
+    @property
+    def short_circuit_rate(self) -> float:
+        return self.routed / self.queries if self.queries else 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "queries": self.queries,
+            "routed": self.routed,
+            "no_match": self.no_match,
+            "rejected": self.rejected,
+            "by_tool": dict(self.by_tool),
+            "short_circuit_rate": self.short_circuit_rate,
+        }
+
+
+class FastPathRouter:
+    """
+    Routes trivial queries straight to a tool.
+    
+    match() returns a Route or None; format() turns the tool's result into
+    the answer, or returns None when the result should go to the model after
+    all. `stats` counts queries, routes, misses and rejected results; it is
+    shared by every session spawned from the agent.
+    """
+    
+    def __init__(
+        self,
+        registry: Any = None,
+        locations: Optional[Iterable[str]] = None,
+        faq_topics: Optional[Iterable[str]] = None,
+        min_confidence: float = ROUTER_MIN_CONFIDENCE,
+        templates: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Args:
+            registry: Tools that may be called (default: the built-in REGISTRY)
+            locations: Names get_time is routed for (default: LOCATION_TIMEZONES keys)
+            faq_topics: Topics lookup_faq is routed for (default: FAQ_DATABASE keys)
+            min_confidence: Lowest confidence at which a route skips the model
+            templates: Answer templates by tool name, overriding ANSWER_TEMPLATES
+        """
+        from src.tools.execution import FAQ_DATABASE, LOCATION_TIMEZONES
+        from src.tools.faq_store import tokenize
+        if registry is None:
+            from src.tools.schemas import REGISTRY as registry
+        
+        self.min_confidence = min_confidence
+        self.templates = {**ANSWER_TEMPLATES, **(templates or {})}
+        self.stats = RouterStats()
+        self._stats_lock = threading.Lock()
+        self._tokenize = tokenize
+        
+        # The argument each routable tool takes, read from its schema
+        self._argument = {
+            name: argument
+            for name in ("calc", "get_time", "lookup_faq")
+            if name in registry and (argument := _single_argument(registry.json_schema(name))) is not None
+        }
+        
+        self.locations: Set[str] = {
+            " ".join(name.lower().split())
+            for name in (locations if locations is not None else LOCATION_TIMEZONES)
+        }
+        
+        # Keyword index: content word -> FAQ topics containing it
+        self._topic_words: Dict[str, Set[str]] = {}
+        self._faq_index: Dict[str, Set[str]] = defaultdict(set)
+        for topic in (faq_topics if faq_topics is not None else FAQ_DATABASE):
+            words = set(tokenize(topic))
+            self._topic_words[topic] = words
+            for word in words:
+                self._faq_index[word].add(topic)
+    
+    def match(self, query: str) -> Optional[Route]:
+        """
+        The confident tool call for a query, or None to ask the model.
+        
+        Args:
+            query: The user's message
+        """
+        text = " ".join(query.lower().split()).rstrip(TRAILING)
+        route = self._match_calc(text) or self._match_time(text) or self._match_faq(text)
+        if route is not None and route.confidence < self.min_confidence:
+            route = None
+        with self._stats_lock:
+            self.stats.queries += 1
+            if route is None:
+                self.stats.no_match += 1
+        return route
+    
+    def format(self, route: Route, result: str, query: str = "") -> Optional[str]:
+        """
+        The answer for a routed query from its tool result, or None if the
+        result is an error or a miss and the model should answer instead.
+        
+        Args:
+            route: The route taken
+            result: The tool's result
+            query: The user's message
+        """
+        answer = None
+        if not result.startswith("Error"):
+            fields = {"query": query, "result": result, "first_line": result.split("\n", 1)[0]}
+            try:
+                parsed = json.loads(result)
+            except ValueError:
+                parsed = None
+            if isinstance(parsed, dict):
+                fields.update(parsed)
+            if not (isinstance(parsed, dict) and parsed.get("source_title") in FAQ_MISS_TITLES):
+                try:
+                    answer = self.templates.get(route.tool_name, "{result}").format(**fields)
+                except (KeyError, IndexError):
+                    answer = None
+        with self._stats_lock:
+            if answer is None:
+                self.stats.rejected += 1
+            else:
+                self.stats.routed += 1
+                self.stats.by_tool[route.tool_name] += 1
+        return answer
+    
+    def _match_calc(self, text: str) -> Optional[Route]:
+        argument = self._argument.get("calc")
+        match = CALC_PATTERN.fullmatch(THOUSANDS_PATTERN.sub("", text))
+        if argument is None or match is None:
+            return None
+        expression = match.group("expression")
+        if not EXPRESSION_PATTERN.fullmatch(expression):
+            return None
+        from src.tools.calculator import compile_expression, normalize_expression
+        try:
+            compile_expression(normalize_expression(expression))
+        except Exception:
+            return None
+        return Route("calc", {argument: expression}, 1.0, "arithmetic")
+    
+    def _match_time(self, text: str) -> Optional[Route]:
+        argument = self._argument.get("get_time")
+        match = TIME_PATTERN.fullmatch(text)
+        if argument is None or match is None:
+            return None
+        location = match.group("location").strip()
+        if location not in self.locations:
+            return None
+        return Route("get_time", {argument: location}, 1.0, "time_in_location")
+    
+    def _match_faq(self, text: str) -> Optional[Route]:
+        """The FAQ topic whose words are the query's content words, scored by Jaccard overlap."""
+        argument = self._argument.get("lookup_faq")
+        if argument is None or any(c.isdigit() for c in text):
+            return None
+        words = {w for w in self._tokenize(text) if w not in FAQ_FILLER_WORDS}
+        candidates = {topic for word in words for topic in self._faq_index.get(word, ())}
+        best, best_score = None, 0.0
+        for topic in candidates:
+            topic_words = self._topic_words[topic]
+            score = len(words & topic_words) / len(words | topic_words)
+            if score > best_score:
+                best, best_score = topic, score
+        if best is None:
+            return None
+        # The topic key is the query, so the FAQ search finds exactly that entry
+        return Route("lookup_faq", {argument: best}, best_score, "faq_topic")
+
+
+def _single_argument(json_schema: Dict[str, Any]) -> Optional[str]:
+    """The name of a schema's only required argument, if it has exactly one."""
+    required = json_schema.get("required") or []
+    return required[0] if len(required) == 1 else None
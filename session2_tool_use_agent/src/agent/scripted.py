@@ -0,0 +1,111 @@
+# src/agent/scripted.py
+"""
+Deterministic scripted chat model.
+Stands in for Gemini so the agent loop can run offline: in unit tests, in
+benchmarks that measure the framework's own overhead, and in demos without
+an API key.
+"""
+
+import json
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+
+# Builds the next response from the request's messages
+Responder = Callable[[Sequence[BaseMessage]], AIMessage]
+
+
+def tool_call(name: str, args: Dict[str, Any], call_id: str) -> Dict[str, Any]:
+    """Build a tool call entry for a scripted AIMessage."""
+    return {"name": name, "args": args, "id": call_id, "type": "tool_call"}
+
+
+class ScriptedChatModel:
+    """
+    Minimal stand-in for a tool-bound chat model.
+    Returns the scripted responses in order, or asks a responder for each
+    response once they run out, and records every request.
+    stream/astream split each response into word chunks, with its tool
+    calls as tool call chunks on the last one.
+    """
+    
+    def __init__(
+        self,
+        responses: Sequence[AIMessage] = (),
+        responder: Optional[Responder] = None,
+        record: bool = True,
+    ):
+        """
+        Args:
+            responses: Responses returned in order
+            responder: Called for each request once the responses run out
+            record: Whether to keep every request in `requests`; turn off for
+                    long benchmark runs so the model does not hold every history
+        """
+        self.responses = list(responses)
+        self.responder = responder
+        self.record = record
+        self.requests: List[List[BaseMessage]] = []
+        self.calls = 0
+    
+    def bind_tools(self, tools: Sequence[Any], **kwargs) -> "ScriptedChatModel":
+        return self
+    
+    def invoke(self, messages: Sequence[BaseMessage], **kwargs) -> AIMessage:
+        self.calls += 1
+        if self.record:
+            self.requests.append(list(messages))
+        if self.responses or self.responder is None:
+            return self.responses.pop(0)
+        return self.responder(messages)
+    
+    async def ainvoke(self, messages: Sequence[BaseMessage], **kwargs) -> AIMessage:
+        return self.invoke(messages)
+    
+    def stream(self, messages: Sequence[BaseMessage], **kwargs) -> Iterator[AIMessageChunk]:
+        response = self.invoke(messages)
+        words = response.content.split(" ") if response.content else [""]
+        for i, word in enumerate(words):
+            text = word if i == 0 else " " + word
+            chunk_calls = []
+            if i == len(words) - 1:
+                chunk_calls = [
+                    {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": n}
+                    for n, c in enumerate(response.tool_calls)
+                ]
+            yield AIMessageChunk(content=text, tool_call_chunks=chunk_calls)
+    
+    async def astream(self, messages: Sequence[BaseMessage], **kwargs) -> AsyncIterator[AIMessageChunk]:
+        for chunk in self.stream(messages):
+            yield chunk
+
+
+def tool_turn_responder(
+    calls: Callable[[int], List[Dict[str, Any]]],
+    answer: str = "Done",
+) -> Responder:
+    """
+    Responder for open-ended runs: answers each user message with the tool
+    calls from `calls(turn)` and each round of tool results with `answer`.
+    A turn with no tool calls is answered directly.
+    
+    Args:
+        calls: Returns the (name, args) of the tool calls for turn n, as
+               {"name": ..., "args": ...} dicts; ids are filled in
+        answer: The final answer of every turn
+    """
+    turn = 0
+    
+    def respond(messages: Sequence[BaseMessage]) -> AIMessage:
+        nonlocal turn
+        if messages[-1].type == "tool":
+            return AIMessage(content=answer)
+        turn += 1
+        requested = calls(turn)
+        if not requested:
+            return AIMessage(content=answer)
+        return AIMessage(content="", tool_calls=[
+            tool_call(c["name"], dict(c["args"]), f"call_{turn}_{i}")
+            for i, c in enumerate(requested)
+        ])
+    
+    return respond
@@ -0,0 +1,408 @@
+# src/agent/sessions.py
+"""
+Multi-tenant session manager.
+Serves many concurrent conversations, keyed by session id, from one agent:
+every session shares the agent's model client, tool binding, caches and
+tool thread pool, and only owns its message history and state.
+
+Idle sessions are evicted least recently used first, when they pass their
+TTL, when there are too many, or when the sessions together use more than
+the memory cap. With a spill directory, evicted sessions are saved to disk
+(msgpack, with the state as an AgentState.to_bytes() snapshot) and restored
+transparently on their next turn. Spill files are written and read on a
+worker thread, outside the manager's lock, so one large session does not
+hold up the others.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import ormsgpack
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from src.agent.loop import ToolUsingAgent, _get_background_loop, _run_coroutine_sync
+from src.agent.state import AgentState
+
+# Default maximum number of sessions kept in memory
+SESSION_MAX_COUNT = 1000
+
+# Default idle time after which a session is evicted, in seconds
+SESSION_TTL = 1800.0
+
+# Approximate memory of one message object beyond its text, in bytes
+MESSAGE_OVERHEAD_BYTES = 1024
+
+
+def session_bytes(agent: ToolUsingAgent) -> int:
+    """Approximate memory held by one conversation: its messages, summary and state."""
+    total = 0
+    for message in agent.messages:
+        content = message.content
+        total += MESSAGE_OVERHEAD_BYTES + sys.getsizeof(content if isinstance(content, str) else json.dumps(content, default=str))
+        if getattr(message, "tool_calls", None):
+            total += len(json.dumps(message.tool_calls, default=str))
+    total += sum(sys.getsizeof(line) for line in agent.history.summary_lines)
+    total += len(agent.state.to_bytes())
+    return total
+
+
+@dataclass
+class SessionStats:
+    """Counters of a SessionManager."""
+    created: int = 0
+    restored: int = 0
+    evicted: int = 0
+    expired: int = 0
+    spilled: int = 0
+
+
+@dataclass
+class Session:
+    """One conversation: its agent, turn lock and bookkeeping."""
+    session_id: str
+    agent: ToolUsingAgent
+    lock: asyncio.Lock
+    last_used: float
+    size_bytes: int = 0
+    active: int = 0
+    # Set while its spilled conversation is being loaded; turns wait for it
+    loading: Optional[Future] = None
+    # Set once it is evicted, done when its spill file is written
+    spilling: Optional[Future] = None
+
+
+class SessionManager:
+    """
+    Serves conversations keyed by session id.
+    
+    Turns in the same session run one at a time, in arrival order; turns in
+    different sessions run concurrently. Sessions with a turn in progress are
+    never evicted.
+    """
+    
+    def __init__(
+        self,
+        agent: Optional[ToolUsingAgent] = None,
+        max_sessions: int = SESSION_MAX_COUNT,
+        ttl: Optional[float] = SESSION_TTL,
+        max_memory_bytes: Optional[int] = None,
+        spill_dir: Optional[str] = None,
+    ):
+        """
+        Args:
+            agent: Template whose model, tools and caches every session shares
+                   (default: a new ToolUsingAgent())
+            max_sessions: Most sessions kept in memory
+            ttl: Idle seconds after which a session is evicted (None: never)
+            max_memory_bytes: Cap on the total approximate size of the sessions
+                              in memory (None: no cap)
+            spill_dir: Directory where evicted sessions are saved, to be
+                       restored on their next turn (None: evicted sessions are dropped)
+        """
+        self.agent = agent if agent is not None else ToolUsingAgent()
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_memory_bytes = max_memory_bytes
+        self.spill_dir = spill_dir
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+        self.stats = SessionStats()
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        # Spill files being written, by session id
+        self._spilling: Dict[str, Future] = {}
+    
+    def run(self, session_id: str, user_input: str, verbose: bool = False) -> str:
+        """Run one turn in a session. Blocking wrapper around arun()."""
+        return _run_coroutine_sync(self._arun(session_id, user_input, verbose))
+    
+    async def arun(self, session_id: str, user_input: str, verbose: bool = False) -> str:
+        """
+        Run one turn in a session, creating or restoring the session if needed.
+        
+        Args:
+            session_id: The conversation's id
+            user_input: The user's question/request
+            verbose: Whether to print intermediate steps
+        
+        Returns:
+            The final answer from the agent
+        """
+        # Session locks live on the shared background loop, whichever loop calls in
+        loop = _get_background_loop()
+        if asyncio.get_running_loop() is loop:
+            return await self._arun(session_id, user_input, verbose)
+        future = asyncio.run_coroutine_threadsafe(self._arun(session_id, user_input, verbose), loop)
+        return await asyncio.wrap_future(future)
+    
+    async def _arun(self, session_id: str, user_input: str, verbose: bool) -> str:
+        session, load, spills = self._claim(session_id)
+        try:
+            # Taken right after the claim, so turns keep their arrival order while the session loads
+            async with session.lock:
+                await self._aprepare(session, load, spills)
+                answer = await session.agent.arun(user_input, verbose=verbose)
+        finally:
+            await self._acheckin(session)
+        return answer
+    
+    def get(self, session_id: str) -> ToolUsingAgent:
+        """The agent of a session, created or restored if needed."""
+        session = self._checkout(session_id)
+        self._checkin(session)
+        return session.agent
+    
+    def _checkout(self, session_id: str) -> Session:
+        """Find, restore or create a session and mark it in use. Blocking."""
+        session, load, spills = self._claim(session_id)
+        try:
+            self._write_spills(spills)
+            if load:
+                self._load(session)
+            if session.loading is not None:
+                session.loading.result()
+        except BaseException:
+            self._checkin(session)
+            raise
+        return session
+    
+    async def _aprepare(self, session: Session, load: bool, spills: List[Session]):
+        """Spill the sessions evicted by _claim() and wait until session is loaded, with the file I/O on worker threads."""
+        if spills:
+            await asyncio.to_thread(self._write_spills, spills)
+        if load:
+            await asyncio.to_thread(self._load, session)
+        if session.loading is not None:
+            await asyncio.shield(asyncio.wrap_future(session.loading))
+    
+    def _claim(self, session_id: str) -> Tuple[Session, bool, List[Session]]:
+        """
+        Find or create a session and mark it in use, without any file I/O.
+        A session created while a spill directory is set is marked loading;
+        a concurrent checkout of the same id finds it and waits for the load.
+        
+        Returns:
+            (session, whether the caller must load its spill file, evicted sessions to spill)
+        """
+        now = time.time()
+        spills: List[Session] = []
+        load = False
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None and self._expired(session, now) and not session.active:
+                spills += self._evict(session, expired=True)
+                session = None
+            if session is None:
+                session = Session(session_id, self.agent.spawn(), asyncio.Lock(), now)
+                if self.spill_dir is None:
+                    self.stats.created += 1
+                else:
+                    session.loading = Future()
+                    load = True
+                self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            session.last_used = now
+            session.active += 1
+        return session, load, spills
+    
+    def _checkin(self, session: Session):
+        """Mark a session idle, update its size and enforce the limits. Blocking version of _acheckin()."""
+        self._write_spills(self._release(session))
+    
+    async def _acheckin(self, session: Session):
+        """Mark a session idle, update its size and enforce the limits, spilling on a worker thread."""
+        spills = self._release(session)
+        if spills:
+            await asyncio.to_thread(self._write_spills, spills)
+    
+    def _release(self, session: Session) -> List[Session]:
+        """Mark a session idle and update its size; returns the sessions evicted to stay within the limits."""
+        size = session_bytes(session.agent)
+        with self._lock:
+            session.active -= 1
+            session.last_used = time.time()
+            if self._sessions.get(session.session_id) is session:
+                self._memory_bytes += size - session.size_bytes
+                session.size_bytes = size
+            return self._enforce_limits()
+    
+    def _load(self, session: Session):
+        """Load a new session's spilled conversation, if any, and wake the turns waiting for it. Blocking."""
+        with self._lock:
+            pending = self._spilling.get(session.session_id)
+        try:
+            if pending is not None:
+                # An earlier eviction of this session is still being written
+                pending.result()
+            restored = self._restore(session.session_id, session.agent)
+        except BaseException as e:
+            with self._lock:
+                if self._sessions.get(session.session_id) is session:
+                    del self._sessions[session.session_id]
+            session.loading.set_exception(e)
+            return
+        with self._lock:
+            if restored:
+                self.stats.restored += 1
+            else:
+                self.stats.created += 1
+        session.loading.set_result(None)
+    
+    def _restore(self, session_id: str, agent: ToolUsingAgent) -> bool:
+        """Load a session's saved conversation into agent, if it was spilled. Blocking."""
+        path = self._spill_path(session_id)
+        if path is None or not os.path.exists(path):
+            return False
+        
+        from langchain_core.messages import messages_from_dict
+        with open(path, "rb") as f:
+            data = ormsgpack.unpackb(f.read())
+        os.remove(path)
+        agent.messages = messages_from_dict(data["messages"])
+        agent.state = AgentState.from_bytes(data["state"])
+        agent.history.summary_lines = data["summary_lines"]
+        agent.history.folded_turns = data["folded_turns"]
+        return True
+    
+    def _spill(self, session: Session):
+        """Save a session's conversation to the spill directory. Blocking."""
+        from langchain_core.messages import messages_to_dict
+        agent = session.agent
+        data = {
+            "session_id": session.session_id,
+            "messages": messages_to_dict(agent.messages),
+            "state": agent.state.to_bytes(),
+            "summary_lines": agent.history.summary_lines,
+            "folded_turns": agent.history.folded_turns,
+        }
+        path = self._spill_path(session.session_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(ormsgpack.packb(data))
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.stats.spilled += 1
+    
+    def _write_spills(self, sessions: List[Session]):
+        """Spill evicted sessions and wake any checkout waiting to restore them. Blocking."""
+        error = None
+        for session in sessions:
+            try:
+                self._spill(session)
+            except Exception as e:
+                error = error or e
+            finally:
+                with self._lock:
+                    if self._spilling.get(session.session_id) is session.spilling:
+                        del self._spilling[session.session_id]
+                session.spilling.set_result(None)
+        if error is not None:
+            raise error
+    
+    def _spill_path(self, session_id: str) -> Optional[str]:
+        if self.spill_dir is None:
+            return None
+        digest = hashlib.sha256(session_id.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.spill_dir, f"{digest}.msgpack")
+    
+    def _expired(self, session: Session, now: float) -> bool:
+        return self.ttl is not None and now - session.last_used > self.ttl
+    
+    def _evict(self, session: Session, expired: bool = False) -> List[Session]:
+        """
+        Remove a session from memory. Caller holds the lock.
+        
+        Returns:
+            The session, if it must be spilled (by the caller, after releasing the lock)
+        """
+        del self._sessions[session.session_id]
+        self._memory_bytes -= session.size_bytes
+        if expired:
+            self.stats.expired += 1
+        else:
+            self.stats.evicted += 1
+        if self.spill_dir is None:
+            return []
+        session.spilling = self._spilling[session.session_id] = Future()
+        return [session]
+    
+    def _enforce_limits(self) -> List[Session]:
+        """
+        Evict expired sessions, then idle sessions LRU first until within limits. Caller holds the lock.
+        
+        Returns:
+            The evicted sessions to spill
+        """
+        spills: List[Session] = []
+        now = time.time()
+        for session in list(self._sessions.values()):
+            if not session.active and self._expired(session, now):
+                spills += self._evict(session, expired=True)
+        
+        for session in list(self._sessions.values()):
+            over_count = len(self._sessions) > self.max_sessions
+            over_memory = self.max_memory_bytes is not None and self._memory_bytes > self.max_memory_bytes
+            if not (over_count or over_memory):
+                break
+            if not session.active:
+                spills += self._evict(session)
+        return spills
+    
+    def evict_idle(self) -> int:
+        """
+        Evict expired sessions now (they are otherwise evicted after the next turn).
+        
+        Returns:
+            Number of sessions evicted
+        """
+        with self._lock:
+            before = len(self._sessions)
+            spills = self._enforce_limits()
+            evicted = before - len(self._sessions)
+        self._write_spills(spills)
+        return evicted
+    
+    def close(self, session_id: str, spill: bool = False):
+        """End a session, forgetting it unless spill is set (and a spill directory is configured)."""
+        spills: List[Session] = []
+        with self._lock:
+            pending = self._spilling.get(session_id)
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self._memory_bytes -= session.size_bytes
+                if spill and self.spill_dir is not None:
+                    session.spilling = self._spilling[session_id] = Future()
+                    spills.append(session)
+        if pending is not None:
+            # Let an earlier eviction finish writing, so it does not outlive the close
+            pending.result()
+        self._write_spills(spills)
+        path = self._spill_path(session_id)
+        if not spill and path is not None and os.path.exists(path):
+            os.remove(path)
+    
+    @property
+    def memory_bytes(self) -> int:
+        """Approximate total size of the sessions in memory."""
+        return self._memory_bytes
+    
+    def stats_dict(self) -> Dict[str, Any]:
+        """Counters plus the current session count and memory, e.g. for a metrics endpoint."""
+        return {**asdict(self.stats), "sessions": len(self), "memory_bytes": self.memory_bytes}
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
+    
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+    
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._sessions))
@@ -4,22 +4,38 @@ State management for the agent.
 Tracks memory across conversation turns for follow-up reference resolution.
 """
 
-from typing import List, Dict, Any, Optional
+from collections import deque
+from typing import Deque, Iterable, List, Dict, Any, Optional
 from dataclasses import dataclass, field
 from datetime import datetime
+import copy
+import ormsgpack
 
+# Number of recent user intents kept
+MAX_USER_INTENTS = 3
 
-@dataclass
+# Bump when the to_bytes() layout changes
+SNAPSHOT_VERSION = 1
+
+
+def _intents(values: Iterable[str] = ()) -> Deque[str]:
+    return deque(values, maxlen=MAX_USER_INTENTS)
+
+
+@dataclass(slots=True)
 class AgentState:
     """
     Agent state that stores:
     - Last 3 user goals (or intents)
     - Last tool result
     - Last used location (if relevant)
+    
+    Slotted to keep parked sessions small. Tool arguments are stored as a
+    deep copy, so later changes to the caller's dict do not leak in.
     """
     
-    # Last 3 user intents/goals
-    user_intents: List[str] = field(default_factory=list)
+    # Last 3 user intents/goals, oldest first
+    user_intents: Deque[str] = field(default_factory=_intents)
     
     # Last tool that was called and its result
     last_tool_name: Optional[str] = None
@@ -32,6 +48,10 @@ class AgentState:
     # Timestamp of last interaction
     last_updated: Optional[datetime] = None
     
+    def __post_init__(self):
+        if not isinstance(self.user_intents, deque) or self.user_intents.maxlen != MAX_USER_INTENTS:
+            self.user_intents = _intents(self.user_intents)
+    
     def add_user_intent(self, intent: str):
         """
         Add a user intent and keep only the last 3.
@@ -39,10 +59,8 @@ class AgentState:
         Args:
             intent: The user's question/request
         """
+        # The deque drops the oldest intent past MAX_USER_INTENTS
         self.user_intents.append(intent)
-        # Keep only last 3
-        if len(self.user_intents) > 3:
-            self.user_intents = self.user_intents[-3:]
         self.last_updated = datetime.now()
     
     def update_tool_result(self, tool_name: str, tool_args: Dict[str, Any], result: str):
@@ -55,7 +73,7 @@ class AgentState:
             result: Result returned by the tool
         """
         self.last_tool_name = tool_name
-        self.last_tool_args = tool_args
+        self.last_tool_args = copy.deepcopy(tool_args)
         self.last_tool_result = result
         
         # Extract location if it was a get_time call
@@ -86,9 +104,60 @@ class AgentState:
         
         return " | ".join(summary_parts) if summary_parts else "No context yet"
     
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-compatible copy of the state, for saving a session."""
+        return {
+            "user_intents": list(self.user_intents),
+            "last_tool_name": self.last_tool_name,
+            "last_tool_result": self.last_tool_result,
+            "last_tool_args": copy.deepcopy(self.last_tool_args),
+            "last_location": self.last_location,
+            "last_updated": self.last_updated.isoformat() if self.last_updated else None,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AgentState":
+        """Rebuild a state saved with to_dict()."""
+        last_updated = data.get("last_updated")
+        return cls(
+            user_intents=_intents(data.get("user_intents", ())),
+            last_tool_name=data.get("last_tool_name"),
+            last_tool_result=data.get("last_tool_result"),
+            last_tool_args=data.get("last_tool_args"),
+            last_location=data.get("last_location"),
+            last_updated=datetime.fromisoformat(last_updated) if last_updated else None,
+        )
+    
+    def to_bytes(self) -> bytes:
+        """Compact binary snapshot of the state (msgpack), for paging sessions out."""
+        return ormsgpack.packb([
+            SNAPSHOT_VERSION,
+            list(self.user_intents),
+            self.last_tool_name,
+            self.last_tool_result,
+            self.last_tool_args,
+            self.last_location,
+            self.last_updated.isoformat() if self.last_updated else None,
+        ])
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "AgentState":
+        """Rebuild a state from a to_bytes() snapshot."""
+        version, intents, tool_name, tool_result, tool_args, location, updated = ormsgpack.unpackb(data)
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported AgentState snapshot version: {version}")
+        return cls(
+            user_intents=_intents(intents),
+            last_tool_name=tool_name,
+            last_tool_result=tool_result,
+            last_tool_args=tool_args,
+            last_location=location,
+            last_updated=datetime.fromisoformat(updated) if updated else None,
+        )
+    
     def reset(self):
         """Clear all state."""
-        self.user_intents = []
+        self.user_intents = _intents()
         self.last_tool_name = None
         self.last_tool_result = None
         self.last_tool_args = None
@@ -101,7 +170,7 @@ def display_state(state: AgentState):
     print("\n" + "=" * 60)
     print("CURRENT AGENT STATE (Memory)")
     print("=" * 60)
-    print(f"Last 3 User Intents: {state.user_intents}")
+    print(f"Last 3 User Intents: {list(state.user_intents)}")
     print(f"Last Tool: {state.last_tool_name}")
     print(f"Last Tool Args: {state.last_tool_args}")
     print(f"Last Tool Result: {state.last_tool_result[:80] + '...' if state.last_tool_result and len(state.last_tool_result) > 80 else state.last_tool_result}")
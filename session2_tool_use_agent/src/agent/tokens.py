@@ -0,0 +1,104 @@
+# src/agent/tokens.py
+"""
+Token counting for chat messages.
+Uses tiktoken when its encoding is available and falls back to a
+characters-per-token estimate otherwise (e.g. offline, where tiktoken
+cannot download its encoding files).
+"""
+
+import json
+import threading
+from typing import Any, Callable, List, Optional, Sequence
+
+# tiktoken encoding used for counting. Gemini's tokenizer is not public,
+# so this is an approximation that is close enough for budgeting.
+TOKEN_ENCODING = "cl100k_base"
+
+# Fallback estimate when tiktoken cannot be used
+CHARS_PER_TOKEN = 4
+
+# Fixed cost of one message (role and separators), as in OpenAI's chat format
+TOKENS_PER_MESSAGE = 4
+
+
+class TokenCounter:
+    """Counts tokens of text and messages; the encoding is loaded on first use."""
+    
+    def __init__(self, encoding_name: str = TOKEN_ENCODING):
+        self.encoding_name = encoding_name
+        self._encoding: Any = None
+        self._loaded = False
+        self._lock = threading.Lock()
+    
+    @property
+    def encoding(self) -> Optional[Any]:
+        """The tiktoken encoding, or None if tiktoken cannot be used."""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    try:
+                        import tiktoken
+                        self._encoding = tiktoken.get_encoding(self.encoding_name)
+                    except Exception:
+                        self._encoding = None
+                    self._loaded = True
+        return self._encoding
+    
+    def count_text(self, text: str) -> int:
+        """Number of tokens in a text."""
+        if not text:
+            return 0
+        encoding = self.encoding
+        if encoding is None:
+            return -(-len(text) // CHARS_PER_TOKEN)
+        return len(encoding.encode(text, disallowed_special=()))
+    
+    def count_message(self, message: Any) -> int:
+        """Number of tokens a message adds to a request, including tool calls."""
+        content = message.content
+        if not isinstance(content, str):
+            content = json.dumps(content, default=str)
+        tokens = TOKENS_PER_MESSAGE + self.count_text(content)
+        for call in getattr(message, "tool_calls", None) or []:
+            tokens += self.count_text(call["name"]) + self.count_text(json.dumps(call["args"], default=str))
+        return tokens
+
+
+# Shared counter, so the encoding is loaded once per process
+DEFAULT_COUNTER = TokenCounter()
+
+
+class PrefixCounts:
+    """
+    Per-message values (e.g. token counts) of a message list that grows at
+    the end, each computed once.
+    The messages seen are kept and matched by identity: holding them means
+    their ids cannot be reused by new messages while they are cached.
+    """
+    
+    def __init__(self, measure: Callable[[Any], Any]):
+        """
+        Args:
+            measure: Computes the value of one message
+        """
+        self.measure = measure
+        self.messages: List[Any] = []
+        self.values: List[Any] = []
+    
+    def update(self, messages: Sequence[Any]) -> List[Any]:
+        """
+        Values of messages, aligned by position; only messages after the
+        longest cached prefix are measured (all of them if the prefix differs).
+        """
+        seen = self.messages
+        if len(seen) > len(messages) or any(seen[i] is not messages[i] for i in range(len(seen))):
+            self.reset()
+        for message in messages[len(self.messages):]:
+            self.messages.append(message)
+            self.values.append(self.measure(message))
+        return self.values
+    
+    def reset(self):
+        """Forget the cached messages and values."""
+        self.messages = []
+        self.values = []
@@ -0,0 +1,143 @@
+# src/agent/tracing.py
+"""
+OpenTelemetry tracing of the agent loop.
+Spans cover the whole turn, each model call, reference resolution and each
+tool execution. Tracing is off by default: span() then returns a shared
+no-op span and OpenTelemetry is not even imported.
+
+Enable it with enable_tracing() to export through the global tracer provider
+(e.g. the OTLP setup in notebooks/lab5.ipynb), or with enable_local_tracing()
+to keep spans in memory, and optionally print them, without a collector.
+"""
+
+import statistics
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+# Instrumentation scope name of the agent's spans
+TRACER_NAME = "src.agent"
+
+
+class _NoopSpan:
+    """Stands in for a span, and for its context manager, when tracing is off."""
+    
+    def __enter__(self) -> "_NoopSpan":
+        return self
+    
+    def __exit__(self, *exc_info) -> bool:
+        return False
+    
+    def set_attribute(self, key: str, value: Any):
+        pass
+    
+    def set_attributes(self, attributes: Mapping[str, Any]):
+        pass
+    
+    def is_recording(self) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+# Tracer used by span(); None while tracing is disabled
+_tracer: Any = None
+
+
+def span(name: str, attributes: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Context manager for a span that is current while it is open.
+    
+    Compute costly attributes only when `span.is_recording()`; with tracing
+    disabled this returns a no-op span.
+    
+    Args:
+        name: Span name (e.g. "agent.tool")
+        attributes: Attributes known when the span starts
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NOOP_SPAN
+    return tracer.start_as_current_span(name, attributes=attributes)
+
+
+def tracing_enabled() -> bool:
+    return _tracer is not None
+
+
+def enable_tracing(tracer_provider: Any = None):
+    """
+    Record agent spans through a tracer provider.
+    
+    Args:
+        tracer_provider: Provider to use (default: the global one set with
+                         opentelemetry.trace.set_tracer_provider)
+    """
+    global _tracer
+    from opentelemetry import trace
+    provider = tracer_provider or trace.get_tracer_provider()
+    _tracer = provider.get_tracer(TRACER_NAME)
+
+
+def enable_local_tracing(console: bool = False) -> Any:
+    """
+    Record agent spans in memory, for profiling without a collector.
+    Uses its own tracer provider, so a global provider is left untouched.
+    
+    Args:
+        console: Also print every finished span to stdout
+    
+    Returns:
+        The InMemorySpanExporter; call get_finished_spans() on it, or pass
+        the spans to latency_report()
+    """
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter, SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+    
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    if console:
+        provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter()))
+    enable_tracing(provider)
+    return exporter
+
+
+def disable_tracing():
+    """Stop recording spans; span() goes back to the no-op span."""
+    global _tracer
+    _tracer = None
+
+
+def latency_report(spans: Sequence[Any]) -> Dict[str, Dict[str, float]]:
+    """
+    Latency per span name from finished spans.
+    
+    Returns:
+        {name: {"count", "total_ms", "mean_ms", "p95_ms", "max_ms"}}, slowest total first
+    """
+    durations: Dict[str, List[float]] = {}
+    for finished in spans:
+        if finished.end_time is None:
+            continue
+        durations.setdefault(finished.name, []).append((finished.end_time - finished.start_time) / 1e6)
+    report = {}
+    for name, values in sorted(durations.items(), key=lambda item: -sum(item[1])):
+        values.sort()
+        report[name] = {
+            "count": len(values),
+            "total_ms": sum(values),
+            "mean_ms": statistics.fmean(values),
+            "p95_ms": values[max(int(len(values) * 0.95) - 1, 0)],
+            "max_ms": values[-1],
+        }
+    return report
+
+
+def print_latency_report(spans: Sequence[Any]):
+    """Print latency_report() as a table."""
+    print(f"{'span':<24} {'count':>6} {'total ms':>10} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for name, row in latency_report(spans).items():
+        print(
+            f"{name:<24} {row['count']:>6} {row['total_ms']:>10.2f} "
+            f"{row['mean_ms']:>9.3f} {row['p95_ms']:>9.3f} {row['max_ms']:>9.3f}"
+        )
@@ -1,16 +1,62 @@
-from .execution import *
-from .schemas import *
-
-__all__ = [
-    "execute_get_time",
-    "execute_calc",
-    "execute_lookup_faq",
-    "GetTimeInput",
-    "CalcInput",
-    "LookupFaqInput",
-    "get_time",
-    "calc",
-    "lookup_faq",
-    "TOOLS",
-    "display_tool_schemas",
-]
\ No newline at end of file
+"""
+Tools for the agent.
+Submodules are imported on first attribute access, so importing the package
+(or one submodule) does not load the whole tool stack.
+"""
+
+import importlib
+from typing import Any
+
+# Where each public name lives
+_EXPORTS = {
+    "execute_get_time": "execution",
+    "execute_calc": "execution",
+    "execute_calc_batch": "execution",
+    "set_calc_sandbox": "execution",
+    "get_calc_sandbox": "execution",
+    "CalcSandbox": "sandbox",
+    "execute_lookup_faq": "execution",
+    "search_faq": "execution",
+    "set_faq_store": "execution",
+    "get_faq_store": "execution",
+    "build_faq_store": "execution",
+    "GetTimeInput": "schemas",
+    "CalcInput": "schemas",
+    "CalcBatchInput": "schemas",
+    "LookupFaqInput": "schemas",
+    "get_time": "schemas",
+    "calc": "schemas",
+    "calc_batch": "schemas",
+    "lookup_faq": "schemas",
+    "TOOLS": "schemas",
+    "REGISTRY": "schemas",
+    "ToolRegistry": "registry",
+    "RegisteredTool": "registry",
+    "display_tool_schemas": "schemas",
+}
+
+# Searched, in this order, for other public names of these modules
+_STAR_MODULES = ("registry", "schemas", "execution")
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f"{__name__}.{_EXPORTS[name]}"), name)
+    elif not name.startswith("_"):
+        for module_name in _STAR_MODULES:
+            module = importlib.import_module(f"{__name__}.{module_name}")
+            if hasattr(module, name):
+                value = getattr(module, name)
+                break
+        else:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
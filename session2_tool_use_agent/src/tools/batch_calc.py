@@ -0,0 +1,217 @@
+"""
+Vectorized batch evaluation for the calc_batch tool.
+Groups expressions by shape (the expression with its numbers taken out),
+parses each shape once and evaluates every group as NumPy array operations.
+Results and error messages match execute_calc element by element.
+"""
+
+import ast
+import re
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+from src.tools.calculator import PERCENTAGE_PATTERN, normalize_expression
+from src.tools.execution import execute_calc
+
+# Number literals as Python tokenizes them from the allowed characters
+NUMBER_PATTERN = re.compile(r'(\d+(?:\.\d*)?|\.\d+)')
+
+# Integer literals with leading zeros ("01"), which Python rejects
+LEADING_ZERO_PATTERN = re.compile(r'(?<![\d.])0\d+(?![\d.])')
+
+# Expressions made only of the calculator's ALLOWED_CHARS
+ALLOWED_PATTERN = re.compile(r'[0-9+\-*/()%. ]*')
+
+# Largest magnitude at which float64 still holds every integer exactly
+EXACT_INT_LIMIT = 2.0 ** 53
+
+# Group key for "X% of Y" expressions
+PERCENTAGE_SHAPE = "%"
+
+# A compiled shape: takes the number columns, returns (values, is_int, fallback mask)
+ShapeEvaluator = Callable[[List[np.ndarray]], Tuple[np.ndarray, bool, np.ndarray]]
+
+
+def evaluate_batch(expressions: List[str]) -> List[str]:
+    """
+    Calculate many expressions at once.
+    Each result is the string execute_calc would return for that expression.
+    
+    Args:
+        expressions: The expressions to calculate
+    
+    Returns:
+        One result string per expression, in the same order
+    """
+    results: List[str] = [""] * len(expressions)
+    groups: Dict[str, List[Tuple[int, List[str]]]] = {}
+    
+    for i, expression in enumerate(expressions):
+        shape, numbers = _shape_of(expression)
+        if shape is None:
+            # Errors and unusual literals take the scalar path for exact messages
+            results[i] = execute_calc(expression)
+        else:
+            groups.setdefault(shape, []).append((i, numbers))
+    
+    for shape, members in groups.items():
+        if shape == PERCENTAGE_SHAPE:
+            _evaluate_percentages(expressions, members, results)
+        else:
+            _evaluate_arithmetic(shape, expressions, members, results)
+    
+    return results
+
+
+def _shape_of(expression: str):
+    """
+    Split an expression into its shape and its number literals.
+    
+    Returns:
+        (shape, numbers), or (None, None) if the expression should be
+        evaluated on its own by execute_calc
+    """
+    if not expression or expression.strip() == "":
+        return None, None
+    
+    normalized = normalize_expression(expression)
+    match = "%" in normalized and PERCENTAGE_PATTERN.search(normalized)
+    if match:
+        return PERCENTAGE_SHAPE, [match.group(1), match.group(2)]
+    
+    if not ALLOWED_PATTERN.fullmatch(normalized) or LEADING_ZERO_PATTERN.search(normalized):
+        return None, None
+    
+    # Splitting on the capturing pattern alternates text and number literals
+    parts = NUMBER_PATTERN.split(normalized)
+    numbers = parts[1::2]
+    shape_parts = parts[:]
+    for k in range(1, len(parts), 2):
+        number = parts[k]
+        if len(number) >= 16 and float(number) >= EXACT_INT_LIMIT:
+            # Too large for float64 to hold exactly
+            return None, None
+        shape_parts[k] = "f" if "." in number else "i"
+    
+    shape = "".join(shape_parts)
+    return shape, numbers
+
+
+def _evaluate_percentages(expressions: List[str], members, results: List[str]):
+    """Evaluate a group of "X% of Y" expressions."""
+    percentage = np.array([float(numbers[0]) for _, numbers in members])
+    number = np.array([float(numbers[1]) for _, numbers in members])
+    fraction = percentage / 100
+    result = fraction * number
+    
+    rows = zip(members, percentage.tolist(), number.tolist(), fraction.tolist(), result.tolist())
+    for (i, _), p, n, f, r in rows:
+        results[i] = f"Calculation: {p}% of {n} = {r:,.2f}\n\nSteps:\n1. Convert {p}% to decimal: {p}/100 = {f}\n2. Multiply: {f} × {n} = {r:,.2f}"
+
+
+def _evaluate_arithmetic(shape: str, expressions: List[str], members, results: List[str]):
+    """Evaluate a group of arithmetic expressions that share one shape."""
+    try:
+        evaluate = _compile_shape(shape)
+    except (SyntaxError, ValueError, RecursionError):
+        evaluate = None
+    
+    if evaluate is None:
+        # Syntax errors, unmatched brackets, or shapes kept scalar (e.g. powers)
+        for i, _ in members:
+            results[i] = execute_calc(expressions[i])
+        return
+    
+    columns = [
+        np.array([float(numbers[k]) for _, numbers in members])
+        for k in range(len(members[0][1]))
+    ]
+    with np.errstate(all="ignore"):
+        values, is_int, fallback = evaluate(columns)
+    fallback = fallback | ~np.isfinite(values)
+    
+    for (i, _), value, use_scalar in zip(members, values.tolist(), fallback.tolist()):
+        if use_scalar:
+            # Division by zero, overflow or precision loss: let execute_calc report it
+            results[i] = execute_calc(expressions[i])
+        else:
+            result = int(value) if is_int else value
+            results[i] = f"Calculation: {expressions[i]} = {result}"
+
+
+def _compile_shape(shape: str) -> ShapeEvaluator:
+    """
+    Compile a shape like "i + i * f" into a vectorized evaluator.
+    Returns None for shapes that are valid but evaluated element by element.
+    """
+    if shape.count('(') != shape.count(')'):
+        raise ValueError("Unmatched parentheses")
+    
+    counter = iter(range(len(shape)))
+    template = re.sub(r'[if]', lambda m: f"{m.group()}{next(counter)}", shape)
+    return _compile_vector_node(ast.parse(template, mode="eval").body)
+
+
+def _compile_vector_node(node: ast.AST):
+    """Compile one node of a shape template into a column function."""
+    if isinstance(node, ast.Name):
+        index = int(node.id[1:])
+        is_int = node.id[0] == "i"
+        
+        def column(columns):
+            values = columns[index]
+            return values, is_int, np.zeros(values.shape, dtype=bool)
+        return column
+    
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        operand = _compile_vector_node(node.operand)
+        if operand is None:
+            return None
+        negate = isinstance(node.op, ast.USub)
+        
+        def unary(columns):
+            values, is_int, fallback = operand(columns)
+            if negate:
+                # Python ints have no negative zero; adding 0.0 turns -0.0 into 0.0
+                values = -values + 0.0 if is_int else -values
+            return values, is_int, fallback
+        return unary
+    
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod)):
+        left = _compile_vector_node(node.left)
+        right = _compile_vector_node(node.right)
+        if left is None or right is None:
+            return None
+        op = node.op
+        
+        def binary(columns):
+            a, a_int, a_fallback = left(columns)
+            b, b_int, b_fallback = right(columns)
+            fallback = a_fallback | b_fallback
+            is_int = a_int and b_int
+            if isinstance(op, ast.Add):
+                values = a + b
+            elif isinstance(op, ast.Sub):
+                values = a - b
+            elif isinstance(op, ast.Mult):
+                values = a * b
+            else:
+                fallback = fallback | (b == 0)
+                if isinstance(op, ast.Div):
+                    values = a / b
+                    is_int = False
+                elif isinstance(op, ast.FloorDiv):
+                    values = np.floor_divide(a, b)
+                else:
+                    values = np.mod(a, b)
+            if is_int:
+                # Integer results must stay exact and unsigned at zero, as in Python
+                values = values + 0.0
+                fallback = fallback | (np.abs(values) >= EXACT_INT_LIMIT)
+            return values, is_int, fallback
+        return binary
+    
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow):
+        # Result type and size depend on each element's values; keep powers scalar
+        return None
+    
+    raise SyntaxError(f"Unsupported expression element: {type(node).__name__}")
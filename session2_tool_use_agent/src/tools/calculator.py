@@ -0,0 +1,112 @@
+"""
+Compiled expression evaluator for the calc tool.
+Parses each expression once with a whitelisted AST walk, compiles it into
+small closures and keeps the result in a bounded LRU cache.
+"""
+
+import ast
+import operator
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Union
+
+Number = Union[int, float]
+
+# Maximum number of compiled expressions kept in the cache
+CALC_CACHE_SIZE = 1024
+
+# Security: only allow safe mathematical operations
+ALLOWED_CHARS = frozenset('0123456789+-*/()%. ')
+
+# Percentage expressions like "18% of 24500"
+PERCENTAGE_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*%\s*of\s*(\d+(?:\.\d+)?)')
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+class InvalidCharactersError(Exception):
+    """The expression contains characters outside ALLOWED_CHARS."""
+
+
+class UnmatchedParenthesesError(Exception):
+    """The expression has more opening than closing brackets, or vice versa."""
+
+
+@dataclass(frozen=True)
+class Percentage:
+    """A compiled "X% of Y" expression."""
+    percentage: float
+    number: float
+
+
+CompiledExpression = Union[Percentage, Callable[[], Number]]
+
+
+def normalize_expression(expression: str) -> str:
+    """Normalize an expression for caching: lower case, single spaces."""
+    return " ".join(expression.lower().split())
+
+
+@lru_cache(maxsize=CALC_CACHE_SIZE)
+def compile_expression(normalized: str) -> CompiledExpression:
+    """
+    Compile a normalized expression.
+    
+    Args:
+        normalized: Output of normalize_expression()
+    
+    Returns:
+        A Percentage for "X% of Y" expressions, otherwise a zero-argument
+        function that evaluates the arithmetic expression
+    
+    Raises:
+        InvalidCharactersError: For characters other than numbers and operators
+        UnmatchedParenthesesError: When brackets do not pair up
+        SyntaxError: When the expression is not valid arithmetic
+    """
+    match = PERCENTAGE_PATTERN.search(normalized)
+    if match:
+        return Percentage(float(match.group(1)), float(match.group(2)))
+    
+    if not all(c in ALLOWED_CHARS for c in normalized):
+        raise InvalidCharactersError(normalized)
+    
+    if normalized.count('(') != normalized.count(')'):
+        raise UnmatchedParenthesesError(normalized)
+    
+    tree = ast.parse(normalized, mode="eval")
+    return _compile_node(tree.body)
+
+
+def _compile_node(node: ast.AST) -> Callable[[], Number]:
+    """Compile one whitelisted AST node into a closure."""
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = node.value
+        return lambda: value
+    
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+        op = BINARY_OPERATORS[type(node.op)]
+        left = _compile_node(node.left)
+        right = _compile_node(node.right)
+        return lambda: op(left(), right())
+    
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+        op = UNARY_OPERATORS[type(node.op)]
+        operand = _compile_node(node.operand)
+        return lambda: op(operand())
+    
+    raise SyntaxError(f"Unsupported expression element: {type(node).__name__}")
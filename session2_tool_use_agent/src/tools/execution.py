@@ -4,10 +4,17 @@ Each function handles the actual business logic, error handling and returns clea
 """
 
 from datetime import datetime
-from zoneinfo import ZoneInfo
 import json
-import re
-from typing import Dict, Any
+import os
+from typing import Dict, Any, List
+from src.tools.calculator import (
+    InvalidCharactersError,
+    Percentage,
+    UnmatchedParenthesesError,
+    compile_expression,
+    normalize_expression,
+)
+from src.tools.gazetteer import get_gazetteer, get_zone
 
 # Hardcoded mapping of city names to timezone identifiers
 LOCATION_TIMEZONES = {
@@ -25,60 +32,109 @@ def execute_get_time(location: str) -> str:
     """
     Get the current time for a specific location.
     Supports at least 3 locations with hardcoded timezone mappings.
+    Other cities, countries, aliases ("NYC") and IANA zones are resolved by the
+    shared gazetteer, which also corrects misspellings (see src/tools/gazetteer.py).
     """
     try:
         " Normalize location input"
         location_key = location.lower().strip()
-
-        if location_key not in LOCATION_TIMEZONES:
-            available = ", ".join(sorted(set(LOCATION_TIMEZONES.keys())))
-            return f"Error: Location '{location}' not supported. Available locations: {available}."
+        
+        if location_key in LOCATION_TIMEZONES:
+            timezone = LOCATION_TIMEZONES[location_key]
+            display_name = location.title()
+        else:
+            match = get_gazetteer().resolve(location)
+            if match is None:
+                available = ", ".join(sorted(set(LOCATION_TIMEZONES.keys())))
+                return f"Error: Location '{location}' not supported. Available locations: {available}, or any major city, country or IANA time zone (e.g. 'Europe/Paris')."
+            timezone = match.place.timezone
+            display_name = match.place.name
         
         # Get timezone and current time
-        tz = ZoneInfo(LOCATION_TIMEZONES[location_key])
+        tz = get_zone(timezone)
         current_time = datetime.now(tz)
-        return f"The current time in {location.title()} is {current_time.strftime('%I:%M %p %Z')} on {current_time.strftime('%A, %B %d, %Y')}"
+        return f"The current time in {display_name} is {current_time.strftime('%I:%M %p %Z')} on {current_time.strftime('%A, %B %d, %Y')}"
     
     except Exception as e:
         return f"Error retrieving time for {location}: {str(e)}"
-    
+
+# Where calc evaluates expressions: "risky" sends powers and very long
+# expressions to the process-pool sandbox and evaluates the rest inline,
+# "all" sends everything, "off" evaluates everything inline
+CALC_SANDBOX_MODE = os.getenv("CALC_SANDBOX", "risky")
+
+# Longest expression without powers that "risky" mode evaluates inline
+CALC_INLINE_MAX_CHARS = 200
+
+# Shared calc sandbox, started on first use
+_calc_sandbox = None
+
+def set_calc_sandbox(sandbox):
+    """
+    Use a different CalcSandbox (e.g. with other limits) for calc, or None
+    to go back to the default one.
+    """
+    global _calc_sandbox
+    _calc_sandbox = sandbox
+
+def get_calc_sandbox():
+    """The shared CalcSandbox, created with default limits on first use."""
+    global _calc_sandbox
+    if _calc_sandbox is None:
+        from src.tools.sandbox import CalcSandbox
+        _calc_sandbox = CalcSandbox()
+    return _calc_sandbox
+
+def needs_sandbox(expression: str) -> bool:
+    """
+    Whether an expression could run long. Without powers, the cost of
+    arithmetic grows with the length of the expression only.
+    """
+    return "**" in expression or len(expression) > CALC_INLINE_MAX_CHARS
+
 def execute_calc(expression: str) -> str:
     """
     Calculate mathematical expressions.
     Handles invalid expressions with clean error messages.
+    Powers and very long expressions are evaluated in a sandboxed worker
+    process with time, CPU and memory limits (see src/tools/sandbox.py),
+    so they cannot stall the agent; everything else is evaluated inline.
+    """
+    if expression and (CALC_SANDBOX_MODE == "all" or (CALC_SANDBOX_MODE == "risky" and needs_sandbox(expression))):
+        return get_calc_sandbox().evaluate(expression)
+    return evaluate_calc(expression)
+
+def evaluate_calc(expression: str) -> str:
+    """
+    Calculate a mathematical expression in this process (execute_calc without the sandbox).
+    Handles invalid expressions with clean error messages.
     Enhanced error handling.
+    Expressions are compiled once and cached (see src/tools/calculator.py).
     """
     try:
         # Handle empty or whitespace-only input
         if not expression or expression.strip() == "":
             return "Error: Empty expression provided. Please provide a mathematical expression to calculate."
         
-        # Handle percentage expressions like "18% of 24500"
-        percentage_pattern = r'(\d+(?:\.\d+)?)\s*%\s*of\s*(\d+(?:\.\d+)?)'
-        match = re.search(percentage_pattern, expression.lower())
+        compiled = compile_expression(normalize_expression(expression))
         
-        if match:
-            percentage = float(match.group(1))
-            number = float(match.group(2))
+        # Handle percentage expressions like "18% of 24500"
+        if isinstance(compiled, Percentage):
+            percentage = compiled.percentage
+            number = compiled.number
             result = (percentage / 100) * number
             
             return f"Calculation: {percentage}% of {number} = {result:,.2f}\n\nSteps:\n1. Convert {percentage}% to decimal: {percentage}/100 = {percentage/100}\n2. Multiply: {percentage/100} × {number} = {result:,.2f}"
         
-        # For simple arithmetic expressions
-        # Security: only allow safe mathematical operations
-        allowed_chars = set('0123456789+-*/()%. ')
-        if not all(c in allowed_chars for c in expression):
-            return f"Error: Invalid characters in expression. Only numbers and operators (+, -, *, /, %) are allowed.\n\nYou provided: '{expression}'\nTry something like: '2 + 2' or '10 * 5'"
-        
-        # Check for common syntax issues
-        if expression.count('(') != expression.count(')'):
-            return "Error: Unmatched parentheses in expression. Please check your brackets."
-        
         # Evaluate the expression
-        result = eval(expression, {"__builtins__": {}}, {})
+        result = compiled()
         
         return f"Calculation: {expression} = {result}"
     
+    except InvalidCharactersError:
+        return f"Error: Invalid characters in expression. Only numbers and operators (+, -, *, /, %) are allowed.\n\nYou provided: '{expression}'\nTry something like: '2 + 2' or '10 * 5'"
+    except UnmatchedParenthesesError:
+        return "Error: Unmatched parentheses in expression. Please check your brackets."
     except ZeroDivisionError:
         return f"Error: Division by zero is not allowed.\n\nYou tried to calculate: '{expression}'\nDivision by zero is mathematically undefined. Please use a non-zero divisor."
     except SyntaxError:
@@ -88,6 +144,21 @@ def execute_calc(expression: str) -> str:
     except Exception as e:
         return f"Error calculating '{expression}': {str(e)}\n\nPlease check the expression format and try again."
 
+def execute_calc_batch(expressions: List[str]) -> List[str]:
+    """
+    Calculate many mathematical expressions in one call.
+    Expressions with the same shape (e.g. "18% of X" over a column) are
+    evaluated together as NumPy array operations.
+    Each element gets the same result or error message execute_calc would give.
+    """
+    from src.tools.batch_calc import evaluate_batch
+    
+    try:
+        return evaluate_batch(expressions)
+    except Exception:
+        # Fall back to one-by-one evaluation so every element still gets an answer
+        return [execute_calc(expression) for expression in expressions]
+
 
 # Mock FAQ Knowledge Base
 FAQ_DATABASE = {
@@ -113,22 +184,111 @@ FAQ_DATABASE = {
     }
 }
 
+# Other ways customers ask about each FAQ topic.
+# Only used to embed entries for semantic search; never returned to the user.
+FAQ_PHRASINGS = {
+    "refund policy": [
+        "Can I get my money back?",
+        "How do I return an item?",
+        "I want a refund for my order",
+        "Can I send a product back?",
+    ],
+    "shipping": [
+        "How long does delivery take?",
+        "When will my order arrive?",
+        "How much does delivery cost?",
+        "Do you charge for postage?",
+    ],
+    "business hours": [
+        "When are you open?",
+        "What are your opening hours?",
+        "How can I reach customer service?",
+        "What time does support close?",
+    ],
+    "payment methods": [
+        "What cards do you accept?",
+        "Can I pay with a credit card?",
+        "Which ways can I pay?",
+        "Do you take debit cards?",
+    ],
+    "warranty": [
+        "Is my product guaranteed?",
+        "What if my item is defective?",
+        "How long is the guarantee?",
+        "My product broke, is it covered?",
+    ],
+}
+
+# Most topics listed in the fallback suggestion
+MAX_SUGGESTED_TOPICS = 10
+
+# How the default FAQ store searches: "keyword" (BM25) or "semantic" (embeddings)
+FAQ_SEARCH_MODE = os.getenv("FAQ_SEARCH_MODE", "keyword")
+
+# Active FAQ store; built from FAQ_DATABASE on first lookup unless one is set
+_faq_store = None
+
+def set_faq_store(store):
+    """
+    Use a different FAQ store for lookups, e.g. a SqliteFaqStore for a large
+    knowledge base. Pass None to go back to the default in-memory store.
+    """
+    global _faq_store
+    _faq_store = store
+    
+    # Memoized lookup_faq answers came from the previous store
+    from src.tools.memo import TOOL_MEMO
+    TOOL_MEMO.invalidate("lookup_faq")
+
+def build_faq_store(mode: str = "keyword"):
+    """
+    Build an FAQ store over FAQ_DATABASE.
+    
+    Args:
+        mode: "keyword" for BM25 ranking, or "semantic" for embedding search
+              that also matches paraphrases (see FAQ_PHRASINGS)
+    """
+    if mode == "semantic":
+        from src.tools.semantic_faq import SemanticFaqStore
+        return SemanticFaqStore.from_faqs(FAQ_DATABASE, FAQ_PHRASINGS)
+    if mode == "keyword":
+        from src.tools.faq_store import InMemoryFaqStore
+        return InMemoryFaqStore(FAQ_DATABASE)
+    raise ValueError(f"Unknown FAQ search mode '{mode}'. Use 'keyword' or 'semantic'.")
+
+def get_faq_store():
+    """Get the active FAQ store, building the default one if needed."""
+    global _faq_store
+    if _faq_store is None:
+        _faq_store = build_faq_store(FAQ_SEARCH_MODE)
+    return _faq_store
+
+def search_faq(query: str, k: int = 5) -> List[Dict[str, Any]]:
+    """
+    Get the top-k FAQ entries for a query, best first.
+    Each entry has 'topic', 'answer', 'source_title' and the store's relevance 'score'.
+    """
+    return [
+        {"topic": hit.topic, **hit.to_dict(), "score": hit.score}
+        for hit in get_faq_store().search(query, k=k)
+    ]
+
 def execute_lookup_faq(query: str) -> str:
     """
     Look up FAQ from mocked knowledge base.
+    Returns the best BM25-ranked entry from the active FAQ store.
     Returns fallback message when no match exists.
     """
     try:
-        # Normalize query
-        query_lower = query.lower().strip()
+        store = get_faq_store()
         
-        # Search for matching FAQ
-        for key, value in FAQ_DATABASE.items():
-            if key in query_lower or query_lower in key:
-                return json.dumps(value, indent=2)
+        # Search for the best matching FAQ
+        hits = store.search(query, k=1)
+        if hits:
+            return json.dumps(hits[0].to_dict(), indent=2)
         
         # Fallback message when no match
-        available_topics = ", ".join(FAQ_DATABASE.keys())
+        available_topics = ", ".join(store.topics(limit=MAX_SUGGESTED_TOPICS))
         fallback = {
             "answer": f"I couldn't find an answer to '{query}' in our FAQ database.",
             "source_title": "No Match Found",
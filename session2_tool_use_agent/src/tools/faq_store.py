@@ -0,0 +1,284 @@
+"""
+Pluggable FAQ stores for the lookup_faq tool.
+Both stores rank entries with BM25 over a tokenized inverted index:
+- InMemoryFaqStore indexes a dict like FAQ_DATABASE in process memory
+- SqliteFaqStore keeps the index in a local SQLite FTS5 file, opened lazily
+When no word of a query is indexed, its words match the indexed words they
+start, so partial queries like "ship" still find "shipping".
+"""
+
+import bisect
+import math
+import re
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+# Words carrying no topic information, dropped from queries and documents
+STOP_WORDS = frozenset("""
+a about all also am an and any are as at be been but by can could did do does
+for from get give had has have hello hi how i if in into is it its just know
+let like me more much my need no not of on or our please s should so some tell
+than thank thanks that the their them then there these they this those to us
+want was we were what whats when where which who why will with would you your
+""".split())
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+# Field weights: the topic key counts most, then the title, then the answer
+FIELD_WEIGHTS = {"topic": 3.0, "source_title": 2.0, "answer": 1.0}
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# A hit must cover at least this share of the query's IDF weight.
+# Keeps "cryptocurrency policy" from matching "refund policy" on "policy" alone.
+MIN_QUERY_COVERAGE = 0.5
+
+# When no query word is indexed, words of at least this many characters
+# match the indexed words they start ("ship" -> "shipping")
+MIN_PREFIX_CHARS = 3
+
+FaqEntries = Union[Mapping[str, Dict[str, str]], Iterable[Tuple[str, Dict[str, str]]]]
+
+
+@dataclass(frozen=True)
+class FaqHit:
+    """One ranked FAQ entry."""
+    topic: str
+    answer: str
+    source_title: str
+    score: float
+    
+    def to_dict(self) -> Dict[str, str]:
+        """The entry in the lookup_faq JSON format."""
+        return {"answer": self.answer, "source_title": self.source_title}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens of a text, without stop words."""
+    return [t for t in TOKEN_PATTERN.findall(text.casefold()) if t not in STOP_WORDS]
+
+
+def bm25_idf(doc_count: int, doc_freq: int) -> float:
+    """BM25 inverse document frequency (never negative)."""
+    return math.log((doc_count - doc_freq + 0.5) / (doc_freq + 0.5) + 1)
+
+
+def term_weights(term_tokens: Dict[str, List[str]], idf: Dict[str, float], unseen_idf: float) -> Dict[str, float]:
+    """Weight of each query term for the coverage check: the best IDF of its index tokens."""
+    return {term: max((idf[t] for t in tokens), default=unseen_idf) for term, tokens in term_tokens.items()}
+
+
+def iter_entries(faqs: FaqEntries) -> Iterable[Tuple[str, Dict[str, str]]]:
+    """Iterate (topic, entry) pairs from a mapping or an iterable of pairs."""
+    return faqs.items() if isinstance(faqs, Mapping) else faqs
+
+
+class FaqStore:
+    """Interface of an FAQ store used by execute_lookup_faq."""
+    
+    def search(self, query: str, k: int = 5) -> List[FaqHit]:
+        """
+        Find the best matching entries for a query.
+        
+        Args:
+            query: The user's question
+            k: Maximum number of hits
+        
+        Returns:
+            Up to k hits, best first; empty when nothing matches well enough
+        """
+        raise NotImplementedError
+    
+    def topics(self, limit: Optional[int] = None) -> List[str]:
+        """Topic keys of the stored entries, for fallback suggestions."""
+        raise NotImplementedError
+
+
+class InMemoryFaqStore(FaqStore):
+    """BM25 over an in-memory inverted index, for small knowledge bases."""
+    
+    def __init__(self, faqs: FaqEntries, min_coverage: float = MIN_QUERY_COVERAGE):
+        self.min_coverage = min_coverage
+        self._entries: List[Tuple[str, Dict[str, str]]] = []
+        self._postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        doc_lengths = []
+        
+        for doc_id, (topic, entry) in enumerate(iter_entries(faqs)):
+            self._entries.append((topic, entry))
+            weighted_tf: Counter = Counter()
+            fields = {"topic": topic, **entry}
+            for field_name, weight in FIELD_WEIGHTS.items():
+                for token in tokenize(fields.get(field_name, "")):
+                    weighted_tf[token] += weight
+            for token, tf in weighted_tf.items():
+                self._postings[token].append((doc_id, tf))
+            doc_lengths.append(sum(weighted_tf.values()))
+        
+        self._doc_lengths = doc_lengths
+        self._avg_length = (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 0.0
+        self._vocabulary = sorted(self._postings)
+    
+    def _term_tokens(self, terms: Iterable[str]) -> Dict[str, List[str]]:
+        """Index tokens matched by each query term: exact matches, or prefix matches if there are none."""
+        exact = {t: [t] if t in self._postings else [] for t in terms}
+        if any(exact.values()):
+            return exact
+        prefixed = {}
+        for term in exact:
+            start = bisect.bisect_left(self._vocabulary, term)
+            end = bisect.bisect_left(self._vocabulary, term + "\U0010ffff")
+            prefixed[term] = self._vocabulary[start:end] if len(term) >= MIN_PREFIX_CHARS else []
+        return prefixed
+    
+    def search(self, query: str, k: int = 5) -> List[FaqHit]:
+        terms = set(tokenize(query))
+        doc_count = len(self._entries)
+        if not terms or not doc_count:
+            return []
+        
+        term_tokens = self._term_tokens(terms)
+        idf = {t: bm25_idf(doc_count, len(self._postings[t])) for tokens in term_tokens.values() for t in tokens}
+        coverage_weights = term_weights(term_tokens, idf, bm25_idf(doc_count, 0))
+        total_idf = sum(coverage_weights.values())
+        scores: Dict[int, float] = defaultdict(float)
+        covered: Dict[int, float] = defaultdict(float)
+        
+        for term, tokens in term_tokens.items():
+            matched = set()
+            for token in tokens:
+                for doc_id, tf in self._postings[token]:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_lengths[doc_id] / self._avg_length)
+                    scores[doc_id] += idf[token] * tf * (BM25_K1 + 1) / (tf + norm)
+                    matched.add(doc_id)
+            for doc_id in matched:
+                covered[doc_id] += coverage_weights[term]
+        
+        ranked = sorted(
+            (doc_id for doc_id in scores if covered[doc_id] >= self.min_coverage * total_idf),
+            key=lambda doc_id: (-scores[doc_id], doc_id),
+        )
+        hits = []
+        for doc_id in ranked[:k]:
+            topic, entry = self._entries[doc_id]
+            hits.append(FaqHit(topic, entry["answer"], entry["source_title"], scores[doc_id]))
+        return hits
+    
+    def topics(self, limit: Optional[int] = None) -> List[str]:
+        return [topic for topic, _ in self._entries[:limit]]
+
+
+class SqliteFaqStore(FaqStore):
+    """
+    BM25 over a SQLite FTS5 index stored in a local file.
+    The database is only opened on first use, and entries are never loaded
+    into memory as a whole, so it scales to large knowledge bases.
+    """
+    
+    # Candidates fetched per requested hit before the coverage filter
+    CANDIDATE_FACTOR = 4
+    
+    def __init__(self, path: str, min_coverage: float = MIN_QUERY_COVERAGE):
+        self.path = path
+        self.min_coverage = min_coverage
+        self._local = threading.local()
+        self._doc_count: Optional[int] = None
+    
+    @classmethod
+    def build(cls, path: str, faqs: FaqEntries, **kwargs) -> "SqliteFaqStore":
+        """Create (or extend) an FTS5 FAQ database at path and return a store for it."""
+        store = cls(path, **kwargs)
+        store.add(faqs)
+        return store
+    
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread, created lazily."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS faq "
+                "USING fts5(topic, source_title, answer, tokenize='unicode61')"
+            )
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS faq_vocab USING fts5vocab(faq, 'row')")
+            self._local.conn = conn
+        return conn
+    
+    def add(self, faqs: FaqEntries, batch_size: int = 10_000):
+        """Insert entries in batches of batch_size rows."""
+        conn = self._connection()
+        batch = []
+        for topic, entry in iter_entries(faqs):
+            batch.append((topic, entry["source_title"], entry["answer"]))
+            if len(batch) >= batch_size:
+                conn.executemany("INSERT INTO faq VALUES (?, ?, ?)", batch)
+                batch = []
+        if batch:
+            conn.executemany("INSERT INTO faq VALUES (?, ?, ?)", batch)
+        conn.commit()
+        self._doc_count = None
+    
+    def search(self, query: str, k: int = 5) -> List[FaqHit]:
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+        
+        conn = self._connection()
+        if self._doc_count is None:
+            self._doc_count = conn.execute("SELECT count(*) FROM faq").fetchone()[0]
+        if not self._doc_count:
+            return []
+        
+        placeholders = ", ".join("?" * len(terms))
+        doc_freq = dict(conn.execute(
+            f"SELECT term, doc FROM faq_vocab WHERE term IN ({placeholders})", terms
+        ).fetchall())
+        term_tokens = {t: [t] if t in doc_freq else [] for t in terms}
+        if not doc_freq:
+            # No word is indexed: match the indexed words the query's words start
+            for term in terms:
+                if len(term) >= MIN_PREFIX_CHARS:
+                    rows = conn.execute(
+                        "SELECT term, doc FROM faq_vocab WHERE term >= ? AND term < ?", (term, term + "\U0010ffff")
+                    ).fetchall()
+                    doc_freq.update(rows)
+                    term_tokens[term] = [token for token, _ in rows]
+            if not doc_freq:
+                return []
+        idf = {t: bm25_idf(self._doc_count, f) for t, f in doc_freq.items()}
+        coverage_weights = term_weights(term_tokens, idf, bm25_idf(self._doc_count, 0))
+        total_idf = sum(coverage_weights.values())
+        
+        weights = ", ".join(str(FIELD_WEIGHTS[f]) for f in ("topic", "source_title", "answer"))
+        rows = conn.execute(
+            f"SELECT topic, source_title, answer, bm25(faq, {weights}) AS rank "
+            f"FROM faq WHERE faq MATCH ? ORDER BY rank LIMIT ?",
+            (" OR ".join(f'"{t}"' for t in doc_freq), k * self.CANDIDATE_FACTOR),
+        ).fetchall()
+        
+        hits = []
+        for topic, source_title, answer, rank in rows:
+            tokens = set(tokenize(f"{topic} {source_title} {answer}"))
+            coverage = sum(coverage_weights[term] for term, matches in term_tokens.items() if tokens.intersection(matches))
+            if coverage >= self.min_coverage * total_idf:
+                hits.append(FaqHit(topic, answer, source_title, -rank))
+                if len(hits) == k:
+                    break
+        return hits
+    
+    def topics(self, limit: Optional[int] = None) -> List[str]:
+        rows = self._connection().execute(
+            "SELECT topic FROM faq ORDER BY rowid LIMIT ?", (-1 if limit is None else limit,)
+        )
+        return [topic for (topic,) in rows]
+    
+    def close(self):
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
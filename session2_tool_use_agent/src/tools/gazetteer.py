@@ -0,0 +1,281 @@
+"""
+Location gazetteer for the get_time tool.
+Resolves free-form place names ("NYC", "Johannesburgh", "Europe/Paris") to
+IANA time zones with exact, prefix and trigram-fuzzy lookup. The index is
+built once from the bundled city/alias table, the country tables shipped
+with tzdata and every zone name, and shared by all agents.
+"""
+
+import bisect
+import csv
+import os
+import re
+import threading
+import unicodedata
+import zoneinfo
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+# Bundled table of cities, countries and aliases: name,timezone,aliases (|-separated)
+LOCATIONS_FILE = os.path.join(os.path.dirname(__file__), "data", "locations.csv")
+
+# A prefix must cover this share of the shortest place name it matches
+MIN_PREFIX_COVERAGE = 0.6
+
+# Fuzzy matches need at least this similarity ratio (difflib, 0-1)
+MIN_FUZZY_RATIO = 0.8
+
+# Places scored with difflib per fuzzy lookup, picked by shared trigrams
+FUZZY_CANDIDATES = 20
+
+# Maximum number of resolved queries and ZoneInfo objects kept in memory
+RESOLVE_CACHE_SIZE = 4096
+
+# Zone areas named after continents and oceans, whose zones are named after cities
+GEOGRAPHIC_AREAS = ("Africa/", "America/", "Antarctica/", "Asia/", "Atlantic/", "Europe/", "Indian/", "Pacific/")
+
+REMOVED_CHARS = re.compile(r"['’.]")
+SEPARATOR_CHARS = re.compile(r"[^\w/+-]+|_")
+
+
+@dataclass(frozen=True)
+class Place:
+    """A named place and its IANA time zone."""
+    name: str
+    timezone: str
+
+
+@dataclass(frozen=True)
+class LocationMatch:
+    """The result of resolving a location."""
+    place: Place
+    key: str
+    method: str  # "exact", "prefix" or "fuzzy"
+    score: float
+
+
+def normalize_location(text: str) -> str:
+    """Normalize a place name for lookup: no accents, lower case, single spaces."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    text = REMOVED_CHARS.sub("", text.replace("&", " and "))
+    return " ".join(SEPARATOR_CHARS.sub(" ", text).split())
+
+
+def trigrams(key: str) -> Set[str]:
+    """Character trigrams of a normalized key, padded to weight word starts."""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Gazetteer:
+    """
+    Index of place names.
+    
+    Keys are normalized names; when two places share a key, the one added
+    first wins, so more specific sources should be added first.
+    """
+    
+    def __init__(self, places: Iterable[Tuple[str, Place]] = ()):
+        self._places: Dict[str, Place] = {}
+        self._sorted_keys: List[str] = []
+        self._trigrams: Dict[str, List[str]] = defaultdict(list)
+        # Per-instance cache of resolved queries, cleared whenever a name is added
+        self.resolve = lru_cache(maxsize=RESOLVE_CACHE_SIZE)(self._resolve)
+        for name, place in places:
+            self.add(name, place)
+    
+    @classmethod
+    def from_sources(cls, locations_file: str = LOCATIONS_FILE) -> "Gazetteer":
+        """
+        Build the index from, in order of precedence: the bundled locations
+        table, country names from tzdata's iso3166.tab/zone.tab, and every
+        available IANA zone name.
+        """
+        zones = zoneinfo.available_timezones()
+        zone_table = _read_tzdata_table("zone.tab")
+        gazetteer = cls()
+        for name, place in _bundled_places(locations_file):
+            if place.timezone in zones:
+                gazetteer.add(name, place)
+        for name, place in _country_places(zone_table):
+            if place.timezone in zones:
+                gazetteer.add(name, place)
+        
+        # "newyork", "hongkong": multi-word names also match without spaces
+        for key in list(gazetteer._places):
+            if " " in key:
+                gazetteer.add(key.replace(" ", ""), gazetteer._places[key])
+        
+        city_zones = {row[2] for row in zone_table if len(row) >= 3} & zones
+        for name, place in _zone_places(zones, city_zones):
+            gazetteer.add(name, place)
+        return gazetteer
+    
+    def add(self, name: str, place: Place) -> bool:
+        """
+        Add a name for a place.
+        
+        Returns:
+            False if the name was already taken (the existing place is kept)
+        """
+        key = normalize_location(name)
+        if not key or key in self._places:
+            return False
+        
+        self._places[key] = place
+        bisect.insort(self._sorted_keys, key)
+        for gram in trigrams(key):
+            self._trigrams[gram].append(key)
+        self.resolve.cache_clear()
+        return True
+    
+    def _resolve(self, location: str) -> Optional[LocationMatch]:
+        """
+        Resolve a location to a place, trying exact, prefix and fuzzy lookup.
+        Results are cached per query string (see resolve).
+        
+        Returns:
+            The best match, or None if nothing is close enough
+        """
+        key = normalize_location(location)
+        if not key:
+            return None
+        
+        place = self._places.get(key)
+        if place:
+            return LocationMatch(place, key, "exact", 1.0)
+        return self._prefix_match(key) or self._fuzzy_match(key)
+    
+    def _prefix_match(self, key: str) -> Optional[LocationMatch]:
+        """Complete a prefix that points to a single time zone ("johannes")."""
+        start = bisect.bisect_left(self._sorted_keys, key)
+        matches = []
+        for candidate in self._sorted_keys[start:]:
+            if not candidate.startswith(key):
+                break
+            matches.append(candidate)
+        
+        if not matches or len({self._places[m].timezone for m in matches}) > 1:
+            return None
+        shortest = min(matches, key=len)
+        coverage = len(key) / len(shortest)
+        if coverage < MIN_PREFIX_COVERAGE:
+            return None
+        return LocationMatch(self._places[shortest], shortest, "prefix", coverage)
+    
+    def _fuzzy_match(self, key: str) -> Optional[LocationMatch]:
+        """Correct misspellings ("johannesburgh") via trigram candidates."""
+        shared: Counter = Counter()
+        for gram in trigrams(key):
+            shared.update(self._trigrams.get(gram, ()))
+        
+        # Same scoring as difflib.get_close_matches, with cheap upper bounds first
+        matcher = SequenceMatcher()
+        matcher.set_seq2(key)
+        best = None
+        candidates = shared.most_common(FUZZY_CANDIDATES)
+        for candidate, count in candidates:
+            if count * 2 < candidates[0][1]:
+                # Shares under half the trigrams of the closest candidate
+                break
+            matcher.set_seq1(candidate)
+            if matcher.real_quick_ratio() < MIN_FUZZY_RATIO or matcher.quick_ratio() < MIN_FUZZY_RATIO:
+                continue
+            ratio = matcher.ratio()
+            if ratio >= MIN_FUZZY_RATIO and (best is None or ratio > best[1]):
+                best = (candidate, ratio)
+        if best is None:
+            return None
+        return LocationMatch(self._places[best[0]], best[0], "fuzzy", best[1])
+    
+    def __contains__(self, name: str) -> bool:
+        return normalize_location(name) in self._places
+    
+    def __len__(self) -> int:
+        return len(self._places)
+
+
+def _bundled_places(path: str) -> Iterable[Tuple[str, Place]]:
+    """Places and aliases from the bundled locations table."""
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            place = Place(row["name"], row["timezone"])
+            yield row["name"], place
+            for alias in filter(None, row["aliases"].split("|")):
+                yield alias, place
+
+
+def _read_tzdata_table(filename: str) -> List[List[str]]:
+    """Rows of a tzdata table (e.g. zone.tab) from the system or the tzdata package."""
+    for directory in zoneinfo.TZPATH:
+        path = os.path.join(directory, filename)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                return [line.rstrip("\n").split("\t") for line in f if not line.startswith("#")]
+    try:
+        from importlib.resources import files
+        text = files("tzdata.zoneinfo").joinpath(filename).read_text(encoding="utf-8")
+    except (ImportError, FileNotFoundError):
+        return []
+    return [line.split("\t") for line in text.splitlines() if not line.startswith("#")]
+
+
+def _country_places(zone_table: List[List[str]]) -> Iterable[Tuple[str, Place]]:
+    """Country names, for countries with a single time zone in zone.tab."""
+    zones_by_country: Dict[str, List[str]] = defaultdict(list)
+    for row in zone_table:
+        if len(row) >= 3:
+            zones_by_country[row[0]].append(row[2])
+    
+    for row in _read_tzdata_table("iso3166.tab"):
+        if len(row) < 2 or len(zones_by_country.get(row[0], [])) != 1:
+            continue
+        name = row[1]
+        place = Place(name, zones_by_country[row[0]][0])
+        yield name, place
+        # "Britain (UK)" is also "Britain"
+        if "(" in name:
+            yield name.split("(")[0], place
+
+
+def _zone_places(zones: Iterable[str], city_zones: Set[str]) -> Iterable[Tuple[str, Place]]:
+    """
+    IANA zone names ("America/New_York") and the city parts ("New York") of
+    city_zones. Without zone.tab, city parts come from the geographic areas,
+    so legacy names like "US/Eastern" do not add "Eastern" as a city.
+    """
+    zones = sorted(zones)
+    if not city_zones:
+        city_zones = {zone for zone in zones if zone.startswith(GEOGRAPHIC_AREAS)}
+    
+    for zone in zones:
+        city = zone.rsplit("/", 1)[-1].replace("_", " ")
+        yield zone, Place(city, zone)
+    for zone in zones:
+        if zone in city_zones:
+            city = zone.rsplit("/", 1)[-1].replace("_", " ")
+            yield city, Place(city, zone)
+
+
+_gazetteer: Optional[Gazetteer] = None
+_gazetteer_lock = threading.Lock()
+
+def get_gazetteer() -> Gazetteer:
+    """Get the shared gazetteer, building it on first use."""
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer.from_sources()
+    return _gazetteer
+
+
+@lru_cache(maxsize=RESOLVE_CACHE_SIZE)
+def get_zone(timezone: str) -> ZoneInfo:
+    """Get a ZoneInfo, creating each one only once."""
+    return ZoneInfo(timezone)
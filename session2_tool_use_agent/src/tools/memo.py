@@ -0,0 +1,209 @@
+"""
+Memoization of tool results.
+Each tool can declare a MemoPolicy when it is registered:
+- pure: the result depends only on the arguments
+- ttl: results are reused for a fixed number of seconds
+- time_bucket: results are reused within the same wall-clock bucket
+  (e.g. get_time within the same minute)
+Results are keyed on the validated (and optionally normalized) arguments
+and kept in a bounded LRU cache shared by every agent in the process.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# Default number of tool results kept in memory
+MEMO_MAX_ENTRIES = 4096
+
+ArgsNormalizer = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class MemoPolicy:
+    """How long a tool's results may be reused."""
+    kind: str  # "pure", "ttl" or "time_bucket"
+    seconds: float = 0.0
+    normalize: Optional[ArgsNormalizer] = None
+    
+    @classmethod
+    def pure(cls, normalize: Optional[ArgsNormalizer] = None) -> "MemoPolicy":
+        return cls("pure", normalize=normalize)
+    
+    @classmethod
+    def ttl(cls, seconds: float, normalize: Optional[ArgsNormalizer] = None) -> "MemoPolicy":
+        return cls("ttl", seconds, normalize)
+    
+    @classmethod
+    def time_bucket(cls, seconds: float, normalize: Optional[ArgsNormalizer] = None) -> "MemoPolicy":
+        return cls("time_bucket", seconds, normalize)
+    
+    def window(self, now: float) -> Tuple[Optional[int], Optional[float]]:
+        """
+        The bucket a call made at `now` falls in, and when its result expires.
+        
+        Returns:
+            (bucket, expires_at); either may be None when not applicable
+        """
+        if self.kind == "time_bucket":
+            bucket = int(now // self.seconds)
+            return bucket, (bucket + 1) * self.seconds
+        if self.kind == "ttl":
+            return None, now + self.seconds
+        return None, None
+
+
+def casefold_args(*fields: str) -> ArgsNormalizer:
+    """Normalizer that lower-cases and collapses whitespace in the given string fields."""
+    def normalize(args: Dict[str, Any]) -> Dict[str, Any]:
+        normalized = dict(args)
+        for name in fields:
+            if isinstance(normalized.get(name), str):
+                normalized[name] = " ".join(normalized[name].casefold().split())
+        return normalized
+    return normalize
+
+
+@dataclass
+class MemoStats:
+    """Counters of a ToolMemo."""
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+
+
+class ToolMemo:
+    """
+    Bounded LRU cache of tool results with in-flight coalescing: identical
+    calls that overlap (e.g. duplicates within one model turn) run once.
+    Results that start with "Error" are not kept.
+    """
+    
+    def __init__(self, max_entries: int = MEMO_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.stats = MemoStats()
+        self._entries: "OrderedDict[Tuple, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._in_flight: Dict[Tuple, Future] = {}
+        self._lock = threading.Lock()
+    
+    def key(self, tool_name: str, args: Dict[str, Any], policy: MemoPolicy, now: float) -> Tuple:
+        """Cache key of a call: tool, normalized arguments and time bucket."""
+        if policy.normalize is not None:
+            args = policy.normalize(args)
+        bucket, _ = policy.window(now)
+        return tool_name, json.dumps(args, sort_keys=True, default=str), bucket
+    
+    def _lookup(self, key: Tuple, now: float) -> Tuple[bool, Any, Optional[Future], bool]:
+        """
+        Find a cached result or an in-flight call for key, claiming it if neither exists.
+        
+        Returns:
+            (found, result, future, leader)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, result = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.stats.hits += 1
+                    return True, result, None, False
+                del self._entries[key]
+            
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.stats.coalesced += 1
+                return False, None, future, False
+            
+            self.stats.misses += 1
+            future = Future()
+            self._in_flight[key] = future
+            return False, None, future, True
+    
+    def _store(self, key: Tuple, policy: MemoPolicy, now: float, future: Future, result: Any):
+        """Keep a fresh result and hand it to the coalesced callers."""
+        _, expires_at = policy.window(now)
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if not (isinstance(result, str) and result.startswith("Error")):
+                self._entries[key] = (expires_at, result)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        future.set_result(result)
+    
+    def _fail(self, key: Tuple, future: Future, error: BaseException):
+        with self._lock:
+            self._in_flight.pop(key, None)
+        future.set_exception(error)
+    
+    def call(self, tool_name: str, args: Dict[str, Any], policy: MemoPolicy, run: Callable[[], Any]) -> Any:
+        """
+        Return the memoized result of a tool call, running it if needed.
+        
+        Args:
+            tool_name: Name of the tool
+            args: Validated, reference-resolved arguments
+            policy: The tool's memo policy
+            run: Runs the tool and returns its result
+        """
+        now = time.time()
+        key = self.key(tool_name, args, policy, now)
+        found, result, future, leader = self._lookup(key, now)
+        if found:
+            return result
+        if not leader:
+            return future.result()
+        
+        try:
+            result = run()
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        self._store(key, policy, now, future, result)
+        return result
+    
+    async def acall(
+        self,
+        tool_name: str,
+        args: Dict[str, Any],
+        policy: MemoPolicy,
+        run: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Async version of call(); run returns an awaitable result."""
+        now = time.time()
+        key = self.key(tool_name, args, policy, now)
+        found, result, future, leader = self._lookup(key, now)
+        if found:
+            return result
+        if not leader:
+            return await asyncio.wrap_future(future)
+        
+        try:
+            result = await run()
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        self._store(key, policy, now, future, result)
+        return result
+    
+    def invalidate(self, tool_name: Optional[str] = None):
+        """Drop the cached results of one tool, or of every tool."""
+        with self._lock:
+            if tool_name is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == tool_name]:
+                    del self._entries[key]
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Shared by all agents and sessions in the process
+TOOL_MEMO = ToolMemo()
@@ -0,0 +1,156 @@
+"""
+Tool registry for the agent.
+Indexes tools by name and caches each tool's schemas, so lookups stay O(1)
+no matter how many tools are registered.
+"""
+
+from importlib.metadata import entry_points
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Type
+from dataclasses import dataclass
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel
+from src.tools.memo import MemoPolicy
+
+# Entry point group that third-party packages can use to contribute tools
+ENTRY_POINT_GROUP = "tool_use_agent.tools"
+
+
+@dataclass(frozen=True)
+class RegisteredTool:
+    """A tool together with its schemas, built once at registration time."""
+    tool: BaseTool
+    args_schema: Type[BaseModel]
+    json_schema: Dict[str, Any]
+    memo: Optional[MemoPolicy] = None
+
+
+class ToolRegistry:
+    """
+    Name-indexed collection of tools.
+    
+    Tools keep their registration order, which is the order they are bound
+    to the model and displayed in.
+    """
+    
+    def __init__(
+        self,
+        tools: Optional[Iterable[BaseTool]] = None,
+        memo: Optional[Dict[str, MemoPolicy]] = None,
+    ):
+        """
+        Args:
+            tools: Tools to register, in order
+            memo: Memo policies of some of the tools, by tool name
+        """
+        self._entries: Dict[str, RegisteredTool] = {}
+        for tool in tools or []:
+            self.register(tool, memo=(memo or {}).get(tool.name))
+    
+    def register(
+        self,
+        tool: BaseTool,
+        replace: bool = False,
+        memo: Optional[MemoPolicy] = None,
+    ) -> BaseTool:
+        """
+        Register a tool and compile its schemas.
+        Returns the tool, so this can also be used as a decorator.
+        
+        Args:
+            tool: The tool to register
+            replace: Whether to replace an existing tool with the same name
+            memo: How the tool's results may be reused (default: never)
+        """
+        if tool.name in self._entries and not replace:
+            raise ValueError(f"Tool '{tool.name}' is already registered")
+        
+        args_schema = tool.args_schema
+        if not (isinstance(args_schema, type) and issubclass(args_schema, BaseModel)):
+            args_schema = tool.get_input_schema()
+        
+        self._entries[tool.name] = RegisteredTool(
+            tool=tool,
+            args_schema=args_schema,
+            json_schema=args_schema.model_json_schema(),
+            memo=memo,
+        )
+        return tool
+    
+    def unregister(self, name: str):
+        """Remove a tool by name."""
+        if name not in self._entries:
+            raise KeyError(f"Tool '{name}' is not registered")
+        del self._entries[name]
+    
+    def load_entry_points(self, group: str = ENTRY_POINT_GROUP) -> List[str]:
+        """
+        Register tools advertised by installed packages.
+        Each entry point may load a tool or an iterable of tools.
+        
+        Returns:
+            Names of the tools that were registered
+        """
+        loaded = []
+        for entry_point in entry_points(group=group):
+            obj = entry_point.load()
+            for tool in [obj] if isinstance(obj, BaseTool) else obj:
+                self.register(tool)
+                loaded.append(tool.name)
+        return loaded
+    
+    def get(self, name: str) -> Optional[BaseTool]:
+        """Find a tool by name, or None if it does not exist."""
+        entry = self._entries.get(name)
+        return entry.tool if entry else None
+    
+    def entry(self, name: str) -> RegisteredTool:
+        """Get a tool's registry entry (tool and cached schemas) by name."""
+        try:
+            return self._entries[name]
+        except KeyError:
+            raise KeyError(f"Tool '{name}' is not registered") from None
+    
+    def args_schema(self, name: str) -> Type[BaseModel]:
+        """Get the cached pydantic args schema of a tool."""
+        return self.entry(name).args_schema
+    
+    def json_schema(self, name: str) -> Dict[str, Any]:
+        """Get the cached JSON schema of a tool's arguments."""
+        return self.entry(name).json_schema
+    
+    def memo_policy(self, name: str) -> Optional[MemoPolicy]:
+        """Get the memo policy of a tool, or None if its results are never reused."""
+        return self.entry(name).memo
+    
+    def validate(self, name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate tool arguments against the tool's args schema.
+        
+        Args:
+            name: Name of the tool
+            args: Raw arguments, e.g. from the model's tool call
+        
+        Returns:
+            The validated arguments, with defaults filled in
+        
+        Raises:
+            pydantic.ValidationError: If the arguments do not fit the schema
+        """
+        return self.args_schema(name).model_validate(args).model_dump()
+    
+    def names(self) -> List[str]:
+        """Names of all registered tools, in registration order."""
+        return list(self._entries)
+    
+    def tools(self) -> List[BaseTool]:
+        """All registered tools, in registration order."""
+        return [entry.tool for entry in self._entries.values()]
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __iter__(self) -> Iterator[BaseTool]:
+        return iter(self.tools())
@@ -0,0 +1,338 @@
+# src/tools/sandbox.py
+"""
+Process-pool sandbox for the calc tool.
+The calculator only allows arithmetic, but arithmetic can still be costly:
+"9**9**9" keeps a CPU busy for minutes and grows to gigabytes. Run inline,
+that stalls the tool thread pool and every session waiting on it.
+
+CalcSandbox evaluates expressions in a few worker processes started ahead
+of the jobs (`python -m src.tools.sandbox`, so the caller's main module is
+never re-imported, and no threads or locks are inherited).
+Each job gets a wall-clock timeout, and each worker runs under CPU-time and
+address-space limits (`resource`, POSIX only). A worker that times out, hits
+a limit or dies is killed and replaced, and the caller gets a clean error
+string like every other calc error. Jobs wait for a free worker in a
+bounded queue; when it is full, calls are turned away instead of piling up.
+"""
+
+import atexit
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import weakref
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+# Default number of worker processes
+CALC_SANDBOX_WORKERS = 2
+
+# Default wall-clock limit of one job, in seconds
+CALC_TIMEOUT = 2.0
+
+# Default CPU time a worker may spend on one job, in seconds
+CALC_CPU_SECONDS = 2
+
+# Default address-space limit of a worker, in bytes
+CALC_MEMORY_BYTES = 512 * 1024 * 1024
+
+# Default number of jobs that may wait for a free worker
+CALC_MAX_QUEUED = 32
+
+# Longest time a new worker may take to start, in seconds
+WORKER_START_TIMEOUT = 30.0
+
+# First line a worker writes once it is ready for jobs
+WORKER_READY = "ready"
+
+# Directory containing the src package, for the workers' import path
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _timeout_error(expression: str, timeout: float) -> str:
+    return f"Error: Calculation took too long (over {timeout:g} seconds) and was stopped.\n\nYou provided: '{expression}'\nVery large powers like '9**9**9' cannot be calculated. Please try a smaller calculation."
+
+
+def _crash_error(expression: str) -> str:
+    return f"Error: Calculation used too much CPU time or memory and was stopped.\n\nYou provided: '{expression}'\nVery large powers like '9**9**9' cannot be calculated. Please try a smaller calculation."
+
+
+def _busy_error() -> str:
+    return "Error: The calculator is busy with other calculations. Please try again in a moment."
+
+
+def _limit_resources(cpu_seconds: Optional[int], memory_bytes: Optional[int]):
+    """Cap the worker's address space and CPU time (no-op where `resource` is unavailable)."""
+    try:
+        import resource
+    except ImportError:
+        return
+    for limit, value in ((resource.RLIMIT_AS, memory_bytes), (resource.RLIMIT_CPU, cpu_seconds)):
+        if value is None:
+            continue
+        _, hard = resource.getrlimit(limit)
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard)
+        resource.setrlimit(limit, (value, hard))
+
+
+def _extend_cpu_limit(cpu_seconds: Optional[int]):
+    """
+    Allow the worker cpu_seconds more CPU time. RLIMIT_CPU counts the whole
+    process, so before each job the soft limit is moved past the time
+    already used; going over it ends the worker with SIGXCPU.
+    """
+    try:
+        import resource
+    except ImportError:
+        return
+    if cpu_seconds is None:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    _limit_resources(int(usage.ru_utime + usage.ru_stime) + cpu_seconds, None)
+
+
+def _worker_main(cpu_seconds: Optional[int], memory_bytes: Optional[int]):
+    """
+    Worker process: read JSON-encoded expressions from stdin, one per line,
+    and write execute_calc's JSON-encoded result for each to stdout.
+    """
+    from src.tools.execution import evaluate_calc
+    _limit_resources(None, memory_bytes)
+    print(json.dumps(WORKER_READY), flush=True)
+    for line in sys.stdin:
+        _extend_cpu_limit(cpu_seconds)
+        print(json.dumps(evaluate_calc(json.loads(line))), flush=True)
+
+
+class _Worker:
+    """
+    One worker process. A reader thread moves its output lines to `results`;
+    None there means the process has exited.
+    """
+    
+    def __init__(self, cpu_seconds: Optional[int], memory_bytes: Optional[int]):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [PACKAGE_ROOT, env.get("PYTHONPATH")]))
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "src.tools.sandbox", str(cpu_seconds or 0), str(memory_bytes or 0)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            text=True,
+            encoding="utf-8",
+        )
+        self.ready = threading.Event()
+        self.results: "queue.Queue[Optional[str]]" = queue.Queue()
+        threading.Thread(target=self._read, daemon=True).start()
+    
+    def _read(self):
+        try:
+            for line in self.process.stdout:
+                message = json.loads(line)
+                if message == WORKER_READY and not self.ready.is_set():
+                    self.ready.set()
+                else:
+                    self.results.put(message)
+        except (OSError, ValueError):
+            pass
+        self.results.put(None)
+        self.ready.set()
+    
+    def send(self, expression: str):
+        self.process.stdin.write(json.dumps(expression) + "\n")
+        self.process.stdin.flush()
+    
+    def alive(self) -> bool:
+        return self.process.poll() is None
+    
+    def kill(self):
+        self.process.kill()
+        self.process.wait()
+        self._close_pipes()
+    
+    def stop(self, timeout: float = 1.0):
+        """Close stdin so the worker exits; kill it if it does not."""
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+        self._close_pipes()
+    
+    def _close_pipes(self):
+        for pipe in (self.process.stdin, self.process.stdout):
+            try:
+                pipe.close()
+            except OSError:
+                pass
+
+
+@dataclass
+class SandboxStats:
+    """Counters of a CalcSandbox."""
+    jobs: int = 0
+    timeouts: int = 0
+    crashes: int = 0
+    rejected: int = 0
+    replaced: int = 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class CalcSandbox:
+    """
+    Pool of calc worker processes.
+    
+    evaluate() is thread-safe and blocking: it sends the expression to a free
+    worker and returns execute_calc's result string, or an error string on
+    timeout, crash or a full queue. Workers are started on first use and
+    stopped by close() (also run at interpreter exit).
+    """
+    
+    def __init__(
+        self,
+        workers: int = CALC_SANDBOX_WORKERS,
+        timeout: float = CALC_TIMEOUT,
+        cpu_seconds: Optional[int] = CALC_CPU_SECONDS,
+        memory_bytes: Optional[int] = CALC_MEMORY_BYTES,
+        max_queued: int = CALC_MAX_QUEUED,
+    ):
+        """
+        Args:
+            workers: Number of worker processes
+            timeout: Wall-clock limit of one job, in seconds
+            cpu_seconds: CPU time a worker may spend on one job (None: no limit)
+            memory_bytes: Address-space limit of each worker (None: no limit)
+            max_queued: Jobs that may wait for a free worker before calls are turned away
+        """
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        self.workers = workers
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_bytes
+        self.max_queued = max_queued
+        self.stats = SandboxStats()
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._all: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._started = False
+        self._closed = False
+        atexit.register(_close_at_exit, weakref.ref(self))
+    
+    def start(self):
+        """Start the worker processes now rather than on the first job, and wait until they are ready."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("CalcSandbox is closed")
+            if self._started:
+                return
+            self._started = True
+            workers = [self._spawn() for _ in range(self.workers)]
+        for worker in workers:
+            worker.ready.wait(WORKER_START_TIMEOUT)
+            self._idle.put(worker)
+    
+    def evaluate(self, expression: str) -> str:
+        """
+        Evaluate an expression in a worker.
+        
+        Args:
+            expression: Expression for the calc tool
+        
+        Returns:
+            The result or error string execute_calc gives
+        """
+        self.start()
+        with self._lock:
+            if self._queued >= self.max_queued + self.workers:
+                self.stats.rejected += 1
+                return _busy_error()
+            self._queued += 1
+            self.stats.jobs += 1
+        
+        try:
+            try:
+                worker = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                with self._lock:
+                    self.stats.rejected += 1
+                return _busy_error()
+            return self._run(worker, expression)
+        finally:
+            with self._lock:
+                self._queued -= 1
+    
+    def _run(self, worker: _Worker, expression: str) -> str:
+        """Run one job on a worker taken from the idle queue, and give back a live worker."""
+        counter = None
+        # A replacement worker may still be starting; that time is not the job's
+        worker.ready.wait(WORKER_START_TIMEOUT)
+        try:
+            worker.send(expression)
+            result = worker.results.get(timeout=self.timeout)
+        except queue.Empty:
+            result, error, counter = None, _timeout_error(expression, self.timeout), "timeouts"
+        except OSError:
+            result = None
+        if result is not None:
+            self._idle.put(worker)
+            return result
+        if counter is None:
+            # Killed by a resource limit (SIGXCPU, out of memory) or otherwise gone
+            error, counter = _crash_error(expression), "crashes"
+        
+        worker.kill()
+        with self._lock:
+            setattr(self.stats, counter, getattr(self.stats, counter) + 1)
+            if self._closed:
+                return error
+            self.stats.replaced += 1
+            replacement = self._spawn()
+        self._idle.put(replacement)
+        return error
+    
+    def _spawn(self) -> _Worker:
+        """Caller holds the lock."""
+        worker = _Worker(self.cpu_seconds, self.memory_bytes)
+        self._all = [w for w in self._all if w.alive()]
+        self._all.append(worker)
+        return worker
+    
+    def alive(self) -> int:
+        """Number of worker processes running."""
+        with self._lock:
+            return sum(1 for w in self._all if w.alive())
+    
+    def close(self):
+        """Stop the workers."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers, self._all = self._all, []
+        for worker in workers:
+            worker.stop()
+    
+    def __enter__(self) -> "CalcSandbox":
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _close_at_exit(sandbox_ref: "weakref.ref[CalcSandbox]"):
+    sandbox = sandbox_ref()
+    if sandbox is not None:
+        sandbox.close()
+
+
+if __name__ == "__main__":
+    _worker_main(int(sys.argv[1]) or None, int(sys.argv[2]) or None)
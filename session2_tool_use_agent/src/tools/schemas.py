@@ -5,13 +5,15 @@ Each tool uses a Pydantic BaseModel for input validation and schema generation.
 
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
-from typing import Literal
+from typing import List, Literal
 import inspect
+from src.tools.memo import MemoPolicy, casefold_args
+from src.tools.registry import ToolRegistry
 
 class GetTimeInput(BaseModel):
     """Input schema for get_time tool."""
     location: str = Field(
-        description="The city name (eg. 'Cape Town', 'New York', 'Bangkok', 'London', 'Tokyo', 'UTC')"
+        description="The city, country or IANA time zone (eg. 'Cape Town', 'New York', 'Bangkok', 'London', 'Tokyo', 'UTC', 'Europe/Paris')"
     )
 
 class CalcInput(BaseModel):
@@ -20,6 +22,12 @@ class CalcInput(BaseModel):
         description="A mathematical expression as a string. Supports: basic arithmetic (2+2), percentages (18% of 24500), multiplication (*), division (/), addition (+), subtraction (-)"
     )
 
+class CalcBatchInput(BaseModel):
+    """Input schema for calc_batch tool."""
+    expressions: List[str] = Field(
+        description="A list of mathematical expressions, each in the same format the calc tool accepts (eg. ['18% of 24500', '18% of 1200', '2 + 2'])"
+    )
+
 class LookupFaqInput(BaseModel):
     """Input schema for lookup_faq tool."""
     query: str = Field(
@@ -48,6 +56,23 @@ def calc(expression: str) -> str:
     from src.tools.execution import execute_calc
     return execute_calc(expression)
 
+@tool(args_schema=CalcBatchInput)
+def calc_batch(expressions: List[str]) -> str:
+    """Calculate many mathematical expressions in a single call.
+    
+    Use this tool instead of calling calc repeatedly when there are several
+    calculations to do at once, such as applying a percentage to a list of prices.
+    Returns a JSON list with one {'expression', 'result'} object per expression,
+    in the same order as the input.
+    """
+    import json
+    from src.tools.execution import execute_calc_batch
+    results = execute_calc_batch(expressions)
+    return json.dumps(
+        [{"expression": e, "result": r} for e, r in zip(expressions, results)],
+        indent=2,
+    )
+
 @tool(args_schema=LookupFaqInput)
 def lookup_faq(query: str) -> str:
     """Look up information from the FAQ knowledge base.
@@ -59,16 +84,29 @@ def lookup_faq(query: str) -> str:
     from src.tools.execution import execute_lookup_faq
     return execute_lookup_faq(query)
 
-# Export all tools
-TOOLS = [get_time, calc, lookup_faq]
 
-def display_tool_schemas():
-    """Display the schema for each tool."""
+# How long each built-in tool's results may be reused.
+# get_time answers to the minute; the others depend only on their arguments.
+MEMO_POLICIES = {
+    "get_time": MemoPolicy.time_bucket(60, normalize=casefold_args("location")),
+    "calc": MemoPolicy.pure(),
+    "calc_batch": MemoPolicy.pure(),
+    "lookup_faq": MemoPolicy.pure(),
+}
+
+# Default registry holding the built-in tools; more can be registered at runtime
+REGISTRY = ToolRegistry([get_time, calc, calc_batch, lookup_faq], memo=MEMO_POLICIES)
+
+# Export all built-in tools
+TOOLS = REGISTRY.tools()
+
+def display_tool_schemas(registry: ToolRegistry = REGISTRY):
+    """Display the schema for each tool in the registry."""
     print("=" * 60)
     print("PART B.1: Tool Schema Definitions")
     print("=" * 60)
     
-    for tool in TOOLS:
+    for tool in registry:
         print(f"\n{'-' * 60}")
         print(f"Tool Name: {tool.name}")
         print(f"Description: {tool.description}")
@@ -89,10 +127,7 @@ def display_tool_schemas():
             
             print(f"\nFull JSON Schema:")
             import json
-            if hasattr(tool.args_schema, 'model_json_schema'):
-                schema_dict = tool.args_schema.model_json_schema()
-            else:
-                schema_dict = {}
+            schema_dict = registry.json_schema(tool.name)
             print(json.dumps(schema_dict, indent=2))
         else:
             print(f"  args_schema: {tool.args_schema}")
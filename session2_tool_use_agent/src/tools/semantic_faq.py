@@ -0,0 +1,183 @@
+"""
+Offline semantic FAQ search for the lookup_faq tool.
+Embeds FAQ entries with a hashing n-gram vectorizer (no model download),
+keeps the vectors in a NumPy matrix (memory-mapped for large corpora) and
+answers queries with a batched cosine-similarity top-k.
+"""
+
+import json
+import os
+import zlib
+from typing import Dict, List, Mapping, Optional, Sequence
+import numpy as np
+from src.tools.faq_store import FaqEntries, FaqHit, FaqStore, iter_entries, tokenize
+
+# Default cosine similarity a hit needs to be returned
+MIN_SIMILARITY = 0.32
+
+# Rows scored per block, to bound memory when scanning a memory-mapped matrix
+BLOCK_ROWS = 65_536
+
+
+class HashingVectorizer:
+    """
+    Embeds text as L2-normalized, signed feature-hashed counts of word
+    unigrams and character n-grams, so related word forms ("refund",
+    "refunds", "refunded") land close together.
+    """
+    
+    def __init__(self, n_features: int = 2 ** 12, ngram_min: int = 3, ngram_max: int = 5):
+        self.n_features = n_features
+        self.ngram_min = ngram_min
+        self.ngram_max = ngram_max
+    
+    def features(self, text: str) -> List[str]:
+        """The word and character n-gram features of a text."""
+        features = []
+        for word in tokenize(text):
+            features.append(f"w:{word}")
+            padded = f" {word} "
+            for n in range(self.ngram_min, self.ngram_max + 1):
+                features.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+        return features
+    
+    def transform(self, texts: Sequence[str]) -> np.ndarray:
+        """Embed texts into a (len(texts), n_features) float32 matrix."""
+        matrix = np.zeros((len(texts), self.n_features), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self.features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                matrix[row, h % self.n_features] += 1.0 if h & 0x80000000 else -1.0
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+    
+    def params(self) -> Dict[str, int]:
+        return {"n_features": self.n_features, "ngram_min": self.ngram_min, "ngram_max": self.ngram_max}
+
+
+class SemanticFaqStore(FaqStore):
+    """
+    Cosine-similarity FAQ store over hashed n-gram embeddings.
+    
+    Each entry is embedded from its topic, title and answer, plus any extra
+    phrasings of the question; an entry scores as its best-matching row.
+    """
+    
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        row_entries: np.ndarray,
+        entries: List[Dict[str, str]],
+        vectorizer: Optional[HashingVectorizer] = None,
+        min_similarity: float = MIN_SIMILARITY,
+    ):
+        self.vectors = vectors
+        self.row_entries = row_entries
+        self.entries = entries
+        self.vectorizer = vectorizer or HashingVectorizer(n_features=vectors.shape[1])
+        self.min_similarity = min_similarity
+        self._max_rows_per_entry = int(np.bincount(row_entries).max()) if len(row_entries) else 1
+    
+    @classmethod
+    def from_faqs(
+        cls,
+        faqs: FaqEntries,
+        phrasings: Optional[Mapping[str, List[str]]] = None,
+        vectorizer: Optional[HashingVectorizer] = None,
+        **kwargs,
+    ) -> "SemanticFaqStore":
+        """
+        Embed FAQ entries.
+        
+        Args:
+            faqs: Entries like FAQ_DATABASE
+            phrasings: Optional extra ways of asking, keyed by topic
+            vectorizer: Vectorizer to use (default: HashingVectorizer())
+        """
+        vectorizer = vectorizer or HashingVectorizer()
+        entries, texts, row_entries = [], [], []
+        for entry_id, (topic, entry) in enumerate(iter_entries(faqs)):
+            entries.append({"topic": topic, **entry})
+            for text in [f"{topic} {entry['source_title']} {entry['answer']}", *(phrasings or {}).get(topic, [])]:
+                texts.append(text)
+                row_entries.append(entry_id)
+        return cls(
+            vectorizer.transform(texts),
+            np.array(row_entries, dtype=np.int32),
+            entries,
+            vectorizer,
+            **kwargs,
+        )
+    
+    def save(self, directory: str):
+        """Write the index to a directory (vectors.npy, rows.npy, entries.json)."""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "vectors.npy"), np.asarray(self.vectors))
+        np.save(os.path.join(directory, "rows.npy"), np.asarray(self.row_entries))
+        with open(os.path.join(directory, "entries.json"), "w") as f:
+            json.dump({"vectorizer": self.vectorizer.params(), "entries": self.entries}, f)
+    
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True, **kwargs) -> "SemanticFaqStore":
+        """Load an index written by save(); the vectors are memory-mapped by default."""
+        mode = "r" if mmap else None
+        with open(os.path.join(directory, "entries.json")) as f:
+            meta = json.load(f)
+        return cls(
+            np.load(os.path.join(directory, "vectors.npy"), mmap_mode=mode),
+            np.load(os.path.join(directory, "rows.npy")),
+            meta["entries"],
+            HashingVectorizer(**meta["vectorizer"]),
+            **kwargs,
+        )
+    
+    def search(self, query: str, k: int = 5) -> List[FaqHit]:
+        return self.search_batch([query], k=k)[0]
+    
+    def search_batch(self, queries: Sequence[str], k: int = 5) -> List[List[FaqHit]]:
+        """
+        Find the top-k entries for many queries with one matrix product per block.
+        
+        Returns:
+            One list of hits per query, best first, all above min_similarity
+        """
+        if not queries or not len(self.row_entries):
+            return [[] for _ in queries]
+        
+        q = self.vectorizer.transform(queries)
+        # Enough rows that k distinct entries survive de-duplication
+        candidates = min(k * self._max_rows_per_entry, len(self.row_entries))
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        
+        for start in range(0, len(self.row_entries), BLOCK_ROWS):
+            block = np.asarray(self.vectors[start:start + BLOCK_ROWS])
+            scores = np.concatenate([best_scores, q @ block.T], axis=1)
+            rows = np.concatenate([
+                best_rows,
+                np.broadcast_to(np.arange(start, start + len(block)), (len(queries), len(block))),
+            ], axis=1)
+            if scores.shape[1] > candidates:
+                top = np.argpartition(-scores, candidates - 1, axis=1)[:, :candidates]
+                scores = np.take_along_axis(scores, top, axis=1)
+                rows = np.take_along_axis(rows, top, axis=1)
+            best_scores, best_rows = scores, rows
+        
+        results = []
+        for scores, rows in zip(best_scores, best_rows):
+            hits, seen = [], set()
+            for i in np.argsort(-scores, kind="stable"):
+                if scores[i] < self.min_similarity or len(hits) == k:
+                    break
+                entry_id = int(self.row_entries[rows[i]])
+                if entry_id in seen:
+                    continue
+                seen.add(entry_id)
+                entry = self.entries[entry_id]
+                hits.append(FaqHit(entry["topic"], entry["answer"], entry["source_title"], float(scores[i])))
+            results.append(hits)
+        return results
+    
+    def topics(self, limit: Optional[int] = None) -> List[str]:
+        return [entry["topic"] for entry in self.entries[:limit]]
@@ -0,0 +1,47 @@
+"""
+Trip-planning tools: flight, hotel and activity search over an indexed
+NumPy inventory, a budget-constrained itinerary optimizer, and a planning
+stage that runs a trip's searches concurrently before the model is called.
+Submodules are imported on first attribute access, as in src.tools.
+"""
+
+import importlib
+from typing import Any
+
+# Where each public name lives
+_EXPORTS = {
+    "TravelInventory": "inventory",
+    "get_inventory": "inventory",
+    "set_inventory": "inventory",
+    "execute_search_flights": "search",
+    "execute_search_hotels": "search",
+    "execute_search_activities": "search",
+    "TripPreferences": "preferences",
+    "Plan": "optimizer",
+    "plan_itinerary": "optimizer",
+    "execute_optimize_itinerary": "optimizer",
+    "TripSearchCache": "pipeline",
+    "asearch_trip": "pipeline",
+    "search_trip": "pipeline",
+    "plan_trip": "pipeline",
+    "search_flights": "schemas",
+    "search_hotels": "schemas",
+    "search_activities": "schemas",
+    "optimize_itinerary": "schemas",
+    "TRAVEL_TOOLS": "schemas",
+    "TRAVEL_REGISTRY": "schemas",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{_EXPORTS[name]}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,369 @@
+# src/travel/inventory.py
+"""
+Travel inventory for the trip-planning tools: flights, hotels and activities
+as NumPy structured arrays.
+
+Rows are sorted by their index key (flight route, hotel city, or activity
+city and category) and by price within a key, and an offsets array (CSR
+style) gives the row range of every key. A search is then a slice of its
+key's rows, a searchsorted on their price column for max_price, and the
+cheapest first rows of what is left: the cost depends on the page size,
+not on the size of the inventory.
+
+Inventories are saved as a directory of .npy files plus meta.json (the
+name vocabularies) and loaded memory-mapped, so a process opening millions
+of rows reads only the pages its queries touch.
+"""
+
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+
+# Bump when the on-disk layout changes
+INVENTORY_VERSION = 1
+
+FLIGHT_DTYPE = np.dtype([
+    ("route", "<i4"),      # origin * len(cities) + destination
+    ("price", "<f4"),
+    ("duration", "<f4"),   # hours
+    ("stops", "<i1"),
+    ("airline", "<i2"),
+])
+
+HOTEL_DTYPE = np.dtype([
+    ("city", "<i4"),
+    ("price", "<f4"),      # per night
+    ("rating", "<f4"),
+    ("name", "<i4"),
+])
+
+ACTIVITY_DTYPE = np.dtype([
+    ("key", "<i4"),        # city * len(categories) + category
+    ("price", "<f4"),
+    ("rating", "<f4"),
+    ("name", "<i4"),
+])
+
+TABLES = ("flights", "hotels", "activities")
+
+CITIES = [
+    "San Francisco", "New York", "Los Angeles", "Chicago", "Seattle", "Boston", "Miami",
+    "Toronto", "Vancouver", "Mexico City", "Sao Paulo", "Buenos Aires", "London", "Paris",
+    "Berlin", "Madrid", "Barcelona", "Rome", "Amsterdam", "Lisbon", "Vienna", "Prague",
+    "Istanbul", "Dubai", "Cairo", "Cape Town", "Nairobi", "Mumbai", "Delhi", "Bangkok",
+    "Singapore", "Hong Kong", "Seoul", "Tokyo", "Osaka", "Beijing", "Shanghai", "Sydney",
+    "Melbourne", "Auckland",
+]
+
+AIRLINES = [
+    "SkyWays", "BudgetWings", "Pacific Air", "Atlas Airlines", "Northern Star", "Coastal Jet",
+    "Meridian", "AeroLink", "Horizon Express", "Blue Crane",
+]
+
+CATEGORIES = ["food", "culture", "nature", "nightlife", "shopping", "adventure", "wellness", "history"]
+
+HOTEL_PREFIXES = ["Budget", "City", "Grand", "Boutique", "Harbor", "Royal", "Garden", "Sky", "Central", "Riverside"]
+HOTEL_SUFFIXES = ["Inn", "Hotel", "Palace", "Stay", "Suites", "Lodge", "Hostel", "Residence"]
+
+ACTIVITY_NAMES = {
+    "food": ["Food Market Tour", "Cooking Class", "Street Food Walk", "Wine Tasting", "Tea Ceremony"],
+    "culture": ["Art Museum", "Temple Visit", "Theater Show", "Architecture Walk", "Gallery Pass"],
+    "nature": ["Mountain Hike", "Botanical Garden", "River Cruise", "Bird Watching", "Sunrise Trek"],
+    "nightlife": ["Jazz Bar Crawl", "Rooftop Lounge", "Night Market", "Live Music Club", "Karaoke Night"],
+    "shopping": ["Vintage Market", "Design District Tour", "Outlet Trip", "Craft Workshop", "Flea Market"],
+    "adventure": ["Kayak Tour", "Zipline Park", "Bike Tour", "Rock Climbing", "Scuba Intro"],
+    "wellness": ["Spa Day", "Yoga Class", "Hot Spring Visit", "Massage", "Meditation Retreat"],
+    "history": ["Old Town Tour", "Castle Visit", "War Museum", "Ruins Excursion", "Historic Walk"],
+}
+
+# Rows of the default generated inventory
+DEFAULT_FLIGHTS = 200_000
+DEFAULT_HOTELS = 100_000
+DEFAULT_ACTIVITIES = 100_000
+
+
+@dataclass(frozen=True)
+class Page:
+    """One page of search results: the rows, and how many match in all."""
+    rows: np.ndarray
+    total: int
+    offset: int
+    
+    @property
+    def has_more(self) -> bool:
+        return self.offset + len(self.rows) < self.total
+
+
+def _offsets(keys: np.ndarray, key_count: int) -> np.ndarray:
+    """Row range of every key in key-sorted rows: key k is rows offsets[k]:offsets[k + 1]."""
+    return np.searchsorted(keys, np.arange(key_count + 1), side="left").astype(np.int64)
+
+
+def _sort(rows: np.ndarray, key: str) -> np.ndarray:
+    """Rows sorted by key, then price."""
+    return rows[np.lexsort((rows["price"], rows[key]))]
+
+
+class TravelInventory:
+    """
+    Flights, hotels and activities, indexed for the search tools.
+    
+    Create one with generate() (synthetic), from_arrays() or load() (a saved
+    directory, memory-mapped). City names are matched case-insensitively.
+    """
+    
+    def __init__(
+        self,
+        flights: np.ndarray,
+        hotels: np.ndarray,
+        activities: np.ndarray,
+        cities: Sequence[str],
+        airlines: Sequence[str],
+        categories: Sequence[str],
+        hotel_names: Sequence[str],
+        activity_names: Sequence[str],
+        offsets: Optional[Dict[str, np.ndarray]] = None,
+    ):
+        """
+        Args:
+            flights, hotels, activities: Rows of FLIGHT_DTYPE, HOTEL_DTYPE and
+                ACTIVITY_DTYPE, sorted by key and price (see from_arrays())
+            cities, airlines, categories, hotel_names, activity_names: Vocabularies
+                the rows' integer columns index into
+            offsets: Row range of every key per table (computed if not given)
+        """
+        self.flights = flights
+        self.hotels = hotels
+        self.activities = activities
+        self.cities = list(cities)
+        self.airlines = list(airlines)
+        self.categories = list(categories)
+        self.hotel_names = list(hotel_names)
+        self.activity_names = list(activity_names)
+        self._city_ids = {name.lower(): i for i, name in enumerate(self.cities)}
+        self._category_ids = {name.lower(): i for i, name in enumerate(self.categories)}
+        if offsets is None:
+            n_cities, n_categories = len(self.cities), len(self.categories)
+            offsets = {
+                "flights": _offsets(flights["route"], n_cities * n_cities),
+                "hotels": _offsets(hotels["city"], n_cities),
+                "activities": _offsets(activities["key"], n_cities * n_categories),
+            }
+        self.offsets = offsets
+    
+    @classmethod
+    def from_arrays(cls, flights: np.ndarray, hotels: np.ndarray, activities: np.ndarray, **vocabularies) -> "TravelInventory":
+        """An inventory from unsorted rows; sorts them by key and price."""
+        return cls(_sort(flights, "route"), _sort(hotels, "city"), _sort(activities, "key"), **vocabularies)
+    
+    @classmethod
+    def generate(
+        cls,
+        flights: int = DEFAULT_FLIGHTS,
+        hotels: int = DEFAULT_HOTELS,
+        activities: int = DEFAULT_ACTIVITIES,
+        seed: int = 0,
+    ) -> "TravelInventory":
+        """
+        A synthetic inventory over CITIES with plausible prices: fares grow
+        with a per-route distance and fall with stops, hotel prices grow
+        with rating.
+        """
+        rng = np.random.default_rng(seed)
+        n_cities, n_categories = len(CITIES), len(CATEGORIES)
+        
+        origin = rng.integers(0, n_cities, flights)
+        destination = (origin + rng.integers(1, n_cities, flights)) % n_cities
+        route = origin * n_cities + destination
+        distance = rng.uniform(2.0, 16.0, n_cities * n_cities)[route]
+        stops = rng.choice(3, flights, p=[0.5, 0.35, 0.15])
+        flight_rows = np.empty(flights, FLIGHT_DTYPE)
+        flight_rows["route"] = route
+        flight_rows["stops"] = stops
+        flight_rows["duration"] = np.round(distance * (1 + 0.3 * stops) + rng.uniform(0, 2, flights), 1)
+        flight_rows["price"] = np.round(distance * 55 * (1 - 0.2 * stops) * rng.lognormal(0, 0.25, flights))
+        flight_rows["airline"] = rng.integers(0, len(AIRLINES), flights)
+        
+        hotel_rows = np.empty(hotels, HOTEL_DTYPE)
+        rating = np.round(rng.uniform(2.5, 5.0, hotels), 1)
+        hotel_rows["city"] = rng.integers(0, n_cities, hotels)
+        hotel_rows["rating"] = rating
+        hotel_rows["price"] = np.round(20 * np.exp(0.6 * (rating - 2.5)) * rng.lognormal(0.5, 0.35, hotels))
+        hotel_names = [f"{p} {s}" for p in HOTEL_PREFIXES for s in HOTEL_SUFFIXES]
+        hotel_rows["name"] = rng.integers(0, len(hotel_names), hotels)
+        
+        activity_names = [name for category in CATEGORIES for name in ACTIVITY_NAMES[category]]
+        per_category = len(activity_names) // n_categories
+        category = rng.integers(0, n_categories, activities)
+        activity_rows = np.empty(activities, ACTIVITY_DTYPE)
+        activity_rows["key"] = rng.integers(0, n_cities, activities) * n_categories + category
+        activity_rows["price"] = np.round(rng.lognormal(3.2, 0.7, activities))
+        activity_rows["rating"] = np.round(rng.uniform(3.0, 5.0, activities), 1)
+        activity_rows["name"] = category * per_category + rng.integers(0, per_category, activities)
+        
+        return cls.from_arrays(
+            flight_rows, hotel_rows, activity_rows,
+            cities=CITIES, airlines=AIRLINES, categories=CATEGORIES,
+            hotel_names=hotel_names, activity_names=activity_names,
+        )
+    
+    def save(self, path: str):
+        """Write the inventory to a directory (created if missing), for load()."""
+        os.makedirs(path, exist_ok=True)
+        for table in TABLES:
+            np.save(os.path.join(path, f"{table}.npy"), getattr(self, table))
+            np.save(os.path.join(path, f"{table}_offsets.npy"), self.offsets[table])
+        meta = {
+            "version": INVENTORY_VERSION,
+            "cities": self.cities,
+            "airlines": self.airlines,
+            "categories": self.categories,
+            "hotel_names": self.hotel_names,
+            "activity_names": self.activity_names,
+        }
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(meta, f)
+    
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "TravelInventory":
+        """
+        Open an inventory written by save().
+        
+        Args:
+            path: The inventory directory
+            mmap: Memory-map the row arrays instead of reading them into memory
+        """
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("version") != INVENTORY_VERSION:
+            raise ValueError(f"Inventory {path} has version {meta.get('version')}, expected {INVENTORY_VERSION}")
+        mode = "r" if mmap else None
+        tables = {table: np.load(os.path.join(path, f"{table}.npy"), mmap_mode=mode) for table in TABLES}
+        offsets = {table: np.load(os.path.join(path, f"{table}_offsets.npy")) for table in TABLES}
+        return cls(
+            **tables,
+            cities=meta["cities"],
+            airlines=meta["airlines"],
+            categories=meta["categories"],
+            hotel_names=meta["hotel_names"],
+            activity_names=meta["activity_names"],
+            offsets=offsets,
+        )
+    
+    def __len__(self) -> int:
+        return len(self.flights) + len(self.hotels) + len(self.activities)
+    
+    def city_id(self, city: str) -> Optional[int]:
+        return self._city_ids.get(" ".join(city.lower().split()))
+    
+    def category_id(self, category: str) -> Optional[int]:
+        return self._category_ids.get(category.strip().lower())
+    
+    def _priced(self, table: str, key: int, max_price: Optional[float]) -> Tuple[int, int]:
+        """Row range of a key's rows priced at most max_price."""
+        offsets = self.offsets[table]
+        start, end = int(offsets[key]), int(offsets[key + 1])
+        if max_price is not None and start < end:
+            prices = getattr(self, table)["price"][start:end]
+            # A Python float would make searchsorted cast (copy) the whole float32 range
+            end = start + int(np.searchsorted(prices, prices.dtype.type(max_price), side="right"))
+        return start, end
+    
+    def search_flights(
+        self, origin: str, destination: str, max_price: Optional[float] = None, limit: int = 10, offset: int = 0
+    ) -> Optional[Page]:
+        """
+        Cheapest flights on a route.
+        
+        Returns:
+            A page of FLIGHT_DTYPE rows, or None if a city is unknown
+        """
+        o, d = self.city_id(origin), self.city_id(destination)
+        if o is None or d is None:
+            return None
+        start, end = self._priced("flights", o * len(self.cities) + d, max_price)
+        rows = self.flights[min(start + offset, end):min(start + offset + limit, end)]
+        return Page(rows, end - start, offset)
+    
+    def search_hotels(
+        self,
+        city: str,
+        max_price: Optional[float] = None,
+        min_rating: Optional[float] = None,
+        limit: int = 10,
+        offset: int = 0,
+    ) -> Optional[Page]:
+        """
+        Cheapest hotels in a city, optionally rated at least min_rating.
+        
+        Returns:
+            A page of HOTEL_DTYPE rows, or None if the city is unknown
+        """
+        c = self.city_id(city)
+        if c is None:
+            return None
+        start, end = self._priced("hotels", c, max_price)
+        if min_rating is None:
+            rows = self.hotels[min(start + offset, end):min(start + offset + limit, end)]
+            return Page(rows, end - start, offset)
+        matching = np.flatnonzero(self.hotels["rating"][start:end] >= min_rating)
+        return Page(self.hotels[start + matching[offset:offset + limit]], len(matching), offset)
+    
+    def search_activities(
+        self, city: str, interests: Sequence[str], max_price: Optional[float] = None, limit: int = 10, offset: int = 0
+    ) -> Optional[Page]:
+        """
+        Cheapest activities in a city in any of the given categories.
+        Unknown categories are ignored.
+        
+        Returns:
+            A page of ACTIVITY_DTYPE rows, or None if the city is unknown
+        """
+        c = self.city_id(city)
+        if c is None:
+            return None
+        categories = {i for i in map(self.category_id, interests) if i is not None}
+        ranges = [self._priced("activities", c * len(self.categories) + i, max_price) for i in sorted(categories)]
+        total = sum(end - start for start, end in ranges)
+        if len(ranges) == 1:
+            start, end = ranges[0]
+            return Page(self.activities[min(start + offset, end):min(start + offset + limit, end)], total, offset)
+        # Each range is price-sorted, so the page is among the first offset + limit rows of each
+        candidates = [self.activities[start:min(end, start + offset + limit)] for start, end in ranges]
+        merged = np.concatenate(candidates) if candidates else self.activities[:0]
+        order = np.argsort(merged["price"], kind="stable")
+        return Page(merged[order[offset:offset + limit]], total, offset)
+
+
+_inventory: Optional[TravelInventory] = None
+_inventory_lock = threading.Lock()
+
+
+def set_inventory(inventory: Optional[TravelInventory]):
+    """Use a different inventory for the travel tools, or None to go back to the default one."""
+    global _inventory
+    _inventory = inventory
+    
+    # Memoized results came from the previous inventory
+    from src.tools.memo import TOOL_MEMO
+    from src.travel.search import INVENTORY_TOOLS
+    for name in INVENTORY_TOOLS:
+        TOOL_MEMO.invalidate(name)
+    from src.travel.pipeline import TRIP_SEARCH_CACHE
+    TRIP_SEARCH_CACHE.clear()
+
+
+def get_inventory() -> TravelInventory:
+    """
+    The shared inventory: the directory named by TRAVEL_INVENTORY, memory-mapped,
+    or else a generated one, created on first use.
+    """
+    global _inventory
+    with _inventory_lock:
+        if _inventory is None:
+            path = os.getenv("TRAVEL_INVENTORY")
+            _inventory = TravelInventory.load(path) if path else TravelInventory.generate()
+        return _inventory
@@ -0,0 +1,339 @@
+# src/travel/optimizer.py
+"""
+Budget-constrained itinerary optimizer.
+Picks one flight, one hotel for the stay and up to `activities_per_day`
+activities per day, maximizing a utility built from ratings, interests and
+flight convenience, with the total cost within the trip budget.
+
+The activity choice is a 0/1 knapsack with a cardinality limit, solved
+once by dynamic programming over (activities chosen, budget spent): the
+table gives the best activity set for every remaining budget. Every
+flight/hotel pair is then scored at once with NumPy by reading the table
+at the money the pair leaves, and the best pairs are expanded into plans.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from src.travel.inventory import TravelInventory
+from src.travel.preferences import TripPreferences
+
+# Rows of each kind read from the inventory, cheapest first; the candidates
+# are those no cheaper row beats (see pareto())
+CANDIDATE_SCAN = 5000
+
+# Utility lost per flight stop and per hour of flying
+FLIGHT_STOP_PENALTY = 1.0
+FLIGHT_HOUR_PENALTY = 0.1
+
+# Interest weight of an activity: 1 for the first interest listed, then
+# 1 / (1 + INTEREST_DECAY * rank)
+INTEREST_DECAY = 0.25
+
+# Largest budget resolution of the knapsack table; bigger budgets are
+# counted in coarser units (costs rounded up, so plans never go over)
+DP_MAX_UNITS = 4000
+
+# Longest trip the tool plans, in days
+MAX_TRIP_DAYS = 30
+
+
+@dataclass
+class Plan:
+    """One itinerary: rows of the inventory tables, and what they cost."""
+    flight: np.void
+    hotel: np.void
+    activities: List[np.void]
+    days: List[List[np.void]]
+    nights: int
+    total_cost: float
+    score: float
+    
+    @property
+    def flight_cost(self) -> float:
+        return float(self.flight["price"])
+    
+    @property
+    def hotel_cost(self) -> float:
+        return float(self.hotel["price"]) * self.nights
+    
+    @property
+    def activity_cost(self) -> float:
+        return float(sum(a["price"] for a in self.activities))
+
+
+def pareto(prices: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Indices of the rows worth considering: those with a higher value than
+    every cheaper row. prices must be sorted ascending.
+    """
+    if not len(values):
+        return np.zeros(0, dtype=np.int64)
+    running = np.maximum.accumulate(values)
+    return np.flatnonzero(np.r_[True, values[1:] > running[:-1]])
+
+
+def knapsack_table(
+    costs: np.ndarray,
+    values: np.ndarray,
+    max_items: int,
+    capacity: int,
+    groups: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    0/1 knapsack with at most max_items items, for every capacity up to
+    `capacity`, taking at most one item of each group (so max_items is
+    capped at the number of groups).
+    
+    Args:
+        costs: Integer cost of each item
+        values: Value of each item (positive)
+        max_items: Most items in a set
+        capacity: Largest total cost
+        groups: Group of each item, items of a group adjacent (default: one group per item)
+    
+    Returns:
+        (best, take): best[k, c] is the largest value of exactly k items
+        costing at most c (-inf if none); take[i, k, c] marks that item i
+        improved best[k, c], for backtrack()
+    """
+    ranges = _group_ranges(len(costs), groups)
+    max_items = min(max_items, len(ranges))
+    best = np.full((max_items + 1, capacity + 1), -np.inf)
+    best[0, :] = 0.0
+    take = np.zeros((len(costs), max_items + 1, capacity + 1), dtype=bool)
+    if max_items == 0:
+        return best, take
+    for start, end in ranges:
+        # Items of a group all extend the table from before the group, so at most one is used
+        before = best.copy()
+        for i in range(start, end):
+            cost = int(costs[i])
+            if cost > capacity:
+                continue
+            candidate = before[:-1, :capacity + 1 - cost] + values[i]
+            improved = candidate > best[1:, cost:]
+            best[1:, cost:] = np.where(improved, candidate, best[1:, cost:])
+            take[i, 1:, cost:] = improved
+    return best, take
+
+
+def backtrack(
+    take: np.ndarray,
+    costs: np.ndarray,
+    items: int,
+    capacity: int,
+    groups: Optional[np.ndarray] = None,
+) -> List[int]:
+    """Indices of the items of the best set of `items` items costing at most `capacity`."""
+    chosen = []
+    for start, end in reversed(_group_ranges(len(costs), groups)):
+        if items == 0:
+            break
+        # The last item of the group that improved the state is the one kept
+        for i in range(end - 1, start - 1, -1):
+            if take[i, items, capacity]:
+                chosen.append(i)
+                items -= 1
+                capacity -= int(costs[i])
+                break
+    return chosen[::-1]
+
+
+def _group_ranges(count: int, groups: Optional[np.ndarray]) -> List[Tuple[int, int]]:
+    if groups is None:
+        return [(i, i + 1) for i in range(count)]
+    bounds = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1], True]) if count else np.zeros(1, dtype=np.int64)
+    return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+def flight_scores(flights: np.ndarray) -> np.ndarray:
+    return -(FLIGHT_STOP_PENALTY * flights["stops"] + FLIGHT_HOUR_PENALTY * flights["duration"]).astype(np.float64)
+
+
+def optimize(
+    prefs: TripPreferences,
+    flights: np.ndarray,
+    hotels: np.ndarray,
+    activities: np.ndarray,
+    activity_values: np.ndarray,
+    activities_per_day: int = 2,
+    top_n: int = 3,
+    activity_groups: Optional[np.ndarray] = None,
+) -> List[Plan]:
+    """
+    The best plans within the budget of prefs.
+    
+    Args:
+        prefs: The trip (dates and budget)
+        flights, hotels, activities: Candidate rows (FLIGHT_DTYPE, HOTEL_DTYPE, ACTIVITY_DTYPE)
+        activity_values: Utility of each candidate activity
+        activity_groups: Group of each activity, at most one per group in a plan
+                         (e.g. offers of the same activity; adjacent)
+        activities_per_day: Most activities per day
+        top_n: Plans returned, each with a different flight/hotel pair
+    
+    Returns:
+        Up to top_n plans, best first; empty if no flight and hotel fit the budget
+    """
+    budget, nights, days = prefs.budget, prefs.nights, prefs.days
+    if not len(flights) or not len(hotels) or budget <= 0:
+        return []
+    unit = max(1, math.ceil(budget / DP_MAX_UNITS))
+    capacity = int(budget // unit)
+    
+    # Best activity value for every remaining budget (in units)
+    activity_costs = np.ceil(activities["price"].astype(np.float64) / unit).astype(np.int64)
+    best, take = knapsack_table(activity_costs, activity_values, activities_per_day * days, capacity, activity_groups)
+    best_items = np.argmax(best, axis=0)
+    best_value = best[best_items, np.arange(capacity + 1)]
+    
+    # Every flight/hotel pair at once
+    pair_cost = flights["price"].astype(np.float64)[:, None] + nights * hotels["price"].astype(np.float64)[None, :]
+    remaining = budget - pair_cost
+    affordable = remaining >= 0
+    remaining_units = np.where(affordable, remaining // unit, 0).astype(np.int64)
+    hotel_values = nights * hotels["rating"].astype(np.float64)
+    score = flight_scores(flights)[:, None] + hotel_values[None, :] + best_value[remaining_units]
+    score = np.where(affordable, score, -np.inf)
+    
+    # Best pairs first; cheaper first among equal scores
+    order = np.lexsort((pair_cost.ravel(), -score.ravel()))
+    plans = []
+    for flat in order[:top_n]:
+        if not np.isfinite(score.flat[flat]):
+            break
+        f, h = np.unravel_index(flat, score.shape)
+        units = int(remaining_units[f, h])
+        chosen = backtrack(take, activity_costs, int(best_items[units]), units, activity_groups)
+        picked = sorted(chosen, key=lambda i: -activity_values[i])
+        rows = [activities[i] for i in picked]
+        plans.append(Plan(
+            flight=flights[f],
+            hotel=hotels[h],
+            activities=rows,
+            days=[rows[d::days] for d in range(days)],
+            nights=nights,
+            total_cost=float(pair_cost[f, h] + sum(float(a["price"]) for a in rows)),
+            score=float(score[f, h]),
+        ))
+    return plans
+
+
+def plan_itinerary(
+    prefs: TripPreferences,
+    inventory: Optional[TravelInventory] = None,
+    activities_per_day: int = 2,
+    top_n: int = 3,
+) -> List[Plan]:
+    """
+    The best plans for a trip, with candidates from the inventory: the
+    flights, hotels and activity offers that fit the budget and that no
+    cheaper row beats on convenience or rating. A plan takes at most one
+    offer of each activity.
+    
+    Args:
+        prefs: The trip
+        inventory: Where to search (default: the shared inventory)
+        activities_per_day: Most activities per day
+        top_n: Plans returned
+    
+    Returns:
+        Up to top_n plans, best first; empty if a city is unknown or nothing fits
+    """
+    if inventory is None:
+        from src.travel.inventory import get_inventory
+        inventory = get_inventory()
+    budget = prefs.budget
+    flights = inventory.search_flights(prefs.origin, prefs.destination, budget, CANDIDATE_SCAN)
+    hotels = inventory.search_hotels(prefs.destination, budget / prefs.nights, None, CANDIDATE_SCAN)
+    activities = inventory.search_activities(prefs.destination, prefs.interests, budget, CANDIDATE_SCAN)
+    if flights is None or hotels is None:
+        return []
+    
+    flights = flights.rows[pareto(flights.rows["price"], flight_scores(flights.rows))]
+    hotels = hotels.rows[pareto(hotels.rows["price"], hotels.rows["rating"])]
+    
+    # Offers of each activity, grouped by name; per name, the price/rating frontier
+    rows = activities.rows
+    values = rows["rating"].astype(np.float64) * interest_weights(inventory, prefs.interests, rows)
+    order = np.lexsort((rows["price"], rows["name"]))
+    rows, values = rows[order], values[order]
+    keep = []
+    for start, end in _group_ranges(len(rows), rows["name"]):
+        keep.extend(start + pareto(rows["price"][start:end], values[start:end]))
+    keep = np.asarray(keep, dtype=np.int64)
+    rows, values = rows[keep], values[keep]
+    return optimize(prefs, flights, hotels, rows, values, activities_per_day, top_n, activity_groups=rows["name"])
+
+
+def interest_weights(inventory: TravelInventory, interests: Sequence[str], activities: np.ndarray) -> np.ndarray:
+    """Weight of each activity by the rank of its category among the interests."""
+    weight_by_category = np.zeros(len(inventory.categories))
+    for rank, interest in reversed(list(enumerate(interests))):
+        category = inventory.category_id(interest)
+        if category is not None:
+            weight_by_category[category] = 1.0 / (1.0 + INTEREST_DECAY * rank)
+    return weight_by_category[activities["key"] % len(inventory.categories)]
+
+
+def execute_optimize_itinerary(
+    origin: str,
+    destination: str,
+    start_date: str,
+    end_date: str,
+    budget_per_day: float,
+    interests: str,
+    activities_per_day: int = 2,
+    plans: int = 3,
+) -> str:
+    """Find the best plans for a trip within its budget, as a message."""
+    from datetime import date, timedelta
+    from src.travel.inventory import get_inventory
+    from src.travel.search import unknown_city
+    
+    inventory = get_inventory()
+    error = unknown_city(inventory, origin, destination)
+    if error:
+        return error
+    try:
+        start = date.fromisoformat(start_date)
+        if date.fromisoformat(end_date) < start:
+            return f"Error: The trip ends ({end_date}) before it starts ({start_date})."
+    except ValueError:
+        return f"Error: Invalid dates '{start_date}' to '{end_date}'. Use YYYY-MM-DD, e.g. '2025-04-10'."
+    days = (date.fromisoformat(end_date) - start).days + 1
+    if days > MAX_TRIP_DAYS:
+        return f"Error: The trip is {days} days long; plans cover at most {MAX_TRIP_DAYS} days. Plan it in parts."
+    
+    prefs = TripPreferences(
+        origin, destination, start_date, end_date, budget_per_day,
+        [i.strip() for i in interests.split(",") if i.strip()],
+    )
+    found = plan_itinerary(prefs, inventory, activities_per_day, plans)
+    header = (
+        f"{origin} → {destination}, {start_date} to {end_date} ({prefs.days} days, {prefs.nights} nights), "
+        f"budget ${prefs.budget:,.0f} (${budget_per_day:g}/day)"
+    )
+    if not found:
+        return f"No plan fits the budget: {header}. Try a higher budget or shorter trip."
+    
+    n_categories = len(inventory.categories)
+    text = f"Best {len(found)} plan(s) for {header}:\n"
+    for number, plan in enumerate(found, 1):
+        flight, hotel = plan.flight, plan.hotel
+        text += (
+            f"\nPlan {number}: total ${plan.total_cost:,.0f} (flight ${plan.flight_cost:,.0f}, "
+            f"hotel ${plan.hotel_cost:,.0f}, activities ${plan.activity_cost:,.0f}), "
+            f"${prefs.budget - plan.total_cost:,.0f} under budget\n"
+            f"- Flight: {inventory.airlines[flight['airline']]} ${flight['price']:.0f} | {flight['duration']:g}h | {flight['stops']} stops\n"
+            f"- Hotel: {inventory.hotel_names[hotel['name']]} ${hotel['price']:.0f}/night × {plan.nights} nights | Rating: {hotel['rating']:.1f}/5\n"
+        )
+        for day, activities in enumerate(plan.days):
+            listed = ", ".join(
+                f"{inventory.activity_names[a['name']]} ({inventory.categories[a['key'] % n_categories]}) ${a['price']:.0f}"
+                for a in activities
+            ) or "free time"
+            text += f"- Day {day + 1} ({start + timedelta(days=day)}): {listed}\n"
+    return text
@@ -0,0 +1,177 @@
+# src/travel/pipeline.py
+"""
+Trip-planning pipeline stage.
+The searches a trip needs (flights, hotels, activities, and the optimizer's
+plans) depend only on the TripPreferences, so they run concurrently before
+the model is called, instead of one per agent step. The model then gets one
+combined observation and a single turn to write the itinerary.
+
+Each search goes through the travel registry and the shared tool memo, so a
+later tool call with the same arguments is a memo hit. The combined
+observation is also kept per thread, so planning the same trip again in a
+thread does not search at all.
+"""
+
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from src.tools.memo import TOOL_MEMO, ToolMemo
+from src.travel.preferences import TripPreferences
+
+# Default maximum number of threads whose search results are kept
+TRIP_CACHE_MAX_THREADS = 1000
+
+# Searches run for every trip, in the order they appear in the observation
+TRIP_SEARCHES = ("search_flights", "search_hotels", "search_activities", "optimize_itinerary")
+
+
+def trip_search_calls(prefs: TripPreferences) -> Dict[str, Dict[str, Any]]:
+    """
+    Arguments of each trip search, derived from the preferences.
+    The flight may use the whole budget; a night or an activity at most a day's budget.
+    """
+    interests = ", ".join(prefs.interests)
+    return {
+        "search_flights": {
+            "origin": prefs.origin, "destination": prefs.destination,
+            "date": prefs.start_date, "max_price": prefs.budget,
+        },
+        "search_hotels": {
+            "city": prefs.destination, "checkin": prefs.start_date,
+            "checkout": prefs.end_date, "max_price": prefs.budget_per_day,
+        },
+        "search_activities": {
+            "city": prefs.destination, "interests": interests, "max_price": prefs.budget_per_day,
+        },
+        "optimize_itinerary": {
+            "origin": prefs.origin, "destination": prefs.destination, "start_date": prefs.start_date,
+            "end_date": prefs.end_date, "budget_per_day": prefs.budget_per_day, "interests": interests,
+        },
+    }
+
+
+class TripSearchCache:
+    """Combined search results per thread, least recently used evicted first."""
+    
+    def __init__(self, max_threads: int = TRIP_CACHE_MAX_THREADS):
+        self.max_threads = max_threads
+        self._entries: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, thread_id: str, key: str) -> Optional[str]:
+        """The thread's observation, if it was gathered for the same searches."""
+        with self._lock:
+            entry = self._entries.get(thread_id)
+            if entry is None or entry[0] != key:
+                return None
+            self._entries.move_to_end(thread_id)
+            return entry[1]
+    
+    def put(self, thread_id: str, key: str, observation: str):
+        with self._lock:
+            self._entries[thread_id] = (key, observation)
+            self._entries.move_to_end(thread_id)
+            while len(self._entries) > self.max_threads:
+                self._entries.popitem(last=False)
+    
+    def clear(self, thread_id: Optional[str] = None):
+        """Drop the results of one thread, or of every thread."""
+        with self._lock:
+            if thread_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(thread_id, None)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Shared by every caller in the process; set_inventory() clears it
+TRIP_SEARCH_CACHE = TripSearchCache()
+
+
+async def _arun_search(registry: Any, memo: Optional[ToolMemo], name: str, args: Dict[str, Any]) -> str:
+    """Run one search on a worker thread, through the memo when the tool has a policy."""
+    try:
+        tool_args = registry.validate(name, args)
+        tool = registry.get(name)
+        run = lambda: asyncio.to_thread(tool.invoke, tool_args)
+        policy = registry.memo_policy(name)
+        if policy is None or memo is None:
+            return await run()
+        return await memo.acall(name, tool_args, policy, run)
+    except Exception as e:
+        return f"Error executing {name}: {str(e)}"
+
+
+async def asearch_trip(
+    prefs: TripPreferences,
+    thread_id: str = "default",
+    registry: Optional[Any] = None,
+    memo: Optional[ToolMemo] = TOOL_MEMO,
+    cache: Optional[TripSearchCache] = TRIP_SEARCH_CACHE,
+) -> str:
+    """
+    Run every trip search concurrently and combine the results.
+    
+    Args:
+        prefs: The trip
+        thread_id: Conversation the results are cached for
+        registry: Tools to run (default: TRAVEL_REGISTRY)
+        memo: Cache for the results of single searches (None disables it)
+        cache: Cache for the combined results per thread (None disables it)
+    
+    Returns:
+        One observation with the results of every search, in TRIP_SEARCHES order
+    """
+    if registry is None:
+        from src.travel.schemas import TRAVEL_REGISTRY
+        registry = TRAVEL_REGISTRY
+    all_calls = trip_search_calls(prefs)
+    calls = {name: all_calls[name] for name in TRIP_SEARCHES if name in registry}
+    key = json.dumps(calls, sort_keys=True, default=str)
+    if cache is not None:
+        cached = cache.get(thread_id, key)
+        if cached is not None:
+            return cached
+    
+    results = await asyncio.gather(*[_arun_search(registry, memo, name, args) for name, args in calls.items()])
+    sections = [f"[{name}]\n{result.strip()}" for name, result in zip(calls, results)]
+    observation = f"Search results for the trip ({prefs.as_text()}):\n\n" + "\n\n".join(sections)
+    
+    if cache is not None and not any(result.startswith("Error") for result in results):
+        cache.put(thread_id, key, observation)
+    return observation
+
+
+def search_trip(prefs: TripPreferences, thread_id: str = "default", **kwargs) -> str:
+    """Blocking version of asearch_trip(), usable from notebooks and scripts."""
+    from src.agent.loop import _run_coroutine_sync
+    return _run_coroutine_sync(asearch_trip(prefs, thread_id, **kwargs))
+
+
+def plan_trip(agent: Any, prefs: TripPreferences, thread_id: str = "default", verbose: bool = False, **kwargs) -> str:
+    """
+    Plan a trip in one model turn: search first, then hand the results to the agent.
+    
+    Args:
+        agent: A ToolUsingAgent, or a SessionManager (thread_id is then the session id)
+        prefs: The trip
+        thread_id: Conversation the plan and the search results belong to
+        verbose: Print the agent's progress
+        **kwargs: Passed to asearch_trip() (registry, memo, cache)
+    
+    Returns:
+        The agent's itinerary
+    """
+    from src.agent.sessions import SessionManager
+    observation = search_trip(prefs, thread_id, **kwargs)
+    message = (
+        f"Plan a trip: {prefs.as_text()}. The searches below were already run for this trip; "
+        f"create an itinerary from them, and only call a tool for anything they do not cover.\n\n{observation}"
+    )
+    if isinstance(agent, SessionManager):
+        return agent.run(thread_id, message, verbose=verbose)
+    return agent.run(message, verbose=verbose)
@@ -0,0 +1,36 @@
+# src/travel/preferences.py
+"""
+What a traveler asks for, as in the trip-planning notebook.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import List
+
+
+@dataclass
+class TripPreferences:
+    origin: str
+    destination: str
+    start_date: str
+    end_date: str
+    budget_per_day: float
+    interests: List[str] = field(default_factory=list)
+    
+    def as_text(self) -> str:
+        return f"From: {self.origin} | To: {self.destination} | Dates: {self.start_date} to {self.end_date} | Budget: ${self.budget_per_day}/day | Interests: {', '.join(self.interests)}"
+    
+    @property
+    def days(self) -> int:
+        """Days of the trip, first and last included."""
+        return max((date.fromisoformat(self.end_date) - date.fromisoformat(self.start_date)).days + 1, 1)
+    
+    @property
+    def nights(self) -> int:
+        """Hotel nights (at least one)."""
+        return max(self.days - 1, 1)
+    
+    @property
+    def budget(self) -> float:
+        """Budget of the whole trip."""
+        return self.budget_per_day * self.days
@@ -0,0 +1,120 @@
+# src/travel/schemas.py
+"""
+Tool schemas of the trip-planning tools, with Pydantic input models like the
+built-in tools (see src/tools/schemas.py). TRAVEL_REGISTRY holds them; pass
+it as an agent's registry, or register its tools into another registry.
+"""
+
+from typing import Optional
+from langchain_core.tools import tool
+from pydantic import BaseModel, Field
+from src.tools.memo import MemoPolicy
+from src.tools.registry import ToolRegistry
+
+
+class SearchFlightsInput(BaseModel):
+    """Input schema for search_flights tool."""
+    origin: str = Field(description="Departure city (eg. 'San Francisco')")
+    destination: str = Field(description="Arrival city (eg. 'Tokyo')")
+    date: str = Field(description="Departure date, YYYY-MM-DD")
+    max_price: float = Field(default=10000, description="Highest fare in USD")
+    page: int = Field(default=0, ge=0, description="Page of results, 0 for the cheapest")
+
+
+class SearchHotelsInput(BaseModel):
+    """Input schema for search_hotels tool."""
+    city: str = Field(description="City to stay in (eg. 'Tokyo')")
+    checkin: str = Field(description="Check-in date, YYYY-MM-DD")
+    checkout: str = Field(description="Check-out date, YYYY-MM-DD")
+    max_price: float = Field(default=500, description="Highest price per night in USD")
+    min_rating: Optional[float] = Field(default=None, ge=0, le=5, description="Lowest guest rating, 0-5")
+    page: int = Field(default=0, ge=0, description="Page of results, 0 for the cheapest")
+
+
+class SearchActivitiesInput(BaseModel):
+    """Input schema for search_activities tool."""
+    city: str = Field(description="City of the activities (eg. 'Tokyo')")
+    interests: str = Field(description="Comma-separated interests (eg. 'food, culture'): food, culture, nature, nightlife, shopping, adventure, wellness, history")
+    max_price: float = Field(default=200, description="Highest price per person in USD")
+    page: int = Field(default=0, ge=0, description="Page of results, 0 for the cheapest")
+
+
+class OptimizeItineraryInput(BaseModel):
+    """Input schema for optimize_itinerary tool."""
+    origin: str = Field(description="Departure city (eg. 'San Francisco')")
+    destination: str = Field(description="City of the trip (eg. 'Tokyo')")
+    start_date: str = Field(description="First day of the trip, YYYY-MM-DD")
+    end_date: str = Field(description="Last day of the trip, YYYY-MM-DD; trips of up to 30 days")
+    budget_per_day: float = Field(gt=0, description="Budget per day in USD, for flight, hotel and activities together")
+    interests: str = Field(default="", description="Comma-separated interests, most important first (eg. 'food, culture')")
+    activities_per_day: int = Field(default=2, ge=0, le=4, description="Most activities per day")
+    plans: int = Field(default=3, ge=1, le=5, description="Number of plans to return")
+
+
+@tool(args_schema=SearchFlightsInput)
+def search_flights(origin: str, destination: str, date: str, max_price: float = 10000, page: int = 0) -> str:
+    """Search for flights between two cities, cheapest first.
+    
+    Returns airline, fare, duration and stops of each flight, one page at a time.
+    """
+    from src.travel.search import execute_search_flights
+    return execute_search_flights(origin, destination, date, max_price, page)
+
+
+@tool(args_schema=SearchHotelsInput)
+def search_hotels(city: str, checkin: str, checkout: str, max_price: float = 500, min_rating: Optional[float] = None, page: int = 0) -> str:
+    """Search for hotels in a city, cheapest first.
+    
+    Returns name, price per night and rating of each hotel, one page at a time.
+    """
+    from src.travel.search import execute_search_hotels
+    return execute_search_hotels(city, checkin, checkout, max_price, min_rating, page)
+
+
+@tool(args_schema=SearchActivitiesInput)
+def search_activities(city: str, interests: str, max_price: float = 200, page: int = 0) -> str:
+    """Search for activities in a city matching the traveler's interests, cheapest first.
+    
+    Returns name, category, price and rating of each activity, one page at a time.
+    """
+    from src.travel.search import execute_search_activities
+    return execute_search_activities(city, interests, max_price, page)
+
+
+@tool(args_schema=OptimizeItineraryInput)
+def optimize_itinerary(
+    origin: str,
+    destination: str,
+    start_date: str,
+    end_date: str,
+    budget_per_day: float,
+    interests: str = "",
+    activities_per_day: int = 2,
+    plans: int = 3,
+) -> str:
+    """Plan a whole trip within budget in one call: flight, hotel and activities per day.
+    
+    Use this tool instead of combining search results yourself. It picks the
+    best-rated combination that fits the total budget, weighting activities
+    by the traveler's interests, and returns the best few plans with their
+    costs per item and in total.
+    """
+    from src.travel.optimizer import execute_optimize_itinerary
+    return execute_optimize_itinerary(
+        origin, destination, start_date, end_date, budget_per_day, interests, activities_per_day, plans
+    )
+
+
+# Results depend only on the arguments and the inventory (set_inventory() invalidates them)
+MEMO_POLICIES = {
+    "search_flights": MemoPolicy.pure(),
+    "search_hotels": MemoPolicy.pure(),
+    "search_activities": MemoPolicy.pure(),
+    "optimize_itinerary": MemoPolicy.pure(),
+}
+
+TRAVEL_REGISTRY = ToolRegistry(
+    [search_flights, search_hotels, search_activities, optimize_itinerary], memo=MEMO_POLICIES
+)
+
+TRAVEL_TOOLS = TRAVEL_REGISTRY.tools()
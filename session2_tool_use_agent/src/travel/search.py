@@ -0,0 +1,80 @@
+# src/travel/search.py
+"""
+Execution logic of the travel search tools.
+Each function queries the shared TravelInventory and returns a clean
+message: the cheapest matching options first, one page at a time.
+Fares are not dated; the dates are only echoed back.
+"""
+
+from typing import Optional
+from src.travel.inventory import TravelInventory, get_inventory
+
+# Results per page
+PAGE_SIZE = 10
+
+# Tools whose memoized results come from the inventory
+INVENTORY_TOOLS = ("search_flights", "search_hotels", "search_activities", "optimize_itinerary")
+
+
+def unknown_city(inventory: TravelInventory, *cities: str) -> Optional[str]:
+    """Error message for the first city the inventory does not cover, if any."""
+    for city in cities:
+        if inventory.city_id(city) is None:
+            available = ", ".join(inventory.cities)
+            return f"Error: City '{city}' not found. Available cities: {available}."
+    return None
+
+
+def _page_footer(page, page_number: int) -> str:
+    if not page.has_more:
+        return ""
+    return f"More results: call again with page={page_number + 1}\n"
+
+
+def execute_search_flights(origin: str, destination: str, date: str, max_price: float = 10000, page: int = 0) -> str:
+    """Search flights on a route, cheapest first."""
+    inventory = get_inventory()
+    error = unknown_city(inventory, origin, destination)
+    if error:
+        return error
+    result = inventory.search_flights(origin, destination, max_price, PAGE_SIZE, page * PAGE_SIZE)
+    if not len(result.rows):
+        return "No flights found"
+    text = f"Flights {origin} → {destination} ({date}), {result.offset + 1}-{result.offset + len(result.rows)} of {result.total}:\n"
+    for row in result.rows:
+        text += f"- {inventory.airlines[row['airline']]}: ${row['price']:.0f} | {row['duration']:g}h | {row['stops']} stops\n"
+    return text + _page_footer(result, page)
+
+
+def execute_search_hotels(city: str, checkin: str, checkout: str, max_price: float = 500, min_rating: Optional[float] = None, page: int = 0) -> str:
+    """Search hotels in a city, cheapest first."""
+    inventory = get_inventory()
+    error = unknown_city(inventory, city)
+    if error:
+        return error
+    result = inventory.search_hotels(city, max_price, min_rating, PAGE_SIZE, page * PAGE_SIZE)
+    if not len(result.rows):
+        return "No hotels found"
+    text = f"Hotels in {city} ({checkin} to {checkout}), {result.offset + 1}-{result.offset + len(result.rows)} of {result.total}:\n"
+    for row in result.rows:
+        text += f"- {inventory.hotel_names[row['name']]}: ${row['price']:.0f}/night | Rating: {row['rating']:.1f}/5\n"
+    return text + _page_footer(result, page)
+
+
+def execute_search_activities(city: str, interests: str, max_price: float = 200, page: int = 0) -> str:
+    """Search activities in a city matching comma-separated interests, cheapest first."""
+    inventory = get_inventory()
+    error = unknown_city(inventory, city)
+    if error:
+        return error
+    interest_list = [i.strip().lower() for i in interests.split(",") if i.strip()]
+    result = inventory.search_activities(city, interest_list, max_price, PAGE_SIZE, page * PAGE_SIZE)
+    if not len(result.rows):
+        known = ", ".join(inventory.categories)
+        return f"No activities found. Interests can be: {known}"
+    n_categories = len(inventory.categories)
+    text = f"Activities in {city} ({interests}), {result.offset + 1}-{result.offset + len(result.rows)} of {result.total}:\n"
+    for row in result.rows:
+        category = inventory.categories[row["key"] % n_categories]
+        text += f"- {inventory.activity_names[row['name']]} ({category}): ${row['price']:.0f} | Rating: {row['rating']:.1f}/5\n"
+    return text + _page_footer(result, page)
@@ -0,0 +1,26 @@
+# tests/conftest.py
+"""
+Shared fixtures for the unit tests.
+Provides a scripted chat model so the agent loop can run without an API key.
+"""
+
+import pytest
+from src.agent.loop import ToolUsingAgent
+from src.agent.scripted import ScriptedChatModel
+from src.tools.memo import TOOL_MEMO
+
+
+@pytest.fixture
+def make_agent():
+    """Factory fixture: build an agent driven by the given scripted responses."""
+    def _make(*responses, **kwargs):
+        return ToolUsingAgent(llm=ScriptedChatModel(responses), **kwargs)
+    return _make
+
+
+@pytest.fixture(autouse=True)
+def clear_tool_memo():
+    """Start every test with an empty shared tool result cache."""
+    TOOL_MEMO.invalidate()
+    yield
+    TOOL_MEMO.invalidate()
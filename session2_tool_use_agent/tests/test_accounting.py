@@ -0,0 +1,153 @@
+# tests/test_accounting.py
+"""
+Unit tests for per-turn token accounting and token budgets.
+Uses a scripted chat model and the character-based token estimate, so no
+API key or tiktoken download is needed.
+
+Run with: uv run pytest tests/test_accounting.py -v
+"""
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from src.agent.accounting import TokenAccountant, TokenBudgetExceeded
+from src.agent.loop import ToolUsingAgent
+from src.agent.scripted import ScriptedChatModel, tool_call
+from src.agent.tokens import TokenCounter
+
+# No tiktoken: 4 characters per token
+COUNTER = TokenCounter(encoding_name="not-an-encoding")
+
+
+def usage(prompt, completion):
+    return {"input_tokens": prompt, "output_tokens": completion, "total_tokens": prompt + completion}
+
+
+def calc_turn(with_usage=True):
+    return (
+        AIMessage(
+            content="",
+            tool_calls=[tool_call("calc", {"expression": "2 + 2"}, "c1")],
+            usage_metadata=usage(800, 10) if with_usage else None,
+        ),
+        AIMessage(content="It is 4", usage_metadata=usage(900, 5) if with_usage else None),
+    )
+
+
+def budgeted_agent(*responses, **budgets):
+    accountant = TokenAccountant(counter=COUNTER, **budgets)
+    return ToolUsingAgent(llm=ScriptedChatModel(responses), accountant=accountant, tool_memo=None)
+
+
+class TestUsage:
+    """Every model call of a turn is counted."""
+    
+    def test_provider_usage(self):
+        agent = budgeted_agent(*calc_turn())
+        agent.run("What is 2 + 2?", verbose=False)
+        [turn] = agent.accountant.turns
+        assert len(turn.calls) == 2
+        assert (turn.prompt_tokens, turn.completion_tokens) == (1700, 15)
+        assert agent.accountant.session_tokens == 1715
+        assert turn.to_dict()["estimated"] is False
+    
+    def test_estimates_without_usage_metadata(self):
+        agent = budgeted_agent(*calc_turn(with_usage=False))
+        agent.run("What is 2 + 2?", verbose=False)
+        [turn] = agent.accountant.turns
+        assert all(c.source == "estimate" for c in turn.calls)
+        assert turn.calls[1].prompt_tokens > turn.calls[0].prompt_tokens > 0
+        assert turn.calls[1].completion_tokens == COUNTER.count_message(AIMessage(content="It is 4"))
+    
+    def test_prompt_breakdown(self):
+        agent = budgeted_agent(*calc_turn())
+        agent.run("What is 2 + 2?", verbose=False)
+        first, second = agent.accountant.turns[0].calls
+        assert first.breakdown.schemas == agent.accountant.schema_tokens(agent.registry) > 0
+        assert first.breakdown.history > 0 and first.breakdown.tool_results == 0
+        assert second.breakdown.tool_results > 0
+    
+    def test_breakdown_parts(self):
+        accountant = TokenAccountant(counter=COUNTER)
+        messages = [
+            SystemMessage(content="x" * 40),
+            HumanMessage(content="y" * 80),
+            ToolMessage(content="z" * 120, tool_call_id="c1"),
+        ]
+        breakdown = accountant.breakdown(messages, schema_tokens=7)
+        assert (breakdown.system, breakdown.history, breakdown.tool_results, breakdown.schemas) == (14, 24, 34, 7)
+        assert breakdown.total == 79
+    
+    def test_new_list_of_new_messages_is_recounted(self):
+        accountant = TokenAccountant(counter=COUNTER)
+        short = accountant.breakdown([HumanMessage(content="x" * 10)]).total
+        long = accountant.breakdown([HumanMessage(content="y" * 4000)]).total
+        assert short < 10 and long >= 1000
+    
+    def test_reset_forgets_counted_messages(self):
+        agent = budgeted_agent(*calc_turn())
+        agent.run("What is 2 + 2?", verbose=False)
+        assert agent.accountant._counted.messages
+        agent.reset()
+        assert agent.accountant._counted.messages == []
+    
+    def test_forks_share_totals(self):
+        agent = budgeted_agent(*calc_turn(), *calc_turn())
+        first, second = agent.spawn(), agent.spawn()
+        first.run("What is 2 + 2?", verbose=False)
+        second.run("What is 2 + 2?", verbose=False)
+        assert first.accountant.session_tokens == second.accountant.session_tokens == 1715
+        assert agent.accountant.all_sessions.total_tokens == 3430
+        assert agent.accountant.turns == []
+
+
+class TestBudgets:
+    """Calls that would break a budget are refused before they are sent."""
+    
+    def test_turn_budget(self):
+        agent = budgeted_agent(*calc_turn(), max_turn_tokens=1200)
+        with pytest.raises(TokenBudgetExceeded) as raised:
+            agent.run("What is 2 + 2?", verbose=False)
+        assert raised.value.scope == "turn"
+        assert raised.value.used == 810
+        assert agent.llm.calls == 1  # the second call was never sent
+    
+    def test_session_budget(self):
+        agent = budgeted_agent(*calc_turn(), *calc_turn(), max_session_tokens=2000)
+        agent.run("What is 2 + 2?", verbose=False)
+        with pytest.raises(TokenBudgetExceeded) as raised:
+            agent.run("And again?", verbose=False)
+        assert raised.value.scope == "session"
+    
+    def test_prompt_budget(self):
+        agent = budgeted_agent(*calc_turn(), max_prompt_tokens=10)
+        with pytest.raises(TokenBudgetExceeded) as raised:
+            agent.run("What is 2 + 2?", verbose=False)
+        assert raised.value.scope == "prompt"
+        assert agent.llm.calls == 0
+    
+    def test_next_turn_after_refusal(self):
+        agent = budgeted_agent(*calc_turn(), AIMessage(content="Hi", usage_metadata=usage(50, 1)), max_turn_tokens=1200)
+        with pytest.raises(TokenBudgetExceeded):
+            agent.run("What is 2 + 2?", verbose=False)
+        agent.llm.responses = [AIMessage(content="Hi", usage_metadata=usage(50, 1))]
+        assert agent.run("Hello", verbose=False) == "Hi"
+        assert [t.total_tokens for t in agent.accountant.turns] == [810, 51]
+        assert [m.content for m in agent.messages] == ["Hello", "Hi"]
+    
+    def test_next_turn_after_prompt_refusal(self):
+        agent = budgeted_agent(AIMessage(content="Hi"), max_prompt_tokens=1200)
+        agent.run("Hello", verbose=False)
+        with pytest.raises(TokenBudgetExceeded) as raised:
+            agent.run("x" * 4000, verbose=False)
+        assert raised.value.scope == "prompt"
+        assert len(agent.messages) == 2
+        
+        agent.llm.responses = [AIMessage(content="Hi again")]
+        assert agent.run("hi", verbose=False) == "Hi again"
+        assert [m.content for m in agent.messages] == ["Hello", "Hi", "hi", "Hi again"]
+    
+    def test_batch_does_not_retry_refusals(self):
+        agent = budgeted_agent(max_prompt_tokens=10)
+        [result] = agent.run_many(["What is 2 + 2?"], backoff_initial=0).collect()
+        assert result.attempts == 1
+        assert result.error.startswith("TokenBudgetExceeded")
@@ -0,0 +1,113 @@
+# tests/test_agent_async.py
+"""
+Unit tests for the async agent loop (arun) and its blocking wrapper (run).
+Uses a scripted chat model, so no API key is needed.
+
+Run with: uv run pytest tests/test_agent_async.py -v
+"""
+
+import asyncio
+import time
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from src.agent.scripted import tool_call
+import src.tools.execution as execution
+
+
+class TestConcurrentToolCalls:
+    """Tool calls from one model turn run concurrently but are recorded in order."""
+    
+    def test_tool_messages_keep_call_order(self, make_agent):
+        agent = make_agent(
+            AIMessage(content="", tool_calls=[
+                tool_call("calc", {"expression": "2 + 2"}, "call_1"),
+                tool_call("lookup_faq", {"query": "shipping"}, "call_2"),
+                tool_call("get_time", {"location": "Tokyo"}, "call_3"),
+            ]),
+            AIMessage(content="Done"),
+        )
+        answer = agent.run("Do three things", verbose=False)
+        
+        assert answer == "Done"
+        assert isinstance(agent.messages[0], HumanMessage)
+        tool_messages = [m for m in agent.messages if isinstance(m, ToolMessage)]
+        assert [m.tool_call_id for m in tool_messages] == ["call_1", "call_2", "call_3"]
+        assert "= 4" in tool_messages[0].content
+        assert agent.state.last_tool_name == "get_time"
+        assert agent.state.last_location == "Tokyo"
+    
+    def test_sync_tools_overlap(self, make_agent, monkeypatch):
+        original = execution.execute_calc
+        
+        def slow_calc(expression):
+            time.sleep(0.2)
+            return original(expression)
+        
+        monkeypatch.setattr(execution, "execute_calc", slow_calc)
+        agent = make_agent(
+            AIMessage(content="", tool_calls=[
+                tool_call("calc", {"expression": f"{i} + 1"}, f"call_{i}")
+                for i in range(3)
+            ]),
+            AIMessage(content="Done"),
+            max_tool_workers=3,
+        )
+        start = time.perf_counter()
+        agent.run("Three sums", verbose=False)
+        elapsed = time.perf_counter() - start
+        
+        assert elapsed < 0.5
+    
+    def test_agents_share_the_tool_pool(self, make_agent):
+        agents = [make_agent(max_tool_workers=3) for _ in range(20)]
+        assert len({id(agent.tool_executor) for agent in agents}) == 1
+        assert make_agent().tool_executor is not agents[0].tool_executor
+    
+    def test_reference_resolves_to_location_from_same_turn(self, make_agent):
+        agent = make_agent(
+            AIMessage(content="", tool_calls=[
+                tool_call("get_time", {"location": "Cape Town"}, "call_1"),
+                tool_call("get_time", {"location": "that"}, "call_2"),
+            ]),
+            AIMessage(content="Done"),
+        )
+        agent.run("Time in Cape Town, then that again", verbose=False)
+        
+        tool_messages = [m for m in agent.messages if isinstance(m, ToolMessage)]
+        assert "Cape Town" in tool_messages[1].content
+    
+    def test_unknown_tool_returns_clean_error(self, make_agent):
+        agent = make_agent(
+            AIMessage(content="", tool_calls=[tool_call("teleport", {}, "call_1")]),
+            AIMessage(content="Sorry"),
+        )
+        agent.run("Teleport me", verbose=False)
+        
+        assert agent.messages[2].content == "Error: Tool 'teleport' not found"
+
+
+class TestBlockingWrapper:
+    """run() is a blocking wrapper around arun()."""
+    
+    def test_arun_without_tools(self, make_agent):
+        agent = make_agent(AIMessage(content="Hello!"))
+        answer = asyncio.run(agent.arun("Hi", verbose=False))
+        
+        assert answer == "Hello!"
+        assert len(agent.messages) == 2
+    
+    def test_run_inside_running_event_loop(self, make_agent):
+        agent = make_agent(AIMessage(content="Hello!"))
+        
+        async def caller():
+            return agent.run("Hi", verbose=False)
+        
+        assert asyncio.run(caller()) == "Hello!"
+    
+    def test_sync_tool_execution_uses_the_async_path(self, make_agent):
+        agent = make_agent()
+        agent.state.update_tool_result("get_time", {"location": "Tokyo"}, "Time in Tokyo")
+        
+        assert agent._execute_tool("get_time", {"location": "that"}).startswith("The current time in Tokyo")
+        assert agent._execute_tool("calc", {"expression": "2 +"}).startswith("Error")
+        assert agent._execute_tool("teleport", {}) == "Error: Tool 'teleport' not found"
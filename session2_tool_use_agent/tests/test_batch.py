@@ -0,0 +1,131 @@
+# tests/test_batch.py
+"""
+Unit tests for running many prompts through the agent with run_many.
+Uses a scripted chat model, so no API key is needed.
+
+Run with: uv run pytest tests/test_batch.py -v
+"""
+
+import asyncio
+import pytest
+from langchain_core.messages import AIMessage
+from src.agent.batch import BatchResult, batch_stats
+from src.agent.loop import ToolUsingAgent
+from src.agent.scripted import ScriptedChatModel
+
+
+def echo(messages):
+    return AIMessage(content=f"echo: {messages[-1].content}")
+
+
+class SlowChatModel(ScriptedChatModel):
+    """Scripted model whose async calls take as long as the prompt says, tracking overlap."""
+    
+    def __init__(self, *args, failures=0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.active = 0
+        self.max_active = 0
+        self.failures = failures
+    
+    async def ainvoke(self, messages, **kwargs):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(float(messages[-1].content.split()[-1]))
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("transient")
+            return self.invoke(messages)
+        finally:
+            self.active -= 1
+
+
+def batch_agent(model=None):
+    return ToolUsingAgent(llm=model or ScriptedChatModel(responder=echo))
+
+
+class TestRunMany:
+    """Each prompt runs in its own session, with bounded concurrency."""
+    
+    def test_sessions_are_isolated(self):
+        model = ScriptedChatModel(responder=echo)
+        agent = batch_agent(model)
+        results = agent.run_many([f"prompt {i}" for i in range(10)], concurrency=3).collect()
+        
+        assert [r.answer for r in results] == [f"echo: prompt {i}" for i in range(10)]
+        assert all(len(request) == 1 for request in model.requests)  # no shared history
+        assert agent.messages == []
+    
+    def test_concurrency_is_bounded(self):
+        model = SlowChatModel(responder=echo)
+        results = batch_agent(model).run_many([f"wait 0.02" for _ in range(12)], concurrency=4).collect()
+        assert len(results) == 12
+        assert model.max_active == 4
+    
+    def test_results_stream_as_they_complete(self):
+        agent = batch_agent(SlowChatModel(responder=echo))
+        order = [r.index for r in agent.run_many(["wait 0.2", "wait 0.01", "wait 0.1"], concurrency=3)]
+        assert order == [1, 2, 0]
+    
+    def test_async_variant(self):
+        agent = batch_agent(SlowChatModel(responder=echo))
+        
+        async def drive():
+            return await agent.arun_many(["wait 0.01", "wait 0.01"], concurrency=2).acollect()
+        
+        assert [r.answer for r in asyncio.run(drive())] == ["echo: wait 0.01", "echo: wait 0.01"]
+    
+    def test_iterated_once(self):
+        batch = batch_agent().run_many(["a"])
+        batch.collect()
+        with pytest.raises(RuntimeError):
+            batch.collect()
+
+
+class TestRetries:
+    """Failures are retried with backoff, and reported if they persist."""
+    
+    def test_transient_failure_is_retried(self):
+        model = SlowChatModel(responder=echo, failures=1)
+        batch = batch_agent(model).run_many(["wait 0"], backoff_initial=0.01)
+        [result] = batch.collect()
+        assert result.ok and result.answer == "echo: wait 0"
+        assert result.attempts == 2
+        assert batch.stats.retried == 1
+    
+    def test_persistent_failure_is_reported(self):
+        model = SlowChatModel(responder=echo, failures=10)
+        batch = batch_agent(model).run_many(["wait 0", "wait 0"], concurrency=1, max_attempts=2, backoff_initial=0.01)
+        results = batch.collect()
+        assert [r.ok for r in results] == [False, False]
+        assert results[0].error == "ConnectionError: transient"
+        assert results[0].attempts == 2
+        assert batch.stats.failed == 2
+    
+    def test_other_errors_are_not_retried(self):
+        model = SlowChatModel(responder=echo, failures=1)
+        [result] = batch_agent(model).run_many(["wait 0"], retry_on=(TimeoutError,)).collect()
+        assert result.attempts == 1
+        assert not result.ok
+
+
+class TestBatchStats:
+    """Throughput and latency percentiles of a batch."""
+    
+    def test_stats(self):
+        results = [BatchResult(i, "p", "a", None, (i + 1) / 1000, 1) for i in range(100)]
+        stats = batch_stats(results, elapsed=2.0)
+        assert stats.total == stats.succeeded == 100
+        assert stats.throughput == 50.0
+        assert stats.p50_ms == pytest.approx(51)
+        assert stats.p95_ms == pytest.approx(96)
+        assert stats.p99_ms == pytest.approx(100)
+    
+    def test_stats_of_a_run(self):
+        batch = batch_agent().run_many([f"p{i}" for i in range(5)])
+        assert batch.stats.total == 0
+        batch.collect()
+        stats = batch.stats
+        assert stats.total == 5 and stats.failed == 0
+        assert stats.throughput > 0
+        assert stats.p50_ms <= stats.p95_ms <= stats.p99_ms
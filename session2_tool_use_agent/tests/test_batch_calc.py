@@ -0,0 +1,50 @@
+# tests/test_batch_calc.py
+"""
+Unit tests for the vectorized calc_batch API.
+Every element must match what execute_calc returns for it.
+
+Run with: uv run pytest tests/test_batch_calc.py -v
+"""
+
+import json
+from src.tools.execution import execute_calc, execute_calc_batch
+from src.tools.schemas import calc_batch
+
+
+class TestExecuteCalcBatch:
+    """Batch results agree with execute_calc element by element."""
+    
+    def test_percentage_column(self):
+        expressions = [f"18% of {price}" for price in range(1000, 1100)]
+        assert execute_calc_batch(expressions) == [execute_calc(e) for e in expressions]
+    
+    def test_mixed_shapes_keep_order(self):
+        expressions = [
+            "2 + 2", "18% of 24500", "10 / 4", "3 + 4", "-7 // 2",
+            "-(0 * 3) / 4.5", "1.5 * 2", "(1 + 2) * (3 + 4)", "7 % 3",
+        ]
+        assert execute_calc_batch(expressions) == [execute_calc(e) for e in expressions]
+    
+    def test_errors_are_reported_per_element(self):
+        expressions = ["100 / 0", "100 / 5", "2 + abc", "(2 + 3", "2 +* 3", "", "1 / (1 / 0)"]
+        results = execute_calc_batch(expressions)
+        
+        assert results == [execute_calc(e) for e in expressions]
+        assert "Division by zero" in results[0]
+        assert results[1] == "Calculation: 100 / 5 = 20.0"
+        assert "Division by zero" in results[6]
+    
+    def test_large_integers_stay_exact(self):
+        expressions = ["9007199254740993 + 0", "4503599627370496 * 3", "2 ** 70"]
+        assert execute_calc_batch(expressions) == [execute_calc(e) for e in expressions]
+
+
+class TestCalcBatchTool:
+    """The calc_batch tool returns one JSON object per expression."""
+    
+    def test_tool_output(self):
+        result = json.loads(calc_batch.invoke({"expressions": ["2 + 2", "100 / 0"]}))
+        
+        assert [r["expression"] for r in result] == ["2 + 2", "100 / 0"]
+        assert result[0]["result"] == "Calculation: 2 + 2 = 4"
+        assert "Error" in result[1]["result"]
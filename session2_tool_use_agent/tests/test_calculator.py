@@ -0,0 +1,60 @@
+# tests/test_calculator.py
+"""
+Unit tests for the compiled calc evaluator.
+
+Run with: uv run pytest tests/test_calculator.py -v
+"""
+
+import pytest
+from src.tools.calculator import (
+    InvalidCharactersError,
+    Percentage,
+    UnmatchedParenthesesError,
+    compile_expression,
+    normalize_expression,
+)
+from src.tools.execution import execute_calc
+
+
+class TestCompileExpression:
+    """Whitelisted AST compilation and caching."""
+    
+    @pytest.mark.parametrize("expression, expected", [
+        ("2 + 2 * 3", 8),
+        ("(5 + 3) * 2", 16),
+        ("10 / 4", 2.5),
+        ("-7 // 2", -4),
+        ("10 % 3", 1),
+        ("2 ** 10", 1024),
+        ("- (3 - 5) * 2.5", 5.0),
+    ])
+    def test_arithmetic_matches_python(self, expression, expected):
+        assert compile_expression(normalize_expression(expression))() == expected
+    
+    def test_percentage_is_recognized(self):
+        compiled = compile_expression(normalize_expression("What is 18% of 24500?"))
+        assert compiled == Percentage(18.0, 24500.0)
+    
+    def test_repeated_expression_hits_cache(self):
+        compile_expression.cache_clear()
+        execute_calc("25 * 48")
+        execute_calc("25  *  48")
+        info = compile_expression.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
+    
+    def test_rejects_invalid_characters(self):
+        with pytest.raises(InvalidCharactersError):
+            compile_expression("__import__('os')")
+    
+    def test_rejects_unmatched_parentheses(self):
+        with pytest.raises(UnmatchedParenthesesError):
+            compile_expression("(2 + 3")
+    
+    def test_rejects_non_arithmetic_nodes(self):
+        with pytest.raises(SyntaxError):
+            compile_expression("()")
+    
+    def test_syntax_error_message(self):
+        result = execute_calc("2 +* 3")
+        assert "Invalid mathematical expression syntax" in result
@@ -0,0 +1,112 @@
+# tests/test_cassette.py
+"""
+Unit tests for recording model interactions to a cassette and replaying them.
+Uses a scripted chat model, so no API key is needed.
+
+Run with: uv run pytest tests/test_cassette.py -v
+"""
+
+import asyncio
+import time
+import pytest
+from langchain_core.messages import AIMessage
+from src.agent.cassette import Cassette, CassetteMiss, record, replay
+from src.agent.events import FinalAnswer
+from src.agent.loop import ToolUsingAgent
+from src.agent.scripted import ScriptedChatModel, tool_call
+
+
+def calc_turn(expression, answer, call_id):
+    return (
+        AIMessage(content="", tool_calls=[tool_call("calc", {"expression": expression}, call_id)]),
+        AIMessage(content=answer),
+    )
+
+
+class SlowChatModel(ScriptedChatModel):
+    async def ainvoke(self, messages, **kwargs):
+        await asyncio.sleep(0.05)
+        return self.invoke(messages)
+
+
+def record_conversation(path, model=None):
+    """Record a two-turn calc conversation; returns the answers."""
+    model = model or ScriptedChatModel([*calc_turn("2 + 2", "It is 4", "c1"), *calc_turn("3 + 3", "It is 6", "c2")])
+    agent = ToolUsingAgent(llm=model, tool_memo=None)
+    cassette = record(agent, path)
+    answers = [agent.run("What is 2 + 2?", verbose=False), agent.run("And 3 + 3?", verbose=False)]
+    cassette.close()
+    return answers
+
+
+def replaying_agent(path, **kwargs):
+    agent = ToolUsingAgent(llm=ScriptedChatModel(), tool_memo=None)
+    return agent, replay(agent, path, **kwargs)
+
+
+class TestRecord:
+    """Every model call is appended to the cassette."""
+    
+    def test_records_every_call(self, tmp_path):
+        path = str(tmp_path / "traffic.jsonl.zst")
+        record_conversation(path)
+        records = list(Cassette(path).records())
+        assert len(records) == 4
+        assert [r["round"] for r in records] == [0, 2, 0, 2]
+        assert records[1]["response"]["data"]["content"] == "It is 4"
+        assert all(r["latency"] >= 0 for r in records)
+        assert Cassette(path).prompts() == ["What is 2 + 2?", "And 3 + 3?"]
+    
+    def test_sessions_append(self, tmp_path):
+        path = str(tmp_path / "traffic.jsonl.zst")
+        record_conversation(path)
+        record_conversation(path)
+        assert len(list(Cassette(path).records())) == 8
+
+
+class TestReplay:
+    """Recorded responses are served back by request hash."""
+    
+    def test_replays_conversation(self, tmp_path):
+        path = str(tmp_path / "traffic.jsonl.zst")
+        answers = record_conversation(path)
+        agent, model = replaying_agent(path)
+        assert [agent.run("What is 2 + 2?", verbose=False), agent.run("And 3 + 3?", verbose=False)] == answers
+        assert model.stats.to_dict() == {"exact": 4, "turn": 0, "misses": 0}
+        assert agent.state.last_tool_result == "Calculation: 3 + 3 = 6"
+    
+    def test_turn_key_fallback(self, tmp_path):
+        path = str(tmp_path / "traffic.jsonl.zst")
+        record_conversation(path)
+        agent, model = replaying_agent(path)
+        assert agent.run("And 3 + 3?", verbose=False) == "It is 6"
+        assert model.stats.turn == 2
+    
+    def test_miss_raises(self, tmp_path):
+        path = str(tmp_path / "traffic.jsonl.zst")
+        record_conversation(path)
+        agent, model = replaying_agent(path)
+        with pytest.raises(CassetteMiss):
+            agent.run("Something never asked", verbose=False)
+        assert model.stats.misses == 1
+    
+    def test_streaming_replay(self, tmp_path):
+        path = str(tmp_path / "traffic.jsonl.zst")
+        record_conversation(path)
+        agent, _ = replaying_agent(path)
+        events = list(agent.run_stream("What is 2 + 2?"))
+        assert isinstance(events[-1], FinalAnswer) and events[-1].content == "It is 4"
+    
+    def test_recorded_latency(self, tmp_path):
+        path = str(tmp_path / "traffic.jsonl.zst")
+        slow = SlowChatModel([*calc_turn("2 + 2", "It is 4", "c1"), *calc_turn("3 + 3", "It is 6", "c2")])
+        record_conversation(path, slow)
+        
+        timings = {}
+        for scale in (None, 1.0):
+            agent, _ = replaying_agent(path, latency_scale=scale)
+            start = time.perf_counter()
+            agent.run("What is 2 + 2?", verbose=False)
+            timings[scale] = time.perf_counter() - start
+        assert timings[1.0] >= 0.1  # two recorded calls of 50 ms each
+        assert timings[None] < timings[1.0]
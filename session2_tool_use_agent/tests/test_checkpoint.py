@@ -0,0 +1,126 @@
+# tests/test_checkpoint.py
+"""
+Unit tests for durable SQLite checkpoints of agent conversations.
+Uses a scripted chat model, so no API key is needed.
+
+Run with: uv run pytest tests/test_checkpoint.py -v
+"""
+
+import sqlite3
+import time
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from src.agent.checkpoint import CheckpointStore
+from src.agent.history import HistoryManager
+from src.agent.loop import ToolUsingAgent
+from src.agent.scripted import ScriptedChatModel, tool_call
+from src.agent.tokens import TokenCounter
+
+
+def tool_turn(n):
+    return (
+        AIMessage(content="", tool_calls=[tool_call("calc", {"expression": f"{n} + {n}"}, f"call_{n}")]),
+        AIMessage(content=f"It is {2 * n}"),
+    )
+
+
+def checkpointed_agent(store, session_id, *responses, **kwargs):
+    return ToolUsingAgent(llm=ScriptedChatModel(responses), checkpoint=store, session_id=session_id, **kwargs)
+
+
+def committed_rows(path, table):
+    """Rows visible to another connection, i.e. committed."""
+    with sqlite3.connect(path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+class TestResume:
+    """A conversation survives the process and is resumed on first use."""
+    
+    def test_resume_after_reopen(self, tmp_path):
+        path = str(tmp_path / "agent.db")
+        store = CheckpointStore(path)
+        agent = checkpointed_agent(store, "s1", *tool_turn(1), *tool_turn(2))
+        agent.run("What is 1 + 1?", verbose=False)
+        agent.run("And 2 + 2?", verbose=False)
+        store.close()
+        
+        store = CheckpointStore(path)
+        resumed = checkpointed_agent(store, "s1", AIMessage(content="Still here"))
+        assert resumed.messages == []  # nothing is loaded until needed
+        resumed.run("Are you there?", verbose=False)
+        
+        sent = resumed.llm.requests[0]
+        assert [type(m) for m in sent[:4]] == [HumanMessage, AIMessage, ToolMessage, AIMessage]
+        assert sent[3].content == "It is 2"
+        assert list(resumed.state.user_intents) == ["What is 1 + 1?", "And 2 + 2?", "Are you there?"]
+        assert resumed.state.last_tool_name == "calc"
+    
+    def test_unknown_session_starts_empty(self, tmp_path):
+        store = CheckpointStore(str(tmp_path / "agent.db"))
+        agent = checkpointed_agent(store, "new")
+        assert agent.resume() is False
+        assert store.load("new") is None
+    
+    def test_reset_is_saved(self, tmp_path):
+        store = CheckpointStore(str(tmp_path / "agent.db"))
+        agent = checkpointed_agent(store, "s1", *tool_turn(1))
+        agent.run("What is 1 + 1?", verbose=False)
+        agent.reset_all()
+        
+        saved = store.load("s1")
+        assert saved.messages == []
+        assert list(saved.state.user_intents) == []
+
+
+class TestAppendOnly:
+    """Each turn writes only its new messages."""
+    
+    def test_turns_append_rows(self, tmp_path):
+        store = CheckpointStore(str(tmp_path / "agent.db"), batch_size=1)
+        agent = checkpointed_agent(store, "s1", *tool_turn(1), *tool_turn(2))
+        agent.run("One", verbose=False)
+        assert committed_rows(store.path, "messages") == 4
+        agent.run("Two", verbose=False)
+        assert committed_rows(store.path, "messages") == 8
+        assert committed_rows(store.path, "states") == 2
+    
+    def test_folded_history_starts_new_epoch_and_compacts(self, tmp_path):
+        store = CheckpointStore(str(tmp_path / "agent.db"), batch_size=1)
+        history = HistoryManager(max_tokens=120, counter=TokenCounter(encoding_name="not-an-encoding"))
+        responses = [r for n in range(1, 6) for r in tool_turn(n)]
+        agent = checkpointed_agent(store, "s1", *responses, history=history)
+        for n in range(1, 6):
+            agent.run(f"What is {n} + {n}? " + "padding " * 10, verbose=False)
+        assert history.folded_turns > 0
+        
+        before = [m.content for m in store.load("s1").messages]
+        assert before == [m.content for m in agent.messages]
+        assert store.compact() > 0
+        assert [m.content for m in store.load("s1").messages] == before
+        assert committed_rows(store.path, "messages") == len(before)
+        assert committed_rows(store.path, "states") == 1
+
+
+class TestBatchedCommits:
+    """Saves are committed in batches, by count or delay, and on close."""
+    
+    def test_commit_after_batch_size(self, tmp_path):
+        store = CheckpointStore(str(tmp_path / "agent.db"), batch_size=2, max_delay=60)
+        agent = checkpointed_agent(store, "s1", *tool_turn(1), *tool_turn(2))
+        agent.run("One", verbose=False)
+        assert committed_rows(store.path, "states") == 0
+        assert store.load("s1") is not None  # the store sees its own pending saves
+        agent.run("Two", verbose=False)
+        assert committed_rows(store.path, "states") == 2
+    
+    def test_commit_after_delay(self, tmp_path):
+        store = CheckpointStore(str(tmp_path / "agent.db"), batch_size=100, max_delay=0.05)
+        checkpointed_agent(store, "s1", *tool_turn(1)).run("One", verbose=False)
+        time.sleep(0.3)
+        assert committed_rows(store.path, "states") == 1
+    
+    def test_close_commits(self, tmp_path):
+        store = CheckpointStore(str(tmp_path / "agent.db"), batch_size=100, max_delay=60)
+        checkpointed_agent(store, "s1", *tool_turn(1)).run("One", verbose=False)
+        store.close()
+        assert committed_rows(store.path, "states") == 1
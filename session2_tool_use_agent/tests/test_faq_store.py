@@ -0,0 +1,120 @@
+# tests/test_faq_store.py
+"""
+Unit tests for the BM25 FAQ stores (in-memory and SQLite FTS5).
+
+Run with: uv run pytest tests/test_faq_store.py -v
+"""
+
+import json
+import pytest
+from src.tools.execution import FAQ_DATABASE, execute_lookup_faq, search_faq, set_faq_store
+from src.tools.faq_store import InMemoryFaqStore, SqliteFaqStore, tokenize
+
+EXTRA_FAQS = {
+    "international shipping": {
+        "answer": "We ship to 40 countries. International shipping takes 10-14 business days.",
+        "source_title": "International Shipping",
+    },
+    "gift cards": {
+        "answer": "Gift cards never expire and can be used online or in store.",
+        "source_title": "Gift Cards",
+    },
+}
+
+
+@pytest.fixture
+def sqlite_store(tmp_path):
+    store = SqliteFaqStore.build(str(tmp_path / "faq.db"), {**FAQ_DATABASE, **EXTRA_FAQS})
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def restore_faq_store():
+    yield
+    set_faq_store(None)
+
+
+class TestInMemoryFaqStore:
+    """BM25 ranking over the in-memory inverted index."""
+    
+    def test_tokenize_drops_stop_words(self):
+        assert tokenize("What's your Refund policy?") == ["refund", "policy"]
+    
+    def test_ranks_most_specific_entry_first(self):
+        store = InMemoryFaqStore({**FAQ_DATABASE, **EXTRA_FAQS})
+        hits = store.search("shipping", k=5)
+        
+        assert [hit.topic for hit in hits] == ["shipping", "international shipping"]
+        assert hits[0].score > hits[1].score
+        assert store.search("international shipping")[0].topic == "international shipping"
+    
+    def test_query_must_cover_enough_terms(self):
+        store = InMemoryFaqStore(FAQ_DATABASE)
+        assert store.search("cryptocurrency policy") == []
+        assert store.search("the and of") == []
+    
+    def test_partial_word_matches_by_prefix(self):
+        # "ship" is not an indexed word of FAQ_DATABASE, but "shipping" is
+        store = InMemoryFaqStore(FAQ_DATABASE)
+        assert store.search("ship")[0].topic == "shipping"
+        assert store.search("warr")[0].topic == "warranty"
+        assert store.search("sh") == []
+
+
+class TestSqliteFaqStore:
+    """BM25 ranking over a lazily opened SQLite FTS5 file."""
+    
+    def test_opens_lazily(self, tmp_path):
+        SqliteFaqStore.build(str(tmp_path / "faq.db"), FAQ_DATABASE).close()
+        store = SqliteFaqStore(str(tmp_path / "faq.db"))
+        
+        assert getattr(store._local, "conn", None) is None
+        assert store.search("warranty")[0].source_title == "Warranty Information"
+    
+    def test_top_k(self, sqlite_store):
+        hits = sqlite_store.search("shipping", k=2)
+        assert {hit.topic for hit in hits} == {"shipping", "international shipping"}
+    
+    def test_agrees_with_in_memory_store(self, sqlite_store):
+        memory_store = InMemoryFaqStore({**FAQ_DATABASE, **EXTRA_FAQS})
+        for query in ["refund policy", "gift cards", "business hours", "cryptocurrency policy"]:
+            assert [h.topic for h in sqlite_store.search(query, k=1)] == \
+                [h.topic for h in memory_store.search(query, k=1)]
+    
+    def test_partial_word_matches_by_prefix(self, tmp_path):
+        store = SqliteFaqStore.build(str(tmp_path / "base.db"), FAQ_DATABASE)
+        memory_store = InMemoryFaqStore(FAQ_DATABASE)
+        try:
+            for query in ["ship", "warr", "refund pol", "sh"]:
+                assert [h.topic for h in store.search(query, k=1)] == \
+                    [h.topic for h in memory_store.search(query, k=1)]
+            assert store.search("ship")[0].topic == "shipping"
+        finally:
+            store.close()
+
+
+class TestLookupFaqWithStore:
+    """execute_lookup_faq keeps its JSON contract with any store."""
+    
+    def test_json_contract_with_sqlite_store(self, sqlite_store, restore_faq_store):
+        set_faq_store(sqlite_store)
+        data = json.loads(execute_lookup_faq("Do gift cards expire?"))
+        
+        assert data == {
+            "answer": EXTRA_FAQS["gift cards"]["answer"],
+            "source_title": "Gift Cards",
+        }
+    
+    def test_fallback_lists_topics(self, sqlite_store, restore_faq_store):
+        set_faq_store(sqlite_store)
+        data = json.loads(execute_lookup_faq("cryptocurrency policy"))
+        
+        assert data["source_title"] == "No Match Found"
+        assert "refund policy" in data["suggestion"]
+    
+    def test_search_faq_top_k(self):
+        results = search_faq("shipping policy", k=2)
+        
+        assert results[0]["topic"] == "shipping"
+        assert set(results[0]) == {"topic", "answer", "source_title", "score"}
@@ -0,0 +1,94 @@
+# tests/test_gazetteer.py
+"""
+Unit tests for the location gazetteer used by get_time.
+
+Run with: uv run pytest tests/test_gazetteer.py -v
+"""
+
+import csv
+import zoneinfo
+import pytest
+from src.tools.execution import execute_get_time
+from src.tools.gazetteer import (
+    LOCATIONS_FILE,
+    Gazetteer,
+    Place,
+    get_gazetteer,
+    get_zone,
+    normalize_location,
+)
+
+
+@pytest.fixture(scope="module")
+def gazetteer():
+    return get_gazetteer()
+
+
+class TestGazetteer:
+    """Exact, prefix and fuzzy resolution of place names."""
+    
+    def test_bundled_zones_exist(self):
+        zones = zoneinfo.available_timezones()
+        with open(LOCATIONS_FILE, newline="", encoding="utf-8") as f:
+            assert all(row["timezone"] in zones for row in csv.DictReader(f))
+    
+    def test_normalize_location(self):
+        assert normalize_location("  São_Paulo ") == "sao paulo"
+        assert normalize_location("St. John's") == "st johns"
+        assert normalize_location("America/New_York") == "america/new york"
+    
+    @pytest.mark.parametrize("location, timezone", [
+        ("NYC", "America/New_York"),
+        ("Europe/Paris", "Europe/Paris"),
+        ("Japan", "Asia/Tokyo"),
+        ("Zürich", "Europe/Zurich"),
+        ("hongkong", "Asia/Hong_Kong"),
+    ])
+    def test_exact(self, gazetteer, location, timezone):
+        match = gazetteer.resolve(location)
+        assert match.method == "exact"
+        assert match.place.timezone == timezone
+    
+    def test_prefix(self, gazetteer):
+        match = gazetteer.resolve("Johannes")
+        assert match.method == "prefix"
+        assert match.place == Place("Johannesburg", "Africa/Johannesburg")
+    
+    @pytest.mark.parametrize("location, timezone", [
+        ("Johannesburgh", "Africa/Johannesburg"),
+        ("Londn", "Europe/London"),
+        ("Bankok", "Asia/Bangkok"),
+    ])
+    def test_fuzzy(self, gazetteer, location, timezone):
+        match = gazetteer.resolve(location)
+        assert match.method == "fuzzy"
+        assert match.place.timezone == timezone
+    
+    def test_unknown_places(self, gazetteer):
+        for location in ["Mars", "Venus", "Narnia", ""]:
+            assert gazetteer.resolve(location) is None
+    
+    def test_first_name_wins(self):
+        gazetteer = Gazetteer([("Paris", Place("Paris", "Europe/Paris"))])
+        assert not gazetteer.add("paris", Place("Paris, Texas", "America/Chicago"))
+        assert gazetteer.resolve("Paris").place.timezone == "Europe/Paris"
+    
+    def test_shared_and_cached(self):
+        assert get_gazetteer() is get_gazetteer()
+        assert get_zone("Asia/Tokyo") is get_zone("Asia/Tokyo")
+
+
+class TestGetTimeWithGazetteer:
+    """execute_get_time answers for places outside LOCATION_TIMEZONES."""
+    
+    def test_alias_uses_place_name(self):
+        result = execute_get_time("NYC")
+        assert result.startswith("The current time in New York is")
+    
+    def test_misspelling(self):
+        result = execute_get_time("Johannesburgh")
+        assert "Johannesburg" in result
+        assert "Error" not in result
+    
+    def test_legacy_location_keeps_title(self):
+        assert execute_get_time("cape town").startswith("The current time in Cape Town is")
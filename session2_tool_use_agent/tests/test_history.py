@@ -0,0 +1,128 @@
+# tests/test_history.py
+"""
+Unit tests for token counting and the token-budgeted history.
+
+Run with: uv run pytest tests/test_history.py -v
+"""
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from src.agent.history import CONTEXT_PREFIX, HistoryManager, split_turns
+from src.agent.scripted import tool_call
+from src.agent.state import AgentState
+from src.agent.tokens import TokenCounter
+
+
+class CountingTokenCounter(TokenCounter):
+    """Character-estimate counter that records how many messages it counted."""
+    
+    def __init__(self):
+        super().__init__(encoding_name="not-an-encoding")
+        self.messages_counted = 0
+    
+    def count_message(self, message):
+        self.messages_counted += 1
+        return super().count_message(message)
+
+
+def make_turn(i):
+    """One question with a tool call, its result and the answer."""
+    return [
+        HumanMessage(content=f"Question {i}: what is {i} times 1000? " + "please " * 20),
+        AIMessage(content="", tool_calls=[tool_call("calc", {"expression": f"{i} * 1000"}, f"call_{i}")]),
+        ToolMessage(content=f"Calculation: {i} * 1000 = {i * 1000}", tool_call_id=f"call_{i}"),
+        AIMessage(content=f"The answer is {i * 1000}."),
+    ]
+
+
+class TestTokenCounter:
+    """Counting falls back to an estimate when tiktoken has no encoding."""
+    
+    def test_fallback_estimate(self):
+        counter = TokenCounter(encoding_name="not-an-encoding")
+        assert counter.encoding is None
+        assert counter.count_text("abcdefgh") == 2
+        assert counter.count_text("") == 0
+    
+    def test_tool_calls_are_counted(self):
+        counter = TokenCounter(encoding_name="not-an-encoding")
+        plain = AIMessage(content="")
+        with_call = AIMessage(content="", tool_calls=[tool_call("calc", {"expression": "1+1"}, "c1")])
+        assert counter.count_message(with_call) > counter.count_message(plain)
+
+
+class TestHistoryManager:
+    """Whole turns are folded into the summary when over budget."""
+    
+    def test_under_budget_is_unchanged(self):
+        history = HistoryManager(max_tokens=10_000, counter=CountingTokenCounter())
+        messages = make_turn(1)
+        assert history.fit(messages) is messages
+    
+    def test_counts_incrementally(self):
+        counter = CountingTokenCounter()
+        history = HistoryManager(max_tokens=10_000, counter=counter)
+        messages = make_turn(1)
+        history.fit(messages)
+        messages.extend(make_turn(2))
+        history.fit(messages)
+        assert counter.messages_counted == 8
+    
+    def test_new_list_of_new_messages_is_recounted(self):
+        # The first message is freed once its list is; a cache keyed only on
+        # id() could take the second one, at the same address, for it
+        history = HistoryManager(counter=CountingTokenCounter())
+        short = history.count([HumanMessage(content="x" * 10)])
+        long = history.count([HumanMessage(content="y" * 4000)])
+        assert short < 10 and long >= 1000
+    
+    def test_folds_whole_turns(self):
+        state = AgentState()
+        state.add_user_intent("Question 6")
+        history = HistoryManager(max_tokens=250, counter=CountingTokenCounter())
+        messages = [m for i in range(6) for m in make_turn(i)]
+        
+        fitted = history.fit(messages, state)
+        
+        assert isinstance(fitted[0], SystemMessage)
+        assert fitted[0].content.startswith(f"{CONTEXT_PREFIX}Recent intents: Question 6")
+        assert "Question 4" in fitted[0].content
+        assert history.count(fitted) <= 250
+        assert fitted[-4:] == messages[-4:]
+        # Every tool call still has its result right after it
+        _, turns = split_turns(fitted)
+        for turn in turns:
+            assert [type(m) for m in turn] == [HumanMessage, AIMessage, ToolMessage, AIMessage]
+            assert turn[2].tool_call_id == turn[1].tool_calls[0]["id"]
+    
+    def test_current_turn_is_never_folded(self):
+        history = HistoryManager(max_tokens=10, counter=CountingTokenCounter())
+        messages = make_turn(1) + make_turn(2)
+        fitted = history.fit(messages)
+        assert fitted[1:] == messages[4:]
+        assert history.folded_turns == 1
+    
+    def test_custom_summarizer(self):
+        seen = []
+        
+        def summarizer(previous, turns):
+            seen.append((previous, len(turns)))
+            return f"{len(turns)} turn(s) about multiplication"
+        
+        history = HistoryManager(max_tokens=150, counter=CountingTokenCounter(), summarizer=summarizer)
+        fitted = history.fit([m for i in range(6) for m in make_turn(i)])
+        assert seen[0][0] is None
+        assert "turn(s) about multiplication" in fitted[0].content
+
+
+class TestAgentHistory:
+    """The agent keeps its history under the budget across turns."""
+    
+    def test_long_conversation_is_folded(self, make_agent):
+        responses = [AIMessage(content=f"Answer {i} " + "word " * 30) for i in range(5)]
+        agent = make_agent(*responses, history=HistoryManager(max_tokens=120, counter=CountingTokenCounter()))
+        for i in range(5):
+            agent.run(f"Question {i}", verbose=False)
+        
+        assert isinstance(agent.messages[0], SystemMessage)
+        assert agent.history.folded_turns >= 3
+        assert len(agent.llm.requests[-1]) < 5
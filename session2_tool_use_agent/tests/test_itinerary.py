@@ -0,0 +1,156 @@
+# tests/test_itinerary.py
+"""
+Unit tests for the budget-constrained itinerary optimizer.
+
+Run with: uv run pytest tests/test_itinerary.py -v
+"""
+
+import itertools
+import time
+import numpy as np
+import pytest
+from src.travel.inventory import ACTIVITY_DTYPE, FLIGHT_DTYPE, HOTEL_DTYPE, TravelInventory, set_inventory
+from src.travel.optimizer import MAX_TRIP_DAYS, backtrack, knapsack_table, optimize, pareto, plan_itinerary
+from src.travel.preferences import TripPreferences
+from src.travel.schemas import optimize_itinerary
+
+
+def brute_force_knapsack(costs, values, max_items, capacity, groups):
+    """Best value of at most max_items items within capacity, one per group, by enumeration."""
+    best = 0.0
+    for count in range(1, max_items + 1):
+        for combo in itertools.combinations(range(len(costs)), count):
+            if len({groups[i] for i in combo}) == count and sum(costs[i] for i in combo) <= capacity:
+                best = max(best, sum(values[i] for i in combo))
+    return best
+
+
+def rows(dtype, **columns):
+    table = np.zeros(len(next(iter(columns.values()))), dtype)
+    for name, values in columns.items():
+        table[name] = values
+    return table
+
+
+@pytest.fixture
+def trip():
+    return TripPreferences("San Francisco", "Tokyo", "2025-04-10", "2025-04-12", 100, ["food", "culture"])
+
+
+class TestKnapsack:
+    """The activity DP against exhaustive search."""
+    
+    @pytest.mark.parametrize("seed", range(6))
+    def test_matches_brute_force(self, seed):
+        rng = np.random.default_rng(seed)
+        n = 9
+        groups = np.sort(rng.integers(0, 5, n))
+        costs = rng.integers(1, 30, n)
+        values = rng.uniform(1, 5, n)
+        max_items, capacity = 3, 45
+        
+        best, take = knapsack_table(costs, values, max_items, capacity, groups)
+        items = int(np.argmax(best[:, capacity]))
+        chosen = backtrack(take, costs, items, capacity, groups)
+        
+        expected = brute_force_knapsack(costs, values, max_items, capacity, groups)
+        assert best[items, capacity] == pytest.approx(expected)
+        assert sum(values[i] for i in chosen) == pytest.approx(expected)
+        assert sum(costs[i] for i in chosen) <= capacity
+        assert len({groups[i] for i in chosen}) == len(chosen)
+    
+    def test_pareto_keeps_rows_no_cheaper_row_beats(self):
+        prices = np.array([10, 20, 30, 40, 50])
+        ratings = np.array([3.0, 2.5, 4.0, 4.0, 4.5])
+        assert list(pareto(prices, ratings)) == [0, 2, 4]
+    
+    def test_items_capped_at_number_of_groups(self):
+        groups = np.array([0, 0, 1, 1, 2])
+        best, take = knapsack_table(np.ones(5, dtype=np.int64), np.ones(5), 120, 10, groups)
+        assert best.shape == (4, 11) and take.shape == (5, 4, 11)
+        assert best[3, 10] == 3.0
+
+
+class TestOptimize:
+    """Whole plans."""
+    
+    def test_best_plan_within_budget(self, trip):
+        # Budget: 3 days * $100 = $300, 2 nights
+        flights = rows(FLIGHT_DTYPE, price=[150, 100], stops=[0, 2], duration=[10, 14])
+        hotels = rows(HOTEL_DTYPE, price=[30, 60], rating=[3.0, 5.0])
+        activities = rows(ACTIVITY_DTYPE, price=[20, 25, 40], rating=[4, 5, 5], name=[0, 1, 2])
+        values = activities["rating"].astype(float)
+        
+        plans = optimize(trip, flights, hotels, activities, values, activities_per_day=1, top_n=2)
+        
+        best = plans[0]
+        assert best.total_cost <= trip.budget
+        assert best.total_cost == best.flight_cost + best.hotel_cost + best.activity_cost
+        # Nonstop flight (-1) and the cheap hotel (+6) leave $90 for all three activities (+14): 19,
+        # ahead of the 5-star hotel with fewer activities (16.6 at best)
+        assert best.flight["price"] == 150 and best.hotel["price"] == 30
+        assert sorted(a["price"] for a in best.activities) == [20.0, 25.0, 40.0]
+        assert best.score == pytest.approx(19.0)
+        assert plans[0].score >= plans[1].score
+        assert len(best.days) == 3
+    
+    def test_nothing_fits(self, trip):
+        flights = rows(FLIGHT_DTYPE, price=[500], stops=[0], duration=[10])
+        hotels = rows(HOTEL_DTYPE, price=[30], rating=[3.0])
+        activities = rows(ACTIVITY_DTYPE, price=[20], rating=[4], name=[0])
+        assert optimize(trip, flights, hotels, activities, np.array([4.0])) == []
+    
+    def test_plans_from_inventory_repeat_no_activity(self):
+        inventory = TravelInventory.generate(flights=50_000, hotels=20_000, activities=20_000, seed=3)
+        prefs = TripPreferences("London", "Rome", "2025-05-01", "2025-05-04", 250, ["history", "food"])
+        
+        plans = plan_itinerary(prefs, inventory, activities_per_day=2, top_n=3)
+        
+        assert 1 <= len(plans) <= 3
+        for plan in plans:
+            assert plan.total_cost <= prefs.budget
+            names = [a["name"] for a in plan.activities]
+            assert len(names) == len(set(names)) <= 8
+        assert [p.score for p in plans] == sorted((p.score for p in plans), reverse=True)
+
+
+class TestOptimizeItineraryTool:
+    """Tool messages."""
+    
+    def test_returns_plans_with_costs(self):
+        set_inventory(TravelInventory.generate(flights=50_000, hotels=20_000, activities=20_000, seed=3))
+        try:
+            result = optimize_itinerary.invoke({
+                "origin": "San Francisco", "destination": "Tokyo", "start_date": "2025-04-10",
+                "end_date": "2025-04-13", "budget_per_day": 180, "interests": "food, culture", "plans": 2,
+            })
+            bad_dates = optimize_itinerary.invoke({
+                "origin": "San Francisco", "destination": "Tokyo", "start_date": "2025-04-13",
+                "end_date": "2025-04-10", "budget_per_day": 180,
+            })
+        finally:
+            set_inventory(None)
+        
+        assert result.startswith("Best 2 plan(s) for San Francisco → Tokyo")
+        assert "budget $720" in result and "Plan 2: total $" in result
+        assert "- Day 4 (2025-04-13):" in result
+        assert bad_dates.startswith("Error: The trip ends")
+    
+    def test_long_trips(self):
+        set_inventory(TravelInventory.generate(flights=50_000, hotels=20_000, activities=20_000, seed=3))
+        all_interests = "food, culture, nature, nightlife, shopping, adventure, wellness, history"
+        trip = {
+            "origin": "San Francisco", "destination": "Tokyo", "start_date": "2025-04-10",
+            "budget_per_day": 180, "interests": all_interests, "activities_per_day": 4,
+        }
+        try:
+            start = time.perf_counter()
+            month = optimize_itinerary.invoke({**trip, "end_date": "2025-05-09"})
+            elapsed = time.perf_counter() - start
+            season = optimize_itinerary.invoke({**trip, "end_date": "2025-07-10"})
+        finally:
+            set_inventory(None)
+        
+        assert month.startswith("Best 3 plan(s)") and "(30 days, 29 nights)" in month
+        assert elapsed < 1.0
+        assert season.startswith(f"Error: The trip is 92 days long; plans cover at most {MAX_TRIP_DAYS} days")
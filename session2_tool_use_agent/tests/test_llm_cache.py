@@ -0,0 +1,209 @@
+# tests/test_llm_cache.py
+"""
+Unit tests for the model response cache.
+
+Run with: uv run pytest tests/test_llm_cache.py -v
+"""
+
+import asyncio
+import threading
+import time
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from src.agent.llm_cache import CachedChatModel, ResponseCache, request_key
+from src.agent.scripted import ScriptedChatModel, tool_call
+
+
+class SlowChatModel(ScriptedChatModel):
+    """Scripted model whose calls take a while, to overlap identical requests."""
+    
+    def invoke(self, messages):
+        time.sleep(0.1)
+        return super().invoke(messages)
+    
+    async def ainvoke(self, messages):
+        await asyncio.sleep(0.1)
+        return super().invoke(messages)
+    
+    async def astream(self, messages):
+        await asyncio.sleep(0.1)
+        for chunk in super().stream(messages):
+            yield chunk
+
+
+class TestRequestKey:
+    """The key changes with anything that changes the model's answer."""
+    
+    def test_equal_requests_share_a_key(self):
+        messages = [SystemMessage(content="ctx"), HumanMessage(content="hi")]
+        assert request_key("m", 0, [], messages) == request_key("m", 0, [], list(messages))
+    
+    def test_key_inputs(self):
+        messages = [HumanMessage(content="hi")]
+        base = request_key("m", 0, [], messages)
+        assert request_key("other", 0, [], messages) != base
+        assert request_key("m", 0.5, [], messages) != base
+        assert request_key("m", 0, [{"name": "calc"}], messages) != base
+        assert request_key("m", 0, [], [HumanMessage(content="hello")]) != base
+
+
+class TestResponseCache:
+    """Memory and disk tiers, TTL, LRU eviction and counters."""
+    
+    def test_memory_hit_returns_a_copy(self):
+        cache = ResponseCache()
+        cache.put("k", AIMessage(content="", tool_calls=[tool_call("get_time", {"location": "that"}, "c1")]))
+        
+        first = cache.get("k")
+        first.tool_calls[0]["args"]["location"] = "Tokyo"
+        assert cache.get("k").tool_calls[0]["args"] == {"location": "that"}
+        assert cache.get("missing") is None
+        assert (cache.stats.hits, cache.stats.misses, cache.stats.memory_hits) == (2, 1, 2)
+    
+    def test_disk_tier_survives_restart(self, tmp_path):
+        path = str(tmp_path / "llm.db")
+        ResponseCache(path).put("k", AIMessage(content="cached"))
+        
+        cache = ResponseCache(path)
+        assert cache.get("k").content == "cached"
+        assert cache.stats.disk_hits == 1
+        assert cache.get("k").content == "cached"
+        assert cache.stats.memory_hits == 1
+    
+    def test_ttl(self, tmp_path):
+        cache = ResponseCache(str(tmp_path / "llm.db"), ttl=0, disk_ttl=0)
+        cache.put("k", AIMessage(content="stale"))
+        assert cache.get("k") is None
+        assert cache.purge_expired() == 0
+    
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_entries=2)
+        for key in "abc":
+            cache.put(key, AIMessage(content=key))
+        assert len(cache) == 2
+        assert cache.get("a") is None
+        assert cache.get("c").content == "c"
+    
+    def test_concurrent_sync_requests_coalesce(self):
+        cache = ResponseCache()
+        model = CachedChatModel(SlowChatModel([AIMessage(content="once")]), cache)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(model.invoke([HumanMessage(content="hi")]).content))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert results == ["once"] * 3
+        assert len(model.llm.requests) == 1
+        assert cache.stats.coalesced == 2
+    
+    def test_concurrent_async_requests_coalesce(self):
+        cache = ResponseCache()
+        model = CachedChatModel(SlowChatModel([AIMessage(content="once")]), cache)
+        
+        async def ask_twice():
+            return await asyncio.gather(*[model.ainvoke([HumanMessage(content="hi")]) for _ in range(2)])
+        
+        answers = asyncio.run(ask_twice())
+        assert [a.content for a in answers] == ["once", "once"]
+        assert len(model.llm.requests) == 1
+        assert cache.stats.coalesced == 1
+    
+    def test_async_disk_tier_runs_off_the_event_loop(self, tmp_path):
+        cache = ResponseCache(str(tmp_path / "llm.db"))
+        disk_threads = []
+        for name in ("_disk_lookup", "_store_disk"):
+            method = getattr(cache, name)
+            def record(*args, method=method):
+                disk_threads.append(threading.current_thread())
+                return method(*args)
+            setattr(cache, name, record)
+        
+        async def ask():
+            async def call():
+                return AIMessage(content="fresh")
+            return await cache.aget_or_call("k", call), threading.current_thread()
+        
+        answer, loop_thread = asyncio.run(ask())
+        assert answer.content == "fresh"
+        assert len(disk_threads) == 2 and loop_thread not in disk_threads
+        assert ResponseCache(cache.path).get("k").content == "fresh"
+    
+    def test_concurrent_streams_coalesce(self, tmp_path):
+        cache = ResponseCache(str(tmp_path / "llm.db"))
+        model = CachedChatModel(SlowChatModel([AIMessage(content="only once please")]), cache)
+        disk_threads = []
+        for name in ("_disk_lookup", "_store_disk"):
+            method = getattr(cache, name)
+            def record(*args, method=method):
+                disk_threads.append(threading.current_thread())
+                return method(*args)
+            setattr(cache, name, record)
+        
+        async def stream_three():
+            async def collect():
+                return [chunk.content async for chunk in model.astream([HumanMessage(content="hi")])]
+            return await asyncio.gather(*[collect() for _ in range(3)]), threading.current_thread()
+        
+        streams, loop_thread = asyncio.run(stream_three())
+        assert ["".join(chunks) for chunks in streams] == ["only once please"] * 3
+        assert len(model.llm.requests) == 1
+        assert cache.stats.coalesced == 2
+        # The leader streams the model's chunks, the others get the response as one chunk
+        assert sorted(streams, key=len) == [["only once please"], ["only once please"], ["only", " once", " please"]]
+        assert disk_threads and loop_thread not in disk_threads
+        assert ResponseCache(cache.path).get(model.cache_key([HumanMessage(content="hi")])).content == "only once please"
+    
+    def test_stream_closed_early_fails_waiters_without_caching(self):
+        cache = ResponseCache()
+        model = CachedChatModel(SlowChatModel([AIMessage(content="a b c")]), cache)
+        
+        async def close_early():
+            leader = model.astream([HumanMessage(content="hi")])
+            await leader.__anext__()
+            waiter = asyncio.ensure_future(model.ainvoke([HumanMessage(content="hi")]))
+            await asyncio.sleep(0)
+            await leader.aclose()
+            return await asyncio.gather(waiter, return_exceptions=True)
+        
+        [error] = asyncio.run(close_early())
+        assert isinstance(error, RuntimeError)
+        assert len(cache) == 0
+    
+    def test_miss_then_finished_leader_does_not_call_again(self):
+        # The lookup misses, then another caller stores the response before this one claims the key
+        cache = ResponseCache()
+        real_get = cache.get
+        def get_then_store(key):
+            found = real_get(key)
+            cache.put(key, AIMessage(content="stored meanwhile"))
+            return found
+        cache.get = get_then_store
+        
+        def call():
+            raise AssertionError("model called again")
+        
+        assert cache.get_or_call("k", call).content == "stored meanwhile"
+        assert cache.stats.coalesced == 1
+
+
+class TestAgentWithCache:
+    """A repeated conversation is answered without calling the model."""
+    
+    def test_repeated_turn_hits_cache(self, make_agent):
+        cache = ResponseCache()
+        responses = [
+            AIMessage(content="", tool_calls=[tool_call("calc", {"expression": "2 + 2"}, "call_1")]),
+            AIMessage(content="It is 4"),
+        ]
+        first = make_agent(*responses, response_cache=cache)
+        assert first.run("What is 2 + 2?", verbose=False) == "It is 4"
+        
+        # The second agent's model has nothing scripted; every call must hit the cache
+        second = make_agent(response_cache=cache)
+        assert second.run("What is 2 + 2?", verbose=False) == "It is 4"
+        assert cache.stats.hits == 2
+        assert cache.stats.misses == 2
@@ -0,0 +1,133 @@
+# tests/test_memo.py
+"""
+Unit tests for per-tool result memoization.
+
+Run with: uv run pytest tests/test_memo.py -v
+"""
+
+import threading
+import time
+from langchain_core.messages import AIMessage, ToolMessage
+from src.agent.scripted import tool_call
+import src.tools.execution as execution
+from src.tools.memo import TOOL_MEMO, MemoPolicy, ToolMemo, casefold_args
+from src.tools.schemas import REGISTRY
+
+
+class Counter:
+    """A fake tool body that counts its calls."""
+    
+    def __init__(self, result="ok", delay=0.0):
+        self.calls = 0
+        self.result = result
+        self.delay = delay
+    
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.result
+
+
+class TestMemoPolicy:
+    """Expiry windows of the three policy kinds."""
+    
+    def test_windows(self):
+        assert MemoPolicy.pure().window(125.0) == (None, None)
+        assert MemoPolicy.ttl(10).window(125.0) == (None, 135.0)
+        assert MemoPolicy.time_bucket(60).window(125.0) == (2, 180.0)
+    
+    def test_builtin_policies(self):
+        assert REGISTRY.memo_policy("calc").kind == "pure"
+        assert REGISTRY.memo_policy("get_time").kind == "time_bucket"
+
+
+class TestToolMemo:
+    """Caching, expiry, normalization and coalescing."""
+    
+    def test_pure_results_are_reused(self):
+        memo, run = ToolMemo(), Counter()
+        for _ in range(3):
+            assert memo.call("calc", {"expression": "1+1"}, MemoPolicy.pure(), run) == "ok"
+        assert run.calls == 1
+        assert (memo.stats.hits, memo.stats.misses) == (2, 1)
+    
+    def test_ttl_expires(self):
+        memo, run = ToolMemo(), Counter()
+        memo.call("t", {}, MemoPolicy.ttl(0), run)
+        memo.call("t", {}, MemoPolicy.ttl(0), run)
+        assert run.calls == 2
+    
+    def test_normalized_arguments_share_a_result(self):
+        memo, run = ToolMemo(), Counter()
+        policy = MemoPolicy.time_bucket(60, normalize=casefold_args("location"))
+        memo.call("get_time", {"location": "Cape Town"}, policy, run)
+        memo.call("get_time", {"location": " cape  TOWN"}, policy, run)
+        assert run.calls == 1
+    
+    def test_errors_are_not_kept(self):
+        memo, run = ToolMemo(), Counter(result="Error: boom")
+        memo.call("t", {}, MemoPolicy.pure(), run)
+        memo.call("t", {}, MemoPolicy.pure(), run)
+        assert run.calls == 2
+    
+    def test_bounded(self):
+        memo = ToolMemo(max_entries=2)
+        for i in range(5):
+            memo.call("calc", {"expression": str(i)}, MemoPolicy.pure(), Counter())
+        assert len(memo) == 2
+    
+    def test_overlapping_calls_run_once(self):
+        memo, run = ToolMemo(), Counter(delay=0.1)
+        threads = [
+            threading.Thread(target=memo.call, args=("t", {}, MemoPolicy.pure(), run))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert run.calls == 1
+        assert memo.stats.coalesced == 2
+
+
+class TestAgentMemo:
+    """The agent reuses tool results across turns, sessions and duplicate calls."""
+    
+    def test_duplicate_calls_in_one_turn_run_once(self, make_agent, monkeypatch):
+        calls = []
+        original = execution.execute_calc
+        monkeypatch.setattr(execution, "execute_calc", lambda e: calls.append(e) or original(e))
+        agent = make_agent(
+            AIMessage(content="", tool_calls=[
+                tool_call("calc", {"expression": "6 * 7"}, "call_1"),
+                tool_call("calc", {"expression": "6 * 7"}, "call_2"),
+            ]),
+            AIMessage(content="42"),
+        )
+        agent.run("Twice", verbose=False)
+        
+        assert calls == ["6 * 7"]
+        tool_messages = [m for m in agent.messages if isinstance(m, ToolMessage)]
+        assert [m.content for m in tool_messages] == ["Calculation: 6 * 7 = 42"] * 2
+    
+    def test_resolved_reference_hits_cache(self, make_agent):
+        agent = make_agent(
+            AIMessage(content="", tool_calls=[tool_call("get_time", {"location": "Tokyo"}, "call_1")]),
+            AIMessage(content="Tokyo time"),
+            AIMessage(content="", tool_calls=[tool_call("get_time", {"location": "that"}, "call_2")]),
+            AIMessage(content="Same"),
+        )
+        agent.run("Time in Tokyo?", verbose=False)
+        hits = TOOL_MEMO.stats.hits
+        agent.run("And there?", verbose=False)
+        
+        assert TOOL_MEMO.stats.hits == hits + 1
+    
+    def test_disabled(self, make_agent):
+        agent = make_agent(
+            AIMessage(content="", tool_calls=[tool_call("calc", {"expression": "1 + 1"}, "call_1")]),
+            AIMessage(content="2"),
+            tool_memo=None,
+        )
+        agent.run("Sum", verbose=False)
+        assert len(TOOL_MEMO) == 0
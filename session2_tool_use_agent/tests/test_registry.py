@@ -0,0 +1,94 @@
+# tests/test_registry.py
+"""
+Unit tests for the ToolRegistry.
+
+Run with: uv run pytest tests/test_registry.py -v
+"""
+
+import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
+from pydantic import ValidationError
+from src.agent.scripted import tool_call
+import src.tools.registry as registry_module
+from src.tools.registry import ToolRegistry
+from src.tools.schemas import REGISTRY, CalcInput, calc, get_time
+
+
+@tool
+def shout(text: str) -> str:
+    """Repeat the text in upper case."""
+    return text.upper()
+
+
+class TestToolRegistry:
+    """Lookup, registration and schema caching."""
+    
+    def test_default_registry_has_builtin_tools(self):
+        assert REGISTRY.names() == ["get_time", "calc", "calc_batch", "lookup_faq"]
+        assert REGISTRY.get("calc") is calc
+        assert REGISTRY.get("missing") is None
+    
+    def test_register_at_runtime(self):
+        registry = ToolRegistry([calc])
+        registry.register(shout)
+        
+        assert "shout" in registry
+        assert len(registry) == 2
+        assert registry.json_schema("shout")["properties"]["text"]["type"] == "string"
+    
+    def test_duplicate_registration_fails(self):
+        registry = ToolRegistry([calc])
+        with pytest.raises(ValueError):
+            registry.register(calc)
+        registry.register(calc, replace=True)
+        assert registry.names() == ["calc"]
+    
+    def test_schemas_are_cached(self):
+        assert REGISTRY.args_schema("calc") is CalcInput
+        assert REGISTRY.json_schema("calc") is REGISTRY.json_schema("calc")
+    
+    def test_validate_arguments(self):
+        assert REGISTRY.validate("calc", {"expression": "2 + 2"}) == {"expression": "2 + 2"}
+        with pytest.raises(ValidationError):
+            REGISTRY.validate("calc", {"expr": "2 + 2"})
+    
+    def test_load_entry_points(self, monkeypatch):
+        class FakeEntryPoint:
+            def __init__(self, obj):
+                self.obj = obj
+            
+            def load(self):
+                return self.obj
+        
+        monkeypatch.setattr(
+            registry_module, "entry_points",
+            lambda group: [FakeEntryPoint(shout), FakeEntryPoint([get_time])],
+        )
+        registry = ToolRegistry()
+        
+        assert registry.load_entry_points() == ["shout", "get_time"]
+
+
+class TestAgentUsesRegistry:
+    """The agent dispatches through its registry."""
+    
+    def test_runtime_registered_tool_is_called(self, make_agent):
+        registry = ToolRegistry([shout])
+        agent = make_agent(
+            AIMessage(content="", tool_calls=[tool_call("shout", {"text": "hi"}, "call_1")]),
+            AIMessage(content="HI"),
+            registry=registry,
+        )
+        agent.run("Shout hi", verbose=False)
+        
+        assert agent.messages[2].content == "HI"
+    
+    def test_invalid_arguments_return_clean_error(self, make_agent):
+        agent = make_agent(
+            AIMessage(content="", tool_calls=[tool_call("calc", {"expr": "2"}, "call_1")]),
+            AIMessage(content="Sorry"),
+        )
+        agent.run("Calculate", verbose=False)
+        
+        assert agent.messages[2].content.startswith("Error executing calc:")
@@ -0,0 +1,114 @@
+# tests/test_router.py
+"""
+Unit tests for the fast-path router that answers trivial queries without the model.
+Uses a scripted chat model, so no API key is needed.
+
+Run with: uv run pytest tests/test_router.py -v
+"""
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from src.agent.events import FinalAnswer, ToolCallFinished
+from src.agent.loop import ToolUsingAgent
+from src.agent.router import FastPathRouter, Route
+from src.agent.scripted import ScriptedChatModel
+
+
+@pytest.fixture(scope="module")
+def router():
+    return FastPathRouter()
+
+
+class TestMatch:
+    """Confident queries get a route; anything else falls through."""
+    
+    @pytest.mark.parametrize("query, tool, args", [
+        ("what is 18% of 24500", "calc", {"expression": "18% of 24500"}),
+        ("What is 18% of 24,500?", "calc", {"expression": "18% of 24500"}),
+        ("calculate (5 + 3) * 2", "calc", {"expression": "(5 + 3) * 2"}),
+        ("time in Tokyo", "get_time", {"location": "tokyo"}),
+        ("What time is it in New York right now?", "get_time", {"location": "new york"}),
+        ("What's your refund policy?", "lookup_faq", {"query": "refund policy"}),
+        ("What payment methods do you accept?", "lookup_faq", {"query": "payment methods"}),
+    ])
+    def test_routes(self, router, query, tool, args):
+        route = router.match(query)
+        assert (route.tool_name, route.args) == (tool, args)
+        assert route.confidence >= router.min_confidence
+    
+    @pytest.mark.parametrize("query", [
+        "what is 42",
+        "time in Paris",
+        "time there",
+        "How long does shipping take?",
+        "Can I get a refund?",
+        "what time is it in tokyo and what is 2+2",
+        "refund policy for orders over 18% of 500",
+        "Tell me a joke",
+    ])
+    def test_falls_through(self, router, query):
+        assert router.match(query) is None
+    
+    def test_only_registered_tools(self):
+        from src.tools.registry import ToolRegistry
+        from src.tools.schemas import calc
+        router = FastPathRouter(registry=ToolRegistry([calc]))
+        assert router.match("2 + 2") is not None
+        assert router.match("time in Tokyo") is None
+
+
+class TestFormat:
+    """Answers come from templates; errors and misses go to the model."""
+    
+    def test_templates(self, router):
+        calc = Route("calc", {"expression": "2 + 2"}, 1.0, "arithmetic")
+        assert router.format(calc, "Calculation: 2 + 2 = 4\n\nSteps: ...") == "Calculation: 2 + 2 = 4"
+        faq = Route("lookup_faq", {"query": "warranty"}, 1.0, "faq_topic")
+        result = '{"answer": "One year.", "source_title": "Warranty Information"}'
+        assert router.format(faq, result) == "One year.\n\nSource: Warranty Information"
+    
+    def test_errors_and_misses_are_rejected(self, router):
+        time_route = Route("get_time", {"location": "atlantis"}, 1.0, "time_in_location")
+        assert router.format(time_route, "Error: Location 'atlantis' not supported.") is None
+        faq = Route("lookup_faq", {"query": "warranty"}, 1.0, "faq_topic")
+        assert router.format(faq, '{"answer": "No match", "source_title": "No Match Found"}') is None
+
+
+class TestAgentFastPath:
+    """The agent skips the model for routed queries and keeps the same history shape."""
+    
+    def test_skips_model(self):
+        model = ScriptedChatModel()
+        agent = ToolUsingAgent(llm=model, router=FastPathRouter(), tool_memo=None)
+        answer = agent.run("What is 18% of 24500?", verbose=False)
+        
+        assert answer == "Calculation: 18.0% of 24500.0 = 4,410.00"
+        assert model.calls == 0
+        assert [type(m) for m in agent.messages] == [HumanMessage, AIMessage, ToolMessage, AIMessage]
+        assert agent.messages[1].tool_calls[0]["name"] == "calc"
+        assert agent.state.last_tool_name == "calc"
+        assert agent.router.stats.routed == 1
+    
+    def test_falls_through_to_model(self):
+        model = ScriptedChatModel([AIMessage(content="Here is a joke")])
+        agent = ToolUsingAgent(llm=model, router=FastPathRouter())
+        assert agent.run("Tell me a joke", verbose=False) == "Here is a joke"
+        assert model.calls == 1
+        assert agent.router.stats.to_dict()["short_circuit_rate"] == 0.0
+    
+    def test_rejected_result_falls_through(self):
+        model = ScriptedChatModel([AIMessage(content="I don't know that place")])
+        agent = ToolUsingAgent(llm=model, router=FastPathRouter(locations=["qxzzv"]), tool_memo=None)
+        assert agent.run("time in Qxzzv", verbose=False) == "I don't know that place"
+        assert model.calls == 1
+        assert agent.router.stats.rejected == 1
+        assert [type(m) for m in agent.messages] == [HumanMessage, AIMessage]
+    
+    def test_streaming(self):
+        model = ScriptedChatModel()
+        agent = ToolUsingAgent(llm=model, router=FastPathRouter(), tool_memo=None)
+        events = list(agent.run_stream("What are your business hours?"))
+        assert isinstance(events[1], ToolCallFinished) and events[1].name == "lookup_faq"
+        assert isinstance(events[-1], FinalAnswer)
+        assert events[-1].content.startswith("Our customer support is available")
+        assert model.calls == 0
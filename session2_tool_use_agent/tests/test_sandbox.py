@@ -0,0 +1,106 @@
+# tests/test_sandbox.py
+"""
+Unit tests for the calc sandbox: worker processes with time and resource limits.
+
+Run with: uv run pytest tests/test_sandbox.py -v
+"""
+
+import threading
+import time
+import pytest
+from src.tools import execution
+from src.tools.execution import evaluate_calc, execute_calc, needs_sandbox, set_calc_sandbox
+from src.tools.sandbox import CalcSandbox
+
+# Runs far longer than any limit used here
+PATHOLOGICAL = "9**9**9"
+
+
+@pytest.fixture(scope="module")
+def sandbox():
+    with CalcSandbox(workers=1, timeout=0.5, cpu_seconds=None) as sandbox:
+        sandbox.start()
+        yield sandbox
+
+
+class TestCalcSandbox:
+    """Evaluation in worker processes."""
+    
+    @pytest.mark.parametrize("expression", ["2 ** 10", "18% of 24500", "1 / 0", "2 + abc", "(1 + 2"])
+    def test_results_match_inline_evaluation(self, sandbox, expression):
+        assert sandbox.evaluate(expression) == evaluate_calc(expression)
+    
+    def test_timeout_returns_error_and_replaces_worker(self, sandbox):
+        replaced = sandbox.stats.replaced
+        start = time.perf_counter()
+        result = sandbox.evaluate(PATHOLOGICAL)
+        
+        assert result.startswith("Error: Calculation took too long (over 0.5 seconds)")
+        assert PATHOLOGICAL in result
+        assert time.perf_counter() - start < 5
+        assert sandbox.stats.replaced == replaced + 1
+        assert sandbox.evaluate("3 ** 4") == "Calculation: 3 ** 4 = 81"
+        assert sandbox.alive() == 1
+    
+    def test_cpu_limit_kills_worker(self):
+        with CalcSandbox(workers=1, timeout=30, cpu_seconds=1) as sandbox:
+            start = time.perf_counter()
+            result = sandbox.evaluate(PATHOLOGICAL)
+            
+            assert result.startswith("Error: Calculation used too much CPU time or memory")
+            assert time.perf_counter() - start < 10
+            assert sandbox.stats.crashes == 1
+            assert sandbox.evaluate("2 ** 8") == "Calculation: 2 ** 8 = 256"
+    
+    def test_full_queue_turns_calls_away(self):
+        with CalcSandbox(workers=1, timeout=1, cpu_seconds=None, max_queued=0) as sandbox:
+            sandbox.start()
+            busy = threading.Thread(target=sandbox.evaluate, args=(PATHOLOGICAL,))
+            busy.start()
+            time.sleep(0.2)
+            
+            assert sandbox.evaluate("1 + 1").startswith("Error: The calculator is busy")
+            assert sandbox.stats.rejected == 1
+            busy.join()
+            assert sandbox.evaluate("1 + 1") == "Calculation: 1 + 1 = 2"
+    
+    def test_closed_sandbox_stops_workers(self):
+        sandbox = CalcSandbox(workers=2)
+        sandbox.start()
+        assert sandbox.alive() == 2
+        sandbox.close()
+        assert sandbox.alive() == 0
+        with pytest.raises(RuntimeError):
+            sandbox.evaluate("1 + 1")
+
+
+class TestExecuteCalcRouting:
+    """Which expressions execute_calc sends to the sandbox."""
+    
+    def test_powers_and_long_expressions_need_the_sandbox(self):
+        assert needs_sandbox("2 ** 10")
+        assert needs_sandbox(" + ".join(["1"] * 200))
+        assert not needs_sandbox("18% of 24500")
+        assert not needs_sandbox("(5 + 3) * 2")
+    
+    def test_pathological_expression_does_not_stall_execute_calc(self, sandbox):
+        set_calc_sandbox(sandbox)
+        try:
+            jobs = sandbox.stats.jobs
+            assert execute_calc("2 + 2") == "Calculation: 2 + 2 = 4"
+            assert sandbox.stats.jobs == jobs
+            
+            assert execute_calc(PATHOLOGICAL).startswith("Error: Calculation took too long")
+            assert sandbox.stats.jobs == jobs + 1
+        finally:
+            set_calc_sandbox(None)
+    
+    def test_off_mode_evaluates_inline(self, sandbox, monkeypatch):
+        monkeypatch.setattr(execution, "CALC_SANDBOX_MODE", "off")
+        set_calc_sandbox(sandbox)
+        try:
+            jobs = sandbox.stats.jobs
+            assert execute_calc("2 ** 10") == "Calculation: 2 ** 10 = 1024"
+            assert sandbox.stats.jobs == jobs
+        finally:
+            set_calc_sandbox(None)
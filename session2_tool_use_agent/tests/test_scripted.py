@@ -0,0 +1,55 @@
+# tests/test_scripted.py
+"""
+Unit tests for the scripted chat model used by the tests and benchmarks.
+
+Run with: uv run pytest tests/test_scripted.py -v
+"""
+
+from langchain_core.messages import AIMessage, ToolMessage
+from src.agent.scripted import ScriptedChatModel, tool_call, tool_turn_responder
+
+
+class TestScriptedChatModel:
+    """Scripted responses first, then the responder, for as many turns as needed."""
+    
+    def test_responses_then_responder(self):
+        model = ScriptedChatModel(
+            [AIMessage(content="first")],
+            responder=lambda messages: AIMessage(content=f"reply to {len(messages)}"),
+        )
+        assert model.invoke(["a"]).content == "first"
+        assert model.invoke(["a", "b"]).content == "reply to 2"
+        assert model.calls == 2
+        assert len(model.requests) == 2
+    
+    def test_record_off_keeps_no_requests(self):
+        model = ScriptedChatModel([AIMessage(content="x")], record=False)
+        model.invoke(["a"])
+        assert model.requests == []
+    
+    def test_stream_reassembles_tool_calls(self):
+        response = AIMessage(content="", tool_calls=[tool_call("calc", {"expression": "1 + 1"}, "c1")])
+        chunks = list(ScriptedChatModel([response]).stream([]))
+        gathered = chunks[0]
+        for chunk in chunks[1:]:
+            gathered = gathered + chunk
+        assert gathered.tool_calls[0]["args"] == {"expression": "1 + 1"}
+
+
+class TestToolTurnResponder:
+    """Open-ended agent runs: tool calls per user message, then an answer."""
+    
+    def test_agent_runs_many_turns(self, make_agent):
+        calls = lambda turn: [{"name": "calc", "args": {"expression": f"{turn} * 2"}}]
+        agent = make_agent()
+        agent.llm = ScriptedChatModel(responder=tool_turn_responder(calls, answer="ok"))
+        for turn in range(1, 4):
+            assert agent.run(f"Double {turn}", verbose=False) == "ok"
+        
+        results = [m.content for m in agent.messages if isinstance(m, ToolMessage)]
+        assert len(results) == 3
+        assert "= 6" in results[-1]
+    
+    def test_no_calls_answers_directly(self):
+        respond = tool_turn_responder(lambda turn: [], answer="plain")
+        assert respond([AIMessage(content="hi")]).content == "plain"
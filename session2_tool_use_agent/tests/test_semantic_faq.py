@@ -0,0 +1,82 @@
+# tests/test_semantic_faq.py
+"""
+Unit tests for the offline semantic FAQ store.
+
+Run with: uv run pytest tests/test_semantic_faq.py -v
+"""
+
+import json
+import pytest
+from src.tools.execution import (
+    FAQ_DATABASE,
+    FAQ_PHRASINGS,
+    build_faq_store,
+    execute_lookup_faq,
+    set_faq_store,
+)
+from src.tools.semantic_faq import HashingVectorizer, SemanticFaqStore
+
+
+@pytest.fixture(scope="module")
+def store():
+    return SemanticFaqStore.from_faqs(FAQ_DATABASE, FAQ_PHRASINGS)
+
+
+@pytest.fixture
+def restore_faq_store():
+    yield
+    set_faq_store(None)
+
+
+class TestSemanticFaqStore:
+    """Cosine-similarity search over hashed n-gram embeddings."""
+    
+    def test_vectors_are_normalized(self):
+        vectors = HashingVectorizer().transform(["refund policy", ""])
+        assert vectors[0] @ vectors[0] == pytest.approx(1.0)
+        assert not vectors[1].any()
+    
+    def test_matches_paraphrases(self, store):
+        assert store.search("can I get my money back", k=1)[0].topic == "refund policy"
+        assert store.search("when will my order arrive", k=1)[0].topic == "shipping"
+    
+    def test_rejects_unrelated_queries(self, store):
+        assert store.search("cryptocurrency policy") == []
+        assert store.search("tell me a joke") == []
+    
+    def test_search_batch_top_k(self, store):
+        results = store.search_batch(["refund policy", "tell me a joke"], k=3)
+        
+        assert len(results) == 2
+        topics = [hit.topic for hit in results[0]]
+        assert topics[0] == "refund policy"
+        assert len(topics) == len(set(topics)) <= 3
+        assert all(a.score >= b.score for a, b in zip(results[0], results[0][1:]))
+        assert results[1] == []
+    
+    def test_save_and_load_memory_mapped(self, store, tmp_path):
+        store.save(str(tmp_path / "index"))
+        loaded = SemanticFaqStore.load(str(tmp_path / "index"))
+        
+        for query in ["refund policy", "do you take paypal", "cryptocurrency policy"]:
+            assert loaded.search(query) == store.search(query)
+        assert loaded.topics() == list(FAQ_DATABASE)
+
+
+class TestLookupFaqSemanticMode:
+    """execute_lookup_faq keeps its JSON contract in semantic mode."""
+    
+    def test_json_contract(self, restore_faq_store):
+        set_faq_store(build_faq_store("semantic"))
+        result = json.loads(execute_lookup_faq("can I get my money back"))
+        
+        assert result == {
+            "answer": FAQ_DATABASE["refund policy"]["answer"],
+            "source_title": FAQ_DATABASE["refund policy"]["source_title"],
+        }
+        fallback = json.loads(execute_lookup_faq("cryptocurrency policy"))
+        assert fallback["source_title"] == "No Match Found"
+    
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError, match="Unknown FAQ search mode"):
+            build_faq_store("fuzzy")
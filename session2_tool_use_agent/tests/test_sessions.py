@@ -0,0 +1,166 @@
+# tests/test_sessions.py
+"""
+Unit tests for the multi-tenant session manager.
+Uses a scripted chat model, so no API key is needed.
+
+Run with: uv run pytest tests/test_sessions.py -v
+"""
+
+import asyncio
+import time
+from langchain_core.messages import AIMessage
+from src.agent.loop import ToolUsingAgent
+from src.agent.scripted import ScriptedChatModel
+from src.agent.sessions import SessionManager
+
+
+def echo(messages):
+    """Answer with the last user message, so each reply shows which turn it belongs to."""
+    return AIMessage(content=f"echo: {messages[-1].content}")
+
+
+class SlowChatModel(ScriptedChatModel):
+    """Scripted model whose async calls take a while, to overlap turns."""
+    
+    async def ainvoke(self, messages, **kwargs):
+        await asyncio.sleep(0.1)
+        return self.invoke(messages)
+
+
+def make_manager(model=None, **kwargs):
+    agent = ToolUsingAgent(llm=model or ScriptedChatModel(responder=echo))
+    return SessionManager(agent, **kwargs)
+
+
+class TestSessions:
+    """Sessions share the model binding but not their conversations."""
+    
+    def test_sessions_are_isolated(self):
+        manager = make_manager()
+        assert manager.run("alice", "hi from alice") == "echo: hi from alice"
+        assert manager.run("bob", "hi from bob") == "echo: hi from bob"
+        
+        alice, bob = manager.get("alice"), manager.get("bob")
+        assert alice.llm_with_tools is bob.llm_with_tools
+        assert alice.tool_executor is bob.tool_executor
+        assert [m.content for m in alice.messages] == ["hi from alice", "echo: hi from alice"]
+        assert list(bob.state.user_intents) == ["hi from bob"]
+    
+    def test_same_session_turns_do_not_interleave(self):
+        manager = make_manager(SlowChatModel(responder=echo))
+        
+        async def two_turns():
+            return await asyncio.gather(manager.arun("s", "first"), manager.arun("s", "second"))
+        
+        assert asyncio.run(two_turns()) == ["echo: first", "echo: second"]
+        contents = [m.content for m in manager.get("s").messages]
+        assert contents == ["first", "echo: first", "second", "echo: second"]
+    
+    def test_different_sessions_overlap(self):
+        manager = make_manager(SlowChatModel(responder=echo))
+        
+        async def four_sessions():
+            return await asyncio.gather(*[manager.arun(f"s{i}", "hi") for i in range(4)])
+        
+        start = time.perf_counter()
+        asyncio.run(four_sessions())
+        assert time.perf_counter() - start < 0.3
+
+
+class TestEviction:
+    """LRU, TTL and memory cap eviction, with optional spill to disk."""
+    
+    def test_lru_eviction(self):
+        manager = make_manager(max_sessions=2)
+        for session_id in ["a", "b", "a", "c"]:
+            manager.run(session_id, "hi")
+        
+        assert "b" not in manager
+        assert "a" in manager and "c" in manager
+        assert manager.stats.evicted == 1
+    
+    def test_ttl_expiry(self):
+        manager = make_manager(ttl=0.05)
+        manager.run("a", "hi")
+        time.sleep(0.1)
+        
+        assert manager.evict_idle() == 1
+        assert len(manager) == 0
+        assert manager.stats.expired == 1
+    
+    def test_memory_cap(self):
+        manager = make_manager(max_memory_bytes=10_000)
+        for i in range(10):
+            manager.run(f"s{i}", "x" * 500)
+        
+        assert manager.memory_bytes <= 10_000
+        assert 0 < len(manager) < 10
+    
+    def test_spilled_session_is_restored(self, tmp_path):
+        manager = make_manager(max_sessions=1, spill_dir=str(tmp_path))
+        manager.run("a", "remember Tokyo")
+        manager.run("b", "hello")
+        assert "a" not in manager
+        assert manager.stats.spilled == 1
+        
+        manager.run("a", "and now?")
+        agent = manager.get("a")
+        assert [m.content for m in agent.messages][:2] == ["remember Tokyo", "echo: remember Tokyo"]
+        assert list(agent.state.user_intents) == ["remember Tokyo", "and now?"]
+        assert manager.stats.restored == 1
+    
+    def test_close_forgets_spilled_session(self, tmp_path):
+        manager = make_manager(max_sessions=1, spill_dir=str(tmp_path))
+        manager.run("a", "hi")
+        manager.run("b", "hi")
+        manager.close("a")
+        
+        assert list(tmp_path.iterdir()) == []
+        assert manager.get("a").messages == []
+    
+    def test_spill_runs_outside_the_lock(self, tmp_path):
+        manager = make_manager(max_sessions=2, spill_dir=str(tmp_path))
+        manager.run("a", "remember Tokyo")
+        manager.run("b", "hi")
+        spill = manager._spill
+        def slow_spill(session):
+            time.sleep(0.5)
+            spill(session)
+        manager._spill = slow_spill
+        
+        async def timed(session_id, text):
+            start = time.perf_counter()
+            await manager.arun(session_id, text)
+            return time.perf_counter() - start
+        
+        async def turns():
+            evicting = asyncio.ensure_future(manager.arun("c", "hi"))  # evicts "a", slowly
+            await asyncio.sleep(0.1)
+            other = await timed("b", "still there?")
+            again = await timed("a", "and now?")
+            await evicting
+            return other, again
+        
+        other, again = asyncio.run(turns())
+        assert other < 0.2  # not held up by the spill
+        assert again > 0.3  # waited for the spill, then restored it
+        assert [m.content for m in manager.get("a").messages][:2] == ["remember Tokyo", "echo: remember Tokyo"]
+    
+    def test_concurrent_turns_share_one_restore(self, tmp_path):
+        manager = make_manager(max_sessions=1, spill_dir=str(tmp_path))
+        manager.run("a", "remember Tokyo")
+        manager.run("b", "hi")
+        restore = manager._restore
+        def slow_restore(session_id, agent):
+            time.sleep(0.2)
+            return restore(session_id, agent)
+        manager._restore = slow_restore
+        
+        async def two_turns():
+            return await asyncio.gather(manager.arun("a", "first"), manager.arun("a", "second"))
+        
+        assert asyncio.run(two_turns()) == ["echo: first", "echo: second"]
+        contents = [m.content for m in manager.get("a").messages]
+        assert contents[:2] == ["remember Tokyo", "echo: remember Tokyo"]
+        assert contents[-4:] == ["first", "echo: first", "second", "echo: second"]
+        assert manager.stats.restored == 1
@@ -0,0 +1,60 @@
+# tests/test_startup.py
+"""
+Unit tests for lazy startup: importing the agent and constructing it must not
+load the Gemini client or the tool stack.
+
+Run with: uv run pytest tests/test_startup.py -v
+"""
+
+import json
+import os
+import subprocess
+import sys
+import src.tools
+from benchmarks.bench_startup import DEFERRED_MODULES
+from src.agent.scripted import ScriptedChatModel
+from src.tools.registry import ToolRegistry
+
+
+def loaded_modules(code):
+    """Run code in a fresh interpreter and return which deferred modules it loaded."""
+    probe = f"{code}\nimport json, sys\nprint(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))"
+    out = subprocess.run(
+        [sys.executable, "-c", probe],
+        capture_output=True, text=True, check=True,
+        env=dict(os.environ, LLM_CACHE_PATH=""),
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+class TestLazyImports:
+    """Heavy modules are imported on first use only."""
+    
+    def test_import_loads_nothing_heavy(self):
+        assert loaded_modules("import src.agent.loop") == []
+    
+    def test_construction_loads_nothing_heavy(self):
+        code = "from src.agent.loop import ToolUsingAgent\nToolUsingAgent()"
+        assert loaded_modules(code) == []
+    
+    def test_tools_package_exports_on_demand(self):
+        assert src.tools.REGISTRY.names() == src.tools.schemas.REGISTRY.names()
+        assert src.tools.ToolRegistry is ToolRegistry
+        assert "execute_calc" in dir(src.tools)
+
+
+class TestLazyClient:
+    """The tool binding happens on first use and follows later changes."""
+    
+    def test_tools_bound_on_first_use(self, make_agent):
+        agent = make_agent()
+        assert agent._llm_with_tools is None
+        assert agent.llm_with_tools is agent.llm
+        assert "calc" in agent.registry.names()
+    
+    def test_replacing_llm_rebinds(self, make_agent):
+        agent = make_agent()
+        agent.llm_with_tools
+        replacement = ScriptedChatModel([])
+        agent.llm = replacement
+        assert agent.llm_with_tools is replacement
@@ -0,0 +1,82 @@
+# tests/test_state.py
+"""
+Unit tests for AgentState: intent ring buffer, copied tool args and snapshots.
+
+Run with: uv run pytest tests/test_state.py -v
+"""
+
+import copy
+import pickle
+import ormsgpack
+import pytest
+from src.agent.state import AgentState, SNAPSHOT_VERSION
+
+
+def filled_state():
+    state = AgentState()
+    for intent in ["one", "two", "three", "four"]:
+        state.add_user_intent(intent)
+    state.update_tool_result("calc_batch", {"expressions": ["1 + 1", "2 * 3"]}, "ok")
+    state.update_tool_result("get_time", {"location": "Tokyo"}, "12:00")
+    return state
+
+
+class TestAgentState:
+    """Compact layout with the same behaviour as before."""
+    
+    def test_keeps_last_three_intents(self):
+        assert list(filled_state().user_intents) == ["two", "three", "four"]
+    
+    def test_slots(self):
+        assert not hasattr(AgentState(), "__dict__")
+    
+    def test_tool_args_are_a_deep_copy(self):
+        args = {"expressions": ["1 + 1"]}
+        state = AgentState()
+        state.update_tool_result("calc_batch", args, "ok")
+        args["expressions"].append("2 + 2")
+        args["extra"] = True
+        
+        assert state.last_tool_args == {"expressions": ["1 + 1"]}
+        assert type(state.last_tool_args) is dict
+    
+    def test_copy_and_pickle(self):
+        state = filled_state()
+        state.update_tool_result("calc_batch", {"expressions": ["1 + 1"]}, "ok")
+        for copied in (copy.deepcopy(state), pickle.loads(pickle.dumps(state))):
+            assert copied == state and copied.last_tool_args is not state.last_tool_args
+    
+    def test_context_summary_shows_plain_args(self):
+        summary = filled_state().get_context_summary()
+        assert "Recent intents: two, three, four" in summary
+        assert "Last tool args: {'location': 'Tokyo'}" in summary
+    
+    def test_reset_keeps_ring_buffer(self):
+        state = filled_state()
+        state.reset()
+        for intent in ["a", "b", "c", "d"]:
+            state.add_user_intent(intent)
+        assert list(state.user_intents) == ["b", "c", "d"]
+
+
+class TestSnapshots:
+    """to_bytes/from_bytes and to_dict/from_dict round trips."""
+    
+    def test_bytes_round_trip(self):
+        state = filled_state()
+        restored = AgentState.from_bytes(state.to_bytes())
+        
+        assert restored == state
+        assert restored.user_intents.maxlen == 3
+    
+    def test_dict_round_trip(self):
+        state = filled_state()
+        assert AgentState.from_dict(state.to_dict()) == state
+    
+    def test_empty_state_round_trip(self):
+        assert AgentState.from_bytes(AgentState().to_bytes()) == AgentState()
+    
+    def test_unknown_version_is_rejected(self):
+        data = ormsgpack.packb([SNAPSHOT_VERSION + 1, [], None, None, None, None, None])
+        with pytest.raises(ValueError):
+            AgentState.from_bytes(data)
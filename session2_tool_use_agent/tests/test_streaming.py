@@ -0,0 +1,111 @@
+# tests/test_streaming.py
+"""
+Unit tests for the streaming agent loop (run_stream / arun_stream).
+Uses a scripted chat model, so no API key is needed.
+
+Run with: uv run pytest tests/test_streaming.py -v
+"""
+
+import asyncio
+import time
+from langchain_core.messages import AIMessage
+import src.tools.execution as execution
+from src.agent.events import FinalAnswer, TokenDelta, ToolCallFinished, ToolCallStarted
+from src.agent.llm_cache import ResponseCache
+from src.agent.scripted import tool_call
+
+
+def scripted_turn():
+    """A turn with two tool calls and a multi-word final answer."""
+    return (
+        AIMessage(content="", tool_calls=[
+            tool_call("calc", {"expression": "2 + 2"}, "call_1"),
+            tool_call("get_time", {"location": "Tokyo"}, "call_2"),
+        ]),
+        AIMessage(content="Two plus two is 4"),
+    )
+
+
+def message_view(messages):
+    """The parts of a history that must match between run() and run_stream()."""
+    return [(type(m).__name__, m.content, getattr(m, "tool_calls", None)) for m in messages]
+
+
+class TestRunStream:
+    """Events come in order and the agent ends up as if run() had been used."""
+    
+    def test_event_sequence(self, make_agent):
+        agent = make_agent(*scripted_turn())
+        events = list(agent.run_stream("What is 2 + 2, and the time in Tokyo?"))
+        
+        types = [event.type for event in events]
+        assert types[:2] == ["tool_started", "tool_started"]
+        assert sorted(types[2:4]) == ["tool_finished", "tool_finished"]
+        assert types[-1] == "final_answer"
+        assert all(t == "token" for t in types[4:-1])
+        
+        tokens = "".join(e.text for e in events if isinstance(e, TokenDelta))
+        assert tokens == "Two plus two is 4"
+        assert events[-1] == FinalAnswer("Two plus two is 4")
+        
+        finished = {e.call_id: e for e in events if isinstance(e, ToolCallFinished)}
+        assert "= 4" in finished["call_1"].result
+        assert all(e.duration >= 0 for e in finished.values())
+    
+    def test_matches_run(self, make_agent):
+        question = "What is 2 + 2, and the time in Tokyo?"
+        streamed = make_agent(*scripted_turn())
+        blocking = make_agent(*scripted_turn())
+        
+        answer = [e for e in streamed.run_stream(question) if isinstance(e, FinalAnswer)][0].content
+        assert answer == blocking.run(question, verbose=False)
+        assert message_view(streamed.messages) == message_view(blocking.messages)
+        for name in ("user_intents", "last_tool_name", "last_tool_args", "last_location"):
+            assert getattr(streamed.state, name) == getattr(blocking.state, name)
+    
+    def test_answer_without_tools(self, make_agent):
+        agent = make_agent(AIMessage(content="Hello there"))
+        events = list(agent.run_stream("Hi"))
+        
+        assert [e.text for e in events[:-1]] == ["Hello", " there"]
+        assert events[-1].content == "Hello there"
+        assert len(agent.messages) == 2
+    
+    def test_finished_events_in_completion_order(self, make_agent, monkeypatch):
+        original = execution.execute_calc
+        
+        def slow_calc(expression):
+            time.sleep(0.2)
+            return original(expression)
+        
+        monkeypatch.setattr(execution, "execute_calc", slow_calc)
+        agent = make_agent(*scripted_turn())
+        finished = [e for e in agent.run_stream("Both") if isinstance(e, ToolCallFinished)]
+        
+        assert [e.call_id for e in finished] == ["call_2", "call_1"]
+        assert finished[1].duration >= 0.2
+        # History still follows the call order
+        assert [m.tool_call_id for m in agent.messages if m.type == "tool"] == ["call_1", "call_2"]
+    
+    def test_arun_stream(self, make_agent):
+        agent = make_agent(*scripted_turn())
+        
+        async def collect():
+            return [event async for event in agent.arun_stream("Both")]
+        
+        events = asyncio.run(collect())
+        assert isinstance(events[0], ToolCallStarted)
+        assert events[0].args == {"expression": "2 + 2"}
+        assert events[-1].content == "Two plus two is 4"
+    
+    def test_streamed_turn_is_cached(self, make_agent):
+        cache = ResponseCache()
+        first = make_agent(*scripted_turn(), response_cache=cache)
+        list(first.run_stream("Both"))
+        
+        # Nothing scripted: both model calls must be replayed from the cache
+        second = make_agent(response_cache=cache)
+        events = list(second.run_stream("Both"))
+        assert events[-1].content == "Two plus two is 4"
+        assert message_view(second.messages) == message_view(first.messages)
+        assert cache.stats.hits == 2
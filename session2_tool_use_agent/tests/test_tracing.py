@@ -0,0 +1,99 @@
+# tests/test_tracing.py
+"""
+Unit tests for OpenTelemetry spans around the agent loop.
+
+Run with: uv run pytest tests/test_tracing.py -v
+"""
+
+import pytest
+from langchain_core.messages import AIMessage
+from src.agent.llm_cache import ResponseCache
+from src.agent.scripted import tool_call
+from src.agent.tracing import disable_tracing, enable_local_tracing, latency_report, span
+
+
+@pytest.fixture
+def exporter():
+    """Record spans in memory for the duration of a test."""
+    exporter = enable_local_tracing()
+    yield exporter
+    disable_tracing()
+
+
+def tool_turn():
+    return (
+        AIMessage(content="", tool_calls=[
+            tool_call("calc", {"expression": "2 + 2"}, "call_1"),
+            tool_call("get_time", {"location": "that"}, "call_2"),
+        ]),
+        AIMessage(content="Done", usage_metadata={"input_tokens": 30, "output_tokens": 2, "total_tokens": 32}),
+    )
+
+
+def by_name(spans, name):
+    return [s for s in spans if s.name == name]
+
+
+class TestDisabled:
+    """With tracing off, span() is a shared no-op."""
+    
+    def test_noop_span(self):
+        with span("agent.turn") as current:
+            assert not current.is_recording()
+            current.set_attribute("ignored", 1)
+        assert span("a") is span("b")
+
+
+class TestAgentSpans:
+    """A turn produces nested spans with the expected attributes."""
+    
+    def test_turn_structure(self, make_agent, exporter):
+        agent = make_agent(*tool_turn())
+        agent.state.last_location = "Tokyo"
+        agent.run("Sum, then the time there", verbose=False)
+        spans = exporter.get_finished_spans()
+        
+        turn = by_name(spans, "agent.turn")[0]
+        assert turn.attributes["turn.tool_calls"] == 2
+        for name in ("agent.llm", "agent.resolve_references", "agent.tool"):
+            for child in by_name(spans, name):
+                assert child.parent.span_id == turn.context.span_id
+        
+        llm_spans = by_name(spans, "agent.llm")
+        assert len(llm_spans) == 2
+        assert llm_spans[1].attributes["gen_ai.usage.total_tokens"] == 32
+        
+        resolve = by_name(spans, "agent.resolve_references")[0]
+        assert resolve.attributes["references.resolved"] == 1
+        
+        tools = {s.attributes["tool.name"]: s.attributes for s in by_name(spans, "agent.tool")}
+        assert tools["calc"]["tool.args_bytes"] > 0
+        assert tools["calc"]["tool.result_bytes"] > 0
+        assert tools["calc"]["tool.memo_hit"] is False
+        assert tools["get_time"]["tool.error"] is False
+    
+    def test_cache_and_memo_hits(self, make_agent, exporter):
+        cache = ResponseCache()
+        make_agent(*tool_turn(), response_cache=cache).run("Again", verbose=False)
+        exporter.clear()
+        make_agent(response_cache=cache).run("Again", verbose=False)
+        spans = exporter.get_finished_spans()
+        
+        assert all(s.attributes["llm.cache_hit"] for s in by_name(spans, "agent.llm"))
+        calc = [s for s in by_name(spans, "agent.tool") if s.attributes["tool.name"] == "calc"][0]
+        assert calc.attributes["tool.memo_hit"] is True
+    
+    def test_streaming_turn(self, make_agent, exporter):
+        agent = make_agent(*tool_turn())
+        list(agent.run_stream("Stream it"))
+        spans = exporter.get_finished_spans()
+        
+        assert by_name(spans, "agent.turn")[0].attributes["agent.streaming"] is True
+        assert len(by_name(spans, "agent.llm")) == 2
+    
+    def test_latency_report(self, make_agent, exporter):
+        make_agent(*tool_turn()).run("Profile", verbose=False)
+        report = latency_report(exporter.get_finished_spans())
+        
+        assert report["agent.tool"]["count"] == 2
+        assert report["agent.turn"]["total_ms"] >= report["agent.llm"]["total_ms"]
@@ -0,0 +1,103 @@
+# tests/test_travel_inventory.py
+"""
+Unit tests for the indexed travel inventory and the search tools.
+
+Run with: uv run pytest tests/test_travel_inventory.py -v
+"""
+
+import numpy as np
+import pytest
+from src.travel.inventory import TravelInventory, set_inventory
+from src.travel.schemas import TRAVEL_REGISTRY, search_activities, search_flights, search_hotels
+
+
+@pytest.fixture(scope="module")
+def inventory():
+    return TravelInventory.generate(flights=80_000, hotels=10_000, activities=10_000, seed=7)
+
+
+@pytest.fixture
+def shared_inventory(inventory):
+    set_inventory(inventory)
+    yield inventory
+    set_inventory(None)
+
+
+def brute_force(rows: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Matching rows by a full scan, cheapest first."""
+    matching = rows[mask]
+    return matching[np.argsort(matching["price"], kind="stable")]
+
+
+class TestTravelInventory:
+    """Index lookups against full scans."""
+    
+    def test_flights_match_full_scan(self, inventory):
+        route = inventory.city_id("San Francisco") * len(inventory.cities) + inventory.city_id("Tokyo")
+        expected = brute_force(inventory.flights, (inventory.flights["route"] == route) & (inventory.flights["price"] <= 400))
+        
+        page = inventory.search_flights("san francisco", "TOKYO", max_price=400, limit=10)
+        
+        assert page.total == len(expected)
+        assert list(page.rows["price"]) == list(expected["price"][:10])
+    
+    def test_hotels_rating_filter_and_pagination(self, inventory):
+        city = inventory.city_id("Paris")
+        hotels = inventory.hotels
+        expected = brute_force(hotels, (hotels["city"] == city) & (hotels["price"] <= 150) & (hotels["rating"] >= 4.0))
+        
+        first = inventory.search_hotels("Paris", max_price=150, min_rating=4.0, limit=5)
+        second = inventory.search_hotels("Paris", max_price=150, min_rating=4.0, limit=5, offset=5)
+        
+        assert first.total == second.total == len(expected)
+        assert list(np.concatenate([first.rows, second.rows])["price"]) == list(expected["price"][:10])
+        assert (second.rows["rating"] >= 4.0).all()
+    
+    def test_activities_merge_interests_by_price(self, inventory):
+        n_categories = len(inventory.categories)
+        keys = [inventory.city_id("Tokyo") * n_categories + inventory.category_id(c) for c in ("food", "culture")]
+        activities = inventory.activities
+        expected = brute_force(activities, np.isin(activities["key"], keys) & (activities["price"] <= 60))
+        
+        page = inventory.search_activities("Tokyo", ["Food", "culture", "skydiving"], max_price=60, limit=8, offset=4)
+        
+        assert page.total == len(expected)
+        assert list(page.rows["price"]) == list(expected["price"][4:12])
+        assert page.has_more
+    
+    def test_unknown_city_returns_none(self, inventory):
+        assert inventory.search_hotels("Atlantis") is None
+        assert inventory.search_flights("Tokyo", "Atlantis") is None
+    
+    def test_saved_inventory_loads_memory_mapped(self, inventory, tmp_path):
+        inventory.save(str(tmp_path))
+        loaded = TravelInventory.load(str(tmp_path))
+        
+        assert isinstance(loaded.flights, np.memmap)
+        assert len(loaded) == len(inventory)
+        assert loaded.cities == inventory.cities
+        page, expected = (
+            inv.search_activities("Rome", ["history"], max_price=80) for inv in (loaded, inventory)
+        )
+        assert page.total == expected.total
+        assert (page.rows == expected.rows).all()
+
+
+class TestTravelTools:
+    """Tool messages."""
+    
+    def test_flight_results_are_listed_cheapest_first(self, shared_inventory):
+        result = search_flights.invoke({"origin": "London", "destination": "New York", "date": "2025-04-10"})
+        prices = [float(line.split("$")[1].split(" ")[0]) for line in result.splitlines() if line.startswith("- ")]
+        
+        assert result.startswith("Flights London → New York (2025-04-10), 1-10 of ")
+        assert prices == sorted(prices) and len(prices) == 10
+        assert "page=1" in result
+    
+    def test_no_results_and_unknown_city(self, shared_inventory):
+        assert search_hotels.invoke({"city": "Tokyo", "checkin": "a", "checkout": "b", "max_price": 1}) == "No hotels found"
+        assert search_activities.invoke({"city": "Atlantis", "interests": "food"}).startswith("Error: City 'Atlantis' not found")
+    
+    def test_registry_holds_the_search_tools(self):
+        assert TRAVEL_REGISTRY.names()[:3] == ["search_flights", "search_hotels", "search_activities"]
+        assert TRAVEL_REGISTRY.json_schema("search_hotels")["required"] == ["city", "checkin", "checkout"]
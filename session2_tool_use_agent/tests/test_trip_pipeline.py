@@ -0,0 +1,133 @@
+# tests/test_trip_pipeline.py
+"""
+Unit tests for the trip-planning pipeline stage: concurrent searches,
+per-thread caching and the single planning turn.
+
+Run with: uv run pytest tests/test_trip_pipeline.py -v
+"""
+
+import asyncio
+import time
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import StructuredTool
+from src.tools.memo import TOOL_MEMO
+from src.tools.registry import ToolRegistry
+from src.travel.inventory import TravelInventory, set_inventory
+from src.travel.pipeline import TripSearchCache, asearch_trip, plan_trip, search_trip, trip_search_calls
+from src.travel.preferences import TripPreferences
+from src.travel.schemas import TRAVEL_REGISTRY
+from src.travel.search import execute_search_hotels
+
+DELAY = 0.2
+
+
+@pytest.fixture(scope="module")
+def inventory():
+    return TravelInventory.generate(flights=50_000, hotels=20_000, activities=20_000, seed=3)
+
+
+@pytest.fixture
+def shared_inventory(inventory):
+    set_inventory(inventory)
+    yield inventory
+    set_inventory(None)
+
+
+@pytest.fixture
+def trip():
+    return TripPreferences("San Francisco", "Tokyo", "2025-04-10", "2025-04-13", 180, ["food", "culture"])
+
+
+def slow_registry(calls: list) -> ToolRegistry:
+    """The three searches, each taking DELAY seconds and recording its call."""
+    def make(name):
+        def run(**kwargs) -> str:
+            calls.append(name)
+            time.sleep(DELAY)
+            return f"{name} results"
+        return StructuredTool.from_function(run, name=name, description=name, args_schema=TRAVEL_REGISTRY.args_schema(name))
+    return ToolRegistry([make(n) for n in ("search_flights", "search_hotels", "search_activities")])
+
+
+class TestSearchTrip:
+    """Concurrent searches and their caches."""
+    
+    def test_searches_run_concurrently(self, trip):
+        calls = []
+        start = time.perf_counter()
+        observation = search_trip(trip, registry=slow_registry(calls), cache=None)
+        elapsed = time.perf_counter() - start
+        
+        assert sorted(calls) == ["search_activities", "search_flights", "search_hotels"]
+        assert elapsed < 2 * DELAY
+        assert observation.index("[search_flights]") < observation.index("[search_hotels]") < observation.index("[search_activities]")
+    
+    def test_results_are_cached_per_thread(self, trip):
+        calls, cache = [], TripSearchCache()
+        registry = slow_registry(calls)
+        first = search_trip(trip, "t1", registry=registry, cache=cache)
+        again = search_trip(trip, "t1", registry=registry, cache=cache)
+        assert again == first and len(calls) == 3
+        
+        search_trip(trip, "t2", registry=registry, cache=cache, memo=None)
+        trip.budget_per_day = 250
+        search_trip(trip, "t1", registry=registry, cache=cache)
+        assert len(calls) == 9 and len(cache) == 2
+    
+    def test_observation_matches_the_tools(self, shared_inventory, trip):
+        observation = search_trip(trip, "plan", cache=None)
+        args = trip_search_calls(trip)["search_hotels"]
+        
+        assert observation.startswith(f"Search results for the trip ({trip.as_text()}):")
+        assert execute_search_hotels(**args).strip() in observation
+        assert "[optimize_itinerary]\nBest 3 plan(s) for San Francisco → Tokyo" in observation
+    
+    def test_searches_fill_the_tool_memo(self, shared_inventory, trip, make_agent):
+        search_trip(trip, cache=None)
+        args = trip_search_calls(trip)["search_flights"]
+        hits = TOOL_MEMO.stats.hits
+        
+        agent = make_agent(
+            AIMessage(content="", tool_calls=[{"name": "search_flights", "args": args, "id": "f1", "type": "tool_call"}]),
+            AIMessage(content="done"),
+            registry=TRAVEL_REGISTRY,
+        )
+        agent.run("Flights again", verbose=False)
+        assert TOOL_MEMO.stats.hits == hits + 1
+    
+    def test_errors_are_not_cached(self, shared_inventory):
+        cache = TripSearchCache()
+        prefs = TripPreferences("San Francisco", "Atlantis", "2025-04-10", "2025-04-13", 180, ["food"])
+        observation = search_trip(prefs, cache=cache)
+        assert "[search_hotels]\nError: City 'Atlantis' not found" in observation
+        assert len(cache) == 0
+    
+    def test_cache_evicts_least_recent_thread(self):
+        cache = TripSearchCache(max_threads=2)
+        cache.put("a", "k", "A")
+        cache.put("b", "k", "B")
+        cache.get("a", "k")
+        cache.put("c", "k", "C")
+        assert cache.get("b", "k") is None
+        assert cache.get("a", "k") == "A" and cache.get("a", "other") is None
+
+
+class TestPlanTrip:
+    """One model turn with the search results."""
+    
+    def test_agent_gets_one_combined_observation(self, shared_inventory, trip, make_agent):
+        agent = make_agent(AIMessage(content="Day 1: ..."))
+        
+        assert plan_trip(agent, trip, "trip-1") == "Day 1: ..."
+        
+        assert agent.llm.calls == 1
+        request = [m for m in agent.llm.requests[0] if isinstance(m, HumanMessage)][-1].content
+        assert request.startswith(f"Plan a trip: {trip.as_text()}.")
+        for name in ("search_flights", "search_hotels", "search_activities", "optimize_itinerary"):
+            assert f"[{name}]" in request
+    
+    def test_async_version(self, trip):
+        calls = []
+        observation = asyncio.run(asearch_trip(trip, registry=slow_registry(calls), cache=None))
+        assert "search_activities results" in observation and len(calls) == 3